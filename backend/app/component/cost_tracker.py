@@ -12,9 +12,82 @@
 # limitations under the License.
 # ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
 
+import json
+import logging
+import threading
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-from collections import defaultdict
+from typing import Deque, Dict, Optional, Tuple
+from collections import defaultdict, deque
+
+from app.component.environment import env
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (input, output, cached input). Looked up by the longest
+# matching prefix of the model name; extend or override with a JSON file at
+# MODEL_PRICING_PATH ({"model-prefix": [input, output, cached_input]}).
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60, 0.075),
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gpt-4.1-nano": (0.10, 0.40, 0.025),
+    "gpt-4.1-mini": (0.40, 1.60, 0.10),
+    "gpt-4.1": (2.00, 8.00, 0.50),
+    "gpt-5-nano": (0.05, 0.40, 0.005),
+    "gpt-5-mini": (0.25, 2.00, 0.025),
+    "gpt-5": (1.25, 10.00, 0.125),
+    "o3-mini": (1.10, 4.40, 0.55),
+    "o3": (2.00, 8.00, 0.50),
+    "o4-mini": (1.10, 4.40, 0.275),
+    "claude-opus-4": (15.00, 75.00, 1.50),
+    "claude-sonnet-4": (3.00, 15.00, 0.30),
+    "claude-3-7-sonnet": (3.00, 15.00, 0.30),
+    "claude-3-5-haiku": (0.80, 4.00, 0.08),
+    "gemini-2.5-pro": (1.25, 10.00, 0.31),
+    "gemini-2.5-flash": (0.30, 2.50, 0.075),
+    "deepseek-chat": (0.27, 1.10, 0.07),
+    "deepseek-reasoner": (0.55, 2.19, 0.14),
+    "glm-4.5": (0.60, 2.20, 0.11),
+    "qwen-plus": (0.40, 1.20, 0.08),
+}
+
+_custom_prices: Optional[Dict[str, Tuple[float, float, float]]] = None
+
+
+def _prices() -> Dict[str, Tuple[float, float, float]]:
+    global _custom_prices
+    if _custom_prices is None:
+        _custom_prices = {}
+        path = env("MODEL_PRICING_PATH")
+        if path:
+            try:
+                with open(path) as f:
+                    _custom_prices = {name: tuple(price) for name, price in json.load(f).items()}
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring model pricing file {path}: {e}")
+    return {**MODEL_PRICES, **_custom_prices}
+
+
+def model_price(model: str) -> Optional[Tuple[float, float, float]]:
+    """(input, output, cached input) USD per million tokens for `model`, or None if unknown."""
+    name = model.lower().rsplit("/", 1)[-1]
+    matches = [prefix for prefix in _prices() if name.startswith(prefix)]
+    return _prices()[max(matches, key=len)] if matches else None
+
+
+def blended_price(model: str) -> Optional[float]:
+    """USD per million tokens at a 3:1 input to output mix, or None if `model` is unknown."""
+    price = model_price(model)
+    return None if price is None else (3 * price[0] + price[1]) / 4
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """Cost in USD of one call; cached tokens are part of `input_tokens`. Unknown models cost 0."""
+    price = model_price(model)
+    if price is None:
+        return 0.0
+    input_price, output_price, cached_price = price
+    uncached = max(input_tokens - cached_tokens, 0)
+    return (uncached * input_price + cached_tokens * cached_price + output_tokens * output_price) / 1_000_000
 
 
 @dataclass
@@ -28,20 +101,133 @@ class TokenUsage:
     cost_usd: float
     org_id: Optional[str] = None
     task_id: Optional[str] = None
+    cached_tokens: int = 0
+    project_id: Optional[str] = None
+    agent_name: Optional[str] = None
+    process_task_id: Optional[str] = None
+
+
+def _totals() -> Dict:
+    return {"cost_usd": 0.0, "input_tokens": 0, "output_tokens": 0, "cached_tokens": 0, "calls": 0}
+
+
+def _add(totals: Dict, usage: TokenUsage):
+    totals["cost_usd"] += usage.cost_usd
+    totals["input_tokens"] += usage.input_tokens
+    totals["output_tokens"] += usage.output_tokens
+    totals["cached_tokens"] += usage.cached_tokens
+    totals["calls"] += 1
+
+
+def _merge(totals: Dict, other: Dict):
+    for name, value in other.items():
+        totals[name] = totals.get(name, 0) + value
 
 
 class CostTracker:
     """Tracks token usage and costs across model calls.
 
     Supports filtering by organization and task for multi-tenant cost tracking.
+    Usage recorded with a `project_id` is also aggregated per project (by agent
+    and by model) for live reads, and checked against the project's budget.
+    Only the latest `max_records` calls are kept individually for `get_summary`;
+    a project's aggregates live until `clear(project_id)`, and `export_project` /
+    `restore_project` carry them across an eviction of the project's task lock.
     """
 
-    def __init__(self):
-        self._records: List[TokenUsage] = []
+    def __init__(self, max_records: Optional[int] = None):
+        if max_records is None:
+            max_records = int(env("COST_TRACKER_MAX_RECORDS", "10000"))
+        self._records: Deque[TokenUsage] = deque(maxlen=max_records)
+        self._projects: Dict[str, Dict] = {}
+        self._budgets: Dict[str, float] = {}
+        self._lock = threading.Lock()
 
     def record(self, usage: TokenUsage):
         """Record a token usage event."""
-        self._records.append(usage)
+        with self._lock:
+            self._records.append(usage)
+            if usage.project_id is None:
+                return
+            project = self._projects.get(usage.project_id)
+            if project is None:
+                project = self._projects[usage.project_id] = {
+                    "total": _totals(),
+                    "by_agent": defaultdict(_totals),
+                    "by_model": defaultdict(_totals),
+                }
+            _add(project["total"], usage)
+            _add(project["by_agent"][usage.agent_name or "unknown"], usage)
+            _add(project["by_model"][f"{usage.provider}/{usage.model}"], usage)
+
+    def set_budget(self, project_id: str, budget_usd: Optional[float]):
+        """Set (or with None remove) the spending limit of a project."""
+        with self._lock:
+            if budget_usd is None:
+                self._budgets.pop(project_id, None)
+            else:
+                self._budgets[project_id] = float(budget_usd)
+
+    def project_cost(self, project_id: str) -> float:
+        project = self._projects.get(project_id)
+        return project["total"]["cost_usd"] if project else 0.0
+
+    def over_budget(self, project_id: str) -> bool:
+        """Whether the project has spent its budget; projects without a budget never are."""
+        budget = self._budgets.get(project_id)
+        return budget is not None and self.project_cost(project_id) >= budget
+
+    def project_usage(self, project_id: str) -> Optional[Dict]:
+        """Live usage of a project broken down per agent and per model, or None if nothing was recorded."""
+        with self._lock:
+            project = self._projects.get(project_id)
+            budget = self._budgets.get(project_id)
+            if project is None:
+                return None
+            return {
+                "project_id": project_id,
+                **{f"total_{name}": value for name, value in project["total"].items()},
+                "budget_usd": budget,
+                "remaining_usd": None if budget is None else budget - project["total"]["cost_usd"],
+                "by_agent": {name: dict(totals) for name, totals in project["by_agent"].items()},
+                "by_model": {name: dict(totals) for name, totals in project["by_model"].items()},
+            }
+
+    def export_project(self, project_id: str) -> Optional[Dict]:
+        """A project's aggregates and budget as plain data, to spill with its evicted task lock."""
+        with self._lock:
+            project = self._projects.get(project_id)
+            budget = self._budgets.get(project_id)
+            if project is None and budget is None:
+                return None
+            return {
+                "budget_usd": budget,
+                "usage": None if project is None else {
+                    "total": dict(project["total"]),
+                    "by_agent": {name: dict(totals) for name, totals in project["by_agent"].items()},
+                    "by_model": {name: dict(totals) for name, totals in project["by_model"].items()},
+                },
+            }
+
+    def restore_project(self, project_id: str, state: Optional[Dict]):
+        """Bring back what `export_project` returned, on top of anything recorded since."""
+        if not state:
+            return
+        with self._lock:
+            if state.get("budget_usd") is not None:
+                self._budgets.setdefault(project_id, float(state["budget_usd"]))
+            usage = state.get("usage")
+            if not usage:
+                return
+            project = self._projects.setdefault(project_id, {
+                "total": _totals(),
+                "by_agent": defaultdict(_totals),
+                "by_model": defaultdict(_totals),
+            })
+            _merge(project["total"], usage["total"])
+            for group in ("by_agent", "by_model"):
+                for name, totals in usage[group].items():
+                    _merge(project[group][name], totals)
 
     def get_summary(
         self, org_id: Optional[str] = None, task_id: Optional[str] = None
@@ -76,6 +262,21 @@ class CostTracker:
             "record_count": len(filtered),
         }
 
-    def clear(self):
-        """Clear all recorded usage."""
-        self._records.clear()
+    def clear(self, project_id: Optional[str] = None):
+        """Clear all recorded usage, or only the usage and budget of one project."""
+        with self._lock:
+            if project_id is not None:
+                self._records = deque(
+                    (record for record in self._records if record.project_id != project_id),
+                    maxlen=self._records.maxlen,
+                )
+                self._projects.pop(project_id, None)
+                self._budgets.pop(project_id, None)
+                return
+            self._records.clear()
+            self._projects.clear()
+            self._budgets.clear()
+
+
+# Process-wide tracker that ListenChatAgent records every model call into
+cost_tracker = CostTracker()
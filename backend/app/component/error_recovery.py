@@ -12,11 +12,14 @@
 # limitations under the License.
 # ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
 
+import math
 import re
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+from app.component.rate_limiter import error_headers, retry_after_seconds
+
 
 class RecoveryStrategy(str, Enum):
     """Strategies for recovering from errors.
@@ -143,6 +146,12 @@ class ErrorRecovery:
                         ),
                     )
 
+                if strategy == RecoveryStrategy.RETRY:
+                    # The provider's Retry-After beats the fixed per-pattern wait
+                    retry_after = retry_after_seconds(error_headers(error))
+                    if retry_after is not None:
+                        wait = math.ceil(retry_after)
+
                 return RecoveryResult(
                     strategy=strategy,
                     user_message=f"{message}. Retrying in {wait} seconds...",
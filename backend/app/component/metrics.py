@@ -0,0 +1,268 @@
+"""
+In-process metrics for the hot paths, rendered in the Prometheus text format at `/metrics`.
+
+Recording never takes a lock: every thread writes to its own shard (a plain dict only that
+thread mutates) and a scrape sums the shards. The only lock is taken the first time a thread
+records into a metric and while scraping, so counters and histograms stay cheap enough to be
+always on.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._local = threading.local()
+        self._shards: list[tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    @abstractmethod
+    def _merge_into(self, total: dict, shard: dict):
+        """Add one shard's values into `total`."""
+
+    def _collect(self) -> dict:
+        with self._lock:
+            # Fold shards of finished threads into one dict so they do not accumulate
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._merge_into(self._retired, shard)
+            self._shards = alive
+            total: dict = {}
+            self._merge_into(total, self._retired)
+            for _, shard in alive:
+                # dict() copies in one step under the GIL, so a concurrent insert cannot break iteration
+                self._merge_into(total, dict(shard))
+        return total
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge_into(self, total: dict, shard: dict):
+        for labels, value in shard.items():
+            total[labels] = total.get(labels, 0) + value
+
+    def value(self, *labels: str) -> float:
+        return self._collect().get(labels, 0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for labels, value in sorted(self._collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        # Per-bucket (non-cumulative) counts, then +Inf, sum and count
+        counts = shard.get(labels)
+        if counts is None:
+            counts = shard[labels] = [0] * (len(self.buckets) + 3)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def _merge_into(self, total: dict, shard: dict):
+        for labels, counts in shard.items():
+            merged = total.get(labels)
+            if merged is None:
+                total[labels] = list(counts)
+            else:
+                for i, count in enumerate(counts):
+                    merged[i] += count
+
+    def summary(self, *labels: str) -> tuple[int, float]:
+        """Observation count and sum for one label set."""
+        counts = self._collect().get(labels)
+        return (counts[-1], counts[-2]) if counts else (0, 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for labels, counts in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(counts[-2])}")
+            lines.append(f"{self.name}_count{label_str} {counts[-1]}")
+        return lines
+
+
+class GaugeFunction:
+    """Gauge whose value is computed at scrape time, for state that already lives elsewhere."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        registry.register(self)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            f"{self.name} {_format_value(self.fn())}",
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric | GaugeFunction] = {}
+
+    def register(self, metric: "_Metric | GaugeFunction"):
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception:
+                # A failing gauge callback must not take the whole scrape down
+                continue
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+agent_step_seconds = Histogram(
+    "eigent_agent_step_seconds", "Latency of one LLM step (step/astep) per agent.", ("agent",)
+)
+agent_step_errors = Counter("eigent_agent_step_errors_total", "LLM steps that raised, per agent.", ("agent",))
+agent_tokens = Counter("eigent_agent_tokens_total", "Total tokens reported by the model, per agent.", ("agent",))
+agent_prompt_tokens = Counter("eigent_agent_prompt_tokens_total", "Prompt tokens sent to the model, per agent.", ("agent",))
+agent_cached_prompt_tokens = Counter(
+    "eigent_agent_cached_prompt_tokens_total",
+    "Prompt tokens served from the provider's prompt cache, per agent (hit ratio: divide by prompt tokens).",
+    ("agent",),
+)
+model_cost_usd = Counter(
+    "eigent_model_cost_usd_total", "Estimated model spend in USD from the local pricing table, per model.", ("model",)
+)
+tool_seconds = Histogram(
+    "eigent_tool_seconds", "Tool call latency per toolkit and method.", ("toolkit", "method")
+)
+tool_errors = Counter("eigent_tool_errors_total", "Tool calls that raised, per toolkit and method.", ("toolkit", "method"))
+task_queue_events = Counter(
+    "eigent_task_queue_events_total", "Events put on task lock queues, per action type.", ("action",)
+)
+sse_frame_bytes = Histogram(
+    "eigent_sse_frame_bytes", "Size of server-sent event frames in bytes, per step.", ("step",), BYTES_BUCKETS
+)
+subtask_wait_seconds = Histogram(
+    "eigent_subtask_wait_seconds", "Time a subtask waited between assignment and start, per worker.", ("worker",)
+)
+task_lock_evictions = Counter(
+    "eigent_task_lock_evictions_total", "Task locks evicted from memory, per reason (ttl, memory).", ("reason",)
+)
+question_routes = Counter(
+    "eigent_question_routes_total", "User questions routed, per tier (rules, llm) and route (simple, complex).",
+    ("tier", "route"),
+)
+subtask_run_seconds = Histogram(
+    "eigent_subtask_run_seconds", "Time a worker spent processing a subtask, per worker.", ("worker",)
+)
+task_card_seconds = Histogram(
+    "eigent_task_card_seconds",
+    "Time from a task being confirmed to its final task card (subtasks and summary), per flow (new, multi_turn).",
+    ("flow",),
+)
+model_rate_limit_wait_seconds = Histogram(
+    "eigent_model_rate_limit_wait_seconds", "Time a model call waited on the shared rate limiter, per model.", ("model",)
+)
+model_rate_limited = Counter(
+    "eigent_model_rate_limited_total", "Model calls rejected by the provider with a rate limit, per model.", ("model",)
+)
+tool_results_spilled = Counter(
+    "eigent_tool_results_spilled_total",
+    "Oversized tool results stored on disk and shown to the model as an excerpt, per method.",
+    ("method",),
+)
+memory_compacted_results = Counter(
+    "eigent_memory_compacted_results_total",
+    "Tool results in agent memory replaced by a stored digest and handle, per agent.",
+    ("agent",),
+)
+
+
+@contextmanager
+def tool_timer(toolkit: str, method: str):
+    """Record the latency of one tool call, counting it as an error if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        tool_errors.inc(toolkit, method)
+        raise
+    finally:
+        tool_seconds.observe(time.perf_counter() - started, toolkit, method)
@@ -12,22 +12,85 @@
 # limitations under the License.
 # ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
 
+import logging
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 from camel.models import ModelFactory
 from camel.types import ModelPlatformType
 
+logger = logging.getLogger(__name__)
+
+# Latency classes from fastest to slowest, with the observed step latency (seconds)
+# above which a model no longer counts as belonging to the class
+LATENCY_CLASSES = ("fast", "standard", "slow")
+LATENCY_CLASS_LIMITS = {"fast": 5.0, "standard": 30.0, "slow": float("inf")}
+
+# Latency key of the caller's own model, passed to `ModelRegistry.route` as `default`
+DEFAULT_MODEL = ("default", "")
+
 
 @dataclass
 class ModelCapabilities:
-    """Tracks the capabilities of a model."""
+    """Tracks the capabilities of a model.
+
+    Attributes:
+        supports_function_calling: Model can call tools.
+        supports_vision: Model accepts image input.
+        supports_streaming: Model can stream responses.
+        max_context_length: Context window in tokens.
+        latency_class: Declared latency class, one of `LATENCY_CLASSES`.
+        cost_per_million_tokens: Blended price in USD; None when unknown.
+    """
 
     supports_function_calling: bool = True
     supports_vision: bool = False
     supports_streaming: bool = True
     max_context_length: int = 128000
+    latency_class: str = "standard"
+    cost_per_million_tokens: Optional[float] = None
+
+    def __post_init__(self):
+        if self.latency_class not in LATENCY_CLASSES:
+            raise ValueError(f"Unknown latency class: {self.latency_class}")
+
+
+@dataclass
+class ModelRequirements:
+    """What an agent role needs from its model.
+
+    Attributes:
+        tool_calling: Model must support function calling.
+        vision: Model must accept image input.
+        min_context_length: Smallest acceptable context window in tokens.
+        latency_class: Slowest acceptable latency class; None accepts any.
+    """
+
+    tool_calling: bool = False
+    vision: bool = False
+    min_context_length: int = 0
+    latency_class: Optional[str] = None
+
+    def __post_init__(self):
+        if self.latency_class is not None and self.latency_class not in LATENCY_CLASSES:
+            raise ValueError(f"Unknown latency class: {self.latency_class}")
+
+    def satisfied_by(self, capabilities: ModelCapabilities, observed_latency: Optional[float] = None) -> bool:
+        if self.tool_calling and not capabilities.supports_function_calling:
+            return False
+        if self.vision and not capabilities.supports_vision:
+            return False
+        if capabilities.max_context_length < self.min_context_length:
+            return False
+        if self.latency_class is not None:
+            allowed = LATENCY_CLASSES.index(self.latency_class)
+            if LATENCY_CLASSES.index(capabilities.latency_class) > allowed:
+                return False
+            # A model that turned out slower than the class allows is demoted
+            if observed_latency is not None and observed_latency > LATENCY_CLASS_LIMITS[self.latency_class]:
+                return False
+        return True
 
 
 @dataclass
@@ -68,8 +131,10 @@ class ModelRegistry:
     adapters by provider+model combination.
     """
 
-    def __init__(self):
+    def __init__(self, latency_smoothing: float = 0.2):
         self._adapters: Dict[str, Dict[str, UniversalModelAdapter]] = {}
+        self._latency: Dict[Tuple[str, str], float] = {}
+        self.latency_smoothing = latency_smoothing
 
     def register(
         self,
@@ -104,3 +169,64 @@ class ModelRegistry:
     def list_models(self, provider_id: str) -> List[str]:
         """List all models for a provider."""
         return list(self._adapters.get(provider_id, {}).keys())
+
+    def record_latency(self, provider_id: str, model_name: str, seconds: float):
+        """Feed one observed step latency into the model's moving average."""
+        key = (provider_id, model_name)
+        previous = self._latency.get(key)
+        self._latency[key] = seconds if previous is None else (
+            previous + self.latency_smoothing * (seconds - previous)
+        )
+
+    def observed_latency(self, provider_id: str, model_name: str) -> Optional[float]:
+        return self._latency.get((provider_id, model_name))
+
+    def route(
+        self, requirements: ModelRequirements, default: Optional[ModelCapabilities] = None
+    ) -> Optional[Tuple[str, UniversalModelAdapter]]:
+        """Cheapest registered model that satisfies `requirements`, as (provider_id, adapter).
+
+        `default` describes the caller's own model, which competes with the registered ones under
+        the `DEFAULT_MODEL` latency key. Models without a known price rank after priced ones; ties
+        go to the lower observed (then declared) latency. Returns None when the default model wins
+        or no registered model qualifies.
+        """
+        candidates = []
+        entries = [
+            (provider_id, model_name, adapter)
+            for provider_id, adapters in self._adapters.items()
+            for model_name, adapter in adapters.items()
+        ]
+        if default is not None:
+            entries.append((*DEFAULT_MODEL, None))
+        for provider_id, model_name, adapter in entries:
+            capabilities = default if adapter is None else adapter.capabilities
+            latency = self.observed_latency(provider_id, model_name)
+            if not requirements.satisfied_by(capabilities, latency):
+                continue
+            cost = capabilities.cost_per_million_tokens
+            rank = (
+                float("inf") if cost is None else cost,
+                float("inf") if latency is None else latency,
+                LATENCY_CLASSES.index(capabilities.latency_class),
+                adapter is not None,
+            )
+            candidates.append((rank, provider_id, adapter))
+        if not candidates:
+            return None
+        _, provider_id, adapter = min(candidates, key=lambda candidate: candidate[0])
+        return None if adapter is None else (provider_id, adapter)
+
+    def register_from_params(self, models: List[Dict[str, Any]]):
+        """Register models declared as [{"provider", "url", "api_key", "models", "capabilities"}]."""
+        for entry in models:
+            try:
+                self.register(
+                    provider_id=entry["provider"],
+                    endpoint_url=entry["url"],
+                    api_key=entry.get("api_key", ""),
+                    models=list(entry["models"]),
+                    capabilities=ModelCapabilities(**entry.get("capabilities", {})),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Ignoring invalid model registration {entry.get('provider')}: {e}")
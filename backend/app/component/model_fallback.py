@@ -12,8 +12,14 @@
 # limitations under the License.
 # ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
 
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,18 +30,163 @@ class ModelCallError(Exception):
     pass
 
 
+class CircuitOpenError(Exception):
+    """The provider's circuit breaker is open, so it was not called."""
+    pass
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states.
+
+    Attributes:
+        CLOSED: Calls go through; outcomes are tracked.
+        OPEN: Calls are skipped until the cooldown has passed.
+        HALF_OPEN: One probe call is let through to decide between the two.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+@dataclass
+class ProviderHealth:
+    """Rolling health of one provider/model pair, with a circuit breaker.
+
+    Attributes:
+        window: Number of recent calls the latency and error statistics cover.
+        min_calls: Calls needed in the window before the breaker may trip.
+        failure_threshold: Error rate over the window that opens the breaker.
+        cooldown: Seconds an open breaker waits before letting a probe through.
+        clock: Monotonic time source, injectable for tests.
+    """
+
+    window: int = 50
+    min_calls: int = 4
+    failure_threshold: float = 0.5
+    cooldown: float = 30.0
+    clock: Callable[[], float] = time.monotonic
+    state: CircuitState = field(default=CircuitState.CLOSED, init=False)
+    opened_at: float = field(default=0.0, init=False)
+    _latencies: Deque[float] = field(default_factory=deque, init=False, repr=False)
+    _outcomes: Deque[bool] = field(default_factory=deque, init=False, repr=False)
+    _probing: bool = field(default=False, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @property
+    def p50(self) -> Optional[float]:
+        return _percentile(list(self._latencies), 0.5)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return _percentile(list(self._latencies), 0.95)
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    @property
+    def error_rate(self) -> float:
+        outcomes = list(self._outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; moves an open breaker past its cooldown to half-open."""
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                if self.clock() - self.opened_at < self.cooldown:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def _append(self, ok: bool, latency: Optional[float]):
+        self._outcomes.append(ok)
+        if len(self._outcomes) > self.window:
+            self._outcomes.popleft()
+        if latency is not None:
+            self._latencies.append(latency)
+            if len(self._latencies) > self.window:
+                self._latencies.popleft()
+
+    def record_success(self, latency: float):
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                # The probe succeeded: start over with a clean window
+                self.state = CircuitState.CLOSED
+                self._probing = False
+                self._outcomes.clear()
+            self._append(True, latency)
+
+    def record_failure(self):
+        with self._lock:
+            self._append(False, None)
+            if self.state == CircuitState.HALF_OPEN:
+                self._open()
+            elif len(self._outcomes) >= self.min_calls and self.error_rate >= self.failure_threshold:
+                self._open()
+
+    def record_cancelled(self):
+        """An attempt was abandoned before it finished; a half-open breaker may probe again."""
+        with self._lock:
+            self._probing = False
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self.opened_at = self.clock()
+        self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "p50": self.p50,
+            "p95": self.p95,
+            "error_rate": self.error_rate,
+            "samples": self.samples,
+        }
+
+
 @dataclass
 class FallbackChain:
     """Chain of models to try in order, with automatic failover.
 
     When a model fails (rate limit, timeout, etc.), the next model in the
-    chain is tried automatically.
+    chain is tried automatically. Each provider/model keeps a `ProviderHealth`;
+    models whose circuit breaker is open are skipped. With `hedge` enabled, a
+    call that is still running after the model's p95 latency fires a second
+    request at the next model and the first success wins.
+
+    Attributes:
+        models: Ordered list of {"provider": ..., "model": ...} configs.
+        registry: `ModelRegistry` providing adapters.
+        hedge: Fire a hedged request once an attempt exceeds its p95 latency.
+        hedge_min_samples: Latency samples needed before a model is hedged.
+        health_options: Keyword arguments for each `ProviderHealth`.
+        clock: Monotonic time source, injectable for tests.
     """
 
     models: List[Dict[str, str]]
     registry: Any = None
+    hedge: bool = False
+    hedge_min_samples: int = 5
+    health_options: Dict[str, Any] = field(default_factory=dict)
+    clock: Callable[[], float] = time.monotonic
     last_used_provider: Optional[str] = field(default=None, init=False)
     last_error: Optional[Exception] = field(default=None, init=False)
+    health: Dict[str, ProviderHealth] = field(default_factory=dict, init=False)
+    _instances: Dict[Tuple, Any] = field(default_factory=dict, init=False, repr=False)
 
     def _get_adapter(self, provider: str, model: str):
         """Get adapter for a provider/model pair."""
@@ -44,29 +195,177 @@ class FallbackChain:
         # For testing without registry
         raise NotImplementedError("Registry required")
 
-    def call(self, prompt: str, **kwargs) -> Any:
-        """Call the model chain, trying each model in order until one succeeds."""
-        errors = []
+    def _get_model(self, provider: str, model: str, kwargs: Dict[str, Any]):
+        """Model instance for a provider/model pair, created once per set of kwargs."""
+        key = (provider, model, tuple(sorted((name, repr(value)) for name, value in kwargs.items())))
+        instance = self._instances.get(key)
+        if instance is None:
+            instance = self._instances[key] = self._get_adapter(provider, model).create_model(**kwargs)
+        return instance
+
+    def get_health(self, provider: str, model: str) -> ProviderHealth:
+        key = f"{provider}/{model}"
+        health = self.health.get(key)
+        if health is None:
+            health = self.health[key] = ProviderHealth(**{"clock": self.clock, **self.health_options})
+        return health
 
+    def _candidates(self, errors: List[Tuple[str, str, Exception]]) -> Iterator[Dict[str, str]]:
         for model_config in self.models:
-            provider = model_config["provider"]
-            model = model_config["model"]
+            provider, model = model_config["provider"], model_config["model"]
+            if self.get_health(provider, model).allow():
+                yield model_config
+            else:
+                logger.info(f"Skipping {provider}/{model}: circuit breaker open")
+                errors.append((provider, model, CircuitOpenError("circuit breaker open")))
+
+    def _hedge_delay(self, model_config: Dict[str, str]) -> Optional[float]:
+        if not self.hedge:
+            return None
+        health = self.get_health(model_config["provider"], model_config["model"])
+        return health.p95 if health.samples >= self.hedge_min_samples else None
+
+    def _attempt(self, model_config: Dict[str, str], prompt: str, kwargs: Dict[str, Any]) -> Any:
+        provider, model = model_config["provider"], model_config["model"]
+        health = self.get_health(provider, model)
+        started = self.clock()
+        try:
+            response = self._get_model(provider, model, kwargs).step(prompt)
+        except Exception:
+            health.record_failure()
+            raise
+        health.record_success(self.clock() - started)
+        return response
 
-            try:
-                adapter = self._get_adapter(provider, model)
-                agent = adapter.create_model(**kwargs)
-                response = agent.step(prompt)
-                self.last_used_provider = provider
+    async def _aattempt(self, model_config: Dict[str, str], prompt: str, kwargs: Dict[str, Any]) -> Any:
+        provider, model = model_config["provider"], model_config["model"]
+        health = self.get_health(provider, model)
+        started = self.clock()
+        try:
+            instance = self._get_model(provider, model, kwargs)
+            astep = getattr(instance, "astep", None)
+            if asyncio.iscoroutinefunction(astep):
+                response = await astep(prompt)
+            else:
+                response = await asyncio.to_thread(instance.step, prompt)
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the provider's health
+            health.record_cancelled()
+            raise
+        except Exception:
+            health.record_failure()
+            raise
+        health.record_success(self.clock() - started)
+        return response
 
-                if hasattr(response, 'msgs') and response.msgs:
-                    return response.msgs[0]
-                return response
+    def _succeeded(self, model_config: Dict[str, str], response: Any) -> Any:
+        self.last_used_provider = model_config["provider"]
+        if hasattr(response, 'msgs') and response.msgs:
+            return response.msgs[0]
+        return response
 
-            except Exception as e:
-                logger.warning(f"Model {provider}/{model} failed: {e}")
-                errors.append((provider, model, e))
-                self.last_error = e
-                continue
+    def _failed(self, model_config: Dict[str, str], error: Exception, errors: List[Tuple[str, str, Exception]]):
+        provider, model = model_config["provider"], model_config["model"]
+        logger.warning(f"Model {provider}/{model} failed: {error}")
+        errors.append((provider, model, error))
+        self.last_error = error
 
+    @staticmethod
+    def _all_failed(errors: List[Tuple[str, str, Exception]]) -> ModelCallError:
         error_summary = "; ".join([f"{p}/{m}: {e}" for p, m, e in errors])
-        raise ModelCallError(f"All models failed: {error_summary}")
+        return ModelCallError(f"All models failed: {error_summary}")
+
+    def call(self, prompt: str, **kwargs) -> Any:
+        """Call the model chain, trying each model in order until one succeeds."""
+        errors: List[Tuple[str, str, Exception]] = []
+        candidates = self._candidates(errors)
+
+        if not self.hedge:
+            for model_config in candidates:
+                try:
+                    return self._succeeded(model_config, self._attempt(model_config, prompt, kwargs))
+                except Exception as e:
+                    self._failed(model_config, e, errors)
+            raise self._all_failed(errors)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(self.models)))
+        try:
+            pending: Dict[concurrent.futures.Future, Dict[str, str]] = {}
+
+            def start_next() -> bool:
+                model_config = next(candidates, None)
+                if model_config is None:
+                    return False
+                pending[executor.submit(self._attempt, model_config, prompt, kwargs)] = model_config
+                return True
+
+            start_next()
+            hedged = False
+            while pending:
+                # Only a lone attempt is hedged; a hedge already in flight is not hedged again
+                delay = None if hedged or len(pending) > 1 else self._hedge_delay(next(iter(pending.values())))
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=delay, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    model_config = next(iter(pending.values()))
+                    if start_next():
+                        logger.info(f"Hedging {model_config['provider']}/{model_config['model']} after {delay:.2f}s")
+                    continue
+                for future in done:
+                    model_config = pending.pop(future)
+                    try:
+                        return self._succeeded(model_config, future.result())
+                    except Exception as e:
+                        self._failed(model_config, e, errors)
+                if not pending:
+                    hedged = False
+                    start_next()
+            raise self._all_failed(errors)
+        finally:
+            # A losing attempt keeps its thread until the provider answers; its outcome still feeds health
+            executor.shutdown(wait=False)
+
+    async def acall(self, prompt: str, **kwargs) -> Any:
+        """Async `call`: uses the model's `astep` when it has one, losing hedges are cancelled."""
+        errors: List[Tuple[str, str, Exception]] = []
+        candidates = self._candidates(errors)
+        pending: Dict[asyncio.Task, Dict[str, str]] = {}
+
+        def start_next() -> bool:
+            model_config = next(candidates, None)
+            if model_config is None:
+                return False
+            pending[asyncio.ensure_future(self._aattempt(model_config, prompt, kwargs))] = model_config
+            return True
+
+        try:
+            start_next()
+            hedged = False
+            while pending:
+                delay = None if hedged or len(pending) > 1 else self._hedge_delay(next(iter(pending.values())))
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    model_config = next(iter(pending.values()))
+                    if start_next():
+                        logger.info(f"Hedging {model_config['provider']}/{model_config['model']} after {delay:.2f}s")
+                    continue
+                for task in done:
+                    model_config = pending.pop(task)
+                    try:
+                        return self._succeeded(model_config, task.result())
+                    except Exception as e:
+                        self._failed(model_config, e, errors)
+                if not pending:
+                    hedged = False
+                    start_next()
+            raise self._all_failed(errors)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def health_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Latency percentiles, error rate and breaker state per provider/model."""
+        return {key: health.snapshot() for key, health in self.health.items()}
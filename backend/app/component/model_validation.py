@@ -1,7 +1,30 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
 from camel.agents import ChatAgent
 from camel.models import ModelFactory
 from camel.types import ModelPlatformType, ModelType
 
+from app.component.environment import env
+from app.component.model_adapter import ModelCapabilities
+
+TOOL_RESULT = "Tool execution completed successfully for https://www.camel-ai.org, Website Content: Welcome to CAMEL AI!"
+
+VALIDATION_PROMPT = """
+            Get the content of https://www.camel-ai.org,
+            you must use the get_website_content tool to get the content ,
+            i just want to verify the get_website_content tool is working,
+            you must call the get_website_content tool only once.
+            """
+
+# The capabilities probe only needs the model to emit one tool call
+PROBE_PROMPT = "Call get_website_content once with url https://www.camel-ai.org."
+PROBE_MAX_TOKENS = 64
+
 
 def get_website_content(url: str) -> str:
     r"""Gets the content of a website.
@@ -12,11 +35,17 @@ def get_website_content(url: str) -> str:
     Returns:
         str: The content of the website.
     """
-    return f"Tool execution completed successfully for https://www.camel-ai.org, Website Content: Welcome to CAMEL AI!"
+    return TOOL_RESULT
 
 
 def create_agent(
-    model_platform: str, model_type: str, api_key: str = None, url: str = None, model_config_dict: dict = None, **kwargs
+    model_platform: str,
+    model_type: str,
+    api_key: str = None,
+    url: str = None,
+    model_config_dict: dict = None,
+    max_iteration: int | None = None,
+    **kwargs,
 ) -> ChatAgent:
     platform = model_platform
     mtype = model_type
@@ -38,5 +67,100 @@ def create_agent(
         model=model,
         tools=[get_website_content],
         step_timeout=900,
+        max_iteration=max_iteration,
     )
     return agent
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating one model configuration.
+
+    Attributes:
+        is_valid: The model answered at all.
+        is_tool_calls: The model called the test tool and got its result back.
+        capabilities: Capability record derived from the check.
+        mode: "full" (tool-calling round-trip) or "probe" (single minimal tool call).
+        checked_at: Wall-clock time of the check.
+    """
+
+    is_valid: bool
+    is_tool_calls: bool
+    capabilities: ModelCapabilities = field(default_factory=ModelCapabilities)
+    mode: str = "full"
+    checked_at: float = field(default_factory=time.time)
+
+
+def validation_key(
+    mode: str,
+    model_platform: str,
+    model_type: str,
+    url: Optional[str],
+    api_key: Optional[str],
+    model_config_dict: Optional[dict],
+    extra_params: Optional[dict],
+) -> str:
+    """Cache key of a validation; the API key and configs only enter it as hashes."""
+    api_key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+    config = json.dumps([model_config_dict or {}, extra_params or {}], sort_keys=True, default=str)
+    config_hash = hashlib.sha256(config.encode()).hexdigest()[:16]
+    return "|".join((mode, model_platform, model_type, url or "", api_key_hash, config_hash))
+
+
+class ValidationCache:
+    """TTL cache of validation results with single-flight deduplication.
+
+    Concurrent validations of the same key share one provider round-trip. Only completed
+    validations are cached; a failure reaches every waiter and the next call tries again.
+    The TTL comes from MODEL_VALIDATION_CACHE_TTL (seconds, default 600).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._entries: Dict[str, Tuple[float, ValidationResult]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def get(self, key: str) -> Optional[ValidationResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires <= self.clock():
+            del self._entries[key]
+            return None
+        return result
+
+    def put(self, key: str, result: ValidationResult):
+        self._entries[key] = (self.clock() + float(env("MODEL_VALIDATION_CACHE_TTL", "600")), result)
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """Drop one key, or everything when `key` is None; returns how many entries were dropped."""
+        if key is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+        return 1 if self._entries.pop(key, None) else 0
+
+    async def get_or_validate(
+        self, key: str, validate: Callable[[], Awaitable[ValidationResult]], refresh: bool = False
+    ) -> Tuple[ValidationResult, bool]:
+        """Cached result for `key`, or the result of `validate()`; the flag tells whether it was cached."""
+        if not refresh:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, True
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = self._inflight[key] = asyncio.ensure_future(validate())
+
+            def done(future: asyncio.Future):
+                self._inflight.pop(key, None)
+                if not future.cancelled() and future.exception() is None:
+                    self.put(key, future.result())
+
+            inflight.add_done_callback(done)
+        # A cancelled caller must not cancel the validation other callers wait on
+        return await asyncio.shield(inflight), False
+
+
+validation_cache = ValidationCache()
@@ -0,0 +1,459 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+"""Process-wide rate limiting of model calls.
+
+Every agent that talks to the same (provider, API key, model) shares one
+`ModelRateLimiter`, holding a requests-per-minute and a tokens-per-minute
+token bucket. Limits start from MODEL_RATE_LIMIT_RPM / MODEL_RATE_LIMIT_TPM
+(unset: unlimited) and are learned from the `x-ratelimit-*` and
+`anthropic-ratelimit-*` headers of rate-limited responses. A `Retry-After`
+pauses the key for every caller instead of each agent sleeping blindly.
+Waiting calls are admitted round-robin across projects, so one busy workforce
+cannot starve the others.
+"""
+
+import asyncio
+import email.utils
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+import logging
+
+from camel.models import ModelManager
+
+from app.component import metrics
+from app.component.environment import env
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse seconds ("12", "0.5") or OpenAI reset durations ("6m0s", "20ms")."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            value = headers.get(name.title())
+        if value is not None:
+            return value
+    return None
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds to wait according to `retry-after-ms` / `Retry-After` (seconds or HTTP date)."""
+    if not headers:
+        return None
+    retry_after_ms = _header(headers, "retry-after-ms")
+    if retry_after_ms is not None:
+        seconds = parse_duration(retry_after_ms)
+        if seconds is not None:
+            return seconds / 1000
+    retry_after = _header(headers, "retry-after")
+    if retry_after is None:
+        return None
+    seconds = parse_duration(retry_after)
+    if seconds is not None:
+        return seconds
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def error_headers(error: BaseException) -> Optional[Mapping[str, str]]:
+    """HTTP response headers attached to `error` or to an exception it was raised from."""
+    seen = 0
+    current: Optional[BaseException] = error
+    while current is not None and seen < 5:
+        response = getattr(current, "response", None)
+        headers = getattr(response, "headers", None) or getattr(current, "headers", None)
+        if headers:
+            return headers
+        current = current.__cause__ or current.__context__
+        seen += 1
+    return None
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` / 60 per second; None means unlimited.
+
+    Admissions may drive the level negative (a debt), which later callers wait off.
+    """
+
+    def __init__(self, per_minute: Optional[float], clock: Callable[[], float]):
+        self.capacity = per_minute
+        self.level = per_minute or 0.0
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self, now: float):
+        if self.capacity:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        # A request larger than the whole bucket goes through once the bucket is full
+        missing = min(amount, self.capacity) - self.level
+        return missing * 60 / self.capacity if missing > 0 else 0.0
+
+    def take(self, amount: float, now: float):
+        if not self.capacity:
+            return
+        self._refill(now)
+        self.level = min(self.capacity, self.level - amount)
+
+    def set_limit(self, per_minute: float, now: float):
+        self._refill(now)
+        if not self.capacity:
+            self.level = per_minute
+        self.capacity = per_minute
+        self.level = min(self.level, per_minute)
+
+    def set_remaining(self, remaining: float, now: float):
+        if self.capacity:
+            self._refill(now)
+            self.level = min(self.level, remaining)
+
+
+@dataclass
+class Lease:
+    """An admitted call; `settle` it with the provider's usage to correct the token estimate."""
+
+    limiter: "ModelRateLimiter"
+    tokens: int
+    waited: float
+
+
+class _Waiter:
+    __slots__ = ("tokens", "event", "future", "loop")
+
+    def __init__(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.tokens = tokens
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def wake(self):
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _on_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class ModelRateLimiter:
+    """Requests- and tokens-per-minute budget for one (provider, API key, model).
+
+    Attributes:
+        key: (provider, API key hash, model) this limiter covers.
+        requests: Requests-per-minute bucket.
+        tokens: Tokens-per-minute bucket.
+        blocked_until: Clock time before which nothing is admitted (`Retry-After`).
+    """
+
+    def __init__(
+        self,
+        key: Tuple[str, str, str],
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.key = key
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._turns: Deque[str] = deque()
+
+    def _delay(self, tokens: int, now: float) -> float:
+        return max(
+            self.blocked_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+            0.0,
+        )
+
+    def _admit(self, tokens: int, now: float):
+        self.requests.take(1, now)
+        self.tokens.take(tokens, now)
+
+    def _enqueue(self, project: str, waiter: _Waiter):
+        queue = self._queues.get(project)
+        if queue is None:
+            queue = self._queues[project] = deque()
+            self._turns.append(project)
+        queue.append(waiter)
+
+    def _dispatch(self) -> Optional[float]:
+        """Admit waiters round-robin across projects while capacity lasts.
+
+        Returns the delay until the next waiter can go, or None when nobody waits.
+        """
+        now = self.clock()
+        while self._turns:
+            project = self._turns[0]
+            queue = self._queues[project]
+            delay = self._delay(queue[0].tokens, now)
+            if delay > 0:
+                return delay
+            waiter = queue.popleft()
+            self._admit(waiter.tokens, now)
+            self._turns.rotate(-1)
+            if not queue:
+                self._turns.pop()
+                del self._queues[project]
+            waiter.wake()
+        return None
+
+    def _remove(self, project: str, waiter: _Waiter):
+        queue = self._queues.get(project)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                self._turns.remove(project)
+                del self._queues[project]
+
+    def _try_fast_path(self, tokens: int) -> bool:
+        now = self.clock()
+        if not self._turns and self._delay(tokens, now) <= 0:
+            self._admit(tokens, now)
+            return True
+        return False
+
+    def _admitted(self, tokens: int, started: float) -> Lease:
+        waited = self.clock() - started
+        if waited > 0:
+            metrics.model_rate_limit_wait_seconds.observe(waited, self.key[2])
+        return Lease(self, tokens, waited)
+
+    def acquire(self, project: str, tokens: int = 0) -> Lease:
+        """Block until a call of ~`tokens` tokens may go out for `project`.
+
+        On an event loop thread the call is admitted at once (as a debt on the
+        buckets) rather than blocking the loop; async callers use `aacquire`.
+        """
+        started = self.clock()
+        with self._lock:
+            if self._try_fast_path(tokens):
+                return Lease(self, tokens, 0.0)
+            if _on_event_loop_thread():
+                self._admit(tokens, started)
+                return Lease(self, tokens, 0.0)
+            waiter = _Waiter(tokens)
+            self._enqueue(project, waiter)
+        while True:
+            with self._lock:
+                delay = self._dispatch()
+            if waiter.event.wait(timeout=delay):
+                return self._admitted(tokens, started)
+
+    async def aacquire(self, project: str, tokens: int = 0) -> Lease:
+        """Async `acquire`: waits without blocking the event loop."""
+        started = self.clock()
+        with self._lock:
+            if self._try_fast_path(tokens):
+                return Lease(self, tokens, 0.0)
+            waiter = _Waiter(tokens, asyncio.get_running_loop())
+            self._enqueue(project, waiter)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._dispatch()
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), timeout=delay)
+                    return self._admitted(tokens, started)
+                except asyncio.TimeoutError:
+                    continue
+        except asyncio.CancelledError:
+            with self._lock:
+                self._remove(project, waiter)
+            raise
+
+    def settle(self, lease: Lease, usage: Any):
+        """Charge the difference between the estimated and the reported token count."""
+        if not usage:
+            return
+        get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+        total = get("total_tokens") or (get("prompt_tokens") or 0) + (get("completion_tokens") or 0)
+        if total:
+            with self._lock:
+                self.tokens.take(total - lease.tokens, self.clock())
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> bool:
+        """Learn limits and pauses from rate-limit response headers; returns whether any applied."""
+        if not headers:
+            return False
+        learned = False
+        with self._lock:
+            now = self.clock()
+            retry_after = retry_after_seconds(headers)
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                learned = True
+            for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+                limit = parse_duration(_header(headers, f"x-ratelimit-limit-{kind}", f"anthropic-ratelimit-{kind}-limit"))
+                if limit:
+                    bucket.set_limit(limit, now)
+                    learned = True
+                remaining = parse_duration(
+                    _header(headers, f"x-ratelimit-remaining-{kind}", f"anthropic-ratelimit-{kind}-remaining")
+                )
+                if remaining is not None:
+                    bucket.set_remaining(remaining, now)
+                    learned = True
+                    reset = parse_duration(_header(headers, f"x-ratelimit-reset-{kind}"))
+                    if remaining <= 0 and reset:
+                        self.blocked_until = max(self.blocked_until, now + reset)
+            # Capacity may have changed (or a pause expired) for the callers already waiting
+            self._dispatch()
+        return learned
+
+    def observe_error(self, error: BaseException) -> bool:
+        """Feed a failed call's response headers back; returns whether the error was a rate limit."""
+        headers = error_headers(error)
+        status = getattr(getattr(error, "response", None), "status_code", None) or getattr(error, "status_code", None)
+        rate_limited = status == 429 or type(error).__name__ == "RateLimitError"
+        if rate_limited:
+            metrics.model_rate_limited.inc(self.key[2])
+            logger.warning(
+                f"Rate limited on {self.key[0]}/{self.key[2]}, retry after {retry_after_seconds(headers)}s"
+            )
+        return self.observe_headers(headers) or rate_limited
+
+
+_limiters: Dict[Tuple[str, str, str], ModelRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limit_key(provider: str, api_key: Optional[str], model: str) -> Tuple[str, str, str]:
+    api_key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()[:12]
+    return provider, api_key_hash, model
+
+
+def get_rate_limiter(provider: str, api_key: Optional[str], model: str) -> ModelRateLimiter:
+    """The process-wide limiter for (provider, API key, model)."""
+    key = limit_key(provider, api_key, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                rpm, tpm = env("MODEL_RATE_LIMIT_RPM"), env("MODEL_RATE_LIMIT_TPM")
+                limiter = _limiters[key] = ModelRateLimiter(
+                    key, float(rpm) if rpm else None, float(tpm) if tpm else None
+                )
+    return limiter
+
+
+def limiter_for_backend(backend: Any) -> ModelRateLimiter:
+    provider = f"{type(backend).__name__}:{getattr(backend, '_url', None) or ''}"
+    return get_rate_limiter(provider, getattr(backend, "_api_key", None), str(getattr(backend, "model_type", "")))
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough prompt size (about four characters per token) used until the provider reports usage."""
+    return sum(len(str(message.get("content") or "")) // 4 + 4 for message in messages)
+
+
+class RateLimitedModelManager(ModelManager):
+    """`ModelManager` whose model calls go through the shared rate limiter of their backend.
+
+    Attributes:
+        project_id: Project the calls are admitted for (the fairness unit).
+    """
+
+    def __init__(self, models, scheduling_strategy: str = "round_robin", project_id: str = ""):
+        super().__init__(models, scheduling_strategy)
+        self.project_id = project_id
+
+    @classmethod
+    def from_manager(cls, manager: ModelManager, project_id: str) -> "RateLimitedModelManager":
+        if isinstance(manager, cls):
+            return manager
+        return cls(manager.models, manager.scheduling_strategy.__name__, project_id)
+
+    def _fail_over(self):
+        # Same recovery as ModelManager: stop pinning the first model once it failed
+        if self.scheduling_strategy == self.always_first:
+            self.scheduling_strategy = self.round_robin
+            logger.warning("The scheduling strategy has been changed to 'round_robin'")
+            self.current_model = self.scheduling_strategy()
+
+    def run(self, messages, response_format=None, tools=None):
+        self.current_model = model = self.scheduling_strategy()
+        limiter = limiter_for_backend(model)
+        lease = limiter.acquire(self.project_id, estimate_message_tokens(messages))
+        try:
+            response = model.run(messages, response_format, tools)
+        except Exception as e:
+            logger.error(f"Error processing with model: {model}")
+            limiter.observe_error(e)
+            self._fail_over()
+            raise
+        limiter.settle(lease, getattr(response, "usage", None))
+        return response
+
+    async def arun(self, messages, response_format=None, tools=None):
+        async with self.lock:
+            self.current_model = model = self.scheduling_strategy()
+        limiter = limiter_for_backend(model)
+        lease = await limiter.aacquire(self.project_id, estimate_message_tokens(messages))
+        try:
+            response = await model.arun(messages, response_format, tools)
+        except Exception as e:
+            logger.error(f"Error processing with model: {model}")
+            limiter.observe_error(e)
+            async with self.lock:
+                self._fail_over()
+            raise
+        limiter.settle(lease, getattr(response, "usage", None))
+        return response
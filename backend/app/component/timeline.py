@@ -0,0 +1,142 @@
+"""
+Per-project execution timeline, exported as Chrome trace-event JSON (viewable in Perfetto or
+chrome://tracing).
+
+Spans are recorded as complete ("X") events on one lane per process_task_id, so a slow task can
+be read off as decomposition vs. agent construction vs. waiting on dependencies vs. LLM steps vs.
+tools. Memory is bounded: each project keeps its most recent TIMELINE_MAX_EVENTS events and only
+the TIMELINE_MAX_PROJECTS most recently active projects are kept.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any
+
+from app.component.environment import env
+
+# Anchors perf_counter() readings to wall-clock microseconds for the trace timestamps
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+_MAIN_LANE = "project"
+
+
+def _micros(perf: float) -> int:
+    return int((perf + _EPOCH_OFFSET) * 1_000_000)
+
+
+class Timeline:
+    def __init__(self, project_id: str, max_events: int):
+        self.project_id = project_id
+        self.events: deque[dict] = deque(maxlen=max_events)
+        self.dropped = 0
+        self.lanes: dict[str, int] = {_MAIN_LANE: 0}
+
+    def lane(self, process_task_id: str | None) -> int:
+        key = process_task_id or _MAIN_LANE
+        tid = self.lanes.get(key)
+        if tid is None:
+            tid = self.lanes.setdefault(key, len(self.lanes))
+        return tid
+
+    def add(self, event: dict):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+
+    def export(self) -> dict:
+        pid = os.getpid()
+        metadata: list[dict] = [
+            {"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": f"project {self.project_id}"}}
+        ]
+        for name, tid in list(self.lanes.items()):
+            metadata.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}})
+            metadata.append({"ph": "M", "name": "thread_sort_index", "pid": pid, "tid": tid, "args": {"sort_index": tid}})
+        events = [{**event, "pid": pid} for event in list(self.events)]
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"project_id": self.project_id, "dropped_events": self.dropped},
+        }
+
+
+_timelines: "OrderedDict[str, Timeline]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_timeline(project_id: str, create: bool = True) -> Timeline | None:
+    timeline = _timelines.get(project_id)
+    if timeline is not None:
+        try:
+            _timelines.move_to_end(project_id)
+        except KeyError:
+            # Evicted concurrently; the caller still gets the (now detached) timeline
+            pass
+        return timeline
+    if not create:
+        return None
+    with _lock:
+        timeline = _timelines.get(project_id)
+        if timeline is None:
+            timeline = _timelines[project_id] = Timeline(project_id, int(env("TIMELINE_MAX_EVENTS", "20000")))
+            while len(_timelines) > int(env("TIMELINE_MAX_PROJECTS", "32")):
+                _timelines.popitem(last=False)
+    return timeline
+
+
+def record(
+    project_id: str | None,
+    name: str,
+    started: float,
+    ended: float,
+    cat: str = "",
+    process_task_id: str | None = None,
+    **args: Any,
+) -> None:
+    """Record a finished span; `started`/`ended` are time.perf_counter() readings."""
+    if not project_id:
+        return
+    timeline = get_timeline(project_id)
+    timeline.add(
+        {
+            "ph": "X",
+            "name": name,
+            "cat": cat,
+            "ts": _micros(started),
+            "dur": max(0, int((ended - started) * 1_000_000)),
+            "tid": timeline.lane(process_task_id),
+            "args": args,
+        }
+    )
+
+
+def instant(project_id: str | None, name: str, cat: str = "", process_task_id: str | None = None, **args: Any):
+    """Record a point-in-time event, e.g. a subtask being posted to a worker."""
+    if not project_id:
+        return
+    timeline = get_timeline(project_id)
+    timeline.add(
+        {
+            "ph": "i",
+            "s": "t",
+            "name": name,
+            "cat": cat,
+            "ts": _micros(time.perf_counter()),
+            "tid": timeline.lane(process_task_id),
+            "args": args,
+        }
+    )
+
+
+@contextmanager
+def span(project_id: str | None, name: str, cat: str = "", process_task_id: str | None = None, **args: Any):
+    """Record the enclosed block as a span; works around awaits and marks spans that raised."""
+    started = time.perf_counter()
+    try:
+        yield args
+    except BaseException as e:
+        args["error"] = type(e).__name__
+        raise
+    finally:
+        record(project_id, name, started, time.perf_counter(), cat, process_task_id, **args)
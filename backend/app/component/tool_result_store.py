@@ -0,0 +1,212 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from camel.toolkits import FunctionTool
+
+from app.component.environment import env
+
+logger = logging.getLogger(__name__)
+
+HANDLE_LENGTH = 16
+DIGEST_CHARS = 300
+COMPACTED_PREFIX = "[Compacted tool result "
+SPILLED_PREFIX = "[Stored tool result "
+EXCERPT_HEAD_CHARS = 2000
+EXCERPT_TAIL_CHARS = 1000
+DEFAULT_READ_CHARS = 8000
+MAX_READ_CHARS = 16000
+MAX_GREP_MATCHES = 100
+MAX_GREP_LINE_CHARS = 500
+
+_HANDLE_RE = re.compile(r"^[0-9a-f]{%d}$" % HANDLE_LENGTH)
+
+
+def result_text(result: Any) -> str:
+    """The text a tool result is sent to the model as."""
+    if isinstance(result, str):
+        return result
+    try:
+        return json.dumps(result, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return str(result)
+
+
+class ToolResultStore:
+    """Content-addressed store for tool results kept out of agent memory.
+
+    Each payload is written once to `<root>/<handle>.txt`, where the handle is a prefix of its
+    sha256, so the same snapshot returned twice is stored once. The directory is only created on
+    the first write.
+
+    Attributes:
+        root: Directory holding the payloads, normally `<project directory>/tool_results`.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def put(self, content: str) -> str:
+        handle = hashlib.sha256(content.encode("utf-8")).hexdigest()[:HANDLE_LENGTH]
+        path = self.root / f"{handle}.txt"
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(content, encoding="utf-8")
+            os.replace(tmp, path)
+        return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        if not _HANDLE_RE.match(handle or ""):
+            return None
+        try:
+            return (self.root / f"{handle}.txt").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def read(self, handle: str, offset: int = 0, length: int = DEFAULT_READ_CHARS, grep: str | None = None) -> str:
+        """One page of a stored payload, or the lines matching `grep` from `offset` on."""
+        content = self.get(handle)
+        if content is None:
+            return f"No stored tool result for handle {handle!r}."
+        offset = min(max(offset, 0), len(content))
+        if grep:
+            return _grep(content, grep, offset)
+        end = min(offset + min(max(length, 1), MAX_READ_CHARS), len(content))
+        note = f"[chars {offset}-{end} of {len(content)}"
+        note += f"; continue with offset={end}]" if end < len(content) else "]"
+        return f"{note}\n{content[offset:end]}"
+
+    def read_tool_result_tool(self) -> FunctionTool:
+        """A `read_tool_result` tool the model pages through stored payloads with."""
+        store = self
+
+        def read_tool_result(
+            handle: str, offset: int = 0, length: int = DEFAULT_READ_CHARS, grep: str | None = None
+        ) -> str:
+            r"""Read the full output of an earlier tool call that was too large for the
+            conversation and was stored under a handle. Read it a page at a time, or use
+            `grep` to find the lines you need.
+
+            Args:
+                handle (str): The handle from the "[... tool result <handle>: ...]" note.
+                offset (int): Character offset to start reading from. (default: :obj:`0`)
+                length (int): Number of characters to return, at most 16000.
+                    (default: :obj:`8000`)
+                grep (str, optional): Regular expression; when given, returns the matching
+                    lines (case-insensitive) from `offset` on instead of a page of text.
+                    (default: :obj:`None`)
+
+            Returns:
+                str: The requested part of the original tool output.
+            """
+            return store.read(handle.strip(), offset, length, grep)
+
+        return FunctionTool(read_tool_result)
+
+
+def _grep(content: str, pattern: str, offset: int) -> str:
+    try:
+        regex = re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        regex = re.compile(re.escape(pattern), re.IGNORECASE)
+    matches: List[str] = []
+    line_start = content.rfind("\n", 0, offset) + 1
+    line_no = content.count("\n", 0, line_start) + 1
+    for line in content[line_start:].split("\n"):
+        if regex.search(line):
+            if len(matches) == MAX_GREP_MATCHES:
+                matches.append(f"[more matches; continue with offset={line_start}]")
+                break
+            matches.append(f"{line_no} (offset {line_start}): {line[:MAX_GREP_LINE_CHARS]}")
+        line_start += len(line) + 1
+        line_no += 1
+    if not matches:
+        return f"No lines match {pattern!r}."
+    return "\n".join(matches)
+
+
+def spill_excerpt(handle: str, text: str, head: int = EXCERPT_HEAD_CHARS, tail: int = EXCERPT_TAIL_CHARS) -> str:
+    """What the model gets instead of an oversized tool result: its start and end plus a handle."""
+    return (
+        f"{SPILLED_PREFIX}{handle}: {len(text)} chars, too large to show in full. Showing the first "
+        f"{head} and last {tail} chars; call read_tool_result(\"{handle}\", offset, length, grep) for the rest.]\n"
+        f"{text[:head]}\n[... {len(text) - head - tail} chars omitted ...]\n{text[-tail:]}"
+    )
+
+
+def compaction_digest(handle: str, text: str) -> str:
+    """What a compacted tool result is replaced with: its handle, size and opening lines."""
+    head = text[:DIGEST_CHARS].rstrip()
+    more = "..." if len(text) > DIGEST_CHARS else ""
+    return (
+        f"{COMPACTED_PREFIX}{handle}: {len(text)} chars. "
+        f'Call read_tool_result("{handle}") for the full output.]\n{head}{more}'
+    )
+
+
+def compact_tool_results(
+    records: List[Dict[str, Any]], store: ToolResultStore, keep_recent: int, min_chars: int
+) -> int:
+    """Replace tool results older than the `keep_recent` latest ones with stored references.
+
+    `records` are `MemoryRecord.to_dict()` dicts and are edited in place. Results shorter than
+    `min_chars`, masked results and already compacted ones are left alone; spilled ones keep
+    only their note. Returns how many
+    results were compacted.
+    """
+    tool_results = [
+        record["message"]
+        for record in records
+        if record.get("role_at_backend") == "function"
+        and record.get("message", {}).get("__class__") == "FunctionCallingMessage"
+        and record["message"].get("result") is not None
+    ]
+    older = tool_results[: max(len(tool_results) - keep_recent, 0)]
+    compacted = 0
+    for message in older:
+        if message.get("mask_output"):
+            continue
+        text = result_text(message["result"])
+        if len(text) < min_chars or text.startswith(COMPACTED_PREFIX):
+            continue
+        if text.startswith(SPILLED_PREFIX):
+            # Already stored when it was spilled: drop the excerpt, keep the note with its handle
+            message["result"] = text.split("\n", 1)[0]
+            compacted += 1
+            continue
+        message["result"] = compaction_digest(store.put(text), text)
+        compacted += 1
+    return compacted
+
+
+def spill_threshold() -> int:
+    """Tool results longer than this many characters are stored and excerpted; 0 disables it."""
+    return int(env("TOOL_RESULT_SPILL_CHARS", "32000"))
+
+
+def compaction_settings() -> tuple[int, int, int]:
+    """(token threshold, tool results kept verbatim, minimum result size) from the environment."""
+    return (
+        int(env("MEMORY_COMPACTION_TOKENS", "32000")),
+        int(env("MEMORY_COMPACTION_KEEP_RESULTS", "3")),
+        int(env("MEMORY_COMPACTION_MIN_CHARS", "2000")),
+    )
@@ -5,9 +5,10 @@ import time
 from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException, Request, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from utils import traceroot_wrapper as traceroot
-from app.component import code
+from app.component import code, timeline
+from app.component.cost_tracker import cost_tracker
 from app.exception.exception import UserException
 from app.model.chat import Chat, HumanReply, McpServers, Status, SupplementChat, AddTaskRequest, sse_json
 from app.service.chat_service import step_solve
@@ -317,3 +318,26 @@ def skip_task(project_id: str):
     except Exception as e:
         chat_logger.error(f"[STOP-BUTTON] ❌ Error skipping task for project_id: {project_id}: {e}")
         raise UserException(code.error, f"Failed to skip task: {str(e)}")
+
+
+@router.get("/chat/{project_id}/timeline", name="export execution timeline")
+@traceroot.trace()
+def export_timeline(project_id: str):
+    """Execution timeline of a project as Chrome trace-event JSON, to open in Perfetto or chrome://tracing."""
+    project_timeline = timeline.get_timeline(project_id, create=False)
+    if project_timeline is None:
+        raise HTTPException(status_code=404, detail="No timeline recorded for this project")
+    return JSONResponse(
+        project_timeline.export(),
+        headers={"Content-Disposition": f'attachment; filename="timeline-{project_id}.json"'},
+    )
+
+
+@router.get("/chat/{project_id}/usage", name="project token usage")
+@traceroot.trace()
+def project_usage(project_id: str):
+    """Live token usage and estimated cost of a project, per agent and per model, with its budget."""
+    usage = cost_tracker.project_usage(project_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail="No usage recorded for this project")
+    return usage
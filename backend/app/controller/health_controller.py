@@ -20,3 +20,19 @@ async def health_check():
     logger.debug("Health check completed", extra={"status": response.status, "service": response.service})
     return response
 
+
+
+@router.get("/health/browser-pool", name="browser connection pool stats")
+async def browser_pool_stats():
+    """Occupancy and connect latency of the browser WebSocket connection pool."""
+    from app.utils.toolkit.hybrid_browser_toolkit import websocket_connection_pool
+
+    return websocket_connection_pool.stats()
+
+
+@router.get("/health/agent-pools", name="agent pool stats")
+async def agent_pool_stats():
+    """Clone latency and pool hit rate of worker agent pools, per worker type."""
+    from app.utils.single_agent_worker import worker_pool_metrics
+
+    return {name: metrics.snapshot() for name, metrics in worker_pool_metrics.items()}
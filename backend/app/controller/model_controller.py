@@ -1,8 +1,20 @@
+import asyncio
+from dataclasses import asdict
+from typing import Literal
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field, field_validator
-from app.component.model_validation import create_agent
+from app.component.model_adapter import ModelCapabilities
+from app.component.model_validation import (
+    PROBE_MAX_TOKENS,
+    PROBE_PROMPT,
+    TOOL_RESULT,
+    VALIDATION_PROMPT,
+    ValidationResult,
+    create_agent,
+    validation_cache,
+    validation_key,
+)
 from app.model.chat import PLATFORM_MAPPING
-from camel.types import ModelType
 from app.component.error_format import normalize_error_to_openai_format
 from utils import traceroot_wrapper as traceroot
 
@@ -19,6 +31,10 @@ class ValidateModelRequest(BaseModel):
     url: str | None = Field(None, description="Model URL")
     model_config_dict: dict | None = Field(None, description="Model config dict")
     extra_params: dict | None = Field(None, description="Extra model parameters")
+    mode: Literal["full", "probe"] = Field(
+        "full", description="full: tool-calling round-trip; probe: one minimal tool call with a small max_tokens"
+    )
+    refresh: bool = Field(False, description="Ignore a cached result and validate again")
 
     @field_validator("model_platform")
     @classmethod
@@ -32,6 +48,44 @@ class ValidateModelResponse(BaseModel):
     error_code: str | None = Field(None, description="Error code")
     error: dict | None = Field(None, description="OpenAI-style error object")
     message: str = Field(..., description="Message")
+    capabilities: dict | None = Field(None, description="Capability record (ModelCapabilities) of the model")
+    cached: bool = Field(False, description="Result served from the validation cache")
+
+
+def run_validation(request: ValidateModelRequest, mode: str) -> ValidationResult:
+    """Build a throwaway agent and check that the model calls the test tool."""
+    probe = mode == "probe"
+    model_config_dict = request.model_config_dict
+    if probe:
+        model_config_dict = {**(model_config_dict or {}), "max_tokens": PROBE_MAX_TOKENS}
+
+    logger.debug("Creating agent for validation", extra={"platform": request.model_platform, "model_type": request.model_type, "mode": mode})
+    agent = create_agent(
+        request.model_platform,
+        request.model_type,
+        api_key=request.api_key,
+        url=request.url,
+        model_config_dict=model_config_dict,
+        # One model call is enough to see the tool call; skip the follow-up answer
+        max_iteration=1 if probe else None,
+        **(request.extra_params or {}),
+    )
+
+    logger.debug("Agent created, executing test step", extra={"platform": request.model_platform, "model_type": request.model_type})
+    response = agent.step(input_message=PROBE_PROMPT if probe else VALIDATION_PROMPT)
+
+    is_valid = bool(response)
+    is_tool_calls = False
+    if response and hasattr(response, "info") and response.info:
+        tool_calls = response.info.get("tool_calls", [])
+        if tool_calls and len(tool_calls) > 0:
+            is_tool_calls = tool_calls[0].result == TOOL_RESULT
+
+    capabilities = ModelCapabilities(supports_function_calling=is_tool_calls)
+    token_limit = getattr(getattr(agent, "model_backend", None), "token_limit", None)
+    if isinstance(token_limit, int) and token_limit > 0:
+        capabilities.max_context_length = token_limit
+    return ValidationResult(is_valid=is_valid, is_tool_calls=is_tool_calls, capabilities=capabilities, mode=mode)
 
 
 @router.post("/model/validate")
@@ -61,30 +115,18 @@ async def validate_model(request: ValidateModelRequest):
             }
         )
 
+    key_args = (platform, model_type, request.url, request.api_key, request.model_config_dict, request.extra_params)
     try:
-        extra = request.extra_params or {}
-
-        logger.debug("Creating agent for validation", extra={"platform": platform, "model_type": model_type})
-        agent = create_agent(
-            platform,
-            model_type,
-            api_key=request.api_key,
-            url=request.url,
-            model_config_dict=request.model_config_dict,
-            **extra,
-        )
-
-        logger.debug("Agent created, executing test step", extra={"platform": platform, "model_type": model_type})
-        response = agent.step(
-            input_message="""
-            Get the content of https://www.camel-ai.org,
-            you must use the get_website_content tool to get the content ,
-            i just want to verify the get_website_content tool is working,
-            you must call the get_website_content tool only once.
-            """
-        )
-
-
+        # A full validation also answers a capabilities probe
+        full_result = validation_cache.get(validation_key("full", *key_args)) if request.mode == "probe" and not request.refresh else None
+        if full_result is not None:
+            validation, cached = full_result, True
+        else:
+            validation, cached = await validation_cache.get_or_validate(
+                validation_key(request.mode, *key_args),
+                lambda: asyncio.to_thread(run_validation, request, request.mode),
+                refresh=request.refresh,
+            )
     except Exception as e:
         # Normalize error to OpenAI-style error structure
         logger.error("Model validation failed", extra={"platform": platform, "model_type": model_type, "error": str(e)}, exc_info=True)
@@ -98,18 +140,9 @@ async def validate_model(request: ValidateModelRequest):
                 "error": error_obj,
             }
         )
-    
-    # Check validation results
-    is_valid = bool(response)
-    is_tool_calls = False
 
-    if response and hasattr(response, "info") and response.info:
-        tool_calls = response.info.get("tool_calls", [])
-        if tool_calls and len(tool_calls) > 0:
-            is_tool_calls = (
-                tool_calls[0].result
-                == "Tool execution completed successfully for https://www.camel-ai.org, Website Content: Welcome to CAMEL AI!"
-            )
+    is_valid = validation.is_valid
+    is_tool_calls = validation.is_tool_calls
 
     result = ValidateModelResponse(
         is_valid=is_valid,
@@ -119,8 +152,19 @@ async def validate_model(request: ValidateModelRequest):
         else "This model doesn't support tool calls. please try with another model.",
         error_code=None,
         error=None,
+        capabilities=asdict(validation.capabilities),
+        cached=cached,
     )
 
-    logger.info("Model validation completed", extra={"platform": platform, "model_type": model_type, "is_valid": is_valid, "is_tool_calls": is_tool_calls})
+    logger.info("Model validation completed", extra={"platform": platform, "model_type": model_type, "is_valid": is_valid, "is_tool_calls": is_tool_calls, "cached": cached})
 
     return result
+
+
+@router.delete("/model/validate/cache")
+@traceroot.trace()
+async def clear_validation_cache():
+    """Forget cached validation results, e.g. after a provider changed a model's capabilities."""
+    cleared = validation_cache.invalidate()
+    logger.info("Model validation cache cleared", extra={"cleared": cleared})
+    return {"cleared": cleared}
@@ -1,6 +1,6 @@
 from typing import Literal
 from dotenv import load_dotenv
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from app.model.chat import NewAgent, UpdateData
 from app.service.task import (
@@ -15,6 +15,7 @@ from app.service.task import (
 )
 import asyncio
 from app.component.environment import set_user_env_path
+from app.utils.terminal_stream import find_log, read_log
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("task_controller")
@@ -79,3 +80,14 @@ def stop_all():
         asyncio.run(task_lock.put_queue(ActionStopData()))
     logger.info("All tasks stopped", extra={"task_count": len(task_locks)})
     return Response(status_code=204)
+
+
+@router.get("/task/{id}/terminal-log", name="read full terminal log")
+@traceroot.trace()
+def terminal_log(id: str, log: str, start_line: int = 0, max_lines: int = 500):
+    """Lines of a terminal log whose streamed output had lines elided."""
+    log_file = find_log(id, log)
+    if log_file is None:
+        raise HTTPException(status_code=404, detail="Log not found")
+    lines, total = read_log(log_file, max(0, start_line), max(1, min(max_lines, 5000)))
+    return {"log": log, "start_line": start_line, "lines": lines, "total_lines": total}
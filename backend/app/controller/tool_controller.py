@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException
-from app.utils.toolkit.notion_mcp_toolkit import NotionMCPToolkit
-from app.utils.toolkit.google_calendar_toolkit import GoogleCalendarToolkit
+from app.utils.toolkit.registry import toolkit_registry
 from app.utils.oauth_state_manager import oauth_state_manager
 from utils import traceroot_wrapper as traceroot
 from camel.toolkits.hybrid_browser_toolkit.hybrid_browser_toolkit_ts import (
@@ -11,6 +10,8 @@ import os
 import uuid
 
 logger = traceroot.get_logger("tool_controller")
+NotionMCPToolkit = toolkit_registry["notion_mcp_toolkit"]
+GoogleCalendarToolkit = toolkit_registry["google_calendar_toolkit"]
 router = APIRouter()
 
 
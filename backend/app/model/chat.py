@@ -6,6 +6,7 @@ from typing import Literal
 from pydantic import BaseModel, Field, field_validator
 from camel.types import ModelType, RoleType
 from utils import traceroot_wrapper as traceroot
+from app.component import metrics
 
 logger = traceroot.get_logger("chat_model")
 
@@ -67,6 +68,8 @@ class Chat(BaseModel):
     new_agents: list["NewAgent"] = []
     extra_params: dict | None = None  # For provider-specific parameters like Azure
     search_config: dict[str, str] | None = None  # User-specific search engine configurations (e.g., GOOGLE_API_KEY, SEARCH_ENGINE_ID)
+    organization_id: int | None = None  # Organization context used to scope retrieved memories
+    budget_usd: float | None = None  # Local spending limit of the project; defaults to PROJECT_BUDGET_USD
 
     @field_validator("model_platform")
     @classmethod
@@ -92,10 +95,14 @@ class Chat(BaseModel):
     def is_cloud(self):
         return self.api_url is not None and "44.247.171.124" in self.api_url
 
-    def file_save_path(self, path: str | None = None):
+    def project_path(self) -> Path:
+        """The project's directory; not created here."""
         email = re.sub(r'[\\/*?:"<>|\s]', "_", self.email.split("@")[0]).strip(".")
+        return Path.home() / "eigent" / email / f"project_{self.project_id}"
+
+    def file_save_path(self, path: str | None = None):
         # Use project-based structure: project_{project_id}/task_{task_id}
-        save_path = Path.home() / "eigent" / email / f"project_{self.project_id}" / f"task_{self.task_id}"
+        save_path = self.project_path() / f"task_{self.task_id}"
         if path is not None:
             save_path = save_path / path
         save_path.mkdir(parents=True, exist_ok=True)
@@ -144,4 +151,6 @@ class RemoveTaskRequest(BaseModel):
 
 def sse_json(step: str, data):
     res_format = {"step": step, "data": data}
-    return f"data: {json.dumps(res_format, ensure_ascii=False)}\n\n"
+    frame = f"data: {json.dumps(res_format, ensure_ascii=False)}\n\n"
+    metrics.sse_frame_bytes.observe(len(frame.encode("utf-8")), getattr(step, "value", step))
+    return frame
@@ -1,15 +1,17 @@
 import asyncio
-import datetime
 import json
 from pathlib import Path
-import platform
+import time
 from typing import Any, Literal
 from fastapi import Request
 from inflection import titleize
 from pydash import chain
+from app.component import metrics, timeline
+from app.component.cost_tracker import cost_tracker
 from app.component.debug import dump_class
 from app.component.environment import env
 from app.utils.file_utils import get_working_directory
+from app.utils.system_prompt import environment_facts, system_prompt
 from app.service.task import (
     ActionImproveData,
     ActionInstallMcpData,
@@ -20,6 +22,7 @@ from app.service.task import (
     ActionDecomposeProgressData,
     ActionDecomposeTextData,
 )
+from app.service.question_router import answer_directly, route_question
 from camel.toolkits import AgentCommunicationToolkit, ToolkitMessageIntegration
 from app.utils.toolkit.human_toolkit import HumanToolkit
 from app.utils.toolkit.note_taking_toolkit import NoteTakingToolkit
@@ -42,12 +45,14 @@ from app.utils.agent import (
 )
 from app.service.task import Action, Agents
 from app.utils.server.sync_step import sync_step
+from app.utils.server.memory_context import fetch_memory_context
 from camel.types import ModelPlatformType
 from camel.models import ModelProcessingError
 from utils import traceroot_wrapper as traceroot
+from utils.lazy_logging import get_lazy_logger
 import os
 
-logger = traceroot.get_logger("chat_service")
+logger = get_lazy_logger("chat_service")
 
 
 def format_task_context(task_data: dict, seen_files: set | None = None, skip_files: bool = False) -> str:
@@ -254,6 +259,10 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
     if not hasattr(task_lock, 'summary_generated'):
         task_lock.summary_generated = False
 
+    # Local spending limit, checked before every model call of the project's agents
+    budget_usd = options.budget_usd if options.budget_usd is not None else env("PROJECT_BUDGET_USD")
+    cost_tracker.set_budget(options.project_id, float(budget_usd) if budget_usd else None)
+
     # Create or reuse persistent question_agent
     if task_lock.question_agent is None:
         task_lock.question_agent = question_confirm_agent(options)
@@ -272,19 +281,20 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
     event_loop = asyncio.get_running_loop()
     sub_tasks: list[Task] = []
 
-    logger.info("=" * 80)
     logger.info("🚀 [LIFECYCLE] step_solve STARTED", extra={"project_id": options.project_id, "task_id": options.task_id})
-    logger.info("=" * 80)
     logger.debug("Step solve options", extra={"task_id": options.task_id, "model_platform": options.model_platform})
 
     while True:
         loop_iteration += 1
-        logger.debug(f"[LIFECYCLE] step_solve loop iteration #{loop_iteration}", extra={"project_id": options.project_id, "task_id": options.task_id})
+        logger.debug(
+            "[LIFECYCLE] step_solve loop iteration #%d",
+            loop_iteration,
+            every=100,
+            extra=lambda: {"project_id": options.project_id, "task_id": options.task_id},
+        )
 
         if await request.is_disconnected():
-            logger.warning("=" * 80)
             logger.warning(f"⚠️  [LIFECYCLE] CLIENT DISCONNECTED for project {options.project_id}")
-            logger.warning("=" * 80)
             if workforce is not None:
                 logger.info(f"[LIFECYCLE] Stopping workforce due to client disconnect, workforce._running={workforce._running}")
                 if workforce._running:
@@ -310,15 +320,14 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
 
         try:
             if item.action == Action.improve or start_event_loop:
-                logger.info("=" * 80)
                 logger.info(f"💬 [NEW-QUESTION] Action.improve received or start_event_loop", extra={"project_id": options.project_id, "start_event_loop": start_event_loop})
                 logger.info(f"[NEW-QUESTION] Current workforce state: workforce={'None' if workforce is None else f'exists(id={id(workforce)})'}")
                 logger.info(f"[NEW-QUESTION] Current camel_task state: camel_task={'None' if camel_task is None else f'exists(id={camel_task.id})'}")
-                logger.info("=" * 80)
                 # from viztracer import VizTracer
 
                 # tracer = VizTracer()
                 # tracer.start()
+                timeline.instant(options.project_id, "question", "chat", task_id=options.task_id)
                 if start_event_loop is True:
                     question = options.question
                     logger.info(f"[NEW-QUESTION] Initial question from options.question: '{question[:100]}...'")
@@ -351,12 +360,11 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
 
                 if not is_complex_task:
                     logger.info(f"[NEW-QUESTION] ✅ Simple question, providing direct answer without workforce")
-                    simple_answer_prompt = f"{build_conversation_context(task_lock, header='=== Previous Conversation ===')}User Query: {question}\n\nProvide a direct, helpful answer to this simple question."
 
                     try:
-                        simple_resp = question_agent.step(simple_answer_prompt)
-                        answer_content = simple_resp.msgs[0].content if simple_resp and simple_resp.msgs else "I understand your question, but I'm having trouble generating a response right now."
+                        answer_content = answer_directly(question_agent, question, task_lock)
 
+                        task_lock.add_conversation('user', question)
                         task_lock.add_conversation('assistant', answer_content)
 
                         yield sse_json("wait_confirm", {"content": answer_content, "question": question})
@@ -396,25 +404,6 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     logger.info(f"[NEW-QUESTION] Sending 'confirmed' SSE to frontend")
                     yield sse_json("confirmed", {"question": question})
 
-                    logger.info(f"[NEW-QUESTION] Building context for coordinator")
-                    context_for_coordinator = build_context_for_workforce(task_lock, options)
-
-                    # Check if workforce exists - if so, reuse it (agents are preserved)
-                    # Otherwise create new workforce
-                    if workforce is not None:
-                        logger.info(f"[NEW-QUESTION] 🔄 Workforce exists (id={id(workforce)}), state={workforce._state.name}, _running={workforce._running}")
-                        logger.info(f"[NEW-QUESTION] ✅ Reusing existing workforce with preserved agents")
-                        # Workforce is already stopped from skip_task, ready for new decomposition
-                    else:
-                        logger.info(f"[NEW-QUESTION] 🏭 Creating NEW workforce instance (workforce=None)")
-                        (workforce, mcp) = await construct_workforce(options)
-                        logger.info(f"[NEW-QUESTION] ✅ NEW Workforce instance created, id={id(workforce)}")
-                        for new_agent in options.new_agents:
-                            workforce.add_single_agent_worker(
-                                format_agent_description(new_agent), await new_agent_model(new_agent, options)
-                            )
-                    task_lock.status = Status.confirmed
-
                     # If camel_task already exists (from previous paused task), add new question as subtask
                     # Otherwise, create a new camel_task
                     if camel_task is not None:
@@ -433,6 +422,35 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                         if len(options.attaches) > 0:
                             camel_task.additional_info = {Path(file_path).name: file_path for file_path in options.attaches}
 
+                    # The task card summary only needs the question: start it now so it runs
+                    # alongside context building, workforce construction and decomposition
+                    confirmed_at = time.perf_counter()
+                    summary_future = asyncio.create_task(generate_task_summary(task_lock, options, camel_task))
+                    task_lock.add_background_task(summary_future)
+
+                    logger.info(f"[NEW-QUESTION] Building context for coordinator")
+                    context_for_coordinator = await fetch_memory_context(options, question) + build_context_for_workforce(
+                        task_lock, options
+                    )
+
+                    # Check if workforce exists - if so, reuse it (agents are preserved)
+                    # Otherwise create new workforce
+                    if workforce is not None:
+                        logger.info(f"[NEW-QUESTION] 🔄 Workforce exists (id={id(workforce)}), state={workforce._state.name}, _running={workforce._running}")
+                        logger.info(f"[NEW-QUESTION] ✅ Reusing existing workforce with preserved agents")
+                        # Workforce is already stopped from skip_task, ready for new decomposition
+                    else:
+                        logger.info(f"[NEW-QUESTION] 🏭 Creating NEW workforce instance (workforce=None)")
+                        with timeline.span(options.project_id, "construct_workforce", "chat"):
+                            (workforce, mcp) = await construct_workforce(options)
+                        logger.info(f"[NEW-QUESTION] ✅ NEW Workforce instance created, id={id(workforce)}")
+                        for new_agent in options.new_agents:
+                            workforce.add_single_agent_worker(
+                                format_agent_description(new_agent), await new_agent_model(new_agent, options)
+                            )
+                        workforce.prewarm_agent_pools()
+                    task_lock.status = Status.confirmed
+
                     # Stream decomposition in background so queue items (decompose_text) are processed immediately
                     logger.info(f"[NEW-QUESTION] 🧩 Starting task decomposition via workforce.eigent_make_sub_tasks")
                     stream_state = {"subtasks": [], "seen_ids": set(), "last_content": ""}
@@ -494,36 +512,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                             except Exception:
                                 pass
 
-                            logger.info(f"[NEW-QUESTION] Generating task summary")
-                            summary_task_agent = task_summary_agent(options)
-                            try:
-                                summary_task_content = await asyncio.wait_for(
-                                    summary_task(summary_task_agent, camel_task), timeout=10
-                                )
-                                task_lock.summary_generated = True
-                                logger.info("[NEW-QUESTION] ✅ Summary generated successfully", extra={"project_id": options.project_id})
-                            except asyncio.TimeoutError:
-                                logger.warning("summary_task timeout", extra={"project_id": options.project_id, "task_id": options.task_id})
-                                task_lock.summary_generated = True
-                                fallback_name = "Task"
-                                content_preview = camel_task.content if hasattr(camel_task, "content") else ""
-                                if content_preview is None:
-                                    content_preview = ""
-                                summary_task_content = (
-                                    (content_preview[:80] + "...") if len(content_preview) > 80 else content_preview
-                                )
-                                summary_task_content = f"{fallback_name}|{summary_task_content}"
-                            except Exception:
-                                task_lock.summary_generated = True
-                                fallback_name = "Task"
-                                content_preview = camel_task.content if hasattr(camel_task, "content") else ""
-                                if content_preview is None:
-                                    content_preview = ""
-                                summary_task_content = (
-                                    (content_preview[:80] + "...") if len(content_preview) > 80 else content_preview
-                                )
-                                summary_task_content = f"{fallback_name}|{summary_task_content}"
-
+                            summary_task_content = await summary_future
                             state_holder["summary_task"] = summary_task_content
                             try:
                                 setattr(task_lock, "summary_task_content", summary_task_content)
@@ -540,6 +529,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                                 "summary_task": summary_task_content,
                             }
                             await task_lock.put_queue(ActionDecomposeProgressData(data=payload))
+                            metrics.task_card_seconds.observe(time.perf_counter() - confirmed_at, "new")
                             logger.info(f"[NEW-QUESTION] ✅ to_sub_tasks SSE sent")
                         except Exception as e:
                             logger.error(f"Error in background decomposition: {e}", exc_info=True)
@@ -596,9 +586,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                 }
                 yield sse_json("remove_task", returnData)
             elif item.action == Action.skip_task:
-                logger.info("=" * 80)
                 logger.info(f"🛑 [LIFECYCLE] SKIP_TASK action received (User clicked Stop button)", extra={"project_id": options.project_id, "item_project_id": item.project_id})
-                logger.info("=" * 80)
 
                 # Prevent duplicate skip processing
                 if task_lock.status == Status.done:
@@ -691,9 +679,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
 
                 yield sse_json("task_state", item.data)
             elif item.action == Action.new_task_state:
-                logger.info("=" * 80)
                 logger.info(f"🔄 [LIFECYCLE] NEW_TASK_STATE action received (Multi-turn)", extra={"project_id": options.project_id})
-                logger.info("=" * 80)
 
                 # Log new task state details
                 new_task_id = item.data.get('task_id', 'unknown')
@@ -722,7 +708,6 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                 new_task_content = item.data.get('content', '')
 
                 if new_task_content:
-                    import time
                     task_id = item.data.get('task_id', f"{int(time.time() * 1000)}-multi")
                     new_camel_task = Task(content=new_task_content, id=task_id)
                     if hasattr(camel_task, 'additional_info') and camel_task.additional_info:
@@ -751,12 +736,11 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
 
                         if not is_multi_turn_complex:
                             logger.info(f"[LIFECYCLE] Multi-turn: task is simple, providing direct answer without workforce")
-                            simple_answer_prompt = f"{build_conversation_context(task_lock, header='=== Previous Conversation ===')}User Query: {new_task_content}\n\nProvide a direct, helpful answer to this simple question."
 
                             try:
-                                simple_resp = question_agent.step(simple_answer_prompt)
-                                answer_content = simple_resp.msgs[0].content if simple_resp and simple_resp.msgs else "I understand your question, but I'm having trouble generating a response right now."
+                                answer_content = answer_directly(question_agent, new_task_content, task_lock)
 
+                                task_lock.add_conversation('user', new_task_content)
                                 task_lock.add_conversation('assistant', answer_content)
 
                                 # Send response to user (don't send confirmed if simple response)
@@ -777,8 +761,21 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                         yield sse_json("confirmed", {"question": new_task_content})
                         task_lock.status = Status.confirmed
 
+                        confirmed_at = time.perf_counter()
+                        summary_future = asyncio.create_task(
+                            generate_task_summary(
+                                task_lock,
+                                options,
+                                camel_task,
+                                fallback_task_summary("Follow-up Task", new_task_content, max_chars=100, keep_chars=97),
+                            )
+                        )
+                        task_lock.add_background_task(summary_future)
+
                         logger.info(f"[LIFECYCLE] Multi-turn: building context for workforce")
-                        context_for_multi_turn = build_context_for_workforce(task_lock, options)
+                        context_for_multi_turn = await fetch_memory_context(
+                            options, new_task_content
+                        ) + build_context_for_workforce(task_lock, options)
 
                         logger.info(f"[LIFECYCLE] Multi-turn: calling workforce.handle_decompose_append_task for new task decomposition")
                         stream_state = {"subtasks": [], "seen_ids": set(), "last_content": ""}
@@ -829,29 +826,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                             new_sub_tasks = stream_state["subtasks"]
                         logger.info(f"[LIFECYCLE] Multi-turn: task decomposed into {len(new_sub_tasks)} subtasks")
 
-                        # Generate proper LLM summary for multi-turn tasks instead of hardcoded fallback
-                        try:
-                            multi_turn_summary_agent = task_summary_agent(options)
-                            new_summary_content = await asyncio.wait_for(
-                                summary_task(multi_turn_summary_agent, camel_task), timeout=10
-                            )
-                            logger.info("Generated LLM summary for multi-turn task", extra={"project_id": options.project_id})
-                        except asyncio.TimeoutError:
-                            logger.warning("Multi-turn summary_task timeout", extra={"project_id": options.project_id, "task_id": task_id})
-                            # Fallback to descriptive but not generic summary
-                            task_content_for_summary = new_task_content
-                            if len(task_content_for_summary) > 100:
-                                new_summary_content = f"Follow-up Task|{task_content_for_summary[:97]}..."
-                            else:
-                                new_summary_content = f"Follow-up Task|{task_content_for_summary}"
-                        except Exception as e:
-                            logger.error(f"Error generating multi-turn task summary: {e}")
-                            # Fallback to descriptive but not generic summary
-                            task_content_for_summary = new_task_content
-                            if len(task_content_for_summary) > 100:
-                                new_summary_content = f"Follow-up Task|{task_content_for_summary[:97]}..."
-                            else:
-                                new_summary_content = f"Follow-up Task|{task_content_for_summary}"
+                        new_summary_content = await summary_future
 
                         # Emit final subtasks once when decomposition is complete
                         final_payload = {
@@ -863,6 +838,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                             "summary_task": new_summary_content,
                         }
                         await task_lock.put_queue(ActionDecomposeProgressData(data=final_payload))
+                        metrics.task_card_seconds.observe(time.perf_counter() - confirmed_at, "multi_turn")
 
                         # Update the context with new task data
                         sub_tasks = new_sub_tasks
@@ -911,7 +887,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
             elif item.action == Action.terminal:
                 yield sse_json(
                     "terminal",
-                    {"output": item.data, "process_task_id": item.process_task_id},
+                    {"output": item.data, "process_task_id": item.process_task_id, "log": item.log},
                 )
             elif item.action == Action.pause:
                 if workforce is not None:
@@ -937,12 +913,10 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     )
                     workforce.resume()
             elif item.action == Action.end:
-                logger.info("=" * 80)
                 logger.info(f"🏁 [LIFECYCLE] END action received for project {options.project_id}, task {options.task_id}")
                 logger.info(f"[LIFECYCLE] camel_task exists: {camel_task is not None}, current status: {task_lock.status}, workforce exists: {workforce is not None}")
                 if workforce is not None:
                     logger.info(f"[LIFECYCLE] Workforce state at END: _state={workforce._state.name}, _running={workforce._running}")
-                logger.info("=" * 80)
 
                 # Prevent duplicate end processing
                 if task_lock.status == Status.done:
@@ -1015,9 +989,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     workforce.pause()
                 yield sse_json(Action.budget_not_enough, {"message": "budget not enouth"})
             elif item.action == Action.stop:
-                logger.info("=" * 80)
                 logger.info(f"⏹️  [LIFECYCLE] STOP action received for project {options.project_id}")
-                logger.info("=" * 80)
                 if workforce is not None:
                     logger.info(f"[LIFECYCLE] Workforce exists (id={id(workforce)}), _running={workforce._running}, _state={workforce._state.name}")
                     if workforce._running:
@@ -1127,49 +1099,12 @@ def add_sub_tasks(camel_task: Task, update_tasks: list[TaskContent]):
 
 
 async def question_confirm(agent: ListenChatAgent, prompt: str, task_lock: TaskLock | None = None) -> bool:
-    """Simple question confirmation - returns True for complex tasks, False for simple questions."""
-
-    context_prompt = ""
-    if task_lock:
-        context_prompt = build_conversation_context(task_lock, header="=== Previous Conversation ===")
-
-    full_prompt = f"""{context_prompt}User Query: {prompt}
-
-Determine if this user query is a complex task or a simple question.
-
-**Complex task** (answer "yes"): Requires tools, code execution, file operations, multi-step planning, or creating/modifying content
-- Examples: "create a file", "search for X", "implement feature Y", "write code", "analyze data", "build something"
-
-**Simple question** (answer "no"): Can be answered directly with knowledge or conversation history, no action needed
-- Examples: greetings ("hello", "hi"), fact queries ("what is X?"), clarifications ("what did you mean?"), status checks ("how are you?")
-
-Answer only "yes" or "no". Do not provide any explanation.
-
-Is this a complex task? (yes/no):"""
-
-    try:
-        resp = agent.step(full_prompt)
-
-        if not resp or not resp.msgs or len(resp.msgs) == 0:
-            logger.warning("No response from agent, defaulting to complex task")
-            return True
-
-        content = resp.msgs[0].content
-        if not content:
-            logger.warning("Empty content from agent, defaulting to complex task")
-            return True
-
-        normalized = content.strip().lower()
-        is_complex = "yes" in normalized
-
-        logger.info(f"Question confirm result: {'complex task' if is_complex else 'simple question'}",
-                   extra={"response": content, "is_complex": is_complex})
+    """Simple question confirmation - returns True for complex tasks, False for simple questions.
 
-        return is_complex
-
-    except Exception as e:
-        logger.error(f"Error in question_confirm: {e}")
-        return True
+    Rules decide what they can without a model call; the rest is one stateless step of `agent`
+    over a bounded context (see `app.service.question_router`).
+    """
+    return route_question(agent, prompt, task_lock).is_complex
 
 
 @traceroot.trace()
@@ -1188,7 +1123,9 @@ Do not include any other text or formatting.
 """
     logger.debug("Generating task summary", extra={"task_id": task.id})
     try:
-        res = agent.step(prompt)
+        # The summary agent is reused across tasks; each summary starts from a clean memory
+        agent.reset()
+        res = await agent.astep(prompt)
         summary = res.msgs[0].content
         logger.info("Task summary generated", extra={"summary": summary})
         return summary
@@ -1197,6 +1134,47 @@ Do not include any other text or formatting.
         raise
 
 
+TASK_SUMMARY_TIMEOUT = 10
+
+
+def fallback_task_summary(name: str, content: str | None, max_chars: int = 80, keep_chars: int | None = None) -> str:
+    """Task card summary made from the task text, cut to `keep_chars` (default `max_chars`) plus "..." when longer than `max_chars`."""
+    content = content or ""
+    if len(content) > max_chars:
+        content = content[: max_chars if keep_chars is None else keep_chars] + "..."
+    return f"{name}|{content}"
+
+
+async def generate_task_summary(
+    task_lock: TaskLock,
+    options: Chat,
+    task: Task,
+    fallback: str | None = None,
+) -> str:
+    """Task card summary ("Name|summary") from the project's reused summary agent.
+
+    Started as soon as a task is confirmed, so it runs while the task is decomposed. Returns
+    `fallback` (by default a truncated task description) if the model fails or takes longer than
+    TASK_SUMMARY_TIMEOUT seconds.
+    """
+    if fallback is None:
+        fallback = fallback_task_summary("Task", task.content)
+    try:
+        with timeline.span(options.project_id, "task_summary", "chat"):
+            if task_lock.summary_agent is None:
+                task_lock.summary_agent = task_summary_agent(options)
+            summary = await asyncio.wait_for(summary_task(task_lock.summary_agent, task), timeout=TASK_SUMMARY_TIMEOUT)
+        logger.info("Task summary generated", extra={"project_id": options.project_id, "task_id": task.id})
+    except asyncio.TimeoutError:
+        logger.warning("summary_task timeout", extra={"project_id": options.project_id, "task_id": task.id})
+        summary = fallback
+    except Exception as e:
+        logger.error(f"Error generating task summary: {e}", extra={"project_id": options.project_id})
+        summary = fallback
+    task_lock.summary_generated = True
+    return summary
+
+
 async def summary_subtasks_result(agent: ListenChatAgent, task: Task) -> str:
     """
     Summarize the aggregated results from all subtasks into a concise summary.
@@ -1294,32 +1272,28 @@ async def construct_workforce(options: Chat) -> tuple[Workforce, ListenChatAgent
             ],
         )
         for key, prompt in {
-            Agents.coordinator_agent: f"""
+            Agents.coordinator_agent: system_prompt(
+                Agents.coordinator_agent,
+                """
 You are a helpful coordinator.
-- You are now working in system {platform.system()} with architecture
-{platform.machine()} at working directory `{working_directory}`. All local file operations must occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {datetime.date.today()}. For any date-related tasks, you MUST use this as the current date.
-
-- If a task assigned to another agent fails, you should re-assign it to the 
-`Developer_Agent`. The `Developer_Agent` is a powerful agent with terminal 
-access and can resolve a wide range of issues. 
-            """,
-            Agents.task_agent: f"""
+- If a task assigned to another agent fails, you should re-assign it to the
+`Developer_Agent`. The `Developer_Agent` is a powerful agent with terminal
+access and can resolve a wide range of issues.
+""",
+                working_directory,
+            ),
+            Agents.task_agent: system_prompt(
+                Agents.task_agent,
+                """
 You are a helpful task planner.
-- You are now working in system {platform.system()} with architecture
-{platform.machine()} at working directory `{working_directory}`. All local file operations must occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {datetime.date.today()}. For any date-related tasks, you MUST use this as the current date.
-        """,
+""",
+                working_directory,
+            ),
         }.items()
     ]
     new_worker_agent = agent_model(
         Agents.new_worker_agent,
-        f"""
-        You are a helpful assistant.
-- You are now working in system {platform.system()} with architecture
-{platform.machine()} at working directory `{working_directory}`. All local file operations must occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {datetime.date.today()}. For any date-related tasks, you MUST use this as the current date.
-        """,
+        system_prompt(Agents.new_worker_agent, "You are a helpful assistant.", working_directory),
         options,
         [
             *HumanToolkit.get_can_use_tools(options.project_id, Agents.new_worker_agent),
@@ -1447,11 +1421,7 @@ async def new_agent_model(data: NewAgent | ActionNewAgent, options: Chat):
         logger.debug(f"Agent {data.name} tool: {item.func.__name__}")
     logger.info(f"Agent {data.name} created with {len(tools)} tools: {tool_names}")
     # Enhanced system message with platform information
-    enhanced_description = f"""{data.description}
-- You are now working in system {platform.system()} with architecture
-{platform.machine()} at working directory `{working_directory}`. All local file operations must occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {datetime.date.today()}. For any date-related tasks, you 
-MUST use this as the current date.
-"""
+    # Not memoized like the built-in prompts: a custom agent's description can change between tasks
+    enhanced_description = f"{data.description}\n\n{environment_facts(working_directory)}\n"
 
     return agent_model(data.name, enhanced_description, options, tools, tool_names=tool_names)
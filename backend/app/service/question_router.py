@@ -0,0 +1,261 @@
+"""
+Two-tier routing of a user question to a direct answer ("simple") or to the workforce ("complex").
+
+1. `classify_locally` decides greetings, short factual questions and explicit requests for action
+   from the question text alone, without a model call.
+2. `classify_with_agent` handles everything else with one stateless call to the question agent: its
+   memory is reset first, and the conversation is passed as a context capped at
+   QUESTION_ROUTER_CONTEXT_TOKENS, newest entries first.
+
+`answer_directly` answers simple questions the same way, capped at QUESTION_ANSWER_CONTEXT_TOKENS,
+so no turn re-sends the whole project history.
+"""
+
+import re
+from dataclasses import dataclass
+
+from app.component import metrics
+from app.component.environment import env
+from app.service.task import TaskLock
+from utils.lazy_logging import get_lazy_logger, payload
+
+logger = get_lazy_logger("question_router")
+
+CONTEXT_HEADER = "=== Previous Conversation ==="
+FALLBACK_ANSWER = "I understand your question, but I'm having trouble generating a response right now."
+
+GREETINGS = {
+    "hi", "hello", "hey", "good", "hiya", "howdy", "yo", "greetings", "morning", "evening",
+    "thanks", "thank", "thx", "ty", "cheers", "bye", "goodbye", "ok", "okay", "cool",
+    "great", "nice", "awesome", "perfect",
+}
+# Words that may follow a greeting without changing its meaning ("hi there", "thanks a lot").
+# No verbs or pronouns that can carry a request: "ok do it" or "great, can you do it?" is not a greeting.
+GREETING_FILLER = {
+    "there", "you", "so", "much", "a", "lot", "again", "good", "very", "all", "everyone",
+    "friend", "eigent", "sounds", "see", "later", "how", "are", "doing", "today",
+    "what's", "whats", "up", "morning", "afternoon", "evening", "night",
+}
+ACTION_VERBS = {
+    "create", "make", "build", "write", "generate", "draft", "compose", "implement", "code",
+    "develop", "program", "fix", "debug", "refactor", "deploy", "install", "run", "execute",
+    "search", "find", "browse", "visit", "download", "upload", "scrape", "crawl", "research",
+    "investigate", "analyze", "analyse", "collect", "gather", "book", "schedule", "send", "email",
+    "post", "tweet", "publish", "edit", "modify", "delete", "remove", "rename", "move", "convert",
+    "export", "save", "organize", "organise", "plan", "design", "setup", "configure", "fill",
+    "monitor", "track", "automate", "open", "check", "update", "compile", "test", "summarize",
+    "summarise", "extract", "look",
+}
+# Politeness and framing stripped from the front before looking for the leading verb
+REQUEST_PREFIXES = (
+    "please", "can you", "could you", "would you", "will you", "pls", "kindly", "help me",
+    "i want you to", "i need you to", "i'd like you to", "i would like you to", "i want to",
+    "i need to", "i'd like to", "let's", "lets", "go ahead and", "now", "then", "and", "also",
+)
+QUESTION_WORDS = {
+    "what", "what's", "whats", "who", "who's", "when", "where", "why", "how", "which",
+    "is", "are", "was", "were", "does", "do", "did", "can", "could", "should", "define", "explain",
+    "describe", "tell",
+}
+# Facts that go stale: answering them needs a search, not the model's knowledge
+FRESHNESS_WORDS = {
+    "latest", "today", "today's", "current", "currently", "news", "now", "recent", "recently",
+    "price", "prices", "stock", "weather", "tonight", "tomorrow", "yesterday", "live", "trending",
+}
+# Time-relative words and past events: the answer may have changed since the model was trained,
+# so such questions are left to the model tier rather than answered as simple facts
+RELATIVE_TIME_WORDS = {
+    "last", "night", "week", "weekend", "month", "year", "ago", "this", "next", "won", "win",
+    "lost", "score", "scores", "result", "results", "happened", "released", "announced", "elected",
+}
+# Things the workforce produces or operates on
+ARTIFACT_WORDS = {
+    "file", "files", "folder", "directory", "website", "webpage", "app", "application", "script",
+    "repo", "repository", "spreadsheet", "excel", "csv", "pdf", "pptx", "slides", "presentation",
+    "document", "docx", "report", "database", "server", "dashboard", "calendar", "inbox",
+}
+FILENAME_PATTERN = re.compile(
+    r"\b[\w-]+\.(xlsx?|csv|tsv|pdf|docx?|pptx?|txt|md|json|ya?ml|xml|html?|py|js|ts|ipynb|zip|png|jpe?g|svg)\b",
+    re.IGNORECASE,
+)
+URL_PATTERN = re.compile(r"https?://|www\.|\b[\w-]+\.(com|org|net|io|dev|ai)\b", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+@dataclass
+class RouteDecision:
+    is_complex: bool
+    tier: str  # "rules" or "llm"
+    reason: str
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), good enough for budgeting prompts."""
+    return (len(text) + 3) // 4
+
+
+def _strip_prefixes(text: str) -> str:
+    stripped = True
+    while stripped:
+        stripped = False
+        for prefix in REQUEST_PREFIXES:
+            if text == prefix or text.startswith(prefix + " "):
+                text = text[len(prefix) :].lstrip(" ,")
+                stripped = True
+    return text
+
+
+def classify_locally(question: str, max_question_words: int | None = None) -> RouteDecision | None:
+    """
+    Route `question` from its text alone, or return None when the rules cannot tell.
+
+    Explicit requests for action, links and questions about current events are complex; greetings
+    and short factual questions that touch no artifact (file, filename, website, ...) and no
+    recent event are simple. Everything else is left to the model.
+    """
+    if max_question_words is None:
+        max_question_words = int(env("QUESTION_ROUTER_SHORT_QUESTION_WORDS", "20"))
+    text = " ".join(question.lower().split())
+    words = WORD_PATTERN.findall(text)
+    if not words:
+        return RouteDecision(False, "rules", "empty")
+
+    if URL_PATTERN.search(text):
+        return RouteDecision(True, "rules", "link")
+
+    lead = WORD_PATTERN.findall(_strip_prefixes(text))
+    if lead and lead[0] in ACTION_VERBS:
+        return RouteDecision(True, "rules", f"action verb '{lead[0]}'")
+
+    if words[0] in GREETINGS and all(word in GREETINGS or word in GREETING_FILLER for word in words[1:]):
+        return RouteDecision(False, "rules", "greeting")
+
+    if FRESHNESS_WORDS.intersection(words):
+        return RouteDecision(True, "rules", "needs current information")
+
+    if (
+        words[0] in QUESTION_WORDS
+        and len(words) <= max_question_words
+        and not ACTION_VERBS.intersection(words)
+        and not ARTIFACT_WORDS.intersection(words)
+        and not RELATIVE_TIME_WORDS.intersection(words)
+        and not FILENAME_PATTERN.search(text)
+    ):
+        return RouteDecision(False, "rules", "short factual question")
+
+    # Anything else, however short, is for the model to decide
+    return None
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+
+def _render_entry(entry: dict, limit: int) -> str:
+    content = entry.get("content")
+    role = entry.get("role")
+    if role == "task_result" and isinstance(content, dict):
+        lines = []
+        if content.get("task_content"):
+            lines.append(f"Previous Task: {_truncate(str(content['task_content']), limit)}")
+        if content.get("task_result"):
+            lines.append(f"Previous Task Result: {_truncate(str(content['task_result']), limit)}")
+        if content.get("working_directory"):
+            lines.append(f"Working Directory: {content['working_directory']}")
+        return "\n".join(lines)
+    if not content:
+        return ""
+    if role == "user":
+        return f"User: {_truncate(str(content), limit)}"
+    if role == "assistant":
+        return f"Assistant: {_truncate(str(content), limit)}"
+    return _truncate(str(content), limit)
+
+
+def build_routing_context(task_lock: TaskLock | None, max_tokens: int, header: str = CONTEXT_HEADER) -> str:
+    """
+    Render the newest conversation entries that fit in `max_tokens`.
+
+    Each entry is truncated to a third of the budget so one long task result cannot crowd out the
+    rest; generated files are not listed (the working directory is).
+    """
+    history = getattr(task_lock, "conversation_history", None) or []
+    budget = max_tokens - estimate_tokens(header)
+    entry_limit = max(max_tokens * 4 // 3, 80)
+    lines: list[str] = []
+    for entry in reversed(history):
+        line = _render_entry(entry, entry_limit)
+        if not line:
+            continue
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            break
+        lines.append(line)
+        budget -= cost
+    if not lines:
+        return ""
+    return f"{header}\n" + "\n".join(reversed(lines)) + "\n\n"
+
+
+def _reset(agent) -> None:
+    # The question agent lives on the task lock; without a reset every earlier prompt is re-sent
+    reset = getattr(agent, "reset", None)
+    if callable(reset):
+        reset()
+
+
+def classification_prompt(question: str, context: str = "") -> str:
+    return f"""{context}User Query: {question}
+
+Determine if this user query is a complex task or a simple question.
+
+**Complex task** (answer "yes"): Requires tools, code execution, file operations, multi-step planning, or creating/modifying content
+- Examples: "create a file", "search for X", "implement feature Y", "write code", "analyze data", "build something"
+
+**Simple question** (answer "no"): Can be answered directly with knowledge or conversation history, no action needed
+- Examples: greetings ("hello", "hi"), fact queries ("what is X?"), clarifications ("what did you mean?"), status checks ("how are you?")
+
+Answer only "yes" or "no". Do not provide any explanation.
+
+Is this a complex task? (yes/no):"""
+
+
+def classify_with_agent(agent, question: str, task_lock: TaskLock | None = None) -> RouteDecision:
+    """Ask `agent` once, without its memory, whether `question` is complex; errors route to complex."""
+    context = build_routing_context(task_lock, int(env("QUESTION_ROUTER_CONTEXT_TOKENS", "1500")))
+    try:
+        _reset(agent)
+        resp = agent.step(classification_prompt(question, context))
+        if not resp or not resp.msgs:
+            logger.warning("No response from agent, defaulting to complex task")
+            return RouteDecision(True, "llm", "no response")
+        content = resp.msgs[0].content
+        if not content:
+            logger.warning("Empty content from agent, defaulting to complex task")
+            return RouteDecision(True, "llm", "empty response")
+        return RouteDecision("yes" in content.strip().lower(), "llm", f"agent answered {payload(content, 20)}")
+    except Exception as e:
+        logger.error("Error classifying question with agent: %s", e)
+        return RouteDecision(True, "llm", "error")
+
+
+def route_question(agent, question: str, task_lock: TaskLock | None = None) -> RouteDecision:
+    decision = classify_locally(question)
+    if decision is None:
+        decision = classify_with_agent(agent, question, task_lock)
+    metrics.question_routes.inc(decision.tier, "complex" if decision.is_complex else "simple")
+    logger.info(
+        "Question routed to %s by %s (%s)",
+        "complex task" if decision.is_complex else "simple question",
+        decision.tier,
+        decision.reason,
+    )
+    return decision
+
+
+def answer_directly(agent, question: str, task_lock: TaskLock | None = None) -> str:
+    """Answer a simple question with one stateless step over a bounded conversation context."""
+    context = build_routing_context(task_lock, int(env("QUESTION_ANSWER_CONTEXT_TOKENS", "4000")))
+    _reset(agent)
+    resp = agent.step(f"{context}User Query: {question}\n\nProvide a direct, helpful answer to this simple question.")
+    return resp.msgs[0].content if resp and resp.msgs else FALLBACK_ANSWER
@@ -1,6 +1,8 @@
 from typing_extensions import Any, Literal, TypedDict
 from typing import List, Dict, Optional
 from pydantic import BaseModel
+from app.component import metrics
+from app.component.cost_tracker import cost_tracker
 from app.exception.exception import ProgramException
 from app.model.chat import McpServers, Status, SupplementChat, Chat, UpdateData
 import asyncio
@@ -8,11 +10,19 @@ from enum import Enum
 from camel.tasks import Task
 from contextlib import contextmanager
 from contextvars import ContextVar
-from datetime import datetime, timedelta
+from datetime import datetime
+import json
+import os
+import re
 import weakref
-from utils import traceroot_wrapper as traceroot
+from pathlib import Path
+from app.component.environment import env
+from app.utils.terminal_stream import terminal_log_dirs
+from utils.lazy_logging import get_lazy_logger
 
-logger = traceroot.get_logger("task_service")
+logger = get_lazy_logger("task_service")
+# Queue events are logged once per TASK_QUEUE_LOG_EVERY events per call site
+_QUEUE_LOG_EVERY = int(env("TASK_QUEUE_LOG_EVERY", "100"))
 
 
 class Action(str, Enum):
@@ -164,6 +174,7 @@ class ActionTerminalData(BaseModel):
     action: Literal[Action.terminal] = Action.terminal
     process_task_id: str
     data: str
+    log: str | None = None
 
 
 class ActionStopData(BaseModel):
@@ -285,6 +296,10 @@ class TaskLock:
     """Store the last task execution result"""
     question_agent: Optional[Any]
     """Persistent question confirmation agent"""
+    summary_agent: Optional[Any]
+    """Task summary agent reused (reset per call) for every task card of the project"""
+    model_registry: Optional[Any]
+    """The project's ModelRegistry: models its auxiliary agents may be routed to, with their keys"""
     summary_generated: bool
     """Track if summary has been generated for this project"""
     current_task_id: Optional[str]
@@ -303,19 +318,32 @@ class TaskLock:
         self.last_task_result = ""
         self.last_task_summary = ""
         self.question_agent = None
+        self.summary_agent = None
+        self.model_registry = None
         self.current_task_id = None
+        # SSE streams currently blocked in get_queue; a lock with a live stream is never evicted
+        self.waiting_consumers = 0
 
         logger.info("Task lock initialized", extra={"task_id": id, "created_at": self.created_at.isoformat()})
 
     async def put_queue(self, data: ActionData):
         self.last_accessed = datetime.now()
-        logger.debug("Adding item to task queue", extra={"task_id": self.id, "action": data.action})
+        logger.debug(
+            "Adding item to task queue",
+            every=_QUEUE_LOG_EVERY,
+            extra=lambda: {"task_id": self.id, "action": data.action},
+        )
+        metrics.task_queue_events.inc(getattr(data.action, "value", str(data.action)))
         await self.queue.put(data)
 
     async def get_queue(self):
         self.last_accessed = datetime.now()
-        logger.debug("Getting item from task queue", extra={"task_id": self.id})
-        return await self.queue.get()
+        logger.debug("Getting item from task queue", every=_QUEUE_LOG_EVERY, extra=lambda: {"task_id": self.id})
+        self.waiting_consumers += 1
+        try:
+            return await self.queue.get()
+        finally:
+            self.waiting_consumers -= 1
 
     async def put_human_input(self, agent: str, data: Any = None):
         logger.debug("Adding human input", extra={"task_id": self.id, "agent": agent, "has_data": data is not None})
@@ -377,8 +405,23 @@ task_locks = dict[str, TaskLock]()
 _cleanup_task: asyncio.Task | None = None
 task_index: dict[str, weakref.ref[Task]] = {}
 
+metrics.GaugeFunction("eigent_task_locks_active", "Task locks currently held in memory.", lambda: len(task_locks))
+metrics.GaugeFunction(
+    "eigent_task_queue_depth",
+    "Events waiting in all task lock queues.",
+    lambda: sum(lock.queue.qsize() for lock in list(task_locks.values())),
+)
+metrics.GaugeFunction(
+    "eigent_task_queue_depth_max",
+    "Events waiting in the fullest task lock queue.",
+    lambda: max((lock.queue.qsize() for lock in list(task_locks.values())), default=0),
+)
+
 
 def get_task_lock(id: str) -> TaskLock:
+    if id not in task_locks and _spill_path(id).exists():
+        # Evicted while idle: bring the project back with its conversation for follow-ups
+        return get_or_create_task_lock(id)
     if id not in task_locks:
         logger.error("Task lock not found", extra={"task_id": id})
         raise ProgramException("Task not found")
@@ -405,11 +448,8 @@ def create_task_lock(id: str) -> TaskLock:
 
     logger.info("Creating new task lock", extra={"task_id": id})
     task_locks[id] = TaskLock(id=id, queue=asyncio.Queue(), human_input={})
-
-    # Start cleanup task if not running
-    # global _cleanup_task
-    # if _cleanup_task is None or _cleanup_task.done():
-    #     _cleanup_task = asyncio.create_task(_periodic_cleanup())
+    _rehydrate_task_lock(task_locks[id])
+    _ensure_cleanup_task()
 
     logger.info("Task lock created successfully", extra={"task_id": id, "total_task_locks": len(task_locks)})
     return task_locks[id]
@@ -435,6 +475,9 @@ async def delete_task_lock(id: str):
     await task_lock.cleanup()
 
     del task_locks[id]
+    # The project's usage aggregates and budget go with its lock; eviction spills them first
+    cost_tracker.clear(id)
+    terminal_log_dirs.pop(id, None)
     logger.info("Task lock deleted successfully", extra={"task_id": id, "remaining_task_locks": len(task_locks)})
 
 
@@ -462,30 +505,165 @@ def get_camel_task(id: str, tasks: list[Task]) -> None | Task:
     return None
 
 
-async def _periodic_cleanup():
-    r"""Periodically clean up stale task locks"""
-    while True:
-        try:
-            await asyncio.sleep(300)  # Run every 5 minutes
+def _approx_size(value: Any, depth: int = 0) -> int:
+    """Rough byte size of plain data (strings, containers, pydantic models) for memory accounting."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if depth > 8:
+        return 64
+    if isinstance(value, dict):
+        return 64 + sum(_approx_size(k, depth + 1) + _approx_size(v, depth + 1) for k, v in list(value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return 56 + sum(_approx_size(item, depth + 1) for item in list(value))
+    if isinstance(value, BaseModel):
+        return _approx_size(value.__dict__, depth + 1)
+    return 32
+
+
+def estimate_task_lock_bytes(task_lock: TaskLock) -> int:
+    """Estimate the variable-size state a task lock keeps alive: history, results, queued events and
+    the question agent's memory."""
+    size = _approx_size(task_lock.conversation_history)
+    size += len(task_lock.last_task_result or "") + len(task_lock.last_task_summary or "")
+    size += _approx_size(list(task_lock.queue._queue))  # type: ignore[attr-defined]
+    memory = getattr(task_lock.question_agent, "memory", None)
+    storage = getattr(getattr(memory, "_chat_history_block", None), "storage", None)
+    size += _approx_size(getattr(storage, "memory_list", []))
+    return size
+
+
+metrics.GaugeFunction(
+    "eigent_task_locks_estimated_bytes",
+    "Estimated memory held by task locks (history, results, queues, question agent memory).",
+    lambda: sum(estimate_task_lock_bytes(lock) for lock in list(task_locks.values())),
+)
 
-            current_time = datetime.now()
-            stale_timeout = timedelta(hours=2)  # Consider tasks stale after 2 hours
 
-            stale_ids = []
-            for task_id, task_lock in task_locks.items():
-                if current_time - task_lock.last_accessed > stale_timeout:
-                    stale_ids.append(task_id)
+def _spill_path(id: str) -> Path:
+    spill_dir = env("TASK_LOCK_SPILL_DIR", os.path.join(os.path.expanduser("~"), ".eigent", "task_locks"))
+    return Path(spill_dir) / (re.sub(r"[^\w.-]", "_", id) + ".json")
+
+
+def _spill_task_lock(task_lock: TaskLock) -> None:
+    """Write the conversation state and usage of an evicted lock to disk so the project can be rehydrated."""
+    usage = cost_tracker.export_project(task_lock.id)
+    if not (task_lock.conversation_history or task_lock.last_task_result or task_lock.last_task_summary or usage):
+        return
+    path = _spill_path(task_lock.id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps(
+            {
+                "conversation_history": task_lock.conversation_history,
+                "last_task_result": task_lock.last_task_result,
+                "last_task_summary": task_lock.last_task_summary,
+                "current_task_id": task_lock.current_task_id,
+                # Spent total and budget, so the budget guard and /chat/{id}/usage survive the eviction
+                "usage": usage,
+            },
+            ensure_ascii=False,
+            default=str,
+        ),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+def _rehydrate_task_lock(task_lock: TaskLock) -> None:
+    path = _spill_path(task_lock.id)
+    if not path.exists():
+        return
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+        task_lock.conversation_history = state.get("conversation_history", [])
+        task_lock.last_task_result = state.get("last_task_result", "")
+        task_lock.last_task_summary = state.get("last_task_summary", "")
+        task_lock.current_task_id = state.get("current_task_id")
+        cost_tracker.restore_project(task_lock.id, state.get("usage"))
+        path.unlink()
+        logger.info(
+            "Task lock rehydrated from spill",
+            extra={"task_id": task_lock.id, "history_entries": len(task_lock.conversation_history)},
+        )
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to rehydrate task lock {task_lock.id}: {e}")
+
+
+def _is_evictable(task_lock: TaskLock, now: datetime, min_idle_seconds: float) -> bool:
+    return (
+        task_lock.waiting_consumers == 0
+        and task_lock.queue.empty()
+        and task_lock.status != Status.processing
+        and all(task.done() for task in list(task_lock.background_tasks))
+        and (now - task_lock.last_accessed).total_seconds() >= min_idle_seconds
+    )
+
+
+async def evict_stale_task_locks(now: datetime | None = None) -> list[str]:
+    r"""Evict idle task locks past TASK_LOCK_TTL_SECONDS, then idle locks least recently used first
+    while the estimated total exceeds TASK_LOCK_MEMORY_BUDGET_MB. Locks with a live SSE stream,
+    queued events, running background tasks or a processing task are never evicted. Conversation
+    state is spilled to disk first and restored when the project's lock is next looked up."""
+    now = now or datetime.now()
+    ttl = float(env("TASK_LOCK_TTL_SECONDS", "7200"))
+    budget = float(env("TASK_LOCK_MEMORY_BUDGET_MB", "256")) * 1024 * 1024
+    min_idle = float(env("TASK_LOCK_MIN_IDLE_SECONDS", "300"))
+
+    sizes = {id: estimate_task_lock_bytes(lock) for id, lock in list(task_locks.items())}
+    total = sum(sizes.values())
+    candidates = sorted(
+        (lock for lock in list(task_locks.values()) if _is_evictable(lock, now, min_idle)),
+        key=lambda lock: lock.last_accessed,
+    )
+    evicted = []
+    for task_lock in candidates:
+        if (now - task_lock.last_accessed).total_seconds() >= ttl:
+            reason = "ttl"
+        elif total > budget:
+            reason = "memory"
+        else:
+            # Candidates are oldest first, so no later lock is past the TTL either
+            break
+        try:
+            _spill_task_lock(task_lock)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Not evicting task lock {task_lock.id}, spilling its history failed: {e}")
+            continue
+        await delete_task_lock(task_lock.id)
+        total -= sizes.get(task_lock.id, 0)
+        metrics.task_lock_evictions.inc(reason)
+        evicted.append(task_lock.id)
+        logger.info(
+            "Evicted task lock",
+            extra={"task_id": task_lock.id, "reason": reason, "estimated_bytes": sizes.get(task_lock.id, 0)},
+        )
+    return evicted
 
-            for task_id in stale_ids:
-                logger.warning(f"Cleaning up stale task lock: {task_id}")
-                await delete_task_lock(task_id)
 
+async def _periodic_cleanup():
+    r"""Periodically evict stale task locks"""
+    while True:
+        try:
+            await asyncio.sleep(float(env("TASK_LOCK_SWEEP_SECONDS", "300")))
+            await evict_stale_task_locks()
         except asyncio.CancelledError:
             break
         except Exception as e:
             logger.error(f"Error in periodic cleanup: {e}")
 
 
+def _ensure_cleanup_task() -> None:
+    global _cleanup_task
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Created outside an event loop (scripts, sync tests); there is nothing to schedule on
+        return
+    if _cleanup_task is None or _cleanup_task.done() or _cleanup_task.get_loop() is not loop:
+        _cleanup_task = loop.create_task(_periodic_cleanup())
+
+
 process_task = ContextVar[str]("id")
 
 
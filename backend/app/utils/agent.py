@@ -1,12 +1,14 @@
 import asyncio
+from contextlib import nullcontext
 import json
 import os
-import platform
+import time
 from threading import Event
 import traceback
 from typing import Any, Callable, Dict, List, Tuple
 import uuid
 from utils import traceroot_wrapper as traceroot
+from utils.lazy_logging import get_lazy_logger, payload
 from camel.agents import ChatAgent
 from camel.agents.chat_agent import (
     StreamingChatAgentResponse,
@@ -26,45 +28,68 @@ from camel.responses import ChatAgentResponse
 from camel.terminators import ResponseTerminator
 from camel.toolkits import FunctionTool, RegisteredAgentToolkit
 from camel.types.agents import ToolCallingRecord
+from app.component import metrics, timeline
+from app.component.cost_tracker import TokenUsage, blended_price, cost_tracker, estimate_cost
 from app.component.environment import env
+from app.component.model_adapter import (
+    DEFAULT_MODEL,
+    ModelCapabilities,
+    ModelRegistry,
+    ModelRequirements,
+    UniversalModelAdapter,
+)
+from app.component.rate_limiter import RateLimitedModelManager
+from app.component.tool_result_store import (
+    EXCERPT_HEAD_CHARS,
+    EXCERPT_TAIL_CHARS,
+    ToolResultStore,
+    compact_tool_results,
+    compaction_settings,
+    result_text,
+    spill_excerpt,
+    spill_threshold,
+)
 from app.utils.file_utils import get_working_directory
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
-from app.utils.toolkit.hybrid_browser_toolkit import HybridBrowserToolkit
-from app.utils.toolkit.excel_toolkit import ExcelToolkit
-from app.utils.toolkit.file_write_toolkit import FileToolkit
-from app.utils.toolkit.google_calendar_toolkit import GoogleCalendarToolkit
-from app.utils.toolkit.google_drive_mcp_toolkit import GoogleDriveMCPToolkit
-from app.utils.toolkit.google_gmail_mcp_toolkit import GoogleGmailMCPToolkit
-from app.utils.toolkit.human_toolkit import HumanToolkit
-from app.utils.toolkit.markitdown_toolkit import MarkItDownToolkit
-from app.utils.toolkit.mcp_search_toolkit import McpSearchToolkit
-from app.utils.toolkit.note_taking_toolkit import NoteTakingToolkit
-from app.utils.toolkit.notion_mcp_toolkit import NotionMCPToolkit
-from app.utils.toolkit.pptx_toolkit import PPTXToolkit
-from app.utils.toolkit.screenshot_toolkit import ScreenshotToolkit
-from app.utils.toolkit.terminal_toolkit import TerminalToolkit
-from app.utils.toolkit.github_toolkit import GithubToolkit
-from app.utils.toolkit.search_toolkit import SearchToolkit
-from app.utils.toolkit.video_download_toolkit import VideoDownloaderToolkit
-from app.utils.toolkit.audio_analysis_toolkit import AudioAnalysisToolkit
-from app.utils.toolkit.video_analysis_toolkit import VideoAnalysisToolkit
-from app.utils.toolkit.image_analysis_toolkit import ImageAnalysisToolkit
-from app.utils.toolkit.openai_image_toolkit import OpenAIImageToolkit
-from app.utils.toolkit.web_deploy_toolkit import WebDeployToolkit
-from app.utils.toolkit.whatsapp_toolkit import WhatsAppToolkit
-from app.utils.toolkit.twitter_toolkit import TwitterToolkit
-from app.utils.toolkit.linkedin_toolkit import LinkedInToolkit
-from app.utils.toolkit.reddit_toolkit import RedditToolkit
-from app.utils.toolkit.slack_toolkit import SlackToolkit
-from app.utils.toolkit.lark_toolkit import LarkToolkit
+from app.utils.toolkit.registry import INSTALLABLE_TOOLKITS, toolkit_registry
+from app.utils.system_prompt import current_hour, prompt_cache_usage, system_prompt
 from camel.types import ModelPlatformType, ModelType
 from camel.toolkits import MCPToolkit, ToolkitMessageIntegration
-import datetime
 from pydantic import BaseModel
 from app.model.chat import Chat, McpServers
 
+# Toolkit classes are imported on first use; see app.utils.toolkit.registry
+HybridBrowserToolkit = toolkit_registry["hybrid_browser_toolkit"]
+ExcelToolkit = toolkit_registry["excel_toolkit"]
+FileToolkit = toolkit_registry["file_write_toolkit"]
+GoogleCalendarToolkit = toolkit_registry["google_calendar_toolkit"]
+GoogleDriveMCPToolkit = toolkit_registry["google_drive_mcp_toolkit"]
+GoogleGmailMCPToolkit = toolkit_registry["google_gmail_mcp_toolkit"]
+HumanToolkit = toolkit_registry["human_toolkit"]
+MarkItDownToolkit = toolkit_registry["markitdown_toolkit"]
+McpSearchToolkit = toolkit_registry["mcp_search_toolkit"]
+NoteTakingToolkit = toolkit_registry["note_taking_toolkit"]
+NotionMCPToolkit = toolkit_registry["notion_mcp_toolkit"]
+PPTXToolkit = toolkit_registry["pptx_toolkit"]
+ScreenshotToolkit = toolkit_registry["screenshot_toolkit"]
+TerminalToolkit = toolkit_registry["terminal_toolkit"]
+GithubToolkit = toolkit_registry["github_toolkit"]
+SearchToolkit = toolkit_registry["search_toolkit"]
+VideoDownloaderToolkit = toolkit_registry["video_download_toolkit"]
+AudioAnalysisToolkit = toolkit_registry["audio_analysis_toolkit"]
+VideoAnalysisToolkit = toolkit_registry["video_analysis_toolkit"]
+ImageAnalysisToolkit = toolkit_registry["image_analysis_toolkit"]
+OpenAIImageToolkit = toolkit_registry["openai_image_toolkit"]
+WebDeployToolkit = toolkit_registry["web_deploy_toolkit"]
+WhatsAppToolkit = toolkit_registry["whatsapp_toolkit"]
+TwitterToolkit = toolkit_registry["twitter_toolkit"]
+LinkedInToolkit = toolkit_registry["linkedin_toolkit"]
+RedditToolkit = toolkit_registry["reddit_toolkit"]
+SlackToolkit = toolkit_registry["slack_toolkit"]
+LarkToolkit = toolkit_registry["lark_toolkit"]
+
 # Create traceroot logger for agent tracking
-traceroot_logger = traceroot.get_logger("agent")
+traceroot_logger = get_lazy_logger("agent")
 from app.service.task import (
     Action,
     ActionActivateAgentData,
@@ -75,10 +100,28 @@ from app.service.task import (
     ActionDeactivateToolkitData,
     Agents,
     get_task_lock,
+    get_task_lock_if_exists,
 )
 from app.service.task import set_process_task
 
-NOW_STR = datetime.datetime.now().strftime("%Y-%m-%d %H:00:00")
+
+class SharedSchemaTool(FunctionTool):
+    r"""A FunctionTool for agent clones that shares its source tool's schema.
+
+    The schema dict and synthesis settings are shared, not copied, and are not
+    re-validated: the source tool was validated when the original agent was
+    built. Only `func` differs when the owning toolkit was cloned per session.
+    """
+
+    def __init__(self, source: FunctionTool, func: Callable | None = None) -> None:
+        self.__dict__.update(source.__dict__)
+        if func is not None:
+            self.func = func
+
+    @staticmethod
+    def validate_openai_tool_schema(openai_tool_schema: Dict[str, Any]) -> None:
+        return None
+
 
 
 class ListenChatAgent(ChatAgent):
@@ -149,8 +192,146 @@ class ListenChatAgent(ChatAgent):
         )
         self.api_task_id = api_task_id
         self.agent_name = agent_name
+        if isinstance(self.model_backend, ModelManager):
+            # Every model call queues on the limiter shared by all agents using the same key and model
+            self.model_backend = RateLimitedModelManager.from_manager(self.model_backend, api_task_id)
 
     process_task_id: str = ""
+    routed_model: Tuple[str, str] | None = None
+    """(provider, model) picked by the model router; None while on the chat's own model"""
+    model_registry: ModelRegistry | None = None
+    """Project registry the model was routed from, whose latency averages this agent's steps feed"""
+    tool_result_store: ToolResultStore | None = None
+    """Where oversized and old tool results are stored; None disables spilling and compaction"""
+    _compaction_idle_tokens: int = 0
+
+    def _record_step(self, started: float, total_tokens: int = 0, error: BaseException | None = None) -> None:
+        """Record one LLM step in the metrics and the project timeline."""
+        ended = time.perf_counter()
+        metrics.agent_step_seconds.observe(ended - started, self.agent_name)
+        args: dict[str, Any] = {"agent_id": self.agent_id, "tokens": total_tokens}
+        if error is not None:
+            metrics.agent_step_errors.inc(self.agent_name)
+            args["error"] = type(error).__name__
+        else:
+            metrics.agent_tokens.inc(self.agent_name, amount=total_tokens)
+            if self.model_registry is not None:
+                self.model_registry.record_latency(*(self.routed_model or DEFAULT_MODEL), ended - started)
+        timeline.record(self.api_task_id, f"{self.agent_name} step", started, ended, "llm", self.process_task_id, **args)
+
+    def _update_token_usage_tracker(self, tracker: Dict[str, int], usage_dict: Dict[str, Any]) -> None:
+        # Called once per model call (batch or final stream chunk) with the provider's full usage,
+        # which the step's `info["usage"]` reduces to prompt/completion/total
+        super()._update_token_usage_tracker(tracker, usage_dict)
+        try:
+            self._record_usage(usage_dict)
+        except Exception as e:
+            traceroot_logger.warning(f"Failed to record usage for {self.agent_name}: {e}")
+
+    def _record_usage(self, usage_dict: Dict[str, Any]) -> None:
+        """Record one model call's tokens and cost in the metrics and the project's cost tracker."""
+        prompt_tokens, cached_tokens = prompt_cache_usage(usage_dict)
+        output_tokens = (usage_dict or {}).get("completion_tokens") or (usage_dict or {}).get("output_tokens") or 0
+        if not prompt_tokens and not output_tokens:
+            return
+        metrics.agent_prompt_tokens.inc(self.agent_name, amount=prompt_tokens)
+        metrics.agent_cached_prompt_tokens.inc(self.agent_name, amount=cached_tokens)
+
+        backend = self.model_backend.current_model
+        model = str(getattr(backend, "model_type", "") or "")
+        if self.routed_model is not None:
+            provider = self.routed_model[0]
+        else:
+            provider = type(backend).__name__.removesuffix("Model").lower()
+        cost = estimate_cost(model, prompt_tokens, output_tokens, cached_tokens)
+        metrics.model_cost_usd.inc(model, amount=cost)
+        task_lock = get_task_lock_if_exists(self.api_task_id)
+        task_id = getattr(task_lock, "current_task_id", None)
+        cost_tracker.record(TokenUsage(
+            provider=provider,
+            model=model,
+            input_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            cost_usd=cost,
+            task_id=task_id,
+            cached_tokens=cached_tokens,
+            project_id=self.api_task_id,
+            agent_name=self.agent_name,
+            process_task_id=self.process_task_id or None,
+        ))
+        traceroot_logger.debug(
+            "Agent %s model call: %s prompt (%s cached) + %s output tokens, $%.6f",
+            self.agent_name, prompt_tokens, cached_tokens, output_tokens, cost,
+        )
+
+    def _spill_result(self, func_name: str, result: Any) -> Any:
+        """Store an oversized tool result and hand the model an excerpt and handle instead.
+
+        The UI message is built from the raw result before this runs.
+        """
+        limit = spill_threshold()
+        if self.tool_result_store is None or not limit or func_name == "read_tool_result":
+            return result
+        text = result_text(result)
+        if len(text) <= max(limit, EXCERPT_HEAD_CHARS + EXCERPT_TAIL_CHARS):
+            return result
+        handle = self.tool_result_store.put(text)
+        metrics.tool_results_spilled.inc(func_name)
+        traceroot_logger.info(f"Agent {self.agent_name} stored {len(text)} char result of {func_name} as {handle}")
+        return spill_excerpt(handle, text)
+
+    def _compact_memory(self, num_tokens: int) -> bool:
+        """Move old tool results out of memory once the context is over the compaction threshold.
+
+        The latest results stay verbatim; older large ones become a digest plus a handle the
+        model can pass to `read_tool_result`. Returns whether memory changed.
+        """
+        threshold, keep_recent, min_chars = compaction_settings()
+        if self.tool_result_store is None or num_tokens <= max(threshold, self._compaction_idle_tokens):
+            return False
+        storage = getattr(getattr(self.memory, "_chat_history_block", None), "storage", None)
+        if storage is None:
+            return False
+        # The in-memory storage is edited in place; load() and save() would copy all of it twice
+        records = getattr(storage, "memory_list", None)
+        in_place = records is not None
+        if not in_place:
+            records = storage.load()
+        compacted = compact_tool_results(records, self.tool_result_store, keep_recent, min_chars)
+        if not compacted:
+            # Nothing to compact until memory grows past this size with new tool results
+            self._compaction_idle_tokens = num_tokens
+            return False
+        self._compaction_idle_tokens = 0
+        if not in_place:
+            storage.clear()
+            storage.save(records)
+        metrics.memory_compacted_results.inc(self.agent_name, amount=compacted)
+        traceroot_logger.info(
+            f"Agent {self.agent_name} compacted {compacted} tool results at {num_tokens} context tokens"
+        )
+        return True
+
+    def _get_context_with_summarization(self) -> Tuple[List[Any], int]:
+        # Runs before every model call of a step, so long tool loops are compacted as they grow
+        openai_messages, num_tokens = super()._get_context_with_summarization()
+        if self._compact_memory(num_tokens):
+            return self.memory.get_context()
+        return openai_messages, num_tokens
+
+    async def _get_context_with_summarization_async(self) -> Tuple[List[Any], int]:
+        openai_messages, num_tokens = await super()._get_context_with_summarization_async()
+        if self._compact_memory(num_tokens):
+            return self.memory.get_context()
+        return openai_messages, num_tokens
+
+    def _check_budget(self) -> None:
+        """Stop before calling the model once the project spent its local budget, so the workforce
+        pauses on the same path as the provider's budget error."""
+        if cost_tracker.over_budget(self.api_task_id):
+            raise ModelProcessingError(
+                f"Budget has been exceeded: project spent ${cost_tracker.project_cost(self.api_task_id):.4f}"
+            )
 
     @traceroot.trace()
     def step(
@@ -179,9 +360,13 @@ class ListenChatAgent(ChatAgent):
         message = None
         res = None
         traceroot_logger.info(
-            f"Agent {self.agent_name} starting step with message: {input_message.content if isinstance(input_message, BaseMessage) else input_message}"
+            "Agent %s starting step with message: %s",
+            self.agent_name,
+            payload(input_message.content if isinstance(input_message, BaseMessage) else input_message),
         )
+        started = time.perf_counter()
         try:
+            self._check_budget()
             res = super().step(input_message, response_format)
         except ModelProcessingError as e:
             res = None
@@ -229,6 +414,7 @@ class ListenChatAgent(ChatAgent):
                             )
                             if usage_info:
                                 total_tokens = usage_info.get("total_tokens", 0)
+                        self._record_step(started, total_tokens)
                         asyncio.create_task(
                             task_lock.put_queue(
                                 ActionDeactivateAgentData(
@@ -248,9 +434,8 @@ class ListenChatAgent(ChatAgent):
             message = res.msg.content if res.msg else ""
             usage_info = res.info.get("usage") or res.info.get("token_usage") or {}
             total_tokens = usage_info.get("total_tokens", 0) if usage_info else 0
-            traceroot_logger.info(
-                f"Agent {self.agent_name} completed step, tokens used: {total_tokens}"
-            )
+            self._record_step(started, total_tokens)
+            traceroot_logger.info("Agent %s completed step, tokens used: %s", self.agent_name, total_tokens)
 
         assert message is not None
 
@@ -269,6 +454,7 @@ class ListenChatAgent(ChatAgent):
         )
 
         if error_info is not None:
+            self._record_step(started, error=error_info)
             raise error_info
         assert res is not None
         return res
@@ -300,10 +486,14 @@ class ListenChatAgent(ChatAgent):
         message = None
         res = None
         traceroot_logger.debug(
-            f"Agent {self.agent_name} starting async step with message: {input_message.content if isinstance(input_message, BaseMessage) else input_message}"
+            "Agent %s starting async step with message: %s",
+            self.agent_name,
+            payload(input_message.content if isinstance(input_message, BaseMessage) else input_message),
         )
 
+        started = time.perf_counter()
         try:
+            self._check_budget()
             res = await super().astep(input_message, response_format)
             if isinstance(res, AsyncStreamingChatAgentResponse):
                 res = await res._get_final_response()
@@ -333,9 +523,8 @@ class ListenChatAgent(ChatAgent):
         if res is not None:
             message = res.msg.content if res.msg else ""
             total_tokens = res.info["usage"]["total_tokens"]
-            traceroot_logger.info(
-                f"Agent {self.agent_name} completed step, tokens used: {total_tokens}"
-            )
+            self._record_step(started, total_tokens)
+            traceroot_logger.info("Agent %s completed step, tokens used: %s", self.agent_name, total_tokens)
 
         assert message is not None
 
@@ -354,6 +543,7 @@ class ListenChatAgent(ChatAgent):
         )
 
         if error_info is not None:
+            self._record_step(started, error=error_info)
             raise error_info
         assert res is not None
         return res
@@ -384,7 +574,11 @@ class ListenChatAgent(ChatAgent):
                 else "mcp_toolkit"
             )
             traceroot_logger.debug(
-                f"Agent {self.agent_name} executing tool: {func_name} from toolkit: {toolkit_name} with args: {json.dumps(args, ensure_ascii=False)}"
+                "Agent %s executing tool: %s from toolkit: %s with args: %s",
+                self.agent_name,
+                func_name,
+                toolkit_name,
+                payload(args),
             )
 
             # Only send activate event if tool is NOT wrapped by @listen_toolkit
@@ -403,9 +597,12 @@ class ListenChatAgent(ChatAgent):
                     )
                 )
             # Set process_task context for all tool executions
-            with set_process_task(self.process_task_id):
+            # Tools wrapped by @listen_toolkit record their own latency
+            timer = nullcontext() if has_listen_decorator else metrics.tool_timer(toolkit_name, func_name)
+            tool_span = timeline.span(self.api_task_id, f"{toolkit_name}.{func_name}", "tool", self.process_task_id)
+            with set_process_task(self.process_task_id), timer, tool_span:
                 raw_result = tool(**args)
-            traceroot_logger.debug(f"Tool {func_name} executed successfully")
+            traceroot_logger.debug("Tool %s executed successfully", func_name)
             if self.mask_tool_output:
                 self._secure_result_store[tool_call_id] = raw_result
                 result = (
@@ -457,7 +654,7 @@ class ListenChatAgent(ChatAgent):
         return self._record_tool_calling(
             func_name,
             args,
-            result,
+            result if mask_flag else self._spill_result(func_name, result),
             tool_call_id,
             mask_output=mask_flag,
             extra_content=tool_call_request.extra_content,
@@ -508,7 +705,11 @@ class ListenChatAgent(ChatAgent):
             toolkit_name = "mcp_toolkit"
 
         traceroot_logger.info(
-            f"Agent {self.agent_name} executing async tool: {func_name} from toolkit: {toolkit_name} with args: {json.dumps(args, ensure_ascii=False)}"
+            "Agent %s executing async tool: %s from toolkit: %s with args: %s",
+            self.agent_name,
+            func_name,
+            toolkit_name,
+            payload(args),
         )
 
         # Always send activate event from agent to ensure consistent logging
@@ -524,9 +725,12 @@ class ListenChatAgent(ChatAgent):
                 },
             )
         )
+        # Tools wrapped by @listen_toolkit record their own latency
+        timer = nullcontext() if hasattr(tool.func, "__wrapped__") else metrics.tool_timer(toolkit_name, func_name)
         try:
             # Set process_task context for all tool executions
-            with set_process_task(self.process_task_id):
+            tool_span = timeline.span(self.api_task_id, f"{toolkit_name}.{func_name}", "tool", self.process_task_id)
+            with set_process_task(self.process_task_id), timer, tool_span:
                 # Try different invocation paths in order of preference
                 if hasattr(tool, "func") and hasattr(tool.func, "async_call"):
                     # Case: FunctionTool wrapping an MCP tool
@@ -606,11 +810,44 @@ class ListenChatAgent(ChatAgent):
         return self._record_tool_calling(
             func_name,
             args,
-            result,
+            self._spill_result(func_name, result),
             tool_call_id,
             extra_content=tool_call_request.extra_content,
         )
 
+    def _clone_tools(self) -> Tuple[List[FunctionTool], List[RegisteredAgentToolkit]]:
+        """Clone tools for a new agent, sharing schemas and stateless toolkits.
+
+        Toolkits that define `clone_for_new_session` get a fresh per-session
+        instance; every other tool keeps its function. Either way the clone
+        reuses the already-validated schema instead of rebuilding it.
+        """
+        cloned_tools: List[FunctionTool] = []
+        toolkits_to_register: List[RegisteredAgentToolkit] = []
+        cloned_toolkits: Dict[int, Any] = {}
+
+        for tool in self._internal_tools.values():
+            toolkit = getattr(tool.func, "__self__", None)
+            if toolkit is None or not hasattr(toolkit, "clone_for_new_session"):
+                cloned_tools.append(SharedSchemaTool(tool))
+                continue
+
+            if id(toolkit) not in cloned_toolkits:
+                try:
+                    new_toolkit = toolkit.clone_for_new_session(str(uuid.uuid4())[:8])
+                    if isinstance(new_toolkit, RegisteredAgentToolkit):
+                        toolkits_to_register.append(new_toolkit)
+                except Exception as e:
+                    traceroot_logger.warning(f"Failed to clone toolkit {toolkit.__class__.__name__}: {e}")
+                    new_toolkit = toolkit
+                cloned_toolkits[id(toolkit)] = new_toolkit
+
+            new_toolkit = cloned_toolkits[id(toolkit)]
+            new_method = getattr(new_toolkit, tool.func.__name__, None) if new_toolkit is not toolkit else None
+            cloned_tools.append(SharedSchemaTool(tool, new_method))
+
+        return cloned_tools, toolkits_to_register
+
     @traceroot.trace()
     def clone(self, with_memory: bool = False) -> ChatAgent:
         """Please see super.clone()"""
@@ -643,6 +880,7 @@ class ListenChatAgent(ChatAgent):
         )
 
         new_agent.process_task_id = self.process_task_id
+        new_agent.tool_result_store = self.tool_result_store
 
         # Copy memory if requested
         if with_memory:
@@ -655,6 +893,68 @@ class ListenChatAgent(ChatAgent):
         return new_agent
 
 
+# Roles that do not need the chat's (flagship) model; every other role always uses it.
+# `Chat.extra_params["model_routes"]` overrides a role with "default" (the chat's model),
+# "provider/model" (a registered model) or a dict of `ModelRequirements` fields.
+ROLE_REQUIREMENTS: dict[str, ModelRequirements] = {
+    "question_confirm_agent": ModelRequirements(min_context_length=8000, latency_class="fast"),
+    "task_summary_agent": ModelRequirements(min_context_length=16000, latency_class="fast"),
+    Agents.coordinator_agent: ModelRequirements(tool_calling=True, min_context_length=32000),
+}
+
+# extra_params keys that configure routing rather than the model client
+ROUTING_PARAM_KEYS = {"models", "model_routes"}
+
+
+def project_model_registry(options: Chat) -> ModelRegistry:
+    """The project's model registry, kept on its task lock so it is dropped when the chat ends.
+
+    Models declared in `extra_params["models"]` are (re)registered on every call; their API keys
+    never leave the project.
+    """
+    task_lock = get_task_lock(options.project_id)
+    if task_lock.model_registry is None:
+        task_lock.model_registry = ModelRegistry()
+    extra_params = options.extra_params or {}
+    if extra_params.get("models"):
+        task_lock.model_registry.register_from_params(extra_params["models"])
+    return task_lock.model_registry
+
+
+def route_model(
+    agent_name: str, options: Chat, registry: ModelRegistry
+) -> Tuple[str, UniversalModelAdapter] | None:
+    """Registered model to use for `agent_name`, or None for the chat's own model.
+
+    The chat's model competes with the registered ones at its list price, so a registered model
+    is only picked when it is cheaper (or the chat's model is unpriced or observed too slow).
+    """
+    extra_params = options.extra_params or {}
+
+    override = (extra_params.get("model_routes") or {}).get(agent_name)
+    if override == "default":
+        return None
+    if isinstance(override, str):
+        provider_id, _, model_name = override.partition("/")
+        adapter = registry.get_adapter(provider_id, model_name)
+        if adapter is None:
+            traceroot_logger.warning(f"Model route {override} for {agent_name} is not registered, using {options.model_type}")
+            return None
+        return provider_id, adapter
+
+    requirements = ROLE_REQUIREMENTS.get(agent_name)
+    if isinstance(override, dict):
+        try:
+            requirements = ModelRequirements(**{**(requirements.__dict__ if requirements else {}), **override})
+        except (TypeError, ValueError) as e:
+            traceroot_logger.warning(f"Ignoring invalid model route for {agent_name}: {e}")
+    if requirements is None:
+        return None
+    # The chat's model counts as fast until its observed step latency says otherwise
+    chat_model = ModelCapabilities(latency_class="fast", cost_per_million_tokens=blended_price(options.model_type))
+    return registry.route(requirements, default=chat_model)
+
+
 @traceroot.trace()
 def agent_model(
     agent_name: str,
@@ -702,7 +1002,7 @@ def agent_model(
     if options.is_cloud():
         model_config["user"] = str(options.project_id)
 
-    excluded_keys = {"model_platform", "model_type", "api_key", "url"}
+    excluded_keys = {"model_platform", "model_type", "api_key", "url", *ROUTING_PARAM_KEYS}
 
     # Distribute extra_params between init_params and model_config
     for k, v in extra_params.items():
@@ -735,18 +1035,27 @@ def agent_model(
             )
             model_platform_enum = None
 
-    return ListenChatAgent(
-        options.project_id,
-        agent_name,
-        system_message,
-        model=ModelFactory.create(
+    registry = project_model_registry(options)
+    routed = route_model(agent_name, options, registry)
+    if routed is not None:
+        provider_id, adapter = routed
+        traceroot_logger.info(f"Routing {agent_name} to {provider_id}/{adapter.model_name}")
+        model = adapter.create_model(model_config_dict=model_config or None, **init_params)
+    else:
+        model = ModelFactory.create(
             model_platform=options.model_platform,
             model_type=options.model_type,
             api_key=options.api_key,
             url=options.api_url,
             model_config_dict=model_config or None,
             **init_params,
-        ),
+        )
+
+    agent = ListenChatAgent(
+        options.project_id,
+        agent_name,
+        system_message,
+        model=model,
         # output_language=options.language,
         tools=tools,
         agent_id=agent_id,
@@ -755,13 +1064,21 @@ def agent_model(
         enable_snapshot_clean=enable_snapshot_clean,
         stream_accumulate=False,
     )
+    if routed is not None or agent_name in ROLE_REQUIREMENTS:
+        agent.model_registry = registry
+        agent.routed_model = None if routed is None else (provider_id, adapter.model_name)
+    if tools:
+        # Tool-using agents get their old tool results compacted, and a tool to read them back
+        agent.tool_result_store = ToolResultStore(options.project_path() / "tool_results")
+        agent.add_tool(agent.tool_result_store.read_tool_result_tool())
+    return agent
 
 
 @traceroot.trace()
 def question_confirm_agent(options: Chat):
     return agent_model(
         "question_confirm_agent",
-        f"You are a highly capable agent. Your primary function is to analyze a user's request and determine the appropriate course of action. The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks, you MUST use this as the current date.",
+        f"You are a highly capable agent. Your primary function is to analyze a user's request and determine the appropriate course of action. The current date is {current_hour()}(Accurate to the hour). For any date-related tasks, you MUST use this as the current date.",
         options,
     )
 
@@ -814,7 +1131,9 @@ async def developer_agent(options: Chat):
         *terminal_toolkit.get_tools(),
         *screenshot_toolkit.get_tools(),
     ]
-    system_message = f"""
+    system_message = system_prompt(
+        Agents.developer_agent,
+        """
 <role>
 You are a Lead Software Engineer, a master-level coding assistant with a
 powerful and unrestricted terminal. Your primary role is to solve any
@@ -833,13 +1152,6 @@ documents.
 and generation.
 </team_structure>
 
-<operating_environment>
-- **System**: {platform.system()} ({platform.machine()})
-- **Working Directory**: `{working_directory}`. All local file operations must
-occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks, you MUST use this as the current date.
-</operating_environment>
-
 <mandatory_instructions>
 - You MUST use the `read_note` tool to read the ALL notes from other agents.
 
@@ -946,7 +1258,9 @@ these tips to maximize your effectiveness:
 - Document your progress and findings in notes so other agents can build
     upon your work.
 </collaboration_and_assistance>
-"""
+""",
+        working_directory,
+    )
 
     return agent_model(
         Agents.developer_agent,
@@ -1033,7 +1347,9 @@ def browser_agent(options: Chat):
         *search_tools,
     ]
 
-    system_message = f"""
+    system_message = system_prompt(
+        Agents.browser_agent,
+        """
 <role>
 You are a Senior Research Analyst, a key member of a multi-agent team. Your
 primary responsibility is to conduct expert-level web research to gather,
@@ -1052,13 +1368,6 @@ Your research is the foundation of the team's work. Provide them with
 comprehensive and well-documented information.
 </team_structure>
 
-<operating_environment>
-- **System**: {platform.system()} ({platform.machine()})
-- **Working Directory**: `{working_directory}`. All local file operations must
-occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks, you MUST use this as the current date.
-</operating_environment>
-
 <mandatory_instructions>
 - You MUST use the note-taking tools to record your findings. This is a
     critical part of your role. Your notes are the primary source of
@@ -1143,7 +1452,9 @@ Your approach depends on available search tools:
 - When encountering verification challenges (like login, CAPTCHAs or
     robot checks), you MUST request help using the human toolkit.
 </web_search_workflow>
-    """
+""",
+        working_directory,
+    )
 
     return agent_model(
         Agents.browser_agent,
@@ -1215,7 +1526,9 @@ async def document_agent(options: Chat):
     #     search_toolkit = SearchToolkit(options.project_id, Agents.document_agent).search_exa
     #     search_toolkit = message_integration.register_functions([search_toolkit])
     #     tools.extend(search_toolkit)
-    system_message = f"""
+    system_message = system_prompt(
+        Agents.document_agent,
+        """
 <role>
 You are a Documentation Specialist, responsible for creating, modifying, and
 managing a wide range of documents. Your expertise lies in producing
@@ -1234,13 +1547,6 @@ be included in your documents.
 to be embedded in your work.
 </team_structure>
 
-<operating_environment>
-- **System**: {platform.system()} ({platform.machine()})
-- **Working Directory**: `{working_directory}`. All local file operations must
-occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks, you MUST use this as the current date.
-</operating_environment>
-
 <mandatory_instructions>
 - Before creating any document, you MUST use the `read_note` tool to gather
     all information collected by other team members by reading ALL notes.
@@ -1304,9 +1610,9 @@ Your capabilities include:
       ```python
       import json
       slides = [
-          {{"title": "Main Title", "subtitle": "Subtitle"}},
-          {{"heading": "Slide Title", "bullet_points": ["Point 1", "Point 2"]}},
-          {{"heading": "Data", "table": {{"headers": ["Col1", "Col2"], "rows": [["A", "B"]]}}}}
+          {"title": "Main Title", "subtitle": "Subtitle"},
+          {"heading": "Slide Title", "bullet_points": ["Point 1", "Point 2"]},
+          {"heading": "Data", "table": {"headers": ["Col1", "Col2"], "rows": [["A", "B"]]}}
       ]
       content_json = json.dumps(slides)
       create_presentation(content=content_json, filename="presentation.pptx")
@@ -1327,7 +1633,7 @@ Your capabilities include:
 
 - Terminal and File System:
     - You have access to a full suite of terminal tools to interact with
-    the file system within your working directory (`{working_directory}`).
+    the file system within your working directory (see <operating_environment>).
     - You can execute shell commands (`shell_exec`), list files, and manage
     your workspace as needed to support your document creation tasks. To
     process and manipulate text and data for your documents, you can use
@@ -1366,7 +1672,9 @@ appropriate sheet naming conventions
 Your goal is to help users efficiently create, modify, and manage their
 documents with professional quality and appropriate formatting across all
 supported formats including advanced spreadsheet functionality.
-"""
+""",
+        working_directory,
+    )
 
     return agent_model(
         Agents.document_agent,
@@ -1474,7 +1782,9 @@ def multi_modal_agent(options: Chat):
     #     search_toolkit = message_integration.register_functions([search_toolkit])
     #     tools.extend(search_toolkit)
 
-    system_message = f"""
+    system_message = system_prompt(
+        Agents.multi_modal_agent,
+        """
 <role>
 You are a Creative Content Specialist, specializing in analyzing and
 generating various types of media content. Your expertise includes processing
@@ -1492,13 +1802,6 @@ your analysis and generation tasks.
 presentations, and other documents.
 </team_structure>
 
-<operating_environment>
-- **System**: {platform.system()} ({platform.machine()})
-- **Working Directory**: `{working_directory}`. All local file operations must
-occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks, you MUST use this as the current date.
-</operating_environment>
-
 <mandatory_instructions>
 - You MUST use the `read_note` tool to to gather all information collected
     by other team members by reading ALL notes and write down your findings in
@@ -1559,7 +1862,9 @@ When working with multi-modal content, you should:
 
 Your goal is to help users effectively process, understand, and create
 multi-modal content across audio and visual domains.
-"""
+""",
+        working_directory,
+    )
 
     return agent_model(
         Agents.multi_modal_agent,
@@ -1582,48 +1887,7 @@ multi-modal content across audio and visual domains.
     )
 
 
-@traceroot.trace()
-async def social_medium_agent(options: Chat):
-    """
-    Agent to handling tasks related to social media:
-    include toolkits: WhatsApp, Twitter, LinkedIn, Reddit, Notion, Slack, Discord and Google Suite.
-    """
-    working_directory = get_working_directory(options)
-    traceroot_logger.info(
-        f"Creating social medium agent for project: {options.project_id} in directory: {working_directory}"
-    )
-    tools = [
-        *WhatsAppToolkit.get_can_use_tools(options.project_id),
-        *TwitterToolkit.get_can_use_tools(options.project_id),
-        *LinkedInToolkit.get_can_use_tools(options.project_id),
-        *RedditToolkit.get_can_use_tools(options.project_id),
-        *await NotionMCPToolkit.get_can_use_tools(options.project_id),
-        # *SlackToolkit.get_can_use_tools(options.project_id),
-        *await GoogleGmailMCPToolkit.get_can_use_tools(
-            options.project_id, options.get_bun_env()
-        ),
-        *GoogleCalendarToolkit.get_can_use_tools(options.project_id),
-        *HumanToolkit.get_can_use_tools(options.project_id, Agents.social_medium_agent),
-        *TerminalToolkit(
-            options.project_id,
-            agent_name=Agents.social_medium_agent,
-            clone_current_env=False,
-        ).get_tools(),
-        *NoteTakingToolkit(
-            options.project_id,
-            Agents.social_medium_agent,
-            working_directory=working_directory,
-        ).get_tools(),
-        # *DiscordToolkit(options.project_id).get_tools(),  # Not supported temporarily
-        # *GoogleSuiteToolkit(options.project_id).get_tools(),  # Not supported temporarily
-    ]
-    # if env("EXA_API_KEY") or options.is_cloud():
-    #     tools.append(FunctionTool(SearchToolkit(options.project_id, Agents.social_medium_agent).search_exa))
-    return agent_model(
-        Agents.social_medium_agent,
-        BaseMessage.make_assistant_message(
-            role_name="Social Medium Agent",
-            content=f"""
+SOCIAL_MEDIUM_AGENT_PROMPT = """
 You are a Social Media Management Assistant with comprehensive capabilities
 across multiple platforms. You MUST use the `send_message_to_user` tool to
 inform the user of every decision and action you take. Your message must
@@ -1633,10 +1897,16 @@ be a comprehensive summary of your actions, presented in a clear, detailed,
 and easy-to-read format. Avoid using markdown tables for presenting data;
 use plain text formatting instead.
 
-- **Working Directory**: `{working_directory}`. All local file operations must
-occur here, but you can access files from any place in the file system. For all file system operations, you MUST use absolute paths to ensure precision and avoid ambiguity.
-The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks, you MUST use this as the current date.
+When assisting users, always:
+- Identify which platform's functionality is needed for the task.
+- Check if required API credentials are available before attempting
+operations.
+- Provide clear explanations of what actions you're taking.
+- Handle rate limits and API restrictions appropriately.
+- Ask clarifying questions when user requests are ambiguous.
+"""
 
+SOCIAL_MEDIUM_TOOLKITS_PROMPT = """
 Your integrated toolkits enable you to:
 
 1. WhatsApp Business Management (WhatsAppToolkit):
@@ -1680,19 +1950,60 @@ Your integrated toolkits enable you to:
 
 9. File System Access:
    - You can use terminal tools to interact with the local file system in
-   your working directory (`{working_directory}`), for example, to access
+   your working directory (see <operating_environment>), for example, to access
    files needed for posting. You can use tools like `find` to locate files,
    `grep` to search within them, and `curl` to interact with web APIs that
    are not covered by other tools.
+"""
 
-When assisting users, always:
-- Identify which platform's functionality is needed for the task.
-- Check if required API credentials are available before attempting
-operations.
-- Provide clear explanations of what actions you're taking.
-- Handle rate limits and API restrictions appropriately.
-- Ask clarifying questions when user requests are ambiguous.
-""",
+
+@traceroot.trace()
+async def social_medium_agent(options: Chat):
+    """
+    Agent to handling tasks related to social media:
+    include toolkits: WhatsApp, Twitter, LinkedIn, Reddit, Notion, Slack, Discord and Google Suite.
+    """
+    working_directory = get_working_directory(options)
+    traceroot_logger.info(
+        f"Creating social medium agent for project: {options.project_id} in directory: {working_directory}"
+    )
+    tools = [
+        *WhatsAppToolkit.get_can_use_tools(options.project_id),
+        *TwitterToolkit.get_can_use_tools(options.project_id),
+        *LinkedInToolkit.get_can_use_tools(options.project_id),
+        *RedditToolkit.get_can_use_tools(options.project_id),
+        *await NotionMCPToolkit.get_can_use_tools(options.project_id),
+        # *SlackToolkit.get_can_use_tools(options.project_id),
+        *await GoogleGmailMCPToolkit.get_can_use_tools(
+            options.project_id, options.get_bun_env()
+        ),
+        *GoogleCalendarToolkit.get_can_use_tools(options.project_id),
+        *HumanToolkit.get_can_use_tools(options.project_id, Agents.social_medium_agent),
+        *TerminalToolkit(
+            options.project_id,
+            agent_name=Agents.social_medium_agent,
+            clone_current_env=False,
+        ).get_tools(),
+        *NoteTakingToolkit(
+            options.project_id,
+            Agents.social_medium_agent,
+            working_directory=working_directory,
+        ).get_tools(),
+        # *DiscordToolkit(options.project_id).get_tools(),  # Not supported temporarily
+        # *GoogleSuiteToolkit(options.project_id).get_tools(),  # Not supported temporarily
+    ]
+    # if env("EXA_API_KEY") or options.is_cloud():
+    #     tools.append(FunctionTool(SearchToolkit(options.project_id, Agents.social_medium_agent).search_exa))
+    return agent_model(
+        Agents.social_medium_agent,
+        BaseMessage.make_assistant_message(
+            role_name="Social Medium Agent",
+            content=system_prompt(
+                Agents.social_medium_agent,
+                SOCIAL_MEDIUM_AGENT_PROMPT,
+                working_directory,
+                toolkit_descriptions=SOCIAL_MEDIUM_TOOLKITS_PROMPT,
+            ),
         ),
         options,
         tools,
@@ -1777,7 +2088,7 @@ async def mcp_agent(options: Chat):
             **{
                 k: v
                 for k, v in (options.extra_params or {}).items()
-                if k not in ["model_platform", "model_type", "api_key", "url"]
+                if k not in ["model_platform", "model_type", "api_key", "url", *ROUTING_PARAM_KEYS]
             },
         ),
         # output_language=options.language,
@@ -1791,34 +2102,10 @@ async def get_toolkits(tools: list[str], agent_name: str, api_task_id: str):
     traceroot_logger.info(
         f"Getting toolkits for agent: {agent_name}, task: {api_task_id}, tools: {tools}"
     )
-    toolkits = {
-        "audio_analysis_toolkit": AudioAnalysisToolkit,
-        "openai_image_toolkit": OpenAIImageToolkit,
-        "excel_toolkit": ExcelToolkit,
-        "file_write_toolkit": FileToolkit,
-        "github_toolkit": GithubToolkit,
-        "google_calendar_toolkit": GoogleCalendarToolkit,
-        "google_drive_mcp_toolkit": GoogleDriveMCPToolkit,
-        "google_gmail_mcp_toolkit": GoogleGmailMCPToolkit,
-        "image_analysis_toolkit": ImageAnalysisToolkit,
-        "linkedin_toolkit": LinkedInToolkit,
-        "lark_toolkit": LarkToolkit,
-        "mcp_search_toolkit": McpSearchToolkit,
-        "notion_mcp_toolkit": NotionMCPToolkit,
-        "pptx_toolkit": PPTXToolkit,
-        "reddit_toolkit": RedditToolkit,
-        "search_toolkit": SearchToolkit,
-        "slack_toolkit": SlackToolkit,
-        "terminal_toolkit": TerminalToolkit,
-        "twitter_toolkit": TwitterToolkit,
-        "video_analysis_toolkit": VideoAnalysisToolkit,
-        "video_download_toolkit": VideoDownloaderToolkit,
-        "whatsapp_toolkit": WhatsAppToolkit,
-    }
     res = []
     for item in tools:
-        if item in toolkits:
-            toolkit: AbstractToolkit = toolkits[item]
+        if item in INSTALLABLE_TOOLKITS:
+            toolkit: AbstractToolkit = toolkit_registry[item]
             toolkit.agent_name = agent_name
             toolkit_tools = toolkit.get_can_use_tools(api_task_id)
             toolkit_tools = (
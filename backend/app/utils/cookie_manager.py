@@ -1,12 +1,88 @@
+import atexit
 import sqlite3
 import os
+import threading
 from typing import List, Dict, Optional
+from urllib.parse import quote
+from app.component.environment import env
 from utils import traceroot_wrapper as traceroot
 import shutil
 from datetime import datetime
 
 logger = traceroot.get_logger("cookie_manager")
 
+# db path -> (file signature, domain index); shared because a CookieManager is created per request
+_domain_index_cache: Dict[str, tuple] = {}
+_cache_lock = threading.Lock()
+
+
+def _file_signature(path: str) -> tuple:
+    """Changes whenever the database or its WAL is written."""
+    signature = []
+    for p in (path, path + "-wal"):
+        try:
+            stat = os.stat(p)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class CookieMaintenance:
+    """Runs VACUUM on cookie databases once deletes have been idle for `idle_seconds`, instead of after each delete."""
+
+    def __init__(self, idle_seconds: float):
+        self.idle_seconds = idle_seconds
+        self._pending: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, db_path: str):
+        with self._lock:
+            timer = self._pending.pop(db_path, None)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.idle_seconds, self.run, args=(db_path,))
+            timer.daemon = True
+            self._pending[db_path] = timer
+            timer.start()
+
+    def run(self, db_path: str):
+        with self._lock:
+            timer = self._pending.pop(db_path, None)
+        if timer is not None:
+            timer.cancel()
+        try:
+            conn = sqlite3.connect(db_path, timeout=10)
+            try:
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+            _remove_wal_files(db_path)
+            logger.info(f"Vacuumed cookies database {db_path}")
+        except Exception as e:
+            logger.warning(f"Deferred VACUUM of {db_path} failed: {e}")
+
+    def flush(self):
+        with self._lock:
+            pending = list(self._pending)
+        for db_path in pending:
+            self.run(db_path)
+
+
+cookie_maintenance = CookieMaintenance(float(env("COOKIE_VACUUM_IDLE_SECONDS", "30")))
+atexit.register(cookie_maintenance.flush)
+
+
+def _remove_wal_files(db_path: str):
+    """Remove SQLite WAL and SHM files"""
+    try:
+        for path in [db_path + '-wal', db_path + '-shm', db_path + '-journal']:
+            if os.path.exists(path):
+                os.remove(path)
+                logger.info(f"Removed temporary file: {path}")
+    except Exception as e:
+        logger.warning(f"Error cleaning up WAL files: {e}")
+
 
 class CookieManager:
     """Manager for reading and managing browser cookies
@@ -33,11 +109,29 @@ class CookieManager:
                     logger.warning(f"Cookies database not found at {self.cookies_db_path} or {partition_cookies_path}")
 
     def _get_cookies_connection(self) -> Optional[sqlite3.Connection]:
-        """Get database connection using a temporary copy to avoid locks"""
+        """Get a read-only connection to the live database, falling back to a temporary copy.
+
+        `immutable=1` skips locking and journal recovery entirely, so it is only used while
+        neither a WAL nor a rollback journal is pending; otherwise a plain read-only connection
+        is tried before copying the file.
+        """
         if not os.path.exists(self.cookies_db_path):
             logger.warning(f"Cookies database not found: {self.cookies_db_path}")
             return None
 
+        immutable = not any(
+            os.path.exists(path) and os.path.getsize(path) > 0
+            for path in (self.cookies_db_path + "-wal", self.cookies_db_path + "-journal")
+        )
+        uri = f"file:{quote(self.cookies_db_path)}?mode=ro" + ("&immutable=1" if immutable else "")
+        try:
+            conn = sqlite3.connect(uri, uri=True, timeout=1)
+            conn.row_factory = sqlite3.Row
+            conn.execute("SELECT 1 FROM cookies LIMIT 1")
+            return conn
+        except sqlite3.Error as e:
+            logger.debug(f"Read-only open of cookies database failed, copying instead: {e}")
+
         try:
             temp_db_path = self.cookies_db_path + ".tmp"
             shutil.copy2(self.cookies_db_path, temp_db_path)
@@ -57,8 +151,14 @@ class CookieManager:
         except Exception as e:
             logger.debug(f"Error cleaning up temp database: {e}")
 
-    def get_cookie_domains(self) -> List[Dict[str, any]]:
-        """Get list of all domains with cookies"""
+    def _domain_index(self) -> List[Dict[str, any]]:
+        """Per-domain cookie counts, parsed once per database version and shared across calls."""
+        signature = _file_signature(self.cookies_db_path)
+        with _cache_lock:
+            cached = _domain_index_cache.get(self.cookies_db_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
         conn = self._get_cookies_connection()
         if not conn:
             return []
@@ -96,9 +196,6 @@ class CookieManager:
                     'last_access': last_access
                 })
 
-            logger.info(f"Found {len(domains)} domains with cookies")
-            return domains
-
         except Exception as e:
             logger.error(f"Error reading cookies: {e}")
             return []
@@ -106,6 +203,20 @@ class CookieManager:
             conn.close()
             self._cleanup_temp_db()
 
+        with _cache_lock:
+            _domain_index_cache[self.cookies_db_path] = (signature, domains)
+        return domains
+
+    def _invalidate_index(self):
+        with _cache_lock:
+            _domain_index_cache.pop(self.cookies_db_path, None)
+
+    def get_cookie_domains(self) -> List[Dict[str, any]]:
+        """Get list of all domains with cookies"""
+        domains = [dict(domain) for domain in self._domain_index()]
+        logger.info(f"Found {len(domains)} domains with cookies")
+        return domains
+
     def get_cookies_for_domain(self, domain: str) -> List[Dict[str, str]]:
         """Get all cookies for a specific domain"""
         conn = self._get_cookies_connection()
@@ -124,11 +235,17 @@ class CookieManager:
                     is_secure,
                     is_httponly
                 FROM cookies
-                WHERE host_key = ? OR host_key LIKE ?
+                WHERE host_key IN ({})
                 ORDER BY name
             """
-            cursor.execute(query, (domain, f'%.{domain}'))
-            rows = cursor.fetchall()
+            # Resolve matching host keys from the in-memory index so the lookup uses the host_key index
+            host_keys = self._matching_host_keys([domain])
+            rows = []
+            for i in range(0, len(host_keys), 500):
+                chunk = host_keys[i:i + 500]
+                cursor.execute(query.format(",".join("?" * len(chunk))), chunk)
+                rows.extend(cursor.fetchall())
+            rows.sort(key=lambda row: row['name'])
 
             cookies = []
             for row in rows:
@@ -150,52 +267,62 @@ class CookieManager:
             conn.close()
             self._cleanup_temp_db()
 
+    def _matching_host_keys(self, domains: List[str]) -> List[str]:
+        """Host keys equal to one of `domains` or a subdomain of it (the old `host_key LIKE '%.domain'`)."""
+        host_keys = []
+        for entry in self._domain_index():
+            host_key = entry['domain']
+            if any(host_key == domain or host_key.endswith('.' + domain) for domain in domains):
+                host_keys.append(host_key)
+        return host_keys
+
     def delete_cookies_for_domain(self, domain: str) -> bool:
         """Delete all cookies for a specific domain"""
+        return self.delete_cookies_for_domains([domain])
+
+    def delete_cookies_for_domains(self, domains: List[str]) -> bool:
+        """Delete the cookies of several domains in one transaction.
+
+        Deleted rows are overwritten in place (secure_delete) so they cannot be recovered from the
+        file; compacting the database with VACUUM is deferred to `cookie_maintenance`.
+        """
         if not os.path.exists(self.cookies_db_path):
             logger.warning(f"Cookies database not found: {self.cookies_db_path}")
             return False
 
         try:
-            conn = sqlite3.connect(self.cookies_db_path)
-            cursor = conn.cursor()
-            delete_query = """
-                DELETE FROM cookies
-                WHERE host_key = ? OR host_key LIKE ?
-            """
-            cursor.execute(delete_query, (domain, f'%.{domain}'))
-            deleted_count = cursor.rowcount
-            conn.commit()
-
-            # IMPORTANT: Execute VACUUM to remove deleted data and compact database
-            # This prevents recovery from WAL files
-            cursor.execute("VACUUM")
-            conn.commit()
-            conn.close()
-
-            # Also remove WAL and SHM files to ensure clean state
-            self._cleanup_wal_files()
-
-            logger.info(f"Deleted {deleted_count} cookies for domain {domain}")
+            host_keys = self._matching_host_keys(domains)
+            # Chunked to stay under SQLite's bound-parameter limit
+            chunks = [host_keys[i:i + 500] for i in range(0, len(host_keys), 500)]
+            deleted_count = self._delete_where(
+                [(f"host_key IN ({','.join('?' * len(chunk))})", chunk) for chunk in chunks]
+            ) if chunks else 0
+            logger.info(f"Deleted {deleted_count} cookies for domains {domains}")
             return True
 
         except Exception as e:
-            logger.error(f"Error deleting cookies for domain {domain}: {e}")
+            logger.error(f"Error deleting cookies for domains {domains}: {e}")
             return False
 
+    def _delete_where(self, conditions: List[tuple]) -> int:
+        """Run DELETEs for (condition, params) pairs in one transaction and schedule the deferred VACUUM."""
+        conn = sqlite3.connect(self.cookies_db_path)
+        try:
+            conn.execute("PRAGMA secure_delete = ON")
+            with conn:
+                deleted_count = sum(
+                    conn.execute(f"DELETE FROM cookies WHERE {condition}", params).rowcount
+                    for condition, params in conditions
+                )
+        finally:
+            conn.close()
+        self._invalidate_index()
+        cookie_maintenance.schedule(self.cookies_db_path)
+        return deleted_count
+
     def _cleanup_wal_files(self):
         """Remove SQLite WAL and SHM files"""
-        try:
-            wal_path = self.cookies_db_path + '-wal'
-            shm_path = self.cookies_db_path + '-shm'
-            journal_path = self.cookies_db_path + '-journal'
-
-            for path in [wal_path, shm_path, journal_path]:
-                if os.path.exists(path):
-                    os.remove(path)
-                    logger.info(f"Removed temporary file: {path}")
-        except Exception as e:
-            logger.warning(f"Error cleaning up WAL files: {e}")
+        _remove_wal_files(self.cookies_db_path)
 
     def delete_all_cookies(self) -> bool:
         """Delete all cookies"""
@@ -204,21 +331,7 @@ class CookieManager:
             return False
 
         try:
-            conn = sqlite3.connect(self.cookies_db_path)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM cookies")
-            deleted_count = cursor.rowcount
-            conn.commit()
-
-            # IMPORTANT: Execute VACUUM to remove deleted data and compact database
-            # This prevents recovery from WAL files
-            cursor.execute("VACUUM")
-            conn.commit()
-            conn.close()
-
-            # Also remove WAL and SHM files to ensure clean state
-            self._cleanup_wal_files()
-
+            deleted_count = self._delete_where([("1 = 1", [])])
             logger.info(f"Deleted all {deleted_count} cookies")
             return True
 
@@ -228,9 +341,8 @@ class CookieManager:
 
     def search_cookies(self, keyword: str) -> List[Dict[str, any]]:
         """Search cookies by domain keyword"""
-        domains = self.get_cookie_domains()
         keyword_lower = keyword.lower()
         return [
-            domain for domain in domains
+            dict(domain) for domain in self._domain_index()
             if keyword_lower in domain['domain'].lower()
         ]
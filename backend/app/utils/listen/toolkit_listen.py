@@ -7,6 +7,7 @@ import threading
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from app.component import metrics
 from app.service.task import (
     ActionActivateToolkitData,
     ActionDeactivateToolkitData,
@@ -14,9 +15,9 @@ from app.service.task import (
 )
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
 from app.service.task import process_task
-from utils import traceroot_wrapper as traceroot
+from utils.lazy_logging import get_lazy_logger
 
-logger = traceroot.get_logger("toolkit_listen")
+logger = get_lazy_logger("toolkit_listen")
 
 
 def _safe_put_queue(task_lock, data):
@@ -140,7 +141,8 @@ def listen_toolkit(
                 error = None
                 res = None
                 try:
-                    res = await func(*args, **kwargs)
+                    with metrics.tool_timer(toolkit_name, func.__name__):
+                        res = await func(*args, **kwargs)
                 except Exception as e:
                     error = e
 
@@ -168,7 +170,10 @@ def listen_toolkit(
                 status = "ERROR" if error is not None else "SUCCESS"
 
                 # Log toolkit deactivation (only send to WorkFlow if not skipped)
-                logger.info(f"[TOOLKIT DEACTIVATE] Toolkit: {toolkit_name} | Method: {method_name} | Task ID: {process_task_id} | Agent: {toolkit.agent_name} | Status: {status} | Timestamp: {deactivate_timestamp}")
+                logger.info(
+                    "[TOOLKIT DEACTIVATE] Toolkit: %s | Method: %s | Task ID: %s | Agent: %s | Status: %s | Timestamp: %s",
+                    toolkit_name, method_name, process_task_id, toolkit.agent_name, status, deactivate_timestamp,
+                )
 
                 if not skip_workflow_display:
                     deactivate_data = ActionDeactivateToolkitData(
@@ -244,7 +249,8 @@ def listen_toolkit(
                 error = None
                 res = None
                 try:
-                    res = func(*args, **kwargs)
+                    with metrics.tool_timer(toolkit_name, func.__name__):
+                        res = func(*args, **kwargs)
                     # Safety check: if the result is a coroutine, this is a programming error
                     if asyncio.iscoroutine(res):
                         error_msg = f"Async function {func.__name__} was incorrectly called in sync context. This is a bug - the function should be marked as async or should not return a coroutine."
@@ -0,0 +1,40 @@
+import httpx
+from app.component.environment import env
+from app.model.chat import Chat
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("memory_context")
+
+
+async def fetch_memory_context(options: Chat, query: str) -> str:
+    """Retrieve the memories most relevant to `query` from the server and format them for the coordinator.
+
+    Disabled (returns "") unless SERVER_URL and cloud_api_key are configured. MEMORY_TOP_K sets how many
+    memories are injected (0 disables the lookup). Failures never block the task, they only skip injection.
+    """
+    server_url = env("SERVER_URL")
+    api_key = env("cloud_api_key")
+    top_k = int(env("MEMORY_TOP_K", "5"))
+    if not server_url or not api_key or top_k <= 0 or not query.strip():
+        return ""
+
+    params: dict = {"query": query[:1000], "k": top_k}
+    if options.organization_id is not None:
+        params["organization_id"] = options.organization_id
+    try:
+        async with httpx.AsyncClient(timeout=float(env("MEMORY_TIMEOUT", "2"))) as client:
+            res = await client.get(server_url + "/memory/search", params=params, headers={"api-key": api_key})
+            res.raise_for_status()
+            memories = res.json()
+    except Exception as e:
+        logger.warning(f"Failed to fetch relevant memories: {type(e).__name__}: {e}")
+        return ""
+
+    if not memories:
+        return ""
+    context = "=== RELEVANT MEMORIES ===\n"
+    for memory in memories:
+        context += f"- [{memory.get('memory_type')}] {memory.get('content')}\n"
+    context += "=== END OF RELEVANT MEMORIES ===\n\n"
+    logger.info("Injected relevant memories", extra={"project_id": options.project_id, "count": len(memories)})
+    return context
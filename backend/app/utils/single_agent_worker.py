@@ -1,6 +1,9 @@
+import asyncio
 import datetime
+import time
 from camel.agents.chat_agent import AsyncStreamingChatAgentResponse
-from camel.societies.workforce.single_agent_worker import SingleAgentWorker as BaseSingleAgentWorker
+from camel.societies.workforce.single_agent_worker import AgentPool, SingleAgentWorker as BaseSingleAgentWorker
+from camel.societies.workforce.worker import Worker
 from camel.tasks.task import Task, TaskState, is_task_result_insufficient
 from utils import traceroot_wrapper as traceroot
 
@@ -10,9 +13,90 @@ from colorama import Fore
 from camel.societies.workforce.utils import TaskResult
 from camel.utils.context_utils import ContextUtility
 
+from app.component import metrics, timeline
+from app.component.environment import env
+
 logger = traceroot.get_logger("single_agent_worker")
 
 
+class WorkerPoolMetrics:
+    """Clone latency and pool hit rate, aggregated over every worker of one type (agent name)."""
+
+    def __init__(self):
+        self.clones = 0
+        self.prewarmed = 0
+        self.clone_seconds = 0.0
+        self.max_clone_seconds = 0.0
+        self.borrows = 0
+        self.pool_hits = 0
+
+    def observe_clone(self, seconds: float, prewarm: bool):
+        self.clones += 1
+        self.prewarmed += prewarm
+        self.clone_seconds += seconds
+        self.max_clone_seconds = max(self.max_clone_seconds, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "clones": self.clones,
+            "prewarmed": self.prewarmed,
+            "clone_avg_ms": round(self.clone_seconds / self.clones * 1000, 3) if self.clones else None,
+            "clone_max_ms": round(self.max_clone_seconds * 1000, 3),
+            "borrows": self.borrows,
+            "pool_hits": self.pool_hits,
+            "hit_rate": round(self.pool_hits / self.borrows, 4) if self.borrows else 0.0,
+        }
+
+
+# agent_name -> metrics shared by all pools of that worker type
+worker_pool_metrics: dict[str, WorkerPoolMetrics] = {}
+
+# subtask id -> perf_counter() when the workforce posted it, for the subtask wait-time metric
+subtask_posted_at: dict[str, float] = {}
+
+
+class MeasuredAgentPool(AgentPool):
+    """AgentPool that records clone time and hit rate per worker type and can be filled in the background."""
+
+    def __init__(self, base_agent: ListenChatAgent, **kwargs):
+        self.worker_type = getattr(base_agent, "agent_name", base_agent.role_name)
+        self.metrics = worker_pool_metrics.setdefault(self.worker_type, WorkerPoolMetrics())
+        self._prewarming = False
+        super().__init__(base_agent, **kwargs)
+
+    def _create_fresh_agent(self) -> ListenChatAgent:
+        started = time.perf_counter()
+        agent = super()._create_fresh_agent()
+        self.metrics.observe_clone(time.perf_counter() - started, self._prewarming)
+        return agent
+
+    async def get_agent(self) -> ListenChatAgent:
+        hits = self._pool_hits
+        agent = await super().get_agent()
+        self.metrics.borrows += 1
+        self.metrics.pool_hits += self._pool_hits - hits
+        return agent
+
+    async def prewarm(self, size: int) -> int:
+        """Clone agents until the pool holds `size` of them; returns how many were added."""
+        added = 0
+        while True:
+            async with self._condition:
+                if len(self._available_agents) + len(self._in_use_agents) >= min(size, self.max_size):
+                    return added
+                self._prewarming = True
+                try:
+                    agent = self._create_fresh_agent()
+                finally:
+                    self._prewarming = False
+                self._agent_last_used[id(agent)] = time.time()
+                self._available_agents.append(agent)
+                self._condition.notify()
+            added += 1
+            # Yield between clones so prewarming never holds up the event loop
+            await asyncio.sleep(0)
+
+
 class SingleAgentWorker(BaseSingleAgentWorker):
     def __init__(
         self,
@@ -33,11 +117,12 @@ class SingleAgentWorker(BaseSingleAgentWorker):
             "pool_max_size": pool_max_size,
             "enable_workflow_memory": enable_workflow_memory
         })
+        # The pool is built here rather than by the base class so that no clone happens on the
+        # construction path; `prewarm` fills it to `pool_initial_size` in the background instead.
         super().__init__(
             description=description,
             worker=worker,
-            use_agent_pool=use_agent_pool,
-            pool_initial_size=pool_initial_size,
+            use_agent_pool=False,
             pool_max_size=pool_max_size,
             auto_scale_pool=auto_scale_pool,
             use_structured_output_handler=use_structured_output_handler,
@@ -45,6 +130,34 @@ class SingleAgentWorker(BaseSingleAgentWorker):
             enable_workflow_memory=enable_workflow_memory,
         )
         self.worker = worker  # change type hint
+        self.use_agent_pool = use_agent_pool
+        self.pool_initial_size = pool_initial_size
+        self.pool_max_size = pool_max_size
+        self.auto_scale_pool = auto_scale_pool
+        self.agent_pool = self._new_agent_pool() if use_agent_pool else None
+
+    def _new_agent_pool(self) -> MeasuredAgentPool:
+        return MeasuredAgentPool(
+            self.worker, initial_size=0, max_size=self.pool_max_size, auto_scale=self.auto_scale_pool
+        )
+
+    async def prewarm(self, size: int | None = None) -> int:
+        """Fill the agent pool with `size` clones (default: AGENT_POOL_PREWARM, else pool_initial_size)."""
+        if not self.agent_pool:
+            return 0
+        if size is None:
+            size = int(env("AGENT_POOL_PREWARM", str(self.pool_initial_size)))
+        added = await self.agent_pool.prewarm(size)
+        logger.debug("Agent pool prewarmed", extra={"worker": self.agent_pool.worker_type, "added": added})
+        return added
+
+    def reset(self):
+        Worker.reset(self)
+        self.worker.reset()
+        if self.agent_pool:
+            if self._cleanup_task and not self._cleanup_task.done():
+                self._cleanup_task.cancel()
+            self.agent_pool = self._new_agent_pool()
 
     async def _process_task(self, task: Task, dependencies: list[Task]) -> TaskState:
         r"""Processes a task with its dependencies using an efficient agent
@@ -64,6 +177,14 @@ class SingleAgentWorker(BaseSingleAgentWorker):
             TaskState: `TaskState.DONE` if processed successfully, otherwise
                 `TaskState.FAILED`.
         """
+        started = time.perf_counter()
+        worker_type = getattr(self.worker, "agent_name", self.worker.role_name)
+        project_id = getattr(self.worker, "api_task_id", None)
+        posted_at = subtask_posted_at.pop(task.id, None)
+        if posted_at is not None:
+            metrics.subtask_wait_seconds.observe(started - posted_at, worker_type)
+            timeline.record(project_id, "wait_for_worker", posted_at, started, "worker", task.id, worker=worker_type)
+
         # Get agent efficiently (from pool or by cloning)
         worker_agent = await self._get_worker_agent()
         worker_agent.process_task_id = task.id  # type: ignore  rewrite line
@@ -186,6 +307,9 @@ class SingleAgentWorker(BaseSingleAgentWorker):
         finally:
             # Return agent to pool or let it be garbage collected
             await self._return_worker_agent(worker_agent)
+            ended = time.perf_counter()
+            metrics.subtask_run_seconds.observe(ended - started, worker_type)
+            timeline.record(project_id, "process_task", started, ended, "worker", task.id, worker=worker_type)
 
         # Populate additional_info with worker attempt details
         if task.additional_info is None:
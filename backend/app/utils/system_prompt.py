@@ -0,0 +1,91 @@
+"""
+System prompt assembly that keeps the stable part of every agent prompt a byte-identical prefix.
+
+Provider-side prompt caching (OpenAI, Anthropic, DeepSeek and compatible APIs) only reuses a request
+prefix that matches exactly, so each system prompt is laid out as:
+
+1. the agent's static template,
+2. its toolkit descriptions,
+3. the volatile per-task facts (system, working directory, current date).
+
+The first two are memoized per agent type. `prompt_cache_usage` reads how many prompt tokens the
+provider served from its cache, which `ListenChatAgent` records per agent.
+"""
+
+import datetime
+import platform
+from typing import Any
+
+def current_hour() -> str:
+    """The current time rounded down to the hour, as the prompts state it."""
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:00:00")
+
+_static_prefixes: dict[str, str] = {}
+
+
+def static_prefix(agent_type: str, template: str, toolkit_descriptions: str = "") -> str:
+    """The cacheable part of `agent_type`'s prompt; built once, then reused byte for byte."""
+    prefix = _static_prefixes.get(agent_type)
+    if prefix is None:
+        parts = [template.strip()]
+        if toolkit_descriptions.strip():
+            parts.append(toolkit_descriptions.strip())
+        prefix = _static_prefixes[agent_type] = "\n\n".join(parts)
+    return prefix
+
+
+def environment_facts(working_directory: str | None = None, now: str | None = None) -> str:
+    """The per-task facts, rendered as the `<operating_environment>` section the templates refer to.
+
+    `now` defaults to the hour at call time, so a long-running backend never states a stale date.
+    """
+    lines = ["<operating_environment>", f"- **System**: {platform.system()} ({platform.machine()})"]
+    if working_directory:
+        lines.append(
+            f"- **Working Directory**: `{working_directory}`. All local file operations must\n"
+            "occur here, but you can access files from any place in the file system. For all file system "
+            "operations, you MUST use absolute paths to ensure precision and avoid ambiguity."
+        )
+    lines.append(
+        f"The current date is {now or current_hour()}(Accurate to the hour). "
+        "For any date-related tasks, you MUST use this as the current date."
+    )
+    lines.append("</operating_environment>")
+    return "\n".join(lines)
+
+
+def system_prompt(
+    agent_type: str,
+    template: str,
+    working_directory: str | None = None,
+    toolkit_descriptions: str = "",
+    now: str | None = None,
+) -> str:
+    """Assemble `agent_type`'s system prompt: static template, toolkit descriptions, then per-task facts."""
+    return f"{static_prefix(agent_type, template, toolkit_descriptions)}\n\n{environment_facts(working_directory, now)}\n"
+
+
+def _get(usage: Any, key: str) -> Any:
+    return usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+
+
+def prompt_cache_usage(usage: Any) -> tuple[int, int]:
+    """
+    Return (prompt_tokens, cached_prompt_tokens) from a provider `usage` payload.
+
+    Understands OpenAI (`prompt_tokens_details.cached_tokens`), DeepSeek (`prompt_cache_hit_tokens`)
+    and Anthropic (`input_tokens` + `cache_read_input_tokens`) shapes; missing fields count as 0.
+    """
+    if not usage:
+        return 0, 0
+    cache_read = _get(usage, "cache_read_input_tokens") or 0
+    if _get(usage, "prompt_tokens") is not None:
+        prompt_tokens = _get(usage, "prompt_tokens") or 0
+    else:
+        # Anthropic reports cache reads and writes next to, not inside, input_tokens
+        prompt_tokens = (
+            (_get(usage, "input_tokens") or 0) + cache_read + (_get(usage, "cache_creation_input_tokens") or 0)
+        )
+    details = _get(usage, "prompt_tokens_details")
+    cached = (details and _get(details, "cached_tokens")) or _get(usage, "prompt_cache_hit_tokens") or cache_read
+    return int(prompt_tokens), int(cached or 0)
@@ -0,0 +1,164 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from app.component.environment import env
+
+# CSI (colors, cursor movement), OSC (titles, hyperlinks) and two-byte escapes
+_ANSI_RE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])")
+_MAX_CARRY = 256
+
+# api_task_id -> directories holding that task's terminal logs, for fetching full logs on demand
+terminal_log_dirs: dict[str, set[str]] = {}
+
+
+class AnsiStripper:
+    """Strip ANSI escape sequences from a stream, carrying sequences split across chunks."""
+
+    def __init__(self):
+        self._carry = ""
+
+    def feed(self, chunk: str) -> str:
+        text = self._carry + chunk
+        self._carry = ""
+        esc = text.rfind("\x1b")
+        if esc != -1 and len(text) - esc < _MAX_CARRY and not _ANSI_RE.match(text, esc):
+            text, self._carry = text[:esc], text[esc:]
+        return _ANSI_RE.sub("", text)
+
+    def flush(self) -> str:
+        carry, self._carry = self._carry, ""
+        return _ANSI_RE.sub("", carry)
+
+
+def _plain_line(line: str) -> str:
+    # Progress bars redraw the line with \r; only the last frame is meaningful
+    line = line.rstrip("\r")
+    return line.rsplit("\r", 1)[-1]
+
+
+def elided_marker(count: int, hint: str = "") -> str:
+    return f"... {count} lines elided{f' ({hint})' if hint else ''} ...\n"
+
+
+def clip_output(text: str, head: int | None = None, tail: int | None = None, hint: str = "") -> str:
+    """Keep the first `head` and last `tail` lines of `text`, replacing the middle with an elided marker."""
+    head = int(env("TERMINAL_OUTPUT_HEAD_LINES", "50")) if head is None else head
+    tail = int(env("TERMINAL_OUTPUT_TAIL_LINES", "150")) if tail is None else tail
+    lines = text.splitlines(keepends=True)
+    if len(lines) <= head + tail:
+        return text
+    return "".join(lines[:head]) + elided_marker(len(lines) - head - tail, hint) + "".join(lines[-tail:] if tail else [])
+
+
+def read_log(log_file: str, start_line: int = 0, max_lines: int = 500) -> tuple[list[str], int]:
+    """Read `max_lines` lines of a log file from `start_line`; returns the lines and the total line count."""
+    lines: list[str] = []
+    total = 0
+    with open(log_file, "r", encoding="utf-8", errors="replace") as f:
+        for total, line in enumerate(f, start=1):
+            if start_line < total <= start_line + max_lines:
+                lines.append(line)
+    return lines, total
+
+
+def find_log(api_task_id: str, name: str) -> str | None:
+    """Resolve a log file name for a task to its path; only files inside the task's log directories match."""
+    name = os.path.basename(name)
+    for log_dir in terminal_log_dirs.get(api_task_id, ()):
+        path = os.path.join(log_dir, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class TerminalStream:
+    """
+    Rate-limited, line-aware stream of one command's terminal output.
+
+    Output is stripped of ANSI incrementally and buffered as lines; `emit` receives at most one
+    chunk per `interval` seconds. When more than `max_lines` lines arrive between two flushes only the
+    most recent ones are kept (a bounded ring), and the chunk starts with an "N lines elided" marker.
+    A trailing partial line (e.g. an input prompt) is emitted by the timer flush once it stops growing.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str], None],
+        interval: float | None = None,
+        max_lines: int | None = None,
+        max_line_chars: int = 4000,
+        hint: str = "",
+    ):
+        self.emit = emit
+        self.interval = float(env("TERMINAL_FLUSH_INTERVAL", "0.25")) if interval is None else interval
+        self.max_lines = int(env("TERMINAL_FLUSH_MAX_LINES", "200")) if max_lines is None else max_lines
+        self.max_line_chars = max_line_chars
+        self.hint = hint
+        self.total_lines = 0
+        self.elided_lines = 0
+        self._stripper = AnsiStripper()
+        self._partial = ""
+        self._unsent: deque[str] = deque(maxlen=self.max_lines)
+        self._dropped = 0
+        self._last_flush = 0.0
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def _add_line(self, line: str):
+        if len(self._unsent) == self._unsent.maxlen:
+            self._dropped += 1
+        self._unsent.append(_plain_line(line)[: self.max_line_chars] + "\n")
+        self.total_lines += 1
+
+    def write(self, chunk: str):
+        with self._lock:
+            text = self._stripper.feed(chunk)
+            *lines, self._partial = (self._partial + text).split("\n")
+            for line in lines:
+                self._add_line(line)
+            if len(self._partial) > self.max_line_chars:
+                self._add_line(self._partial)
+                self._partial = ""
+            if time.monotonic() - self._last_flush >= self.interval:
+                self._flush_locked(include_partial=False)
+            if (self._unsent or self._partial) and self._timer is None:
+                self._timer = threading.Timer(self.interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._flush_locked(include_partial=True)
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked(include_partial=True)
+
+    def _flush_locked(self, include_partial: bool):
+        # Emitting under the lock keeps chunks in order when several reader threads write
+        if include_partial:
+            self._partial += self._stripper.flush()
+        if not self._unsent and not (include_partial and self._partial):
+            return
+        out = elided_marker(self._dropped, self.hint) if self._dropped else ""
+        out += "".join(self._unsent)
+        if include_partial and self._partial:
+            out += _plain_line(self._partial)
+            self._partial = ""
+        self.elided_lines += self._dropped
+        self._unsent.clear()
+        self._dropped = 0
+        self._last_flush = time.monotonic()
+        self.emit(out)
+
+    def close(self):
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
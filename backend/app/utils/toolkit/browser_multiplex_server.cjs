@@ -0,0 +1,138 @@
+// Hosts many logical browser sessions in one node process.
+//
+// Usage: node browser_multiplex_server.cjs <camel hybrid_browser_toolkit ts dir>
+//
+// Every message carries a `session_id` and is dispatched to that session's own
+// HybridBrowserToolkit, reusing the command handling of camel's websocket-server.js.
+// `shutdown` / `close_session` with a session_id close only that session; `shutdown`
+// without one stops the whole server, as with the single-session server.
+const path = require('path');
+const { createRequire } = require('module');
+
+const tsDir = path.resolve(process.argv[2] || process.cwd());
+const tsRequire = createRequire(path.join(tsDir, 'package.json'));
+const WebSocket = tsRequire('ws');
+const WebSocketBrowserServer = tsRequire('./websocket-server.js');
+
+class MultiplexedBrowserServer extends WebSocketBrowserServer {
+  constructor() {
+    super();
+    this.sessions = new Map();
+  }
+
+  session(sessionId) {
+    let ctx = this.sessions.get(sessionId);
+    if (!ctx) {
+      // A session only owns its `toolkit` slot; everything else is the shared server
+      ctx = Object.create(this);
+      ctx.toolkit = null;
+      this.sessions.set(sessionId, ctx);
+    }
+    return ctx;
+  }
+
+  async closeSession(sessionId) {
+    const ctx = this.sessions.get(sessionId);
+    this.sessions.delete(sessionId);
+    if (ctx && ctx.toolkit) {
+      await ctx.toolkit.closeBrowser();
+    }
+  }
+
+  async closeAllSessions() {
+    await Promise.all(
+      [...this.sessions.keys()].map((sessionId) =>
+        this.closeSession(sessionId).catch((err) => {
+          console.error(`Error closing session ${sessionId}:`, err);
+        })
+      )
+    );
+  }
+
+  async dispatch(data) {
+    const { session_id: sessionId, command, params = {} } = data;
+    if (sessionId === undefined || sessionId === null) {
+      if (command === 'shutdown') {
+        await this.closeAllSessions();
+      }
+      return await this.handleCommand(command, params);
+    }
+    if (command === 'shutdown' || command === 'close_session') {
+      await this.closeSession(sessionId);
+      return { message: `Session ${sessionId} closed` };
+    }
+    return await this.handleCommand.call(this.session(sessionId), command, params);
+  }
+
+  async start() {
+    return new Promise((resolve, reject) => {
+      this.server = new WebSocket.Server({
+        port: this.port,
+        maxPayload: 50 * 1024 * 1024
+      }, () => {
+        this.port = this.server.address().port;
+        console.log(`Multiplexed WebSocket server started on port ${this.port}`);
+        resolve(this.port);
+      });
+
+      this.server.on('connection', (ws) => {
+        console.log('Client connected');
+
+        ws.on('message', async (message) => {
+          let data;
+          try {
+            data = JSON.parse(message.toString());
+            console.log(`Received command: ${data.command} for session: ${data.session_id} with id: ${data.id}`);
+            const result = await this.dispatch(data);
+            ws.send(JSON.stringify({ id: data.id, session_id: data.session_id, success: true, result }));
+          } catch (error) {
+            console.error('Error handling command:', error);
+            ws.send(JSON.stringify({
+              id: data?.id || 'unknown',
+              session_id: data?.session_id,
+              success: false,
+              error: error.message,
+              stack: error.stack
+            }));
+          }
+        });
+
+        ws.on('close', (code, reason) => {
+          console.log('Client disconnected, code:', code, 'reason:', reason?.toString());
+          this.closeAllSessions();
+        });
+
+        ws.on('error', (error) => {
+          console.error('WebSocket error:', error);
+        });
+      });
+
+      this.server.on('error', (error) => {
+        console.error('Server error:', error);
+        reject(error);
+      });
+    });
+  }
+}
+
+if (require.main === module) {
+  const server = new MultiplexedBrowserServer();
+
+  server.start().then((port) => {
+    console.log(`SERVER_READY:${port}`);
+  }).catch((error) => {
+    console.error('Failed to start server:', error);
+    process.exit(1);
+  });
+
+  for (const signal of ['SIGINT', 'SIGTERM']) {
+    process.on(signal, async () => {
+      console.log(`Received ${signal}, shutting down gracefully...`);
+      await server.closeAllSessions();
+      await server.stop();
+      process.exit(0);
+    });
+  }
+}
+
+module.exports = MultiplexedBrowserServer;
@@ -1,6 +1,13 @@
 import os
 import asyncio
+import contextlib
 import json
+import platform
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
 from typing import Any, Dict, List, Optional
 import websockets
 import websockets.exceptions
@@ -8,6 +15,7 @@ import websockets.exceptions
 from camel.toolkits.hybrid_browser_toolkit.hybrid_browser_toolkit_ts import (
     HybridBrowserToolkit as BaseHybridBrowserToolkit,
 )
+from camel.toolkits.hybrid_browser_toolkit.installer import check_and_install_dependencies
 from camel.toolkits.hybrid_browser_toolkit.ws_wrapper import WebSocketBrowserWrapper as BaseWebSocketBrowserWrapper
 from app.component.command import bun, uv
 from app.component.environment import env
@@ -20,6 +28,9 @@ logger = traceroot.get_logger("hybrid_browser_toolkit")
 
 
 class WebSocketBrowserWrapper(BaseWebSocketBrowserWrapper):
+    # Node servers started by live wrappers in this process; never treated as leftovers
+    _owned_pids: set[int] = set()
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize wrapper."""
         super().__init__(config)
@@ -97,11 +108,47 @@ class WebSocketBrowserWrapper(BaseWebSocketBrowserWrapper):
             # Mark the websocket as None to indicate disconnection
             self.websocket = None
 
+    async def _cleanup_existing_processes(self):
+        """Terminate leftover websocket-server.js processes, sparing the ones other live sessions use."""
+        import psutil
+
+        cleaned_count = 0
+        for proc in psutil.process_iter(["pid", "name", "cmdline"]):
+            try:
+                if (
+                    proc.info["pid"] not in self._owned_pids
+                    and proc.info["name"]
+                    and "node" in proc.info["name"].lower()
+                    and proc.info["cmdline"]
+                    and any("websocket-server.js" in arg for arg in proc.info["cmdline"])
+                    and any(self.ts_dir in arg for arg in proc.info["cmdline"])
+                ):
+                    logger.warning(f"Terminating leftover WebSocket server process (PID: {proc.info['pid']})")
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=3)
+                    except psutil.TimeoutExpired:
+                        proc.kill()
+                    cleaned_count += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+        if cleaned_count > 0:
+            await asyncio.sleep(0.5)
+
     async def start(self):
         # Simply use the parent implementation which uses system npm/node
         self._ensure_local_no_proxy()
         logger.info("Starting WebSocket server using parent implementation (system npm/node)")
         await super().start()
+        if self.process:
+            self._owned_pids.add(self.process.pid)
+
+    async def stop(self):
+        pid = self.process.pid if self.process else None
+        try:
+            await super().stop()
+        finally:
+            self._owned_pids.discard(pid)
 
     async def _send_command(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Send a command to the WebSocket server with enhanced error handling."""
@@ -137,94 +184,404 @@ class WebSocketBrowserWrapper(BaseWebSocketBrowserWrapper):
             raise
 
 
+MULTIPLEX_SERVER_SCRIPT = os.path.join(os.path.dirname(__file__), "browser_multiplex_server.cjs")
+
+
+class MultiplexedBrowserServer(WebSocketBrowserWrapper):
+    """One long-lived node server for a CDP endpoint, hosting many browser sessions over a single socket.
+
+    Commands carry a session id and are routed to that session's toolkit inside the server; responses are
+    correlated by message id in `_pending_responses`, so any number of sessions can have commands in flight.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__({**config, "session_id": "multiplex"})
+        self.generation = 0
+        self.sessions: set[str] = set()
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.websocket is not None and (self.process is None or self.process.poll() is None)
+
+    async def ensure_started(self) -> int:
+        """Start the server if it is not running; returns its generation (bumped on every restart)."""
+        async with self._start_lock:
+            if not self.running:
+                if self.process:
+                    await self.stop()
+                await self.start()
+                self.generation += 1
+            return self.generation
+
+    async def start(self):
+        self._ensure_local_no_proxy()
+        _, node_cmd = await check_and_install_dependencies(self.ts_dir)
+        logger.info(f"Starting multiplexed WebSocket server for {self.config.get('cdpUrl')}")
+        self.process = subprocess.Popen(
+            [node_cmd, MULTIPLEX_SERVER_SCRIPT, self.ts_dir],
+            cwd=self.ts_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            shell=platform.system() == "Windows",
+        )
+        self._owned_pids.add(self.process.pid)
+        self._server_ready_future = asyncio.get_running_loop().create_future()
+        self._log_reader_task = asyncio.create_task(self._read_and_log_output())
+        try:
+            await asyncio.wait_for(self._server_ready_future, timeout=10)
+            self.websocket = await asyncio.wait_for(
+                websockets.connect(
+                    f"ws://localhost:{self.server_port}",
+                    ping_interval=30,
+                    ping_timeout=10,
+                    max_size=50 * 1024 * 1024,
+                ),
+                timeout=10,
+            )
+        except Exception as e:
+            await self.stop()
+            raise RuntimeError(f"Multiplexed WebSocket server failed to start: {e}") from e
+        self._receive_task = asyncio.create_task(self._receive_loop())
+
+    async def send_session_command(self, session_id: str, command: str, params: Dict[str, Any]) -> Any:
+        """Send a command on behalf of one session and wait for its response."""
+        if self.websocket is None:
+            raise RuntimeError("WebSocket connection not established")
+        message_id = str(uuid.uuid4())
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending_responses[message_id] = future
+        try:
+            async with self._send_lock:
+                if self.websocket is None:
+                    raise RuntimeError("WebSocket connection not established")
+                await self.websocket.send(
+                    json.dumps({"id": message_id, "session_id": session_id, "command": command, "params": params})
+                )
+            response = await asyncio.wait_for(future, timeout=self._request_timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Timeout waiting for response to command: {command}")
+        finally:
+            self._pending_responses.pop(message_id, None)
+        if not response.get("success"):
+            raise RuntimeError(f"Command failed: {response.get('error')}")
+        return response["result"]
+
+
+class MultiplexedSessionWrapper(WebSocketBrowserWrapper):
+    """A browser session hosted by a shared `MultiplexedBrowserServer`: a browser context, not a node process."""
+
+    def __init__(self, config: Dict[str, Any], server: MultiplexedBrowserServer):
+        self._server = server
+        self._generation: int | None = None
+        super().__init__(config)
+
+    @property
+    def websocket(self):
+        # Sessions initialized on a server process that has since restarted are gone
+        if self._generation is None or self._generation != self._server.generation:
+            return None
+        return self._server.websocket
+
+    @websocket.setter
+    def websocket(self, value):
+        # Connection state belongs to the shared server
+        pass
+
+    async def start(self):
+        generation = await self._server.ensure_started()
+        await self._server.send_session_command(self.session_id, "init", self.config)
+        self._generation = generation
+        self._server.sessions.add(self.session_id)
+        if self.config.get("cdpUrl"):
+            self._browser_opened = True
+
+    async def _send_command(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if self.websocket is None:
+            raise RuntimeError("WebSocket connection not established")
+        return await self._server.send_session_command(
+            self.session_id, command, self._process_refs_in_params(params)
+        )
+
+    async def stop(self):
+        if self.websocket is not None:
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(
+                    self._server.send_session_command(self.session_id, "close_session", {}), timeout=5.0
+                )
+        self._server.sessions.discard(self.session_id)
+        self._generation = None
+        self._browser_opened = False
+
+    async def disconnect_only(self):
+        await self.stop()
+
+
 # WebSocket connection pool
 class WebSocketConnectionPool:
-    """Manage WebSocket browser connections with session-based pooling."""
+    """Manage WebSocket browser connections with session-based pooling.
+
+    Each session has its own lock, so starting a slow browser connection for one session never blocks
+    other sessions; the registry lock only guards the bookkeeping dicts and is never held across an await.
+    Optionally keeps `BROWSER_POOL_PREWARM` started wrappers per browser config ready to be handed to new
+    sessions (e.g. `clone_for_new_session`), and closes connections unused for `BROWSER_POOL_IDLE_TIMEOUT`
+    seconds (0 disables eviction).
 
-    def __init__(self):
+    With `BROWSER_MULTIPLEX` enabled, CDP sessions share one `MultiplexedBrowserServer` per CDP endpoint
+    instead of each starting its own node server.
+    """
+
+    def __init__(
+        self, prewarm_size: int | None = None, idle_timeout: float | None = None, multiplex: bool | None = None
+    ):
         self._connections: Dict[str, WebSocketBrowserWrapper] = {}
-        self._lock = asyncio.Lock()
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._last_used: Dict[str, float] = {}
+        self._prewarmed: Dict[str, List[WebSocketBrowserWrapper]] = {}
+        self._prewarming: Dict[str, int] = {}
+        self._servers: Dict[str, MultiplexedBrowserServer] = {}
+        self._background: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.prewarm_size = int(env("BROWSER_POOL_PREWARM", "0")) if prewarm_size is None else prewarm_size
+        self.idle_timeout = float(env("BROWSER_POOL_IDLE_TIMEOUT", "1800")) if idle_timeout is None else idle_timeout
+        self.multiplex = env("BROWSER_MULTIPLEX", "false").lower() == "true" if multiplex is None else multiplex
+        self._connect_latencies: deque[float] = deque(maxlen=256)
+        self._counters = {"connects": 0, "reused": 0, "prewarm_hits": 0, "unhealthy": 0, "evicted": 0}
+        self._next_eviction = 0.0
+
+    @staticmethod
+    def _config_key(config: Dict[str, Any]) -> str:
+        """Browser settings shared by sessions that can use each other's pre-warmed wrappers."""
+        return json.dumps({k: v for k, v in config.items() if k != "session_id"}, sort_keys=True, default=str)
+
+    def _session_lock(self, session_id: str) -> asyncio.Lock:
+        with self._lock:
+            lock = self._session_locks.get(session_id)
+            if lock is None:
+                lock = self._session_locks[session_id] = asyncio.Lock()
+            return lock
+
+    def _multiplexed(self, config: Dict[str, Any]) -> bool:
+        return self.multiplex and bool(config.get("connectOverCdp"))
+
+    def _new_wrapper(self, config: Dict[str, Any]) -> WebSocketBrowserWrapper:
+        if not self._multiplexed(config):
+            return WebSocketBrowserWrapper(config)
+        endpoint = config.get("cdpUrl") or "default"
+        with self._lock:
+            server = self._servers.get(endpoint)
+            if server is None:
+                server = self._servers[endpoint] = MultiplexedBrowserServer(config)
+        return MultiplexedSessionWrapper(config, server)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    @staticmethod
+    async def _is_healthy(session_id: str, wrapper: WebSocketBrowserWrapper) -> bool:
+        """Comprehensive connection health check."""
+        if not wrapper.websocket:
+            return False
+        try:
+            # Check WebSocket state based on available attributes
+            if hasattr(wrapper.websocket, "state"):
+                import websockets.protocol
+
+                is_healthy = wrapper.websocket.state == websockets.protocol.State.OPEN
+                if not is_healthy:
+                    logger.debug(f"Session {session_id} WebSocket state: {wrapper.websocket.state}")
+                return is_healthy
+            if hasattr(wrapper.websocket, "open"):
+                return wrapper.websocket.open
+            # Try ping as last resort
+            try:
+                await asyncio.wait_for(wrapper.websocket.ping(), timeout=1.0)
+                return True
+            except Exception:
+                return False
+        except Exception as e:
+            logger.debug(f"Health check failed for session {session_id}: {e}")
+            return False
 
     async def get_connection(self, session_id: str, config: Dict[str, Any]) -> WebSocketBrowserWrapper:
         """Get or create a connection for the given session ID."""
-        async with self._lock:
-            # Check if we have an existing connection for this session
-            if session_id in self._connections:
-                wrapper = self._connections[session_id]
-
-                # Comprehensive connection health check
-                is_healthy = False
-                if wrapper.websocket:
-                    try:
-                        # Check WebSocket state based on available attributes
-                        if hasattr(wrapper.websocket, "state"):
-                            import websockets.protocol
-
-                            is_healthy = wrapper.websocket.state == websockets.protocol.State.OPEN
-                            if not is_healthy:
-                                logger.debug(f"Session {session_id} WebSocket state: {wrapper.websocket.state}")
-                        elif hasattr(wrapper.websocket, "open"):
-                            is_healthy = wrapper.websocket.open
-                        else:
-                            # Try ping as last resort
-                            try:
-                                await asyncio.wait_for(wrapper.websocket.ping(), timeout=1.0)
-                                is_healthy = True
-                            except:
-                                is_healthy = False
-                    except Exception as e:
-                        logger.debug(f"Health check failed for session {session_id}: {e}")
-                        is_healthy = False
-
-                if is_healthy:
+        async with self._session_lock(session_id):
+            wrapper = self._connections.get(session_id)
+            if wrapper is not None:
+                if await self._is_healthy(session_id, wrapper):
                     logger.debug(f"Reusing healthy WebSocket connection for session {session_id}")
+                    self._last_used[session_id] = time.monotonic()
+                    self._counters["reused"] += 1
+                    self._maybe_evict()
                     return wrapper
-                else:
-                    # Connection is unhealthy, clean it up
-                    logger.info(f"Removing unhealthy WebSocket connection for session {session_id}")
-                    try:
-                        await wrapper.stop()
-                    except Exception as e:
-                        logger.debug(f"Error stopping unhealthy wrapper: {e}")
-                    del self._connections[session_id]
-
-            # Create a new connection
-            logger.info(f"Creating new WebSocket connection for session {session_id}")
-            wrapper = WebSocketBrowserWrapper(config)
-            await wrapper.start()
-            self._connections[session_id] = wrapper
+                # Connection is unhealthy, clean it up
+                logger.info(f"Removing unhealthy WebSocket connection for session {session_id}")
+                self._counters["unhealthy"] += 1
+                self._unregister(session_id)
+                try:
+                    await wrapper.stop()
+                except Exception as e:
+                    logger.debug(f"Error stopping unhealthy wrapper: {e}")
+
+            started = time.perf_counter()
+            wrapper = await self._take_prewarmed(session_id, config)
+            if wrapper is None:
+                logger.info(f"Creating new WebSocket connection for session {session_id}")
+                wrapper = self._new_wrapper(config)
+                await wrapper.start()
+            with self._lock:
+                self._connections[session_id] = wrapper
+                self._last_used[session_id] = time.monotonic()
+            self._connect_latencies.append(time.perf_counter() - started)
+            self._counters["connects"] += 1
             logger.info(f"Successfully created WebSocket connection for session {session_id}")
-            return wrapper
 
-    async def close_connection(self, session_id: str):
-        """Close and remove a connection for the given session ID."""
-        async with self._lock:
-            if session_id in self._connections:
-                wrapper = self._connections[session_id]
+        self._schedule_prewarm(config)
+        self._maybe_evict()
+        return wrapper
+
+    def _maybe_evict(self) -> None:
+        if self.idle_timeout > 0 and time.monotonic() >= self._next_eviction:
+            self._next_eviction = time.monotonic() + min(self.idle_timeout, 60)
+            self._spawn(self.evict_idle())
+
+    async def _take_prewarmed(self, session_id: str, config: Dict[str, Any]) -> WebSocketBrowserWrapper | None:
+        key = self._config_key(config)
+        while True:
+            with self._lock:
+                ready = self._prewarmed.get(key)
+                wrapper = ready.pop() if ready else None
+            if wrapper is None:
+                return None
+            if await self._is_healthy(session_id, wrapper):
+                wrapper.config["session_id"] = session_id
+                wrapper.session_id = session_id
+                self._counters["prewarm_hits"] += 1
+                logger.info(f"Using pre-warmed WebSocket connection for session {session_id}")
+                return wrapper
+            self._spawn(wrapper.stop())
+
+    def _schedule_prewarm(self, config: Dict[str, Any]) -> None:
+        # Multiplexed sessions are already cheap to start, and are bound to their session id on the server
+        if self.prewarm_size <= 0 or self._multiplexed(config):
+            return
+        key = self._config_key(config)
+        with self._lock:
+            missing = self.prewarm_size - len(self._prewarmed.get(key, [])) - self._prewarming.get(key, 0)
+            if missing <= 0:
+                return
+            self._prewarming[key] = self._prewarming.get(key, 0) + missing
+        for _ in range(missing):
+            self._spawn(self._prewarm_one(key, config))
+
+    async def _prewarm_one(self, key: str, config: Dict[str, Any]) -> None:
+        try:
+            wrapper = WebSocketBrowserWrapper({**config, "session_id": "prewarm"})
+            await wrapper.start()
+        except Exception as e:
+            logger.warning(f"Failed to pre-warm WebSocket connection: {e}")
+            return
+        finally:
+            with self._lock:
+                self._prewarming[key] -= 1
+        with self._lock:
+            self._prewarmed.setdefault(key, []).append(wrapper)
+
+    async def prewarm(self, config: Dict[str, Any]) -> None:
+        """Start wrappers for `config` until `prewarm_size` are ready and wait for them."""
+        self._schedule_prewarm(config)
+        pending = list(self._background)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _unregister(self, session_id: str) -> WebSocketBrowserWrapper | None:
+        with self._lock:
+            self._last_used.pop(session_id, None)
+            return self._connections.pop(session_id, None)
+
+    async def evict_idle(self, max_idle: float | None = None) -> int:
+        """Close connections that have not been requested for `max_idle` seconds and are not in use."""
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            idle = [sid for sid, used in self._last_used.items() if now - used >= max_idle]
+        evicted = 0
+        for session_id in idle:
+            lock = self._session_lock(session_id)
+            if lock.locked():
+                continue
+            async with lock:
+                used = self._last_used.get(session_id)
+                if used is None or time.monotonic() - used < max_idle:
+                    continue
+                wrapper = self._unregister(session_id)
+                logger.info(f"Evicting idle WebSocket connection for session {session_id}")
                 try:
                     await wrapper.stop()
                 except Exception as e:
-                    logger.error(f"Error closing WebSocket connection for session {session_id}: {e}")
-                del self._connections[session_id]
-                logger.info(f"Closed WebSocket connection for session {session_id}")
+                    logger.debug(f"Error stopping idle wrapper: {e}")
+                evicted += 1
+        self._counters["evicted"] += evicted
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and connect latency."""
+        latencies = sorted(self._connect_latencies)
+        with self._lock:
+            occupancy = {
+                "connections": len(self._connections),
+                "prewarmed": sum(len(ready) for ready in self._prewarmed.values()),
+                "prewarming": sum(self._prewarming.values()),
+                "connecting": sum(1 for lock in self._session_locks.values() if lock.locked()),
+                "multiplex_servers": sum(1 for server in self._servers.values() if server.running),
+                "multiplexed_sessions": sum(len(server.sessions) for server in self._servers.values()),
+            }
+        return {
+            **occupancy,
+            **self._counters,
+            "connect_avg_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+            "connect_p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1) if latencies else None,
+        }
+
+    async def close_connection(self, session_id: str):
+        """Close and remove a connection for the given session ID."""
+        async with self._session_lock(session_id):
+            await self._close_connection_unlocked(session_id)
+        with self._lock:
+            lock = self._session_locks.get(session_id)
+            if lock is not None and not lock.locked() and session_id not in self._connections:
+                del self._session_locks[session_id]
 
     async def _close_connection_unlocked(self, session_id: str):
-        """Close connection without acquiring lock (for internal use)."""
-        if session_id in self._connections:
-            wrapper = self._connections[session_id]
+        """Close connection without acquiring the session lock (for internal use)."""
+        wrapper = self._unregister(session_id)
+        if wrapper is not None:
             try:
                 await wrapper.stop()
             except Exception as e:
                 logger.error(f"Error closing WebSocket connection for session {session_id}: {e}")
-            del self._connections[session_id]
             logger.info(f"Closed WebSocket connection for session {session_id}")
 
     async def close_all(self):
-        """Close all connections in the pool."""
-        async with self._lock:
-            for session_id in list(self._connections.keys()):
-                await self._close_connection_unlocked(session_id)
-            logger.info("Closed all WebSocket connections")
+        """Close all connections in the pool, including pre-warmed ones and multiplexed servers."""
+        with self._lock:
+            session_ids = list(self._connections.keys())
+            prewarmed = [wrapper for ready in self._prewarmed.values() for wrapper in ready]
+            self._prewarmed.clear()
+            servers = list(self._servers.values())
+            self._servers.clear()
+        await asyncio.gather(*(self.close_connection(session_id) for session_id in session_ids))
+        for wrapper in [*prewarmed, *servers]:
+            try:
+                await wrapper.stop()
+            except Exception as e:
+                logger.debug(f"Error stopping pooled wrapper: {e}")
+        logger.info("Closed all WebSocket connections")
 
 
 # Global connection pool instance
@@ -0,0 +1,117 @@
+"""
+Lazy registry of the app's toolkits.
+
+Toolkit modules (and the SDKs they pull in) are imported the first time a toolkit is actually
+constructed or inspected, not when `app.utils.agent` is imported, so backend start-up does not pay
+for toolkits a user never enables.
+"""
+
+import importlib
+from typing import Any
+
+TOOLKIT_PATHS: dict[str, str] = {
+    "audio_analysis_toolkit": "app.utils.toolkit.audio_analysis_toolkit:AudioAnalysisToolkit",
+    "excel_toolkit": "app.utils.toolkit.excel_toolkit:ExcelToolkit",
+    "file_write_toolkit": "app.utils.toolkit.file_write_toolkit:FileToolkit",
+    "github_toolkit": "app.utils.toolkit.github_toolkit:GithubToolkit",
+    "google_calendar_toolkit": "app.utils.toolkit.google_calendar_toolkit:GoogleCalendarToolkit",
+    "google_drive_mcp_toolkit": "app.utils.toolkit.google_drive_mcp_toolkit:GoogleDriveMCPToolkit",
+    "google_gmail_mcp_toolkit": "app.utils.toolkit.google_gmail_mcp_toolkit:GoogleGmailMCPToolkit",
+    "human_toolkit": "app.utils.toolkit.human_toolkit:HumanToolkit",
+    "hybrid_browser_toolkit": "app.utils.toolkit.hybrid_browser_toolkit:HybridBrowserToolkit",
+    "image_analysis_toolkit": "app.utils.toolkit.image_analysis_toolkit:ImageAnalysisToolkit",
+    "lark_toolkit": "app.utils.toolkit.lark_toolkit:LarkToolkit",
+    "linkedin_toolkit": "app.utils.toolkit.linkedin_toolkit:LinkedInToolkit",
+    "markitdown_toolkit": "app.utils.toolkit.markitdown_toolkit:MarkItDownToolkit",
+    "mcp_search_toolkit": "app.utils.toolkit.mcp_search_toolkit:McpSearchToolkit",
+    "note_taking_toolkit": "app.utils.toolkit.note_taking_toolkit:NoteTakingToolkit",
+    "notion_mcp_toolkit": "app.utils.toolkit.notion_mcp_toolkit:NotionMCPToolkit",
+    "openai_image_toolkit": "app.utils.toolkit.openai_image_toolkit:OpenAIImageToolkit",
+    "pptx_toolkit": "app.utils.toolkit.pptx_toolkit:PPTXToolkit",
+    "reddit_toolkit": "app.utils.toolkit.reddit_toolkit:RedditToolkit",
+    "screenshot_toolkit": "app.utils.toolkit.screenshot_toolkit:ScreenshotToolkit",
+    "search_toolkit": "app.utils.toolkit.search_toolkit:SearchToolkit",
+    "slack_toolkit": "app.utils.toolkit.slack_toolkit:SlackToolkit",
+    "terminal_toolkit": "app.utils.toolkit.terminal_toolkit:TerminalToolkit",
+    "twitter_toolkit": "app.utils.toolkit.twitter_toolkit:TwitterToolkit",
+    "video_analysis_toolkit": "app.utils.toolkit.video_analysis_toolkit:VideoAnalysisToolkit",
+    "video_download_toolkit": "app.utils.toolkit.video_download_toolkit:VideoDownloaderToolkit",
+    "web_deploy_toolkit": "app.utils.toolkit.web_deploy_toolkit:WebDeployToolkit",
+    "whatsapp_toolkit": "app.utils.toolkit.whatsapp_toolkit:WhatsAppToolkit",
+}
+
+# Toolkits a user can attach to a custom agent by name (see `get_toolkits`); the rest are only
+# wired into the built-in agents
+INSTALLABLE_TOOLKITS = frozenset(
+    {
+        "audio_analysis_toolkit",
+        "excel_toolkit",
+        "file_write_toolkit",
+        "github_toolkit",
+        "google_calendar_toolkit",
+        "google_drive_mcp_toolkit",
+        "google_gmail_mcp_toolkit",
+        "image_analysis_toolkit",
+        "lark_toolkit",
+        "linkedin_toolkit",
+        "mcp_search_toolkit",
+        "notion_mcp_toolkit",
+        "openai_image_toolkit",
+        "pptx_toolkit",
+        "reddit_toolkit",
+        "search_toolkit",
+        "slack_toolkit",
+        "terminal_toolkit",
+        "twitter_toolkit",
+        "video_analysis_toolkit",
+        "video_download_toolkit",
+        "whatsapp_toolkit",
+    }
+)
+
+
+class LazyToolkit:
+    """
+    Stand-in for a toolkit class that imports it on first use.
+
+    Calling it constructs the real toolkit; attribute reads, writes and deletes (`get_can_use_tools`,
+    `toolkit_name`, `agent_name`, ...) are forwarded to the real class.
+    """
+
+    def __init__(self, name: str, path: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_cls", None)
+
+    @property
+    def loaded(self) -> bool:
+        return self._cls is not None
+
+    def resolve(self) -> type:
+        cls = self._cls
+        if cls is None:
+            module_name, _, class_name = self._path.partition(":")
+            # import_module holds the import lock, so concurrent first uses import once
+            cls = getattr(importlib.import_module(module_name), class_name)
+            object.__setattr__(self, "_cls", cls)
+        return cls
+
+    def __call__(self, *args: Any, **kwargs: Any):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, item: str):
+        return getattr(self.resolve(), item)
+
+    def __setattr__(self, key: str, value: Any):
+        setattr(self.resolve(), key, value)
+
+    def __delattr__(self, key: str):
+        # Paired with __setattr__ so mock.patch can restore what it set
+        delattr(self.resolve(), key)
+
+    def __repr__(self) -> str:
+        return f"<LazyToolkit {self._name} ({'loaded' if self.loaded else self._path})>"
+
+
+toolkit_registry: dict[str, LazyToolkit] = {name: LazyToolkit(name, path) for name, path in TOOLKIT_PATHS.items()}
+
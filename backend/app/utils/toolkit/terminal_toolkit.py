@@ -3,12 +3,13 @@ import logging
 import os
 import threading
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from typing import List, Optional
+from camel.toolkits.function_tool import FunctionTool
 from camel.toolkits.terminal_toolkit import TerminalToolkit as BaseTerminalToolkit
-from camel.toolkits.terminal_toolkit.terminal_toolkit import _to_plain
 from app.component.environment import env
 from app.service.task import Action, ActionTerminalData, Agents, get_task_lock
 from app.utils.listen.toolkit_listen import auto_listen_toolkit
+from app.utils.terminal_stream import TerminalStream, clip_output, read_log, terminal_log_dirs
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
 from app.service.task import process_task
 from utils import traceroot_wrapper as traceroot
@@ -48,6 +49,8 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
             "safe_mode": safe_mode,
             "use_docker_backend": use_docker_backend
         })
+        self._streams: dict[str, TerminalStream] = {}
+        self._streams_lock = threading.Lock()
 
         if TerminalToolkit._thread_pool is None:
             TerminalToolkit._thread_pool = ThreadPoolExecutor(
@@ -73,6 +76,7 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
                 "openpyxl",
             ],
         )
+        terminal_log_dirs.setdefault(api_task_id, set()).add(self.log_dir)
 
     def _write_to_log(self, log_file: str, content: str) -> None:
         r"""Write content to log file with optional ANSI stripping.
@@ -81,18 +85,55 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
             log_file (str): Path to the log file
             content (str): Content to write
         """
-        # Convert ANSI escape sequences to plain text
+        # The full output goes to disk; the UI gets a rate-limited, ANSI-stripped stream per log file
         super()._write_to_log(log_file, content)
         logger.debug("Terminal output logged", extra={
             "api_task_id": self.api_task_id,
             "log_file": log_file,
             "content_length": len(content)
         })
-        self._update_terminal_output(_to_plain(content))
+        self._stream_for(log_file).write(content)
 
-    def _update_terminal_output(self, output: str):
-        task_lock = get_task_lock(self.api_task_id)
+    def _stream_for(self, log_file: str) -> TerminalStream:
+        # Reader threads do not inherit the agent's context, so remember the process task of the first writer
         process_task_id = process_task.get("")
+        with self._streams_lock:
+            stream = self._streams.get(log_file)
+            if stream is None:
+                log_name = os.path.basename(log_file)
+                stream = TerminalStream(
+                    lambda output: self._update_terminal_output(output, stream.process_task_id, log_name),
+                    hint=f"full output in {log_name}",
+                )
+                stream.process_task_id = process_task_id
+                self._streams[log_file] = stream
+            elif process_task_id and not stream.process_task_id:
+                stream.process_task_id = process_task_id
+            return stream
+
+    def _close_stream(self, log_file: str) -> None:
+        with self._streams_lock:
+            stream = self._streams.pop(log_file, None)
+        if stream is not None:
+            stream.close()
+
+    def _start_output_reader_thread(self, session_id: str):
+        super()._start_output_reader_thread(session_id)
+        threading.Thread(target=self._close_stream_when_done, args=(session_id,), daemon=True).start()
+
+    def _close_stream_when_done(self, session_id: str) -> None:
+        # The reader marks the session stopped once it has read the process output to the end
+        with self._output_condition:
+            log_file = self.shell_sessions[session_id]["log_file"]
+            self._output_condition.wait_for(
+                lambda: not self.shell_sessions.get(session_id, {}).get("running", False)
+            )
+        self._close_stream(log_file)
+
+    def _update_terminal_output(self, output: str, process_task_id: str | None = None, log: str | None = None):
+        task_lock = get_task_lock(self.api_task_id)
+        if process_task_id is None:
+            process_task_id = process_task.get("")
 
         # Create the coroutine
         coro = task_lock.put_queue(
@@ -100,6 +141,7 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
                 action=Action.terminal,
                 process_task_id=process_task_id,
                 data=output,
+                log=log,
             )
         )
 
@@ -173,7 +215,52 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
         if block and result == "":
             return "Command executed successfully (no output)."
 
-        return result
+        clipped = clip_output(result, hint=f"use shell_read_log('{id}') for the full output")
+        if block and clipped is not result:
+            # Blocking output only lands in the shared blocking log; keep a per-session copy for shell_read_log
+            BaseTerminalToolkit._write_to_log(self, os.path.join(self.log_dir, f"session_{id}.log"), result)
+        return clipped
+
+    def shell_view(self, id: str) -> str:
+        r"""Retrieves new output from a non-blocking session.
+
+        Args:
+            id (str): The unique session ID of the non-blocking process.
+
+        Returns:
+            str: New output since the last call, with the middle of very long output elided.
+        """
+        return clip_output(super().shell_view(id), hint=f"use shell_read_log('{id}') for the full output")
+
+    def shell_read_log(self, id: str, start_line: int = 0, max_lines: int = 200) -> str:
+        r"""Reads the full, unabridged output of a shell session from its log file.
+
+        Use this when shell_exec or shell_view elided lines from long output.
+
+        Args:
+            id (str): The session ID used with shell_exec.
+            start_line (int, optional): Number of lines to skip from the start of the log. Defaults to 0.
+            max_lines (int, optional): Maximum number of lines to return. Defaults to 200.
+
+        Returns:
+            str: The requested lines, followed by the position and total line count.
+        """
+        log_file = os.path.join(self.log_dir, f"session_{id}.log")
+        if not os.path.isfile(log_file):
+            return f"No log found for session '{id}'."
+        lines, total = read_log(log_file, start_line, max(1, min(max_lines, 1000)))
+        end = start_line + len(lines)
+        return "".join(lines) + f"\n[lines {start_line + 1}-{end} of {total}]"
+
+    def cleanup(self):
+        super().cleanup()
+        with self._streams_lock:
+            log_files = list(self._streams)
+        for log_file in log_files:
+            self._close_stream(log_file)
+
+    def get_tools(self) -> List[FunctionTool]:
+        return [*super().get_tools(), FunctionTool(self.shell_read_log)]
 
     @classmethod
     def shutdown(cls):
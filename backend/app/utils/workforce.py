@@ -1,4 +1,5 @@
 import asyncio
+import time
 from typing import Generator, List
 from camel.agents import ChatAgent
 from camel.societies.workforce.workforce import (
@@ -14,7 +15,7 @@ from camel.societies.workforce.workforce_metrics import WorkforceMetrics
 from camel.societies.workforce.events import WorkerCreatedEvent
 from camel.societies.workforce.prompts import TASK_DECOMPOSE_PROMPT
 from camel.tasks.task import Task, TaskState, validate_task_content
-from app.component import code
+from app.component import code, timeline
 from app.exception.exception import UserException
 from app.utils.agent import ListenChatAgent
 from app.service.task import (
@@ -25,7 +26,7 @@ from app.service.task import (
     get_camel_task,
     get_task_lock,
 )
-from app.utils.single_agent_worker import SingleAgentWorker
+from app.utils.single_agent_worker import SingleAgentWorker, subtask_posted_at
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("workforce")
@@ -66,6 +67,8 @@ class Workforce(BaseWorkforce):
         )
         self.task_agent.stream_accumulate = True
         self.task_agent._stream_accumulate_explicit = True
+        # Subtasks this workforce posted, so their wait-time entries can be dropped on stop
+        self._posted_subtask_ids: set[str] = set()
         logger.info(f"[WF-LIFECYCLE] ✅ Workforce.__init__ COMPLETED, id={id(self)}")
 
     def eigent_make_sub_tasks(
@@ -114,15 +117,17 @@ class Workforce(BaseWorkforce):
         logger.info(f"[DECOMPOSE] Workforce reset complete, state: {self._state.name}")
 
         logger.info(f"[DECOMPOSE] Calling handle_decompose_append_task")
-        subtasks = asyncio.run(
-            self.handle_decompose_append_task(
-                task, 
-                reset=False, 
-                coordinator_context=coordinator_context,
-                on_stream_batch=on_stream_batch, 
-                on_stream_text=on_stream_text
+        with timeline.span(self.api_task_id, "decompose", "workforce", task.id) as span_args:
+            subtasks = asyncio.run(
+                self.handle_decompose_append_task(
+                    task, 
+                    reset=False, 
+                    coordinator_context=coordinator_context,
+                    on_stream_batch=on_stream_batch, 
+                    on_stream_text=on_stream_text
+                )
             )
-        )
+            span_args["subtasks"] = len(subtasks)
         logger.info("=" * 80)
         logger.info(f"✅ [DECOMPOSE] Task decomposition COMPLETED", extra={
             "api_task_id": self.api_task_id,
@@ -145,7 +150,8 @@ class Workforce(BaseWorkforce):
 
         try:
             logger.info(f"[WF-LIFECYCLE] Calling base class start() method")
-            await self.start()
+            with timeline.span(self.api_task_id, "workforce_run", "workforce", subtasks=len(subtasks)):
+                await self.start()
             logger.info(f"[WF-LIFECYCLE] ✅ Base class start() method completed")
         except Exception as e:
             logger.error(f"[WF-LIFECYCLE] ❌ Error in workforce execution: {e}", extra={
@@ -309,7 +315,8 @@ class Workforce(BaseWorkforce):
         # Task assignment phase: send "waiting for execution" notification
         # to the frontend, and send "start execution" notification when the
         # task actually begins execution
-        assigned = await super()._find_assignee(tasks)
+        with timeline.span(self.api_task_id, "find_assignee", "workforce", tasks=len(tasks)):
+            assigned = await super()._find_assignee(tasks)
 
         task_lock = get_task_lock(self.api_task_id)
         for item in assigned.assignments:
@@ -397,6 +404,9 @@ class Workforce(BaseWorkforce):
                         },
                     )
                 )
+        subtask_posted_at[task.id] = time.perf_counter()
+        self._posted_subtask_ids.add(task.id)
+        timeline.instant(self.api_task_id, "post_task", "workforce", task.id, assignee_id=assignee_id)
         # Call the parent class method to continue the normal task publishing process
         await super()._post_task(task, assignee_id)
 
@@ -444,9 +454,36 @@ class Workforce(BaseWorkforce):
             metrics_callbacks[0].log_worker_created(event)
         return self
 
+    def prewarm_agent_pools(self) -> asyncio.Task:
+        """Fill every worker's agent pool in the background so the first parallel subtasks skip cloning."""
+        workers = [child for child in self._children if isinstance(child, SingleAgentWorker)]
+
+        async def prewarm():
+            started = time.perf_counter()
+            added = await asyncio.gather(*(worker.prewarm() for worker in workers), return_exceptions=True)
+            for worker, result in zip(workers, added):
+                if isinstance(result, Exception):
+                    logger.warning(f"Agent pool prewarm failed for {worker.description[:40]}: {result}")
+            logger.info(
+                "Agent pools prewarmed",
+                extra={"workers": len(workers), "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)},
+            )
+
+        task = asyncio.create_task(prewarm())
+        get_task_lock(self.api_task_id).add_background_task(task)
+        return task
+
+    def _forget_posted_subtasks(self) -> None:
+        """Drop wait-time entries of subtasks no worker will start anymore."""
+        for task_id in self._posted_subtask_ids:
+            subtask_posted_at.pop(task_id, None)
+        self._posted_subtask_ids.clear()
+
     async def _handle_completed_task(self, task: Task) -> None:
         # DEBUG ▶ Task completed
         logger.debug(f"[WF] DONE  {task.id}")
+        subtask_posted_at.pop(task.id, None)
+        self._posted_subtask_ids.discard(task.id)
         task_lock = get_task_lock(self.api_task_id)
 
         # Log task completion with result details
@@ -475,6 +512,8 @@ class Workforce(BaseWorkforce):
     async def _handle_failed_task(self, task: Task) -> bool:
         # DEBUG ▶ Task failed
         logger.debug(f"[WF] FAIL  {task.id} retry={task.failure_count}")
+        subtask_posted_at.pop(task.id, None)
+        self._posted_subtask_ids.discard(task.id)
 
         result = await super()._handle_failed_task(task)
 
@@ -508,6 +547,7 @@ class Workforce(BaseWorkforce):
         logger.info(f"[WF-LIFECYCLE] Current state before stop: {self._state.name}, _running: {self._running}")
         logger.info("=" * 80)
         super().stop()
+        self._forget_posted_subtasks()
         logger.info(f"[WF-LIFECYCLE] super().stop() completed, new state: {self._state.name}")
         task_lock = get_task_lock(self.api_task_id)
         task = asyncio.create_task(task_lock.put_queue(ActionEndData()))
@@ -548,6 +588,7 @@ class Workforce(BaseWorkforce):
 
     async def cleanup(self) -> None:
         r"""Clean up resources when workforce is done"""
+        self._forget_posted_subtasks()
         try:
             # Clean up the task lock
             from app.service.task import delete_task_lock
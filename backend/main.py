@@ -33,6 +33,16 @@ app_logger.info("Starting Eigent Multi-Agent System API")
 app_logger.info(f"Python encoding: {os.environ.get('PYTHONIOENCODING')}")
 app_logger.info(f"Environment: {os.environ.get('ENVIRONMENT', 'development')}")
 
+from fastapi import Response
+from app.component import metrics
+
+
+@api.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    r"""Prometheus scrape endpoint for hot-path counters and histograms"""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 prefix = env("url_prefix", "")
 app_logger.info(f"Loading routers with prefix: '{prefix}'")
 register_routers(api, prefix)
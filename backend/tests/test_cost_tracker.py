@@ -12,6 +12,8 @@
 # limitations under the License.
 # ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
 
+import json
+
 import pytest
 from app.component.cost_tracker import CostTracker, TokenUsage
 
@@ -58,3 +60,77 @@ def test_cost_tracker_separates_by_org():
 
     org1_summary = tracker.get_summary(org_id="org-1")
     assert org1_summary["total_cost_usd"] == 0.015
+
+
+def test_estimate_cost_uses_longest_matching_price():
+    from app.component.cost_tracker import estimate_cost, model_price
+
+    assert model_price("gpt-4o-mini-2024-07-18") == model_price("gpt-4o-mini")
+    assert model_price("openai/gpt-4o") == (2.50, 10.00, 1.25)
+    assert model_price("my-local-llama") is None
+
+    # 1M prompt tokens of which half cached, plus 100k output
+    assert estimate_cost("gpt-4o", 1_000_000, 100_000, 500_000) == pytest.approx(1.25 + 0.625 + 1.0)
+    assert estimate_cost("my-local-llama", 1000, 1000) == 0.0
+
+
+def test_project_usage_breaks_down_per_agent_and_model():
+    tracker = CostTracker()
+    for agent, tokens in (("developer_agent", 1000), ("developer_agent", 500), ("task_summary_agent", 100)):
+        tracker.record(TokenUsage(
+            provider="openai", model="gpt-4o", input_tokens=tokens, output_tokens=10, cost_usd=0.01,
+            cached_tokens=tokens // 2, project_id="p1", agent_name=agent, task_id="t1",
+        ))
+    tracker.record(TokenUsage(provider="openai", model="gpt-4o", input_tokens=1, output_tokens=1, cost_usd=1, project_id="p2"))
+
+    usage = tracker.project_usage("p1")
+    assert usage["total_calls"] == 3
+    assert usage["total_input_tokens"] == 1600
+    assert usage["total_cached_tokens"] == 800
+    assert usage["by_agent"]["developer_agent"]["calls"] == 2
+    assert usage["by_model"]["openai/gpt-4o"]["cost_usd"] == pytest.approx(0.03)
+    assert tracker.project_usage("unknown") is None
+
+    tracker.clear("p1")
+    assert tracker.project_usage("p1") is None
+    assert tracker.get_summary()["record_count"] == 1
+
+
+def test_budget_guard_trips_once_spend_reaches_budget():
+    tracker = CostTracker()
+    tracker.set_budget("p1", 0.05)
+
+    tracker.record(TokenUsage(provider="openai", model="gpt-4o", input_tokens=1, output_tokens=1, cost_usd=0.04, project_id="p1"))
+    assert not tracker.over_budget("p1")
+    assert tracker.project_usage("p1")["remaining_usd"] == pytest.approx(0.01)
+
+    tracker.record(TokenUsage(provider="openai", model="gpt-4o", input_tokens=1, output_tokens=1, cost_usd=0.02, project_id="p1"))
+    assert tracker.over_budget("p1")
+    assert not tracker.over_budget("p2")
+
+
+def test_individual_records_are_bounded_but_project_totals_are_not():
+    tracker = CostTracker(max_records=3)
+    for _ in range(10):
+        tracker.record(TokenUsage(provider="openai", model="gpt-4o", input_tokens=10, output_tokens=1, cost_usd=0.5, project_id="p1"))
+
+    assert tracker.get_summary()["record_count"] == 3
+    assert tracker.project_usage("p1")["total_calls"] == 10
+    assert tracker.project_cost("p1") == pytest.approx(5.0)
+
+
+def test_exported_project_restores_on_top_of_new_usage():
+    tracker = CostTracker()
+    tracker.set_budget("p1", 2.0)
+    tracker.record(TokenUsage(provider="openai", model="gpt-4o", input_tokens=10, output_tokens=1, cost_usd=0.5, project_id="p1", agent_name="a"))
+    state = json.loads(json.dumps(tracker.export_project("p1")))
+    tracker.clear("p1")
+    assert tracker.export_project("p1") is None
+
+    tracker.record(TokenUsage(provider="openai", model="gpt-4o", input_tokens=5, output_tokens=1, cost_usd=0.25, project_id="p1", agent_name="a"))
+    tracker.restore_project("p1", state)
+
+    usage = tracker.project_usage("p1")
+    assert usage["total_cost_usd"] == pytest.approx(0.75)
+    assert usage["by_agent"]["a"]["input_tokens"] == 15
+    assert usage["budget_usd"] == 2.0
@@ -12,6 +12,8 @@
 # limitations under the License.
 # ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
 
+import httpx
+import openai
 import pytest
 from app.component.error_recovery import ErrorRecovery, RecoveryStrategy
 
@@ -53,3 +55,14 @@ def test_error_recovery_suggests_human_help_for_unknown():
 
     assert result.strategy == RecoveryStrategy.HUMAN_HELP
     assert result.question_for_user is not None
+
+
+def test_error_recovery_waits_for_retry_after():
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": "4.2"}, request=request)
+    error = openai.RateLimitError("Rate limit exceeded", response=response, body=None)
+
+    result = ErrorRecovery().analyze(error=error, task_content="Generate a report", attempt_count=1)
+
+    assert result.strategy == RecoveryStrategy.RETRY
+    assert result.wait_seconds == 5
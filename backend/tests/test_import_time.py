@@ -0,0 +1,77 @@
+"""
+Cold-start import benchmark for backend/main.py, based on `python -X importtime`.
+
+Run it directly for a report of the slowest imports:
+
+    python tests/test_import_time.py [module] [top]
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Toolkits every task needs right away; all other toolkits must stay out of start-up
+EAGER_TOOLKIT_MODULES = {
+    "app.utils.toolkit",
+    "app.utils.toolkit.abstract_toolkit",
+    "app.utils.toolkit.registry",
+    "app.utils.toolkit.human_toolkit",
+    "app.utils.toolkit.note_taking_toolkit",
+}
+
+
+def profile_imports(module: str = "main") -> dict[str, tuple[int, int]]:
+    """Import `module` in a fresh interpreter and return {module: (self_us, cumulative_us)}."""
+    pythonpath = [str(BACKEND_DIR.parent), str(BACKEND_DIR), os.environ.get("PYTHONPATH", "")]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, pythonpath))},
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    times: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    # main.py schedules its PID-file task at import and fails without a running loop (uvicorn
+    # provides one); that happens after every import is timed, so only a missing entry is an error
+    if module not in times:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    return times
+
+
+def format_report(times: dict[str, tuple[int, int]], module: str, top: int = 25) -> str:
+    lines = [f"cold import of {module}: {times[module][1] / 1000:.0f}ms", "slowest imports (cumulative):"]
+    for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: -item[1][1])[:top]:
+        lines.append(f"  {cumulative_us / 1000:8.1f}ms {self_us / 1000:7.1f}ms self  {name}")
+    return "\n".join(lines)
+
+
+def test_toolkits_are_not_imported_at_startup():
+    times = profile_imports("app.utils.agent")
+
+    eager = {name for name in times if name.startswith("app.utils.toolkit")} - EAGER_TOOLKIT_MODULES
+    assert eager == set()
+
+
+@pytest.mark.very_slow
+def test_benchmark_main_cold_start():
+    times = profile_imports("main")
+    print("\n" + format_report(times, "main"))
+
+    eager = {name for name in times if name.startswith("app.utils.toolkit")} - EAGER_TOOLKIT_MODULES
+    assert eager == set()
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "main"
+    print(format_report(profile_imports(target), target, int(sys.argv[2]) if len(sys.argv) > 2 else 25))
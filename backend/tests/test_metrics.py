@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from app.component import metrics
+from app.component.metrics import Counter, GaugeFunction, Histogram, Registry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    fresh = Registry()
+    monkeypatch.setattr(metrics, "registry", fresh)
+    return fresh
+
+
+def test_counter_sums_per_thread_shards(registry):
+    events = Counter("test_events_total", "Events.", ("action",))
+
+    def record():
+        for _ in range(1000):
+            events.inc("activate_agent")
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    events.inc("end", amount=2)
+
+    assert events.value("activate_agent") == 8000
+    assert events.value("end") == 2
+    # Finished threads are folded into one retired shard on scrape
+    assert len(events._shards) == 1
+
+
+def test_histogram_renders_cumulative_buckets(registry):
+    latency = Histogram("test_seconds", "Latency.", ("toolkit", "method"), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        latency.observe(value, "Terminal Toolkit", "shell_exec")
+
+    text = registry.render()
+
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{toolkit="Terminal Toolkit",method="shell_exec",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{toolkit="Terminal Toolkit",method="shell_exec",le="1"} 3' in text
+    assert 'test_seconds_bucket{toolkit="Terminal Toolkit",method="shell_exec",le="+Inf"} 4' in text
+    assert 'test_seconds_sum{toolkit="Terminal Toolkit",method="shell_exec"} 4.05' in text
+    assert 'test_seconds_count{toolkit="Terminal Toolkit",method="shell_exec"} 4' in text
+    assert latency.summary("Terminal Toolkit", "shell_exec") == (4, 4.05)
+
+
+def test_failing_gauge_does_not_break_scrape(registry):
+    GaugeFunction("test_broken", "Broken.", lambda: 1 / 0)
+    GaugeFunction("test_depth", "Depth.", lambda: 3)
+    Counter("test_quoted_total", "Quoted.", ("step",)).inc('say "hi"\n')
+
+    text = registry.render()
+
+    assert "test_broken" not in text
+    assert "test_depth 3" in text
+    assert 'test_quoted_total{step="say \\"hi\\"\\n"} 1' in text
+
+
+def test_tool_timer_counts_errors():
+    before_errors = metrics.tool_errors.value("test_toolkit", "fail")
+    with pytest.raises(ValueError):
+        with metrics.tool_timer("test_toolkit", "fail"):
+            raise ValueError("boom")
+    with metrics.tool_timer("test_toolkit", "ok"):
+        pass
+
+    assert metrics.tool_errors.value("test_toolkit", "fail") == before_errors + 1
+    assert metrics.tool_seconds.summary("test_toolkit", "ok")[0] >= 1
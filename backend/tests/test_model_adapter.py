@@ -57,3 +57,83 @@ def test_registry_returns_none_for_unknown():
     registry = ModelRegistry()
     adapter = registry.get_adapter("unknown", "model")
     assert adapter is None
+
+
+def make_router_registry():
+    from app.component.model_adapter import ModelRegistry
+
+    registry = ModelRegistry()
+    registry.register(
+        "flagship", "https://flagship.example/v1", "k", ["big"],
+        ModelCapabilities(max_context_length=200000, cost_per_million_tokens=10.0),
+    )
+    registry.register(
+        "budget", "https://budget.example/v1", "k", ["mini"],
+        ModelCapabilities(max_context_length=32000, latency_class="fast", cost_per_million_tokens=0.3),
+    )
+    registry.register(
+        "budget", "https://budget.example/v1", "k", ["nano"],
+        ModelCapabilities(
+            supports_function_calling=False, max_context_length=16000, latency_class="fast", cost_per_million_tokens=0.1
+        ),
+    )
+    return registry
+
+
+def test_router_picks_cheapest_model_meeting_requirements():
+    from app.component.model_adapter import ModelRequirements
+
+    registry = make_router_registry()
+
+    provider, adapter = registry.route(ModelRequirements(latency_class="fast"))
+    assert (provider, adapter.model_name) == ("budget", "nano")
+
+    provider, adapter = registry.route(ModelRequirements(tool_calling=True, latency_class="fast"))
+    assert (provider, adapter.model_name) == ("budget", "mini")
+
+    provider, adapter = registry.route(ModelRequirements(min_context_length=100000))
+    assert (provider, adapter.model_name) == ("flagship", "big")
+
+    assert registry.route(ModelRequirements(vision=True)) is None
+
+
+def test_router_demotes_models_observed_slower_than_their_class():
+    from app.component.model_adapter import ModelRequirements
+
+    registry = make_router_registry()
+    for _ in range(3):
+        registry.record_latency("budget", "nano", 12.0)
+
+    provider, adapter = registry.route(ModelRequirements(latency_class="fast"))
+    assert (provider, adapter.model_name) == ("budget", "mini")
+    assert registry.observed_latency("budget", "nano") == pytest.approx(12.0)
+
+
+def test_register_from_params_skips_invalid_entries():
+    from app.component.model_adapter import ModelRegistry
+
+    registry = ModelRegistry()
+    registry.register_from_params([
+        {"provider": "ok", "url": "https://ok.example/v1", "models": ["m"], "capabilities": {"latency_class": "fast"}},
+        {"provider": "bad-class", "url": "https://x.example/v1", "models": ["m"], "capabilities": {"latency_class": "warp"}},
+        {"provider": "no-url", "models": ["m"]},
+    ])
+
+    assert registry.list_providers() == ["ok"]
+    assert registry.get_adapter("ok", "m").capabilities.latency_class == "fast"
+
+
+def test_router_weighs_the_default_model_against_registered_ones():
+    from app.component.model_adapter import DEFAULT_MODEL, ModelRequirements
+
+    registry = make_router_registry()
+    requirements = ModelRequirements(latency_class="fast")
+
+    assert registry.route(requirements, default=ModelCapabilities(latency_class="fast", cost_per_million_tokens=0.05)) is None
+    provider, adapter = registry.route(requirements, default=ModelCapabilities(latency_class="fast"))
+    assert (provider, adapter.model_name) == ("budget", "nano")
+
+    # A default model observed slower than its class loses even when it is the cheapest
+    registry.record_latency(*DEFAULT_MODEL, 12.0)
+    provider, adapter = registry.route(requirements, default=ModelCapabilities(latency_class="fast", cost_per_million_tokens=0.05))
+    assert (provider, adapter.model_name) == ("budget", "nano")
@@ -12,6 +12,10 @@
 # limitations under the License.
 # ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
 
+import asyncio
+import time
+from types import SimpleNamespace
+
 import pytest
 from unittest.mock import Mock, patch
 from app.component.model_fallback import FallbackChain, ModelCallError
@@ -51,3 +55,119 @@ def test_fallback_raises_after_all_fail():
     with patch.object(chain, '_get_adapter', return_value=failing_adapter):
         with pytest.raises(ModelCallError, match="All models failed"):
             chain.call("test prompt")
+
+
+class FakeModel:
+    """Local provider with injectable latency and faults."""
+
+    def __init__(self, name, latency=0.0, fail=False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def _respond(self, prompt):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
+        return SimpleNamespace(msgs=[SimpleNamespace(content=f"{self.name}: {prompt}")])
+
+    def step(self, prompt):
+        time.sleep(self.latency)
+        return self._respond(prompt)
+
+    async def astep(self, prompt):
+        await asyncio.sleep(self.latency)
+        return self._respond(prompt)
+
+
+class FakeRegistry:
+    def __init__(self, *models):
+        self.models = {model.name: model for model in models}
+        self.created = []
+
+    def get_adapter(self, provider, model):
+        registry = self
+
+        class Adapter:
+            def create_model(self, **kwargs):
+                registry.created.append(provider)
+                return registry.models[provider]
+
+        return Adapter()
+
+
+def make_chain(*models, **options):
+    return FallbackChain(
+        [{"provider": model.name, "model": "m"} for model in models], registry=FakeRegistry(*models), **options
+    )
+
+
+def test_model_instances_are_reused():
+    chain = make_chain(FakeModel("primary"))
+
+    for _ in range(3):
+        chain.call("hi", temperature=0)
+
+    assert chain.registry.created == ["primary"]
+
+
+def test_circuit_breaker_skips_failing_provider_and_probes_after_cooldown():
+    now = [0.0]
+    primary, fallback = FakeModel("primary", fail=True), FakeModel("fallback")
+    chain = make_chain(primary, fallback, clock=lambda: now[0], health_options={"min_calls": 2, "cooldown": 10})
+
+    for _ in range(4):
+        assert chain.call("hi").content == "fallback: hi"
+
+    assert primary.calls == 2
+    assert chain.health_snapshot()["primary/m"]["state"] == "open"
+
+    now[0] = 11.0
+    primary.fail = False
+    assert chain.call("hi").content == "primary: hi"
+    assert chain.health_snapshot()["primary/m"]["state"] == "closed"
+
+
+def test_all_providers_tripped_raises():
+    chain = make_chain(FakeModel("a", fail=True), health_options={"min_calls": 1})
+
+    with pytest.raises(ModelCallError):
+        chain.call("hi")
+    with pytest.raises(ModelCallError, match="circuit breaker open"):
+        chain.call("hi")
+
+
+def test_hedged_call_returns_fallback_when_primary_exceeds_p95():
+    primary, fallback = FakeModel("primary", latency=0.01), FakeModel("fallback", latency=0.01)
+    chain = make_chain(primary, fallback, hedge=True)
+    for _ in range(5):
+        chain.call("warm up")
+
+    primary.latency = 2.0
+    started = time.perf_counter()
+    result = chain.call("hi")
+
+    assert result.content == "fallback: hi"
+    assert time.perf_counter() - started < 1.0
+    assert chain.last_used_provider == "fallback"
+
+
+@pytest.mark.asyncio
+async def test_acall_fails_over_and_hedges():
+    primary, fallback = FakeModel("primary", latency=0.01), FakeModel("fallback", latency=0.01)
+    chain = make_chain(primary, fallback, hedge=True)
+    for _ in range(5):
+        assert (await chain.acall("warm up")).content == "primary: warm up"
+
+    primary.latency = 2.0
+    started = time.perf_counter()
+    assert (await chain.acall("hi")).content == "fallback: hi"
+    assert time.perf_counter() - started < 1.0
+
+    primary.latency, primary.fail = 0.0, True
+    assert (await chain.acall("hi")).content == "fallback: hi"
+
+    fallback.fail = True
+    with pytest.raises(ModelCallError, match="All models failed"):
+        await chain.acall("hi")
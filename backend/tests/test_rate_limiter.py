@@ -0,0 +1,148 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.component.rate_limiter import (
+    ModelRateLimiter,
+    RateLimitedModelManager,
+    TokenBucket,
+    get_rate_limiter,
+    parse_duration,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def rate_limit_error(headers: dict) -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class FakeBackend:
+    def __init__(self, model_type: str, failures: list[Exception]):
+        self.model_type = model_type
+        self._api_key = "sk-shared"
+        self._url = None
+        self.failures = failures
+        self.calls: list[float] = []
+
+    def run(self, messages, response_format=None, tools=None):
+        self.calls.append(time.monotonic())
+        if self.failures:
+            raise self.failures.pop(0)
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=10))
+
+
+def test_token_bucket_refills_per_minute():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)
+
+    bucket.take(60, clock())
+    assert bucket.wait_time(1, clock()) == pytest.approx(1.0)
+
+    clock.now += 30
+    assert bucket.wait_time(30, clock()) == 0
+    # Larger than the whole bucket: admitted once the bucket is full again
+    assert bucket.wait_time(500, clock()) == pytest.approx(30.0)
+    assert TokenBucket(None, clock).wait_time(10**9, clock()) == 0
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("12", 12.0), ("0.5", 0.5), ("6m0s", 360.0), ("1m30.5s", 90.5), ("20ms", 0.02), ("soon", None), (None, None)],
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == expected
+
+
+def test_retry_after_header_forms():
+    assert retry_after_seconds({"retry-after": "7"}) == 7
+    assert retry_after_seconds({"retry-after-ms": "250", "retry-after": "1"}) == 0.25
+    assert retry_after_seconds({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert retry_after_seconds({}) is None
+
+
+def test_limits_are_learned_from_response_headers():
+    clock = FakeClock()
+    limiter = ModelRateLimiter(("openai", "hash", "gpt-4o"), clock=clock)
+
+    assert limiter.observe_headers({
+        "x-ratelimit-limit-requests": "60",
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "2s",
+        "x-ratelimit-limit-tokens": "30000",
+        "x-ratelimit-remaining-tokens": "29000",
+    })
+
+    assert limiter.requests.capacity == 60 and limiter.tokens.capacity == 30000
+    assert limiter._delay(100, clock()) == pytest.approx(2.0)
+    clock.now += 2
+    assert limiter._delay(100, clock()) == 0
+
+
+def test_retry_after_blocks_every_caller_of_the_key():
+    first = get_rate_limiter("openai", "sk-same", "gpt-shared-key")
+    assert get_rate_limiter("openai", "sk-same", "gpt-shared-key") is first
+    assert get_rate_limiter("openai", "sk-other", "gpt-shared-key") is not first
+
+    first.observe_error(rate_limit_error({"retry-after-ms": "150"}))
+
+    started = time.monotonic()
+    asyncio.run(first.aacquire("another-project", 10))
+    assert time.monotonic() - started >= 0.12
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_round_robin_across_projects():
+    limiter = ModelRateLimiter(("openai", "hash", "gpt-fair"), rpm=1200)
+    limiter.requests.take(limiter.requests.capacity, limiter.clock())
+    order = []
+
+    async def call(project):
+        await limiter.aacquire(project)
+        order.append(project)
+
+    tasks = [asyncio.create_task(call("busy")) for _ in range(4)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(call("quiet")))
+    await asyncio.gather(*tasks)
+
+    assert order == ["busy", "quiet", "busy", "busy", "busy"]
+
+
+def test_model_manager_waits_out_retry_after():
+    backend = FakeBackend("gpt-manager-test", [rate_limit_error({"retry-after-ms": "200"})])
+    manager = RateLimitedModelManager([backend], project_id="project")
+    other_project = RateLimitedModelManager([backend], project_id="other")
+
+    with pytest.raises(openai.RateLimitError):
+        manager.run([{"role": "user", "content": "hi"}])
+    other_project.run([{"role": "user", "content": "hi"}])
+
+    assert backend.calls[1] - backend.calls[0] >= 0.18
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from app.component import timeline
+
+
+@pytest.fixture(autouse=True)
+def fresh_timelines(monkeypatch):
+    monkeypatch.setattr(timeline, "_timelines", timeline.OrderedDict())
+
+
+def test_spans_are_exported_per_process_task_lane():
+    async def subtask(task_id):
+        with timeline.span("p1", "process_task", "worker", task_id, worker="developer_agent"):
+            await asyncio.sleep(0.01)
+
+    async def run():
+        with timeline.span("p1", "workforce_run", "workforce"):
+            await asyncio.gather(subtask("t1"), subtask("t2"))
+
+    asyncio.run(run())
+    timeline.instant("p1", "post_task", "workforce", "t1", assignee_id="node")
+
+    trace = timeline.get_timeline("p1").export()
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    lanes = {e["args"]["name"]: e["tid"] for e in trace["traceEvents"] if e["name"] == "thread_name"}
+
+    assert [e["name"] for e in spans] == ["process_task", "process_task", "workforce_run"]
+    assert {e["tid"] for e in spans[:2]} == {lanes["t1"], lanes["t2"]}
+    assert spans[2]["tid"] == lanes["project"] == 0
+    assert spans[2]["dur"] >= spans[0]["dur"] >= 10_000
+    assert spans[2]["ts"] <= spans[0]["ts"]
+    assert any(e["ph"] == "i" and e["tid"] == lanes["t1"] for e in trace["traceEvents"])
+
+
+def test_failed_span_is_marked():
+    with pytest.raises(ValueError):
+        with timeline.span("p1", "decompose", "workforce"):
+            raise ValueError("boom")
+
+    (event,) = [e for e in timeline.get_timeline("p1").export()["traceEvents"] if e["ph"] == "X"]
+    assert event["args"]["error"] == "ValueError"
+
+
+def test_least_recent_projects_are_dropped(monkeypatch):
+    monkeypatch.setenv("TIMELINE_MAX_PROJECTS", "2")
+    now = time.perf_counter()
+    for project_id in ("p1", "p2", "p1", "p3"):
+        timeline.record(project_id, "step", now, now)
+    timeline.record(None, "ignored", now, now)
+
+    assert list(timeline._timelines) == ["p1", "p3"]
+
+
+def test_events_per_project_are_capped(monkeypatch):
+    monkeypatch.setenv("TIMELINE_MAX_EVENTS", "5")
+    now = time.perf_counter()
+    for i in range(20):
+        timeline.record("p1", f"step {i}", now, now, "llm")
+
+    trace = timeline.get_timeline("p1").export()
+    assert [e["name"] for e in trace["traceEvents"] if e["ph"] == "X"] == [f"step {i}" for i in range(15, 20)]
+    assert trace["otherData"]["dropped_events"] == 15
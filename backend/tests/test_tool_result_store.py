@@ -0,0 +1,86 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+from app.component.tool_result_store import (
+    COMPACTED_PREFIX,
+    SPILLED_PREFIX,
+    ToolResultStore,
+    compact_tool_results,
+    spill_excerpt,
+)
+
+
+def _tool_result(result, mask_output=False):
+    return {
+        "role_at_backend": "function",
+        "message": {"__class__": "FunctionCallingMessage", "func_name": "shell_exec", "result": result,
+                    "mask_output": mask_output},
+    }
+
+
+def test_store_is_content_addressed_and_lazy(tmp_path):
+    store = ToolResultStore(tmp_path / "tool_results")
+    assert not store.root.exists()
+
+    handle = store.put("x" * 5000)
+    assert store.put("x" * 5000) == handle
+    assert len(list(store.root.iterdir())) == 1
+    assert store.get(handle) == "x" * 5000
+    assert store.get("../../etc/passwd") is None
+    assert store.get("0" * 16) is None
+
+
+def test_compaction_keeps_recent_small_and_masked_results(tmp_path):
+    store = ToolResultStore(tmp_path)
+    records = [
+        {"role_at_backend": "user", "message": {"__class__": "BaseMessage", "content": "go"}},
+        _tool_result("a" * 3000),
+        _tool_result("small"),
+        _tool_result("secret" * 1000, mask_output=True),
+        _tool_result({"rows": ["b" * 3000]}),
+        _tool_result("c" * 3000),
+    ]
+
+    assert compact_tool_results(records, store, keep_recent=1, min_chars=2000) == 2
+    results = [record["message"].get("result") for record in records[1:]]
+    assert results[0].startswith(COMPACTED_PREFIX) and "3000 chars" in results[0]
+    assert results[1] == "small"
+    assert results[2] == "secret" * 1000
+    assert results[3].startswith(COMPACTED_PREFIX)
+    assert results[4] == "c" * 3000
+    # Compacting again finds nothing new
+    assert compact_tool_results(records, store, keep_recent=1, min_chars=10) == 0
+
+
+def test_read_tool_result_tool_returns_the_payload(tmp_path):
+    store = ToolResultStore(tmp_path)
+    handle = store.put("full output")
+    tool = store.read_tool_result_tool()
+
+    assert tool.get_function_name() == "read_tool_result"
+    assert tool(handle=handle) == "[chars 0-11 of 11]\nfull output"
+    assert tool(handle=handle, offset=5, length=3) == "[chars 5-8 of 11; continue with offset=8]\nout"
+    assert "No stored tool result" in tool(handle="missing")
+
+
+def test_compaction_keeps_only_the_note_of_spilled_results(tmp_path):
+    store = ToolResultStore(tmp_path)
+    text = "row\n" * 5000
+    handle = store.put(text)
+    records = [_tool_result(spill_excerpt(handle, text)), _tool_result("latest")]
+
+    assert compact_tool_results(records, store, keep_recent=1, min_chars=2000) == 1
+    note = records[0]["message"]["result"]
+    assert note.startswith(f"{SPILLED_PREFIX}{handle}: 20000 chars") and "\n" not in note
+    assert len(list(tmp_path.iterdir())) == 1
@@ -2,11 +2,13 @@ import os
 from unittest.mock import MagicMock, patch
 
 import pytest
-from fastapi import Response
+import json
+from fastapi import HTTPException, Response
 from fastapi.responses import StreamingResponse
 from fastapi.testclient import TestClient
 
-from app.controller.chat_controller import improve, post, stop, supplement, human_reply, install_mcp
+from app.controller.chat_controller import improve, post, stop, supplement, human_reply, install_mcp, export_timeline, project_usage
+from app.component import timeline
 from pydantic import ValidationError
 from app.exception.exception import UserException
 from app.model.chat import Chat, HumanReply, McpServers, Status, SupplementChat
@@ -158,6 +160,37 @@ class TestChatController:
             assert response.status_code == 201
             mock_run.assert_called_once()
 
+    def test_export_timeline(self):
+        """Timeline export returns Chrome trace events for a recorded project."""
+        with timeline.span("timeline_project", "decompose", "workforce", "task_1"):
+            pass
+
+        response = export_timeline("timeline_project")
+        trace = json.loads(response.body)
+
+        assert "timeline-timeline_project.json" in response.headers["content-disposition"]
+        assert [e["name"] for e in trace["traceEvents"] if e["ph"] == "X"] == ["decompose"]
+        with pytest.raises(HTTPException) as exc_info:
+            export_timeline("unknown_project")
+        assert exc_info.value.status_code == 404
+
+    def test_project_usage(self):
+        """Usage endpoint returns the live per-agent breakdown of a project."""
+        from app.component.cost_tracker import TokenUsage, cost_tracker
+
+        cost_tracker.record(TokenUsage(
+            provider="openai", model="gpt-4o", input_tokens=1200, output_tokens=300, cost_usd=0.006,
+            cached_tokens=1024, project_id="usage_project", agent_name="developer_agent",
+        ))
+
+        usage = project_usage("usage_project")
+
+        assert usage["by_agent"]["developer_agent"]["input_tokens"] == 1200
+        assert usage["total_cost_usd"] == pytest.approx(0.006)
+        with pytest.raises(HTTPException) as exc_info:
+            project_usage("unknown_project")
+        assert exc_info.value.status_code == 404
+
 
 @pytest.mark.integration
 class TestChatControllerIntegration:
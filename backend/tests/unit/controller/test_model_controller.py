@@ -1,10 +1,37 @@
+import asyncio
+import time
 from unittest.mock import MagicMock, patch
 import pytest
 from fastapi.testclient import TestClient
 
+from app.component.model_validation import ValidationCache, ValidationResult, validation_cache
 from app.controller.model_controller import validate_model, ValidateModelRequest, ValidateModelResponse
 
 
+@pytest.fixture(autouse=True)
+def clear_validation_cache():
+    validation_cache.invalidate()
+    yield
+    validation_cache.invalidate()
+
+
+def tool_calling_agent(delay: float = 0) -> MagicMock:
+    def step(input_message):
+        time.sleep(delay)
+        tool_call = MagicMock()
+        tool_call.result = (
+            "Tool execution completed successfully for https://www.camel-ai.org, Website Content: Welcome to CAMEL AI!"
+        )
+        response = MagicMock()
+        response.info = {"tool_calls": [tool_call]}
+        return response
+
+    agent = MagicMock()
+    agent.step.side_effect = step
+    agent.model_backend.token_limit = 64000
+    return agent
+
+
 @pytest.mark.unit
 class TestModelController:
     """Test cases for model controller endpoints."""
@@ -299,3 +326,94 @@ class TestModelControllerErrorCases:
         assert response.error["message"] == "Invalid model name. Validation failed."
         assert response.error["type"] == "invalid_request_error"
         assert response.error["code"] == "model_not_found"
+
+
+@pytest.mark.unit
+class TestModelValidationCache:
+    """Validation results are cached per configuration and deduplicated while in flight."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_validation_is_served_from_cache(self):
+        request_data = ValidateModelRequest(model_platform="openai", model_type="gpt-4o", api_key="cache_key")
+
+        with patch("app.controller.model_controller.create_agent", return_value=tool_calling_agent()) as create:
+            first = await validate_model(request_data)
+            second = await validate_model(request_data)
+            other_key = await validate_model(request_data.model_copy(update={"api_key": "other_key"}))
+            refreshed = await validate_model(request_data.model_copy(update={"refresh": True}))
+
+        assert (first.cached, second.cached, other_key.cached, refreshed.cached) == (False, True, False, False)
+        assert second.is_tool_calls is True
+        assert second.capabilities["supports_function_calling"] is True
+        assert second.capabilities["max_context_length"] == 64000
+        assert create.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_validations_share_one_round_trip(self):
+        request_data = ValidateModelRequest(model_platform="openai", model_type="gpt-4o", api_key="flight_key")
+
+        with patch("app.controller.model_controller.create_agent", return_value=tool_calling_agent(0.1)) as create:
+            results = await asyncio.gather(*(validate_model(request_data) for _ in range(5)))
+
+        assert create.call_count == 1
+        assert all(result.is_tool_calls for result in results)
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        request_data = ValidateModelRequest(model_platform="openai", model_type="gpt-4o", api_key="flaky_key")
+        failing = MagicMock()
+        failing.step.side_effect = ConnectionError("Network unreachable")
+
+        with patch("app.controller.model_controller.create_agent", side_effect=[failing, tool_calling_agent()]):
+            with pytest.raises(Exception):
+                await validate_model(request_data)
+            result = await validate_model(request_data)
+
+        assert result.is_tool_calls is True and result.cached is False
+
+    @pytest.mark.asyncio
+    async def test_probe_makes_one_small_call(self):
+        request_data = ValidateModelRequest(
+            model_platform="openai", model_type="gpt-4o", api_key="probe_key", model_config_dict={"temperature": 0}, mode="probe"
+        )
+
+        with patch("app.controller.model_controller.create_agent", return_value=tool_calling_agent()) as create:
+            result = await validate_model(request_data)
+
+        kwargs = create.call_args.kwargs
+        assert kwargs["max_iteration"] == 1
+        assert kwargs["model_config_dict"] == {"temperature": 0, "max_tokens": 64}
+        assert result.capabilities["supports_function_calling"] is True
+
+    @pytest.mark.asyncio
+    async def test_full_validation_answers_probe(self):
+        request_data = ValidateModelRequest(model_platform="openai", model_type="gpt-4o", api_key="full_key")
+
+        with patch("app.controller.model_controller.create_agent", return_value=tool_calling_agent()) as create:
+            await validate_model(request_data)
+            probe = await validate_model(request_data.model_copy(update={"mode": "probe"}))
+
+        assert probe.cached is True
+        assert create.call_count == 1
+
+    def test_delete_clears_the_cache(self, client: TestClient):
+        request_data = {"model_platform": "openai", "model_type": "gpt-4o", "api_key": "bust_key"}
+
+        with patch("app.controller.model_controller.create_agent", return_value=tool_calling_agent()) as create:
+            client.post("/model/validate", json=request_data)
+            assert client.delete("/model/validate/cache").json() == {"cleared": 1}
+            response = client.post("/model/validate", json=request_data)
+
+        assert response.json()["cached"] is False
+        assert create.call_count == 2
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        monkeypatch.setenv("MODEL_VALIDATION_CACHE_TTL", "60")
+        now = [0.0]
+        cache = ValidationCache(clock=lambda: now[0])
+        cache.put("key", ValidationResult(is_valid=True, is_tool_calls=True))
+
+        now[0] = 59
+        assert cache.get("key") is not None
+        now[0] = 61
+        assert cache.get("key") is None
@@ -1,4 +1,6 @@
 from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import time
 import pytest
 import os
 import tempfile
@@ -13,6 +15,8 @@ from app.service.chat_service import (
     add_sub_tasks,
     question_confirm,
     summary_task,
+    fallback_task_summary,
+    generate_task_summary,
     construct_workforce,
     format_agent_description,
     new_agent_model,
@@ -571,14 +575,15 @@ class TestChatServiceAgentOperations:
     @pytest.mark.asyncio
     async def test_summary_task(self, mock_camel_agent):
         """Test summary_task creates proper task summary."""
-        mock_camel_agent.step.return_value.msgs[0].content = "Web App Creation|Create a modern web application with user authentication and dashboard"
+        mock_camel_agent.astep.return_value.msgs[0].content = "Web App Creation|Create a modern web application with user authentication and dashboard"
         
         task = Task(content="Create a web application with user authentication", id="web_app_task")
         
         result = await summary_task(mock_camel_agent, task)
         
         assert result == "Web App Creation|Create a modern web application with user authentication and dashboard"
-        mock_camel_agent.step.assert_called_once()
+        mock_camel_agent.reset.assert_called_once()
+        mock_camel_agent.astep.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_new_agent_model_creation(self, sample_chat_data):
@@ -1072,7 +1077,7 @@ class TestChatServiceErrorCases:
     @pytest.mark.asyncio
     async def test_summary_task_agent_error(self, mock_camel_agent):
         """Test summary_task when agent raises error."""
-        mock_camel_agent.step.side_effect = Exception("Summary error")
+        mock_camel_agent.astep.side_effect = Exception("Summary error")
         
         task = Task(content="Test task", id="test")
         
@@ -1136,3 +1141,91 @@ class TestChatServiceErrorCases:
         
         # Should filter out empty content tasks
         assert len(result) <= 1
+
+
+@pytest.mark.unit
+class TestTaskSummaryOverlap:
+    """The task card summary runs alongside decomposition on a reused agent."""
+
+    @staticmethod
+    def slow_summary_agent(delay: float) -> MagicMock:
+        async def astep(prompt):
+            await asyncio.sleep(delay)
+            response = MagicMock()
+            response.msgs[0].content = "Report|Write the quarterly report"
+            return response
+
+        agent = MagicMock()
+        agent.astep = AsyncMock(side_effect=astep)
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_summary_overlaps_decomposition(self, sample_chat_data, mock_request):
+        options = Chat(**sample_chat_data)
+        task_lock = TaskLock("overlap_project", asyncio.Queue(), {})
+        await task_lock.put_queue(ActionImproveData(data=options.question))
+        events = []
+
+        async def astep(prompt):
+            events.append("summary started")
+            response = MagicMock()
+            response.msgs[0].content = "Script|Create a simple Python script"
+            return response
+
+        def make_sub_tasks(task, context, on_stream_batch, on_stream_text):
+            events.append("decomposition started")
+            time.sleep(0.2)
+            events.append("decomposition finished")
+            return []
+
+        summary_agent = MagicMock()
+        summary_agent.astep = AsyncMock(side_effect=astep)
+        mock_workforce = MagicMock()
+        mock_workforce.eigent_make_sub_tasks.side_effect = make_sub_tasks
+
+        async def until_task_card():
+            async for response in step_solve(options, mock_request, task_lock):
+                if '"to_sub_tasks"' in response:
+                    return response
+
+        with patch("app.service.chat_service.construct_workforce", return_value=(mock_workforce, MagicMock())), \
+             patch("app.service.chat_service.question_confirm_agent", return_value=MagicMock()), \
+             patch("app.service.chat_service.question_confirm", return_value=True), \
+             patch("app.service.chat_service.fetch_memory_context", return_value=""), \
+             patch("app.service.chat_service.task_summary_agent", return_value=summary_agent):
+            task_card = await asyncio.wait_for(until_task_card(), timeout=5)
+
+        assert "Script|Create a simple Python script" in task_card
+        assert events.index("summary started") < events.index("decomposition finished")
+
+    @pytest.mark.asyncio
+    async def test_summary_agent_is_created_once_per_project(self, sample_chat_data):
+        options = Chat(**sample_chat_data)
+        task_lock = TaskLock("reuse_project", asyncio.Queue(), {})
+        agent = self.slow_summary_agent(0)
+
+        with patch("app.service.chat_service.task_summary_agent", return_value=agent) as factory:
+            await generate_task_summary(task_lock, options, Task(content="First task", id="1"))
+            await generate_task_summary(task_lock, options, Task(content="Second task", id="2"))
+
+        factory.assert_called_once()
+        assert agent.reset.call_count == 2
+        assert task_lock.summary_generated is True
+
+    @pytest.mark.asyncio
+    async def test_slow_summary_falls_back_to_task_content(self, sample_chat_data):
+        options = Chat(**sample_chat_data)
+        task_lock = TaskLock("timeout_project", asyncio.Queue(), {})
+
+        with patch("app.service.chat_service.task_summary_agent", return_value=self.slow_summary_agent(1)), \
+             patch("app.service.chat_service.TASK_SUMMARY_TIMEOUT", 0.05):
+            summary = await generate_task_summary(task_lock, options, Task(content="x" * 100, id="slow"))
+            follow_up = await generate_task_summary(
+                task_lock,
+                options,
+                Task(content="y" * 150, id="slow"),
+                fallback_task_summary("Follow-up Task", "y" * 150, max_chars=100, keep_chars=97),
+            )
+
+        assert summary == "Task|" + "x" * 80 + "..."
+        assert follow_up == "Follow-up Task|" + "y" * 97 + "..."
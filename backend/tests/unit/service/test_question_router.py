@@ -0,0 +1,196 @@
+import sys
+from pathlib import Path
+
+# Add project root to sys.path to allow importing 'utils'
+project_root = str(Path(__file__).parents[4])
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.service.chat_service import build_conversation_context
+from app.service.question_router import (
+    CONTEXT_HEADER,
+    answer_directly,
+    build_routing_context,
+    classification_prompt,
+    classify_locally,
+    classify_with_agent,
+    estimate_tokens,
+    route_question,
+)
+from app.service.task import TaskLock
+
+# (query, is_complex) pairs the rules must get right without a model call
+LABELLED_QUERIES = [
+    ("hello", False),
+    ("Hi there!", False),
+    ("thanks a lot", False),
+    ("good morning", False),
+    ("hey, how are you doing today?", False),
+    ("who are you?", False),
+    ("What is the capital of France?", False),
+    ("what's the difference between a list and a tuple in python?", False),
+    ("Explain how photosynthesis works", False),
+    ("Who wrote Pride and Prejudice?", False),
+    ("why is the sky blue", False),
+    ("What did you mean by that?", False),
+    ("How many legs does a spider have?", False),
+    ("tell me a joke", False),
+    ("Create a web application with authentication", True),
+    ("write a python script that renames my photos by date", True),
+    ("Please search for the best hiking trails near Seattle", True),
+    ("can you build me a landing page for my bakery", True),
+    ("Summarize https://example.com/article for me", True),
+    ("Download the quarterly report and extract the tables", True),
+    ("I need you to analyze this sales data and make a chart", True),
+    ("Fix the failing tests in my repo", True),
+    ("book a table for two at 7pm", True),
+    ("Generate a 10-slide presentation about climate change", True),
+    ("send an email to the team about tomorrow's meeting", True),
+    ("What is the latest news about the Mars rover?", True),
+    ("find flights from Paris to Tokyo next week", True),
+    ("look up the population of Canada", True),
+    ("could you draft a cover letter for a data scientist role", True),
+    ("What's the weather today in Berlin?", True),
+]
+
+# Queries the rules must hand to the model instead of guessing
+AMBIGUOUS_QUERIES = [
+    "how do I create a virtual environment in python?",
+    "The chart from before looks off, the axis labels are wrong",
+    "which files did you generate last time?",
+    "I have 3 apples and eat one, and my friend gives me five more, so with my sister joining we"
+    " split them evenly between the three of us, how many apples does each of us end up with?",
+    # Confirmations of a proposed plan are tasks, not greetings
+    "ok do it",
+    "ok, do it",
+    "great, can you do it?",
+    # Filenames are artifacts, and past events need fresh information
+    "how are the sales figures in q3.xlsx",
+    "what does report_final.pdf say about churn",
+    "who won the game last night",
+]
+
+
+class FakeAgent:
+    """Question agent stand-in that keeps a chat memory and counts input tokens per step."""
+
+    def __init__(self, reply: str = "no"):
+        self.reply = reply
+        self.memory: list[str] = []
+        self.input_tokens: list[int] = []
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+        self.memory.clear()
+
+    def step(self, prompt: str):
+        self.input_tokens.append(sum(estimate_tokens(m) for m in self.memory) + estimate_tokens(prompt))
+        self.memory += [prompt, self.reply]
+        return SimpleNamespace(msgs=[SimpleNamespace(content=self.reply)])
+
+
+def make_task_lock(turns: int = 0) -> TaskLock:
+    task_lock = TaskLock("router_project", None, {})
+    for i in range(turns):
+        task_lock.add_conversation(
+            "task_result",
+            {"task_content": f"task {i}", "task_result": f"result {i} " + "x" * 2000, "working_directory": ""},
+        )
+    return task_lock
+
+
+@pytest.mark.unit
+class TestQuestionRouter:
+    def test_labelled_queries_route_correctly(self):
+        decisions = [(query, expected, classify_locally(query)) for query, expected in LABELLED_QUERIES]
+        wrong = [(query, expected) for query, expected, decision in decisions if decision and decision.is_complex != expected]
+        undecided = [query for query, _, decision in decisions if decision is None]
+
+        assert wrong == []
+        assert undecided == []
+
+    def test_ambiguous_queries_go_to_the_model(self):
+        assert [query for query in AMBIGUOUS_QUERIES if classify_locally(query) is not None] == []
+
+    def test_routing_context_keeps_newest_entries_within_budget(self):
+        task_lock = make_task_lock(turns=20)
+        task_lock.add_conversation("user", "what is a tuple?")
+        task_lock.add_conversation("assistant", "An immutable sequence.")
+
+        context = build_routing_context(task_lock, max_tokens=500)
+
+        assert context.startswith(CONTEXT_HEADER)
+        assert estimate_tokens(context) <= 500
+        assert "User: what is a tuple?\nAssistant: An immutable sequence." in context
+        assert "task 19" in context and "task 0" not in context
+        assert build_routing_context(make_task_lock(), max_tokens=500) == ""
+
+    def test_model_tier_is_stateless(self):
+        agent = FakeAgent(reply="yes")
+        task_lock = make_task_lock(turns=20)
+
+        for _ in range(3):
+            decision = classify_with_agent(agent, AMBIGUOUS_QUERIES[0], task_lock)
+
+        assert decision.is_complex and decision.tier == "llm"
+        assert agent.resets == 3
+        assert agent.input_tokens[0] == agent.input_tokens[-1]
+        assert agent.input_tokens[0] <= 1500 + estimate_tokens(classification_prompt(AMBIGUOUS_QUERIES[0]))
+
+    def test_model_errors_route_to_complex(self):
+        agent = FakeAgent()
+        agent.step = lambda prompt: (_ for _ in ()).throw(RuntimeError("model down"))
+
+        assert classify_with_agent(agent, "anything", make_task_lock()).is_complex
+
+    def test_tokens_saved_per_turn(self):
+        """Replay a 30-turn conversation through the old and the new routing and compare input tokens."""
+        queries = [query for query, _ in LABELLED_QUERIES[:26]] + AMBIGUOUS_QUERIES
+
+        def replay(route) -> list[int]:
+            agent = FakeAgent()
+            task_lock = make_task_lock()
+            per_turn = []
+            for turn, query in enumerate(queries):
+                before = sum(agent.input_tokens)
+                is_complex = route(agent, query, task_lock)
+                if is_complex:
+                    task_lock.add_conversation(
+                        "task_result", {"task_content": query, "task_result": "done " + "x" * 2000, "working_directory": ""}
+                    )
+                else:
+                    task_lock.add_conversation("user", query)
+                    task_lock.add_conversation("assistant", f"answer {turn}")
+                per_turn.append(sum(agent.input_tokens) - before)
+            return per_turn
+
+        def legacy_route(agent, query, task_lock):
+            # Previous behaviour: full history prepended, persistent agent memory, every turn
+            context = build_conversation_context(task_lock, header=CONTEXT_HEADER)
+            is_complex = "yes" in agent.step(classification_prompt(query, context)).msgs[0].content
+            is_complex = dict(LABELLED_QUERIES).get(query, is_complex)
+            if not is_complex:
+                agent.step(f"{context}User Query: {query}\n\nProvide a direct, helpful answer to this simple question.")
+            return is_complex
+
+        def new_route(agent, query, task_lock):
+            is_complex = route_question(agent, query, task_lock).is_complex
+            if not is_complex:
+                answer_directly(agent, query, task_lock)
+            return is_complex
+
+        legacy, new = replay(legacy_route), replay(new_route)
+        model_calls = sum(classify_locally(query) is None for query in queries)
+        print(
+            f"\n{len(queries)} turns, {model_calls} routed by the model: "
+            f"legacy {sum(legacy)} input tokens (last turn {legacy[-1]}), "
+            f"new {sum(new)} (last turn {new[-1]}), saved {1 - sum(new) / sum(legacy):.0%}"
+        )
+
+        assert sum(new) < sum(legacy) / 10
+        assert max(new) <= 2 * (4000 + 1500)
@@ -49,6 +49,8 @@ from app.service.task import (
     set_process_task,
     process_task,
     _periodic_cleanup,
+    estimate_task_lock_bytes,
+    evict_stale_task_locks,
     task_index,
 )
 from camel.tasks import Task
@@ -360,6 +362,34 @@ class TestTaskLockManagement:
         assert task_id not in task_locks
         assert task.cancelled()
 
+    @pytest.mark.asyncio
+    async def test_delete_task_lock_clears_project_usage(self):
+        """Deleting a project's lock drops its recorded usage and budget."""
+        from app.component.cost_tracker import TokenUsage, cost_tracker
+
+        task_id = "usage_project"
+        create_task_lock(task_id)
+        cost_tracker.set_budget(task_id, 1.0)
+        cost_tracker.record(TokenUsage(
+            provider="openai", model="gpt-4o", input_tokens=10, output_tokens=1, cost_usd=0.1, project_id=task_id
+        ))
+
+        await delete_task_lock(task_id)
+
+        assert cost_tracker.project_usage(task_id) is None
+        assert not cost_tracker.over_budget(task_id)
+
+    @pytest.mark.asyncio
+    async def test_delete_task_lock_forgets_terminal_log_dirs(self):
+        from app.utils.terminal_stream import terminal_log_dirs
+
+        create_task_lock("terminal_project")
+        terminal_log_dirs.setdefault("terminal_project", set()).add("/tmp/terminal_logs")
+
+        await delete_task_lock("terminal_project")
+
+        assert "terminal_project" not in terminal_log_dirs
+
     @pytest.mark.asyncio
     async def test_delete_task_lock_not_found(self):
         """Test deleting task lock that doesn't exist."""
@@ -544,6 +574,107 @@ class TestPeriodicCleanup:
             mock_logger.assert_called()
 
 
+@pytest.mark.unit
+class TestTaskLockEviction:
+    """Test cases for TTL and memory-budget eviction of task locks."""
+
+    def setup_method(self):
+        task_locks.clear()
+
+    @pytest.fixture(autouse=True)
+    def spill_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TASK_LOCK_SPILL_DIR", str(tmp_path))
+        monkeypatch.setenv("TASK_LOCK_TTL_SECONDS", "7200")
+        monkeypatch.setenv("TASK_LOCK_MIN_IDLE_SECONDS", "300")
+        monkeypatch.setenv("TASK_LOCK_MEMORY_BUDGET_MB", "256")
+        return tmp_path
+
+    @pytest.mark.asyncio
+    async def test_ttl_eviction_spills_and_rehydrates(self, spill_dir):
+        stale = create_task_lock("stale_project")
+        stale.add_conversation("user", "build me a website")
+        stale.last_task_result = "done"
+        stale.last_accessed = datetime.now() - timedelta(hours=3)
+        create_task_lock("fresh_project")
+
+        assert await evict_stale_task_locks() == ["stale_project"]
+        assert set(task_locks) == {"fresh_project"}
+        assert (spill_dir / "stale_project.json").exists()
+
+        returning = create_task_lock("stale_project")
+        assert [entry["content"] for entry in returning.conversation_history] == ["build me a website"]
+        assert returning.last_task_result == "done"
+        assert not (spill_dir / "stale_project.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_usage_and_budget_survive_eviction(self):
+        from app.component.cost_tracker import TokenUsage, cost_tracker
+
+        stale = create_task_lock("spent_project")
+        stale.last_accessed = datetime.now() - timedelta(hours=3)
+        cost_tracker.set_budget("spent_project", 1.0)
+        cost_tracker.record(TokenUsage(
+            provider="openai", model="gpt-4o", input_tokens=10, output_tokens=1, cost_usd=1.5,
+            project_id="spent_project", agent_name="developer_agent",
+        ))
+
+        assert await evict_stale_task_locks() == ["spent_project"]
+        assert cost_tracker.project_usage("spent_project") is None
+
+        get_task_lock("spent_project")
+        usage = cost_tracker.project_usage("spent_project")
+        assert usage["total_cost_usd"] == 1.5 and usage["budget_usd"] == 1.0
+        assert usage["by_agent"]["developer_agent"]["calls"] == 1
+        assert cost_tracker.over_budget("spent_project")
+        cost_tracker.clear("spent_project")
+
+    def test_follow_up_after_eviction_rehydrates(self, spill_dir):
+        from app.controller.chat_controller import improve
+
+        stale = create_task_lock("stale_project")
+        stale.add_conversation("user", "build me a website")
+        stale.status = Status.done
+        stale.last_accessed = datetime.now() - timedelta(hours=3)
+        assert asyncio.run(evict_stale_task_locks()) == ["stale_project"]
+
+        improve("stale_project", SupplementChat(question="now add a blog"))
+
+        returning = task_locks["stale_project"]
+        assert [entry["content"] for entry in returning.conversation_history] == ["build me a website"]
+        queued = returning.queue.get_nowait()
+        assert queued.action == Action.improve and queued.data == "now add a blog"
+        assert not (spill_dir / "stale_project.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_busy_locks_are_kept(self):
+        old = datetime.now() - timedelta(hours=3)
+        streaming = create_task_lock("streaming")
+        streaming.waiting_consumers = 1
+        processing = create_task_lock("processing")
+        processing.status = Status.processing
+        queued = create_task_lock("queued")
+        await queued.put_queue(ActionEndData())
+        for lock in (streaming, processing, queued):
+            lock.last_accessed = old
+
+        assert await evict_stale_task_locks() == []
+        assert len(task_locks) == 3
+
+    @pytest.mark.asyncio
+    async def test_memory_budget_evicts_least_recently_used_first(self, monkeypatch):
+        monkeypatch.setenv("TASK_LOCK_MEMORY_BUDGET_MB", str(2.5 / 1024))  # 2.5 KB, room for two locks
+        for minutes, name in ((30, "oldest"), (20, "older"), (10, "recent")):
+            lock = create_task_lock(name)
+            lock.add_conversation("assistant", "x" * 700)
+            lock.last_accessed = datetime.now() - timedelta(minutes=minutes)
+        hot = create_task_lock("hot")
+        hot.add_conversation("assistant", "x" * 700)
+
+        assert estimate_task_lock_bytes(hot) > 700
+        assert await evict_stale_task_locks() == ["oldest", "older"]
+        assert set(task_locks) == {"recent", "hot"}
+
+
 @pytest.mark.integration
 class TestTaskServiceIntegration:
     """Integration tests for task service components."""
@@ -28,6 +28,7 @@ from app.utils.agent import (
     get_mcp_tools
 )
 from app.model.chat import Chat, McpServers
+from camel.models import ModelProcessingError
 from app.service.task import ActionActivateAgentData, ActionDeactivateAgentData
 
 
@@ -105,6 +106,111 @@ class TestListenChatAgent:
                 # Should queue activation notification
                 mock_task_lock.put_queue.assert_called()
 
+    def test_listen_chat_agent_step_stops_at_local_budget(self, mock_task_lock):
+        """Once the project spent its budget, steps pause the workforce instead of calling the model."""
+        from app.component.cost_tracker import TokenUsage, cost_tracker
+        from app.service.task import ActionBudgetNotEnough
+
+        api_task_id = "budget_project"
+        cost_tracker.set_budget(api_task_id, 0.01)
+        cost_tracker.record(TokenUsage(
+            provider="openai", model="gpt-4o", input_tokens=5000, output_tokens=100, cost_usd=0.02, project_id=api_task_id
+        ))
+
+        with patch('app.utils.agent.get_task_lock', return_value=mock_task_lock), \
+             patch('camel.models.ModelFactory.create') as mock_create_model, \
+             patch('asyncio.create_task'):
+            mock_create_model.return_value = MagicMock(model_type="gpt-4o")
+            agent = ListenChatAgent(api_task_id=api_task_id, agent_name="TestAgent", model="gpt-4o")
+
+            with patch.object(ChatAgent, 'step') as mock_parent_step, \
+                 pytest.raises(ModelProcessingError, match="Budget has been exceeded"):
+                agent.step("Test input message")
+
+        cost_tracker.clear(api_task_id)
+        mock_parent_step.assert_not_called()
+        queued = [call.args[0] for call in mock_task_lock.put_queue.call_args_list]
+        assert any(isinstance(item, ActionBudgetNotEnough) for item in queued)
+
+    def test_memory_compaction_bounds_tokens_per_step(self, tmp_path, monkeypatch):
+        """Replaying a long browser session, old page snapshots are compacted and stay readable."""
+        import json
+
+        from camel.memories import ChatHistoryMemory, MemoryRecord, ScoreBasedContextCreator
+        from camel.messages import FunctionCallingMessage
+        from camel.models import ModelFactory
+        from camel.models.stub_model import StubTokenCounter
+        from camel.types import ModelPlatformType, ModelType, OpenAIBackendRole, RoleType
+
+        from app.component.tool_result_store import ToolResultStore
+
+        class CharTokenCounter(StubTokenCounter):
+            def count_tokens_from_messages(self, messages):
+                return len(json.dumps(messages)) // 4
+
+        monkeypatch.setenv("MEMORY_COMPACTION_TOKENS", "8000")
+        monkeypatch.setenv("MEMORY_COMPACTION_KEEP_RESULTS", "2")
+
+        def replay(store):
+            memory = ChatHistoryMemory(ScoreBasedContextCreator(CharTokenCounter(), 10_000_000))
+            agent = ListenChatAgent(
+                "compaction_project", "browser_agent", "You browse the web.",
+                model=ModelFactory.create(ModelPlatformType.OPENAI, ModelType.STUB), memory=memory,
+            )
+            agent.tool_result_store = store
+            agent.update_memory(BaseMessage.make_user_message("user", "Compare the pricing pages"), OpenAIBackendRole.USER)
+            tokens_per_step = []
+            for turn in range(20):
+                snapshot = f"- page {turn}\n" + "\n".join(f'- link "item {turn}-{i}" [ref=e{i}]' for i in range(800))
+                for role, result in ((OpenAIBackendRole.ASSISTANT, None), (OpenAIBackendRole.FUNCTION, snapshot)):
+                    agent.memory.write_record(MemoryRecord(
+                        message=FunctionCallingMessage(
+                            role_name="browser_agent", role_type=RoleType.ASSISTANT, meta_dict=None, content="",
+                            func_name="browser_get_page_snapshot", args={}, result=result, tool_call_id=f"call_{turn}",
+                        ),
+                        role_at_backend=role,
+                    ))
+                tokens_per_step.append(agent._get_context_with_summarization()[1])
+            return agent, tokens_per_step, snapshot
+
+        _, uncompacted, _ = replay(None)
+        agent, compacted, last_snapshot = replay(ToolResultStore(tmp_path / "tool_results"))
+
+        assert uncompacted[-1] > 100_000
+        assert max(compacted) < 20_000
+        assert sum(compacted) < sum(uncompacted) / 4
+        # The two latest snapshots stay verbatim, older ones point at the store
+        results = [record.memory_record.message.result for record in agent.memory.retrieve()
+                   if record.memory_record.role_at_backend == OpenAIBackendRole.FUNCTION]
+        assert results[-1] == last_snapshot
+        handle = results[0].split()[3].rstrip(":")
+        full = agent.tool_result_store.get(handle)
+        assert full.startswith("- page 0\n") and len(full) > 20_000
+
+    def test_memory_compaction_skips_rescans_until_memory_grows(self, tmp_path, monkeypatch):
+        """Over the threshold with nothing to compact, memory is neither copied nor rescanned every call."""
+        from camel.models import ModelFactory
+        from camel.types import ModelPlatformType, ModelType
+
+        from app.component.tool_result_store import ToolResultStore, compact_tool_results
+
+        monkeypatch.setenv("MEMORY_COMPACTION_TOKENS", "100")
+        agent = ListenChatAgent(
+            "compaction_project", "browser_agent", "You browse the web.",
+            model=ModelFactory.create(ModelPlatformType.OPENAI, ModelType.STUB),
+        )
+        agent.tool_result_store = ToolResultStore(tmp_path)
+        storage = agent.memory._chat_history_block.storage
+
+        with patch.object(storage, "load", side_effect=AssertionError("memory copied")), \
+             patch("app.utils.agent.compact_tool_results", wraps=compact_tool_results) as mock_compact:
+            assert agent._compact_memory(5000) is False
+            assert agent._compact_memory(5000) is False
+            assert agent._compact_memory(4000) is False
+            assert mock_compact.call_count == 1
+            assert agent._compact_memory(6000) is False
+            assert mock_compact.call_count == 2
+
     def test_listen_chat_agent_step_with_base_message_input(self, mock_task_lock):
         """Test ListenChatAgent step method with BaseMessage input."""
         api_task_id = "test_api_task_123"
@@ -283,9 +389,52 @@ class TestListenChatAgent:
                 assert result is mock_record
                 mock_record_func.assert_called_once()
                 
-                # Should queue toolkit activation and deactivation notifications  
+                # Should queue toolkit activation and deactivation notifications
                 assert mock_task_lock.put_queue.call_count >= 2
 
+    @pytest.mark.asyncio
+    async def test_oversized_tool_results_are_spilled(self, mock_task_lock, tmp_path, monkeypatch):
+        """The model gets a head/tail excerpt and a handle; read_tool_result pages through the rest."""
+        from app.component.tool_result_store import ToolResultStore
+
+        monkeypatch.setenv("TOOL_RESULT_SPILL_CHARS", "10000")
+        log = "\n".join(f"line {i}: {'ERROR disk full' if i == 4000 else 'ok'}" for i in range(6000))
+
+        async def shell_exec(command: str) -> str:
+            """Run a shell command.
+
+            Args:
+                command (str): The command.
+            """
+            return log
+
+        with patch('app.utils.agent.get_task_lock', return_value=mock_task_lock), \
+             patch('camel.models.ModelFactory.create') as mock_create_model:
+            mock_create_model.return_value = MagicMock(model_type="gpt-4")
+            agent = ListenChatAgent(api_task_id="spill_project", agent_name="TestAgent", model="gpt-4")
+            agent.tool_result_store = ToolResultStore(tmp_path / "tool_results")
+            read_tool = agent.tool_result_store.read_tool_result_tool()
+            agent._internal_tools = {"shell_exec": FunctionTool(shell_exec), "read_tool_result": read_tool}
+
+            with patch.object(agent, '_record_tool_calling') as mock_record_func:
+                await agent._aexecute_tool(ToolCallRequest(tool_name="shell_exec", args={"command": "cat app.log"}, tool_call_id="c1"))
+                excerpt = mock_record_func.call_args.args[2]
+                handle = excerpt.split()[3].rstrip(":")
+
+                assert len(excerpt) < 4000
+                assert excerpt.startswith(f"[Stored tool result {handle}: {len(log)} chars")
+                assert "line 0: ok" in excerpt and excerpt.endswith("line 5999: ok")
+
+                # Pages of the stored payload are never spilled again
+                await agent._aexecute_tool(ToolCallRequest(
+                    tool_name="read_tool_result", args={"handle": handle, "length": 100000}, tool_call_id="c2"
+                ))
+                page = mock_record_func.call_args.args[2]
+                assert page.startswith("[chars 0-16000 of") and "continue with offset=16000" in page
+
+        assert read_tool(handle=handle, grep="error") == f"4001 (offset {log.index('line 4000')}): line 4000: ERROR disk full"
+        assert read_tool(handle=handle, offset=len(log) - 13) == f"[chars {len(log) - 13}-{len(log)} of {len(log)}]\nline 5999: ok"
+
     def test_listen_chat_agent_clone(self, mock_task_lock):
         """Test ListenChatAgent clone method."""
         api_task_id = "test_api_task_123"
@@ -341,6 +490,56 @@ class TestListenChatAgent:
                 assert result is cloned_agent
                 mock_clone_constructor.assert_called_once()
 
+    def test_listen_chat_agent_clone_shares_tool_schemas(self, mock_task_lock):
+        """Clones share validated schemas; only per-session toolkits are cloned."""
+
+        class SessionToolkit:
+            def __init__(self, session_id="main"):
+                self.session_id = session_id
+
+            def clone_for_new_session(self, new_session_id):
+                return SessionToolkit(new_session_id)
+
+            def open_page(self, url: str) -> str:
+                r"""Open a page.
+
+                Args:
+                    url (str): Page URL.
+                """
+                return self.session_id
+
+        def add(a: int, b: int) -> int:
+            r"""Add two numbers.
+
+            Args:
+                a (int): First number.
+                b (int): Second number.
+            """
+            return a + b
+
+        session_toolkit = SessionToolkit()
+        tools = [FunctionTool(add), FunctionTool(session_toolkit.open_page)]
+
+        with patch('app.utils.agent.get_task_lock', return_value=mock_task_lock), \
+             patch('camel.models.ModelFactory.create') as mock_create_model:
+            mock_backend = MagicMock(spec=BaseModelBackend)
+            mock_backend.model_type = "gpt-4"
+            mock_create_model.return_value = mock_backend
+            agent = ListenChatAgent(api_task_id="test_api_task_123", agent_name="TestAgent", model="gpt-4", tools=tools)
+
+            with patch.object(FunctionTool, 'validate_openai_tool_schema') as mock_validate:
+                cloned = agent.clone()
+                grandchild = cloned.clone()
+            mock_validate.assert_not_called()
+
+        for clone in (cloned, grandchild):
+            assert clone._internal_tools["add"].func is add
+            assert clone._internal_tools["add"].openai_tool_schema is tools[0].openai_tool_schema
+            assert clone._internal_tools["open_page"].openai_tool_schema is tools[1].openai_tool_schema
+            assert clone._internal_tools["open_page"].func.__self__ is not session_toolkit
+        assert cloned._internal_tools["open_page"].func.__self__ is not grandchild._internal_tools["open_page"].func.__self__
+        assert agent._internal_tools["add"] is tools[0]
+
     def test_listen_chat_agent_with_tools(self, mock_task_lock):
         """Test ListenChatAgent with tools."""
         api_task_id = "test_api_task_123"
@@ -414,7 +613,7 @@ class TestAgentFactoryFunctions:
         # Setup task lock in the registry before calling agent_model
         from app.service.task import task_locks
         mock_task_lock = MagicMock()
-        task_locks[options.task_id] = mock_task_lock
+        task_locks[options.project_id] = mock_task_lock
 
         with patch('app.utils.agent.ListenChatAgent') as mock_listen_agent, \
              patch('app.utils.agent.ModelFactory.create') as mock_model_factory, \
@@ -430,6 +629,57 @@ class TestAgentFactoryFunctions:
             assert result is mock_agent
             mock_listen_agent.assert_called_once()
 
+    def test_auxiliary_agents_are_routed_to_cheaper_models(self, sample_chat_data):
+        """Auxiliary roles use the cheapest capable model of their own project, the chat's included."""
+        from app.component.model_adapter import UniversalModelAdapter
+        from app.service.task import TaskLock, task_locks
+
+        extra_params = {
+            "models": [{
+                "provider": "budget",
+                "url": "https://budget.example/v1",
+                "api_key": "budget-key",
+                "models": ["mini"],
+                "capabilities": {"latency_class": "fast", "cost_per_million_tokens": 0.2},
+            }],
+            "model_routes": {"task_summary_agent": "default"},
+        }
+        options = Chat(**{**sample_chat_data, "extra_params": extra_params})
+        other_project = Chat(**{**sample_chat_data, "project_id": "other_project"})
+        cheap_chat_model = Chat(**{
+            **sample_chat_data, "project_id": "cheap_chat_project", "model_type": "gpt-5-nano", "extra_params": extra_params
+        })
+        chats = (options, other_project, cheap_chat_model)
+        for chat in chats:
+            task_locks[chat.project_id] = TaskLock(chat.project_id, asyncio.Queue(), {})
+
+        try:
+            with patch('app.utils.agent.ListenChatAgent', side_effect=lambda *args, **kwargs: MagicMock()) as mock_listen_agent, \
+                 patch('app.utils.agent.ModelFactory.create') as mock_model_factory, \
+                 patch.object(UniversalModelAdapter, 'create_model') as mock_create_model, \
+                 patch('asyncio.create_task'):
+                question_agent = question_confirm_agent(options)
+                task_summary_agent(options)
+                agent_model("developer_agent", "Prompt", options)
+                other_project_agent = question_confirm_agent(other_project)
+                cheap_chat_model_agent = question_confirm_agent(cheap_chat_model)
+
+            assert question_agent.routed_model == ("budget", "mini")
+            assert question_agent.model_registry is task_locks[options.project_id].model_registry
+            assert mock_listen_agent.call_args_list[0].kwargs["model"] is mock_create_model.return_value
+            # Registered models stay in their project, and lose to a cheaper chat model
+            assert other_project_agent.routed_model is None
+            assert task_locks[other_project.project_id].model_registry.list_providers() == []
+            assert cheap_chat_model_agent.routed_model is None
+            # Overridden to the chat's model, worker roles never route
+            assert mock_create_model.call_count == 1
+            assert mock_model_factory.call_count == 4
+            for call in mock_model_factory.call_args_list:
+                assert "models" not in (call.kwargs["model_config_dict"] or {})
+        finally:
+            for chat in chats:
+                task_locks.pop(chat.project_id, None)
+
     def test_question_confirm_agent_creation(self, sample_chat_data):
         """Test question_confirm_agent creates specialized agent."""
         options = Chat(**sample_chat_data)
@@ -0,0 +1,171 @@
+import sys
+from pathlib import Path
+
+# Add project root to sys.path to allow importing 'utils'
+project_root = str(Path(__file__).parents[4])
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import asyncio
+import json
+import time
+
+import pytest
+import pytest_asyncio
+import websockets
+
+from app.utils.toolkit import hybrid_browser_toolkit
+from app.utils.toolkit.hybrid_browser_toolkit import MultiplexedBrowserServer, WebSocketConnectionPool
+
+START_DELAY = 0.3
+
+
+@pytest_asyncio.fixture
+async def fake_server():
+    """Local WebSocket server standing in for the node browser server."""
+
+    async def handler(websocket):
+        async for _ in websocket:
+            pass
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        yield server.sockets[0].getsockname()[1]
+
+
+@pytest.fixture
+def fake_wrapper(fake_server, monkeypatch):
+    """Wrapper whose start() takes START_DELAY (like spawning node) and connects to the fake server."""
+    started = []
+
+    class FakeWrapper:
+        def __init__(self, config):
+            self.config = dict(config)
+            self.session_id = self.config.get("session_id")
+            self.websocket = None
+
+        async def start(self):
+            started.append(self.session_id)
+            await asyncio.sleep(START_DELAY)
+            self.websocket = await websockets.connect(f"ws://127.0.0.1:{fake_server}")
+
+        async def stop(self):
+            if self.websocket:
+                await self.websocket.close()
+                self.websocket = None
+
+    monkeypatch.setattr(hybrid_browser_toolkit, "WebSocketBrowserWrapper", FakeWrapper)
+    return started
+
+
+@pytest.mark.unit
+class TestWebSocketConnectionPool:
+    @pytest.mark.asyncio
+    async def test_sessions_start_in_parallel(self, fake_wrapper):
+        pool = WebSocketConnectionPool(prewarm_size=0, idle_timeout=0)
+        sessions = [f"s{i}" for i in range(6)]
+
+        begin = time.perf_counter()
+        wrappers = await asyncio.gather(*(pool.get_connection(sid, {"session_id": sid}) for sid in sessions))
+        elapsed = time.perf_counter() - begin
+
+        assert elapsed < START_DELAY * 3, f"sessions were serialized ({elapsed:.2f}s)"
+        assert [w.session_id for w in wrappers] == sessions
+        assert pool.stats()["connections"] == 6
+        assert pool.stats()["connect_avg_ms"] >= START_DELAY * 1000 * 0.9
+        await pool.close_all()
+        assert pool.stats()["connections"] == 0
+
+    @pytest.mark.asyncio
+    async def test_same_session_starts_once(self, fake_wrapper):
+        pool = WebSocketConnectionPool(prewarm_size=0, idle_timeout=0)
+
+        wrappers = await asyncio.gather(*(pool.get_connection("same", {"session_id": "same"}) for _ in range(5)))
+
+        assert fake_wrapper == ["same"]
+        assert all(w is wrappers[0] for w in wrappers)
+        assert pool.stats()["reused"] == 4
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_prewarmed_wrapper_is_handed_to_new_session(self, fake_wrapper):
+        pool = WebSocketConnectionPool(prewarm_size=1, idle_timeout=0)
+        config = {"session_id": "main", "headless": True}
+        await pool.get_connection("main", config)
+        await pool.prewarm(config)
+        assert pool.stats()["prewarmed"] == 1
+
+        begin = time.perf_counter()
+        clone = await pool.get_connection("clone", {**config, "session_id": "clone"})
+
+        assert time.perf_counter() - begin < START_DELAY
+        assert clone.session_id == "clone" and clone.config["session_id"] == "clone"
+        assert pool.stats()["prewarm_hits"] == 1
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_idle_connections_are_evicted(self, fake_wrapper):
+        pool = WebSocketConnectionPool(prewarm_size=0, idle_timeout=0)
+        wrapper = await pool.get_connection("idle", {"session_id": "idle"})
+
+        assert await pool.evict_idle(max_idle=60) == 0
+        assert await pool.evict_idle(max_idle=0) == 1
+        assert wrapper.websocket is None
+        assert pool.stats()["connections"] == 0
+
+
+@pytest_asyncio.fixture
+async def fake_multiplex_server():
+    """Local WebSocket server speaking the multiplexed protocol: replies echo the session a command ran in."""
+    received = []
+
+    async def handler(websocket):
+        async def reply(data):
+            await asyncio.sleep(0.1)
+            result = {"session_id": data["session_id"], "command": data["command"]}
+            await websocket.send(json.dumps({"id": data["id"], "session_id": data["session_id"], "success": True, "result": result}))
+
+        async for message in websocket:
+            data = json.loads(message)
+            received.append((data.get("session_id"), data["command"]))
+            asyncio.ensure_future(reply(data))
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        yield server.sockets[0].getsockname()[1], received
+
+
+@pytest.mark.unit
+class TestMultiplexedBrowserSessions:
+    @pytest.mark.asyncio
+    async def test_cdp_sessions_share_one_server(self, fake_multiplex_server, monkeypatch):
+        port, received = fake_multiplex_server
+        server_starts = []
+
+        async def fake_start(self):
+            server_starts.append(self)
+            self.websocket = await websockets.connect(f"ws://127.0.0.1:{port}")
+            self._receive_task = asyncio.create_task(self._receive_loop())
+
+        monkeypatch.setattr(MultiplexedBrowserServer, "start", fake_start)
+        pool = WebSocketConnectionPool(prewarm_size=1, idle_timeout=0, multiplex=True)
+        config = {"connectOverCdp": True, "cdpUrl": "http://localhost:9222"}
+
+        wrappers = await asyncio.gather(
+            *(pool.get_connection(f"s{i}", {**config, "session_id": f"s{i}"}) for i in range(4))
+        )
+        results = await asyncio.gather(*(w._send_command("visit_page", {"url": "x"}) for w in wrappers))
+
+        assert len(server_starts) == 1
+        assert [r["session_id"] for r in results] == ["s0", "s1", "s2", "s3"]
+        assert sorted(s for s, command in received if command == "init") == ["s0", "s1", "s2", "s3"]
+        stats = pool.stats()
+        assert stats["multiplex_servers"] == 1 and stats["multiplexed_sessions"] == 4
+        assert stats["prewarmed"] == 0
+
+        await pool.close_connection("s0")
+        assert ("s0", "close_session") in received
+        assert pool.stats()["multiplexed_sessions"] == 3
+
+        # A restarted server invalidates the sessions initialized on the old process
+        server_starts[0].generation += 1
+        assert wrappers[1].websocket is None
+        await pool.close_all()
@@ -0,0 +1,164 @@
+import sys
+from pathlib import Path
+
+# Add project root to sys.path to allow importing 'utils'
+project_root = str(Path(__file__).parents[4])
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import os
+import shutil
+import sqlite3
+import time
+
+import pytest
+
+from app.utils import cookie_manager as cookie_manager_module
+from app.utils.cookie_manager import CookieManager
+
+SCHEMA = """
+    CREATE TABLE cookies (
+        creation_utc INTEGER NOT NULL,
+        host_key TEXT NOT NULL,
+        name TEXT NOT NULL,
+        value TEXT NOT NULL,
+        path TEXT NOT NULL,
+        expires_utc INTEGER NOT NULL,
+        is_secure INTEGER NOT NULL,
+        is_httponly INTEGER NOT NULL,
+        last_access_utc INTEGER NOT NULL
+    );
+    CREATE UNIQUE INDEX cookies_unique_index ON cookies(host_key, name, path);
+"""
+
+
+def build_cookie_store(path: Path, domains: int, cookies_per_domain: int, value_size: int = 16) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    rows = (
+        (0, host, f"cookie{c}", "v" * value_size, "/", 0, 1, c % 2, 13_300_000_000_000_000 + d)
+        for d in range(domains)
+        for host in ([f"site{d}.com"] if d % 2 else [f"site{d}.com", f".www.site{d}.com"])
+        for c in range(cookies_per_domain)
+    )
+    conn.executemany("INSERT INTO cookies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def cookie_store(tmp_path):
+    build_cookie_store(tmp_path / "Cookies", domains=20, cookies_per_domain=3)
+    cookie_manager_module._domain_index_cache.clear()
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestCookieManager:
+    def test_reads_live_db_without_copy(self, cookie_store, monkeypatch):
+        monkeypatch.setattr(shutil, "copy2", lambda *args: pytest.fail("cookie store was copied"))
+        manager = CookieManager(str(cookie_store))
+
+        domains = manager.get_cookie_domains()
+        cookies = manager.get_cookies_for_domain("site0.com")
+
+        assert len(domains) == 30
+        assert {c["domain"] for c in cookies} == {"site0.com", ".www.site0.com"}
+        assert len(cookies) == 6
+        assert not os.path.exists(manager.cookies_db_path + ".tmp")
+
+    def test_pending_journal_disables_immutable_reads(self, cookie_store, monkeypatch):
+        uris = []
+        connect = sqlite3.connect
+        monkeypatch.setattr(sqlite3, "connect", lambda database, **kwargs: uris.append(database) or connect(database, **kwargs))
+        manager = CookieManager(str(cookie_store))
+
+        manager._get_cookies_connection().close()
+        (cookie_store / "Cookies-journal").write_bytes(b"")
+        manager._get_cookies_connection().close()
+        (cookie_store / "Cookies-journal").write_bytes(b"\0" * 512)
+        manager._get_cookies_connection().close()
+
+        assert ["immutable=1" in uri for uri in uris] == [True, True, False]
+
+    def test_domain_index_is_reused_until_db_changes(self, cookie_store, monkeypatch):
+        manager = CookieManager(str(cookie_store))
+        manager.get_cookie_domains()
+
+        opened = []
+        real_connect = manager._get_cookies_connection
+        monkeypatch.setattr(manager, "_get_cookies_connection", lambda: opened.append(1) or real_connect())
+
+        assert {d["domain"] for d in manager.search_cookies("SITE1")} >= {"site1.com", "site19.com", ".www.site18.com"}
+        assert opened == []
+
+        conn = sqlite3.connect(manager.cookies_db_path)
+        conn.execute("INSERT INTO cookies VALUES (0, 'new.org', 'a', 'b', '/', 0, 0, 0, 0)")
+        conn.commit()
+        conn.close()
+        os.utime(manager.cookies_db_path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+        assert manager.search_cookies("new.org")[0]["cookie_count"] == 1
+        assert opened == [1]
+
+    def test_batched_delete_defers_vacuum(self, cookie_store, monkeypatch):
+        scheduled = []
+        monkeypatch.setattr(cookie_manager_module.cookie_maintenance, "schedule", scheduled.append)
+        manager = CookieManager(str(cookie_store))
+
+        assert manager.delete_cookies_for_domains(["site0.com", "site1.com"])
+
+        remaining = {d["domain"] for d in manager.get_cookie_domains()}
+        assert not remaining & {"site0.com", ".www.site0.com", "site1.com"}
+        assert len(remaining) == 27
+        assert scheduled == [manager.cookies_db_path]
+
+    def test_maintenance_vacuums_after_idle(self, cookie_store):
+        manager = CookieManager(str(cookie_store))
+        maintenance = cookie_manager_module.CookieMaintenance(idle_seconds=0.05)
+        size_before = os.path.getsize(manager.cookies_db_path)
+        conn = sqlite3.connect(manager.cookies_db_path)
+        conn.execute("DELETE FROM cookies")
+        conn.commit()
+        conn.close()
+
+        maintenance.schedule(manager.cookies_db_path)
+        time.sleep(0.3)
+
+        assert os.path.getsize(manager.cookies_db_path) < size_before
+
+
+@pytest.mark.very_slow
+def test_benchmark_50mb_cookie_store(tmp_path):
+    """Compare copy-per-call reads with live read-only reads and the cached domain index on a 50 MB store."""
+    store = build_cookie_store(tmp_path / "Cookies", domains=5_000, cookies_per_domain=40, value_size=120)
+    assert os.path.getsize(store) >= 50 * 1024 * 1024
+    cookie_manager_module._domain_index_cache.clear()
+    manager = CookieManager(str(tmp_path))
+
+    def timed(fn, repeat=5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    def copy_and_scan():
+        shutil.copy2(store, str(store) + ".tmp")
+        conn = sqlite3.connect(str(store) + ".tmp")
+        conn.execute("SELECT host_key, COUNT(*) FROM cookies GROUP BY host_key").fetchall()
+        conn.close()
+        os.remove(str(store) + ".tmp")
+
+    copy_ms = timed(copy_and_scan)
+    cold_ms = timed(lambda: (cookie_manager_module._domain_index_cache.clear(), manager.get_cookie_domains()))
+    search_ms = timed(lambda: manager.search_cookies("site42"), repeat=50)
+    domain_ms = timed(lambda: manager.get_cookies_for_domain("site42.com"), repeat=50)
+    print(
+        f"\n50MB cookie store: copy+scan {copy_ms:.1f}ms, live index build {cold_ms:.1f}ms, "
+        f"cached search {search_ms:.2f}ms, domain lookup {domain_ms:.2f}ms"
+    )
+
+    assert search_ms < copy_ms / 10
+    assert domain_ms < copy_ms / 10
@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+
+# Add project root to sys.path to allow importing 'utils'
+project_root = str(Path(__file__).parents[4])
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import asyncio
+import io
+import logging
+import time
+
+import pytest
+
+from app.service import task as task_module
+from app.service.task import ActionEndData, TaskLock
+from utils.lazy_logging import LazyLogger, lazy, payload
+
+
+def make_logger(name: str) -> tuple[logging.Logger, io.StringIO]:
+    """A stdlib logger at DEBUG with a stream handler, like the loggers TraceRoot hands out."""
+    stream = io.StringIO()
+    logger = logging.getLogger(name)
+    logger.handlers = [logging.StreamHandler(stream)]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger, stream
+
+
+@pytest.mark.unit
+class TestLazyLogger:
+    def test_disabled_level_evaluates_nothing(self):
+        std, stream = make_logger("lazy_logging.disabled")
+        log = LazyLogger(std, level=logging.INFO)
+        calls = []
+
+        log.debug("value: %s", lazy(lambda: calls.append("arg")), extra=lambda: calls.append("extra") or {})
+
+        assert calls == []
+        assert stream.getvalue() == ""
+
+    def test_enabled_level_formats_lazily(self):
+        std, stream = make_logger("lazy_logging.enabled")
+        log = LazyLogger(std, level=logging.DEBUG)
+
+        log.debug("value: %s", lazy(lambda: 42), extra=lambda: {"task_id": "t1"})
+
+        assert stream.getvalue() == "value: 42\n"
+
+    def test_sampling_is_per_call_site(self):
+        std, stream = make_logger("lazy_logging.sampled")
+        log = LazyLogger(std, level=logging.DEBUG)
+
+        for i in range(7):
+            log.debug("event %d", i, every=3)
+            log.info("other %d", i)
+
+        lines = stream.getvalue().splitlines()
+        assert [line for line in lines if line.startswith("event")] == [
+            "event 0 [sampled 1/3]",
+            "event 3 [sampled 1/3]",
+            "event 6 [sampled 1/3]",
+        ]
+        assert len([line for line in lines if line.startswith("other")]) == 7
+
+    def test_payload_truncates_and_serializes(self):
+        assert str(payload({"query": "é"})) == '{"query": "é"}'
+        assert str(payload("x" * 30, limit=10)) == "xxxxxxxxxx... (30 chars)"
+        assert str(payload({"when": object}, limit=200)).startswith('{"when": "<class')
+
+
+@pytest.mark.very_slow
+def test_benchmark_queue_logging_overhead(monkeypatch):
+    """Logging overhead of 10k put_queue/get_queue round trips: eager stdlib logging vs. the facade."""
+    events = 10_000
+
+    async def round_trips():
+        task_lock = TaskLock("bench", asyncio.Queue(), {})
+        started = time.perf_counter()
+        for _ in range(events):
+            await task_lock.put_queue(ActionEndData())
+            await task_lock.get_queue()
+        return (time.perf_counter() - started) * 1000
+
+    class EagerLogger:
+        """The previous behaviour: every queue event built its `extra` and reached the handlers."""
+
+        def __init__(self, logger: logging.Logger):
+            self.logger = logger
+
+        def debug(self, msg, *args, every=1, extra=None, **kwargs):
+            self.logger.debug(msg, *args, extra=extra() if callable(extra) else extra, **kwargs)
+
+        def __getattr__(self, item):
+            return getattr(self.logger, item)
+
+    std, _ = make_logger("lazy_logging.bench")
+    variants = {
+        "no logging": LazyLogger(std, level=logging.CRITICAL + 1),
+        "eager DEBUG": EagerLogger(std),
+        "facade at INFO": LazyLogger(std, level=logging.INFO),
+        "facade at DEBUG, 1/100": LazyLogger(std, level=logging.DEBUG),
+    }
+    results = {}
+    for name, logger in variants.items():
+        monkeypatch.setattr(task_module, "logger", logger)
+        monkeypatch.setattr(task_module, "_QUEUE_LOG_EVERY", 100)
+        results[name] = min(asyncio.run(round_trips()) for _ in range(3))
+
+    baseline = results["no logging"]
+    print(f"\n{events} queue events:")
+    for name, ms in results.items():
+        print(f"  {name:<24} {ms:7.1f}ms  (logging overhead {ms - baseline:6.1f}ms)")
+
+    assert results["facade at INFO"] < results["eager DEBUG"]
+    assert results["facade at DEBUG, 1/100"] < results["eager DEBUG"]
@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+# Add project root to sys.path to allow importing 'utils'
+project_root = str(Path(__file__).parents[4])
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.model.chat import Chat
+from app.utils.server.memory_context import fetch_memory_context
+
+
+def _client_factory(handler):
+    real_client = httpx.AsyncClient
+
+    def factory(*args, **kwargs):
+        return real_client(*args, transport=httpx.MockTransport(handler), **kwargs)
+
+    return factory
+
+
+@pytest.mark.unit
+class TestFetchMemoryContext:
+    @pytest.fixture
+    def options(self, sample_chat_data):
+        return Chat(**sample_chat_data, organization_id=7)
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_server_config(self, options, monkeypatch):
+        monkeypatch.delenv("SERVER_URL", raising=False)
+        monkeypatch.setenv("cloud_api_key", "key-123")
+        assert await fetch_memory_context(options, "deploy the app") == ""
+
+    @pytest.mark.asyncio
+    async def test_formats_top_k_memories_with_org_scope(self, options, monkeypatch):
+        monkeypatch.setenv("SERVER_URL", "http://server.test")
+        monkeypatch.setenv("cloud_api_key", "key-123")
+        monkeypatch.setenv("MEMORY_TOP_K", "3")
+        seen = {}
+
+        def handler(request: httpx.Request):
+            seen["params"] = dict(request.url.params)
+            seen["api_key"] = request.headers.get("api-key")
+            return httpx.Response(
+                200,
+                json=[
+                    {"id": 1, "memory_type": "knowledge", "content": "Deploy with docker compose", "score": 0.9},
+                    {"id": 2, "memory_type": "preference", "content": "Prefers Python", "score": 0.5},
+                ],
+            )
+
+        with patch("app.utils.server.memory_context.httpx.AsyncClient", _client_factory(handler)):
+            context = await fetch_memory_context(options, "deploy the app")
+
+        assert seen["params"] == {"query": "deploy the app", "k": "3", "organization_id": "7"}
+        assert seen["api_key"] == "key-123"
+        assert context.startswith("=== RELEVANT MEMORIES ===")
+        assert "- [knowledge] Deploy with docker compose" in context
+        assert "- [preference] Prefers Python" in context
+
+    @pytest.mark.asyncio
+    async def test_server_error_skips_injection(self, options, monkeypatch):
+        monkeypatch.setenv("SERVER_URL", "http://server.test")
+        monkeypatch.setenv("cloud_api_key", "key-123")
+
+        with patch(
+            "app.utils.server.memory_context.httpx.AsyncClient",
+            _client_factory(lambda request: httpx.Response(500)),
+        ):
+            assert await fetch_memory_context(options, "deploy the app") == ""
@@ -6,7 +6,7 @@ from camel.societies.workforce.utils import TaskResult
 from camel.tasks import Task
 from camel.tasks.task import TaskState
 
-from app.utils.single_agent_worker import SingleAgentWorker
+from app.utils.single_agent_worker import SingleAgentWorker, worker_pool_metrics
 from app.utils.agent import ListenChatAgent
 
 
@@ -569,3 +569,31 @@ class TestSingleAgentWorkerErrorCases:
             assert result == TaskState.DONE
             assert task.additional_info["token_usage"]["total_tokens"] == 0
             mock_return_agent.assert_called_once_with(mock_worker_agent)
+
+
+@pytest.mark.unit
+class TestAgentPoolPrewarm:
+    """Background prewarming and per-worker-type pool metrics."""
+
+    @pytest.mark.asyncio
+    async def test_prewarm_fills_pool_off_the_construction_path(self):
+        mock_worker = MagicMock(spec=ListenChatAgent)
+        mock_worker.role_name = "test_worker"
+        mock_worker.agent_id = "worker_123"
+        mock_worker.agent_name = "prewarm_test_agent"
+        mock_worker.clone.side_effect = lambda with_memory=False: MagicMock(spec=ListenChatAgent)
+
+        worker = SingleAgentWorker(description="Test worker", worker=mock_worker, pool_initial_size=3)
+        assert mock_worker.clone.call_count == 0
+
+        assert await worker.prewarm() == 3
+        assert await worker.prewarm() == 0
+        agents = [await worker._get_worker_agent() for _ in range(4)]
+        for agent in agents:
+            await worker._return_worker_agent(agent)
+
+        stats = worker_pool_metrics["prewarm_test_agent"].snapshot()
+        assert stats["clones"] == 4 and stats["prewarmed"] == 3
+        assert stats["borrows"] == 4 and stats["pool_hits"] == 3
+        assert stats["hit_rate"] == 0.75
+        assert stats["clone_avg_ms"] is not None
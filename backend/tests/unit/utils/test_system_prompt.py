@@ -0,0 +1,88 @@
+import datetime
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.component import metrics
+from app.model.chat import Chat
+from app.utils.agent import ListenChatAgent, developer_agent
+from app.utils.system_prompt import environment_facts, prompt_cache_usage, static_prefix, system_prompt
+
+
+@pytest.mark.unit
+class TestSystemPrompt:
+    def test_volatile_facts_come_after_the_static_prefix(self):
+        first = system_prompt("prompt_test_agent", "<role>\nStatic role.\n</role>\n", "/tmp/a", "Toolkits.", "2025-01-01 10:00:00")
+        second = system_prompt("prompt_test_agent", "<role>\nStatic role.\n</role>\n", "/tmp/b", "Toolkits.", "2025-06-30 18:00:00")
+
+        prefix = static_prefix("prompt_test_agent", "")
+        assert prefix == "<role>\nStatic role.\n</role>\n\nToolkits."
+        assert first.startswith(prefix) and second.startswith(prefix)
+        assert "/tmp/a" in first and "2025-01-01 10:00:00" in first
+        assert first.index("<operating_environment>") > first.index("Toolkits.")
+
+    def test_default_date_is_taken_at_call_time(self):
+        morning, afternoon = datetime.datetime(2025, 1, 1, 9, 30), datetime.datetime(2025, 3, 2, 17, 5)
+        with patch("app.utils.system_prompt.datetime.datetime") as mock_datetime:
+            mock_datetime.now.return_value = morning
+            first = environment_facts("/tmp/a")
+            mock_datetime.now.return_value = afternoon
+            later = environment_facts("/tmp/a")
+
+        assert "The current date is 2025-01-01 09:00:00" in first
+        assert "The current date is 2025-03-02 17:00:00" in later
+
+    def test_static_prefix_is_memoized_per_agent_type(self):
+        assert static_prefix("memo_test_agent", "template") is static_prefix("memo_test_agent", "template")
+
+    @pytest.mark.parametrize(
+        "usage, expected",
+        [
+            ({"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 1536}}, (2000, 1536)),
+            ({"prompt_tokens": 2000, "prompt_cache_hit_tokens": 1024, "prompt_cache_miss_tokens": 976}, (2000, 1024)),
+            ({"input_tokens": 100, "cache_read_input_tokens": 1800, "cache_creation_input_tokens": 0}, (1900, 1800)),
+            ({"prompt_tokens": 50, "prompt_tokens_details": None}, (50, 0)),
+            ({}, (0, 0)),
+            (None, (0, 0)),
+        ],
+    )
+    def test_prompt_cache_usage(self, usage, expected):
+        assert prompt_cache_usage(usage) == expected
+
+    def test_model_calls_record_cached_tokens(self):
+        agent = MagicMock(spec=ListenChatAgent)
+        agent.agent_name = "cache_metrics_agent"
+        agent.api_task_id = "cache_metrics_project"
+        agent.process_task_id = ""
+        agent.routed_model = None
+        agent.model_backend = SimpleNamespace(current_model=SimpleNamespace(model_type="gpt-4o"))
+        agent._record_usage = lambda usage: ListenChatAgent._record_usage(agent, usage)
+        usage = {"prompt_tokens": 3000, "completion_tokens": 10, "prompt_tokens_details": {"cached_tokens": 2048}}
+
+        ListenChatAgent._update_token_usage_tracker(agent, {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}, usage)
+
+        assert metrics.agent_prompt_tokens.value("cache_metrics_agent") == 3000
+        assert metrics.agent_cached_prompt_tokens.value("cache_metrics_agent") == 2048
+
+    @pytest.mark.asyncio
+    async def test_developer_prompt_prefix_is_stable_across_tasks(self, sample_chat_data, tmp_path):
+        prompts = []
+        for project in ("project_a", "project_b"):
+            options = Chat(**{**sample_chat_data, "project_id": project})
+            with patch("app.utils.agent.agent_model") as mock_agent_model, \
+                 patch("app.utils.agent.get_working_directory", return_value=str(tmp_path / project)), \
+                 patch("app.utils.agent.HumanToolkit"), \
+                 patch("app.utils.agent.NoteTakingToolkit"), \
+                 patch("app.utils.agent.WebDeployToolkit"), \
+                 patch("app.utils.agent.ScreenshotToolkit"), \
+                 patch("app.utils.agent.TerminalToolkit"), \
+                 patch("app.utils.agent.ToolkitMessageIntegration"):
+                await developer_agent(options)
+            prompts.append(mock_agent_model.call_args[0][1].content)
+
+        # Everything up to the per-task facts is byte-identical, and that is nearly the whole prompt
+        volatile_start = prompts[0].index("<operating_environment>")
+        assert len(os.path.commonprefix(prompts)) >= volatile_start > 0.9 * len(prompts[0])
+        assert str(tmp_path / "project_a") in prompts[0][volatile_start:]
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from app.utils.terminal_stream import AnsiStripper, TerminalStream, clip_output, read_log
+
+
+@pytest.mark.unit
+class TestAnsiStripper:
+    def test_strips_sequences_split_across_chunks(self):
+        stripper = AnsiStripper()
+        out = stripper.feed("\x1b[32mgreen\x1b[") + stripper.feed("0m plain \x1b]0;title\x07done")
+        assert out == "green plain done"
+
+    def test_flush_returns_incomplete_tail(self):
+        stripper = AnsiStripper()
+        assert stripper.feed("text\x1b[3") == "text"
+        assert stripper.flush() == "\x1b[3"
+
+
+@pytest.mark.unit
+class TestTerminalStream:
+    def test_flood_is_rate_limited_and_elided(self):
+        chunks = []
+        stream = TerminalStream(chunks.append, interval=0.2, max_lines=50, hint="full output in session_x.log")
+
+        for i in range(10_000):
+            stream.write(f"\x1b[1mline {i}\x1b[0m\n")
+        stream.close()
+
+        text = "".join(chunks)
+        assert "\x1b" not in text
+        assert "lines elided (full output in session_x.log)" in text
+        assert text.startswith("line 0\n")
+        assert text.endswith("line 9999\n")
+        numbers = [int(line.split()[1]) for line in text.splitlines() if line.startswith("line ")]
+        assert numbers == sorted(set(numbers))
+        assert len(text.splitlines()) <= 2 * 50 + 2
+        assert stream.total_lines == 10_000
+        assert stream.elided_lines > 9_000
+
+    def test_partial_line_is_emitted_after_interval(self):
+        chunks = []
+        stream = TerminalStream(chunks.append, interval=0.05, max_lines=50)
+        stream.write("first\n")
+        stream.write("Password: ")
+        time.sleep(0.2)
+
+        assert "".join(chunks) == "first\nPassword: "
+
+    def test_progress_bar_keeps_last_frame(self):
+        chunks = []
+        stream = TerminalStream(chunks.append, interval=0, max_lines=50)
+        stream.write("10%\r50%\r100%\n")
+        assert chunks == ["100%\n"]
+
+
+@pytest.mark.unit
+class TestClipAndReadLog:
+    def test_clip_output_keeps_head_and_tail(self):
+        text = "".join(f"{i}\n" for i in range(100))
+        clipped = clip_output(text, head=3, tail=2, hint="see log")
+        assert clipped == "0\n1\n2\n... 95 lines elided (see log) ...\n98\n99\n"
+        assert clip_output("a\nb\n", head=3, tail=2) == "a\nb\n"
+
+    def test_read_log_window(self, tmp_path):
+        log = tmp_path / "session_x.log"
+        log.write_text("".join(f"{i}\n" for i in range(10)))
+        lines, total = read_log(str(log), start_line=4, max_lines=3)
+        assert lines == ["4\n", "5\n", "6\n"]
+        assert total == 10
@@ -98,3 +98,20 @@ class TestTerminalToolkit:
 
 
 
+
+    def test_stream_is_dropped_when_session_ends(self, tmp_path):
+        """The UI stream of a non-blocking session is closed once its output is read to the end."""
+        test_api_task_id = "test_api_task_123"
+
+        if test_api_task_id not in task_locks:
+            task_locks[test_api_task_id] = TaskLock(id=test_api_task_id, queue=asyncio.Queue(), human_input={})
+        toolkit = TerminalToolkit(test_api_task_id, working_directory=str(tmp_path))
+
+        toolkit.shell_exec("echo done", id="short", block=False)
+        log_file = toolkit.shell_sessions["short"]["log_file"]
+        deadline = time.time() + 5
+        while log_file in toolkit._streams and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert log_file not in toolkit._streams
+        assert "done" in toolkit.shell_read_log("short")
@@ -0,0 +1,63 @@
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.toolkit.registry import INSTALLABLE_TOOLKITS, TOOLKIT_PATHS, LazyToolkit
+
+
+@pytest.fixture
+def fake_toolkit_module(tmp_path, monkeypatch):
+    (tmp_path / "fake_lazy_toolkit.py").write_text(
+        "class FakeToolkit:\n"
+        "    agent_name = ''\n"
+        "    def __init__(self, api_task_id):\n"
+        "        self.api_task_id = api_task_id\n"
+        "    @classmethod\n"
+        "    def toolkit_name(cls):\n"
+        "        return 'Fake Toolkit'\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "fake_lazy_toolkit"
+    sys.modules.pop("fake_lazy_toolkit", None)
+
+
+@pytest.mark.unit
+class TestLazyToolkit:
+    def test_imports_on_first_use(self, fake_toolkit_module):
+        toolkit = LazyToolkit("fake_toolkit", f"{fake_toolkit_module}:FakeToolkit")
+
+        assert not toolkit.loaded
+        assert fake_toolkit_module not in sys.modules
+
+        instance = toolkit("task-1")
+
+        assert toolkit.loaded
+        assert instance.api_task_id == "task-1"
+        assert type(instance) is toolkit.resolve()
+
+    def test_forwards_class_attributes(self, fake_toolkit_module):
+        toolkit = LazyToolkit("fake_toolkit", f"{fake_toolkit_module}:FakeToolkit")
+
+        toolkit.agent_name = "developer_agent"
+
+        assert toolkit.resolve().agent_name == "developer_agent"
+        assert toolkit.toolkit_name() == "Fake Toolkit"
+
+    def test_patching_a_class_method_is_undone(self, fake_toolkit_module):
+        toolkit = LazyToolkit("fake_toolkit", f"{fake_toolkit_module}:FakeToolkit")
+
+        with patch.object(toolkit, "agent_name", "patched_agent"), \
+             patch.object(toolkit, "toolkit_name", return_value="Patched"):
+            assert toolkit.resolve().agent_name == "patched_agent"
+            assert toolkit.toolkit_name() == "Patched"
+
+        assert toolkit.resolve().agent_name == ""
+        assert toolkit.toolkit_name() == "Fake Toolkit"
+
+    def test_registry_paths_follow_module_layout(self):
+        assert INSTALLABLE_TOOLKITS <= TOOLKIT_PATHS.keys()
+        for name, path in TOOLKIT_PATHS.items():
+            module_name, _, class_name = path.partition(":")
+            assert module_name == f"app.utils.toolkit.{name}"
+            assert class_name.endswith("Toolkit")
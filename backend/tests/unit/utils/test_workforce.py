@@ -346,6 +346,30 @@ class TestWorkforce:
             # Should queue end notification
             assert mock_task_lock.add_background_task.call_count == 1
 
+    @pytest.mark.asyncio
+    async def test_subtask_wait_entries_are_dropped_on_terminal_states(self, mock_task_lock):
+        """Posted subtasks that fail or are never started do not stay in the wait-time map."""
+        from app.utils.single_agent_worker import subtask_posted_at
+
+        workforce = Workforce(api_task_id="test_api_task_123", description="Test workforce")
+        workforce._task = Task(content="Main task", id="main")
+        failed, pending = Task(content="Fails", id="sub_failed"), Task(content="Never starts", id="sub_pending")
+
+        with patch('app.utils.workforce.get_task_lock', return_value=mock_task_lock), \
+             patch.object(workforce, '_get_agent_id_from_node_id', return_value="agent_1"), \
+             patch.object(workforce.__class__.__bases__[0], '_post_task', return_value=None), \
+             patch.object(workforce.__class__.__bases__[0], '_handle_failed_task', return_value=False), \
+             patch.object(workforce.__class__.__bases__[0], 'stop'):
+            await workforce._post_task(failed, "worker_1")
+            await workforce._post_task(pending, "worker_1")
+            assert {"sub_failed", "sub_pending"} <= subtask_posted_at.keys()
+
+            await workforce._handle_failed_task(failed)
+            assert "sub_failed" not in subtask_posted_at
+
+            workforce.stop()
+            assert "sub_pending" not in subtask_posted_at
+
     @pytest.mark.asyncio
     async def test_cleanup_deletes_task_lock(self):
         """Test cleanup method deletes task lock."""
@@ -0,0 +1,54 @@
+"""add user credits balance snapshot
+
+Revision ID: a3c1f0d2b7e4
+Revises: edb94d3e4bee
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c1f0d2b7e4"
+down_revision: Union[str, None] = "edb94d3e4bee"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add per-user credit balance snapshots and ledger indexes used by consumption.
+
+    Snapshots are built lazily on first access (or by `python cli.py reconcile-credits`).
+    """
+    op.create_table(
+        "user_credits_balance",
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("permanent_credits", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("daily_credits", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("daily_expire_at", sa.DateTime(), nullable=True),
+        sa.Column("next_expire_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_user_credits_balance_user_id"), "user_credits_balance", ["user_id"], unique=True)
+    op.create_index(
+        "ix_user_credits_record_user_open", "user_credits_record", ["user_id", "used", "channel"], unique=False
+    )
+    op.create_index(
+        "ix_user_credits_record_user_source", "user_credits_record", ["user_id", "channel", "source_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop credit balance snapshots and ledger indexes."""
+    op.drop_index("ix_user_credits_record_user_source", table_name="user_credits_record")
+    op.drop_index("ix_user_credits_record_user_open", table_name="user_credits_record")
+    op.drop_index(op.f("ix_user_credits_balance_user_id"), table_name="user_credits_balance")
+    op.drop_table("user_credits_balance")
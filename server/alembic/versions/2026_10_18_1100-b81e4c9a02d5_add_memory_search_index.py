@@ -0,0 +1,68 @@
+"""add memory search index
+
+Revision ID: b81e4c9a02d5
+Revises: a3c1f0d2b7e4
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b81e4c9a02d5"
+down_revision: Union[str, None] = "a3c1f0d2b7e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the embedding column and a full-text index over memory content."""
+    op.add_column("memories", sa.Column("embedding", sa.LargeBinary(), nullable=True))
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_memories_content_fts ON memories USING GIN (to_tsvector('simple', content))"
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE memories_fts USING fts5(content, content='memories', content_rowid='id')"
+        )
+        op.execute(
+            """
+            CREATE TRIGGER memories_fts_ai AFTER INSERT ON memories BEGIN
+                INSERT INTO memories_fts(rowid, content) VALUES (new.id, new.content);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER memories_fts_ad AFTER DELETE ON memories BEGIN
+                INSERT INTO memories_fts(memories_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER memories_fts_au AFTER UPDATE OF content ON memories BEGIN
+                INSERT INTO memories_fts(memories_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                INSERT INTO memories_fts(rowid, content) VALUES (new.id, new.content);
+            END
+            """
+        )
+        op.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Drop the full-text index and the embedding column."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_memories_content_fts")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS memories_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS memories_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS memories_fts_ai")
+        op.execute("DROP TABLE IF EXISTS memories_fts")
+    op.drop_column("memories", "embedding")
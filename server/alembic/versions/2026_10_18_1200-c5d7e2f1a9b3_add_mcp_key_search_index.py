@@ -0,0 +1,34 @@
+"""add mcp key search index
+
+Revision ID: c5d7e2f1a9b3
+Revises: b81e4c9a02d5
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d7e2f1a9b3"
+down_revision: Union[str, None] = "b81e4c9a02d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index lower(key) so `GET /mcps?keyword=` substring search avoids a sequential scan."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX ix_mcp_key_lower_trgm ON mcp USING GIN (lower(key) gin_trgm_ops)")
+    else:
+        op.execute("CREATE INDEX ix_mcp_key_lower ON mcp (lower(key))")
+
+
+def downgrade() -> None:
+    """Drop the mcp key search index."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_mcp_key_lower_trgm")
+    else:
+        op.execute("DROP INDEX IF EXISTS ix_mcp_key_lower")
@@ -0,0 +1,66 @@
+"""make user_stat.user_id unique
+
+Revision ID: d2e8b6a4c1f7
+Revises: c5d7e2f1a9b3
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2e8b6a4c1f7"
+down_revision: Union[str, None] = "c5d7e2f1a9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = (
+    "download_count",
+    "register_count",
+    "task_complete_count",
+    "task_failed_count",
+    "file_download_count",
+    "file_generate_count",
+    "paid_amount_on_avg_task",
+)
+
+
+def upgrade() -> None:
+    """One stat row per user, so counters can be upserted with INSERT ... ON CONFLICT.
+
+    Duplicate rows left by concurrent first writes are merged into the oldest one: counters
+    are summed and the newest model_type is kept.
+    """
+    bind = op.get_bind()
+    duplicates = bind.execute(
+        sa.text("SELECT user_id FROM user_stat GROUP BY user_id HAVING COUNT(*) > 1")
+    ).scalars().all()
+    for user_id in duplicates:
+        rows = bind.execute(
+            sa.text(f"SELECT id, model_type, {', '.join(COUNTERS)} FROM user_stat WHERE user_id = :user_id ORDER BY id"),
+            {"user_id": user_id},
+        ).mappings().all()
+        totals = {name: sum(row[name] or 0 for row in rows) for name in COUNTERS}
+        bind.execute(
+            sa.text(
+                f"UPDATE user_stat SET model_type = :model_type, {', '.join(f'{name} = :{name}' for name in COUNTERS)} "
+                "WHERE id = :id"
+            ),
+            {"id": rows[0]["id"], "model_type": rows[-1]["model_type"], **totals},
+        )
+        bind.execute(
+            sa.text("DELETE FROM user_stat WHERE user_id = :user_id AND id <> :id"),
+            {"user_id": user_id, "id": rows[0]["id"]},
+        )
+
+    op.drop_index(op.f("ix_user_stat_user_id"), table_name="user_stat")
+    op.create_index(op.f("ix_user_stat_user_id"), "user_stat", ["user_id"], unique=True)
+
+
+def downgrade() -> None:
+    """Make the user_stat.user_id index non-unique again; merged rows stay merged."""
+    op.drop_index(op.f("ix_user_stat_user_id"), table_name="user_stat")
+    op.create_index(op.f("ix_user_stat_user_id"), "user_stat", ["user_id"], unique=False)
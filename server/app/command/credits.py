@@ -0,0 +1,86 @@
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from sqlmodel import select
+
+from app.command import cli
+from app.component.database import session_make
+from app.model.user.user import User
+from app.model.user.user_credits_balance import UserCreditsBalance
+from app.model.user.user_credits_record import CreditsChannel, UserCreditsRecord
+
+
+@cli.command("reconcile-credits")
+@click.option("--user-id", type=int, default=None, help="Only rebuild the snapshot of this user")
+def reconcile_credits(user_id: int | None):
+    """Rebuild user credit balance snapshots from the credits ledger."""
+    with session_make() as s:
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = s.exec(select(UserCreditsRecord.user_id).distinct()).all()
+        drift = 0
+        for uid in user_ids:
+            before = s.exec(select(UserCreditsBalance).where(UserCreditsBalance.user_id == uid)).first()
+            old = (before.permanent_credits, before.daily_credits) if before else None
+            snapshot = UserCreditsRecord.rebuild_balance(uid, s)
+            s.commit()
+            if old is not None and old != (snapshot.permanent_credits, snapshot.daily_credits):
+                drift += 1
+                click.echo(f"user {uid}: {old} -> {(snapshot.permanent_credits, snapshot.daily_credits)}")
+    click.echo(f"Reconciled {len(user_ids)} users, {drift} snapshots corrected")
+
+
+@cli.command("bench-credits")
+@click.option("--records", type=int, default=100_000, help="Historical ledger records for the benchmark user")
+@click.option("--iterations", type=int, default=200, help="Number of consume calls to time")
+@click.confirmation_option(prompt="This writes a temporary user and ledger rows to the configured database. Continue?")
+def bench_credits(records: int, iterations: int):
+    """Benchmark consume latency for a user with a large credits ledger."""
+    now = datetime.now()
+    with session_make() as s:
+        user = User(email=f"bench-{uuid.uuid4().hex[:12]}@example.com", credits=iterations * 10)
+        s.add(user)
+        s.commit()
+        s.refresh(user)
+        history = []
+        for i in range(records):
+            if i % 10 == 0:
+                # Exhausted grants from the past
+                history.append(
+                    UserCreditsRecord(
+                        user_id=user.id, amount=10, balance=10, channel=CreditsChannel.paid, used=True, used_at=now
+                    )
+                )
+            else:
+                history.append(
+                    UserCreditsRecord(user_id=user.id, amount=-1, channel=CreditsChannel.consume, source_id=i)
+                )
+        s.add_all(history)
+        s.commit()
+        UserCreditsRecord.grant_credits(
+            user.id, iterations * 10, CreditsChannel.paid, s, expire_at=now + timedelta(days=30)
+        )
+        user_id = user.id
+
+    timings = []
+    with session_make() as s:
+        for i in range(iterations):
+            start = time.perf_counter()
+            UserCreditsRecord.consume_credits(user_id, 5, s, source_id=records + i)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        UserCreditsRecord.delete_by(UserCreditsRecord.user_id == user_id, s=s)
+        UserCreditsBalance.delete_by(UserCreditsBalance.user_id == user_id, s=s)
+        User.delete_by(User.id == user_id, s=s)
+
+    timings.sort()
+    click.echo(
+        f"consume_credits with {records} ledger records: "
+        f"p50={statistics.median(timings):.2f}ms "
+        f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms "
+        f"max={timings[-1]:.2f}ms"
+    )
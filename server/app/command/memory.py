@@ -0,0 +1,71 @@
+import random
+import statistics
+import time
+import uuid
+
+import click
+
+from app.command import cli
+from app.component.database import session_make
+from app.component.memory_index import search_memories
+from app.model.memory.memory import Memory, MemoryType
+from app.model.organization.organization import Organization
+from app.model.user.user import User
+
+_WORDS = (
+    "python typescript deploy docker review refactor invoice budget customer report meeting roadmap "
+    "browser scraping excel chart migration database index latency cache release hotfix onboarding "
+    "design spec pricing contract travel hotel flight calendar slack notion github linear analytics"
+).split()
+
+
+@cli.command("bench-memory-search")
+@click.option("--memories", type=int, default=100_000, help="Memories to seed in the benchmark organization")
+@click.option("--queries", type=int, default=100, help="Number of search queries to time")
+@click.option("--k", type=int, default=5, help="Memories returned per query")
+@click.confirmation_option(prompt="This writes a temporary user, organization and memories to the configured database. Continue?")
+def bench_memory_search(memories: int, queries: int, k: int):
+    """Benchmark top-k memory retrieval for an organization with many memories."""
+    rng = random.Random(0)
+    with session_make() as s:
+        user = User(email=f"bench-{uuid.uuid4().hex[:12]}@example.com")
+        s.add(user)
+        s.commit()
+        s.refresh(user)
+        org = Organization(name=f"bench-{user.id}", owner_id=user.id)
+        s.add(org)
+        s.commit()
+        s.refresh(org)
+        user_id, org_id = user.id, org.id
+        types = list(MemoryType)
+        for start in range(0, memories, 5000):
+            s.add_all(
+                Memory(
+                    user_id=user_id,
+                    organization_id=org_id,
+                    memory_type=types[i % len(types)],
+                    content=" ".join(rng.choices(_WORDS, k=12)),
+                )
+                for i in range(start, min(start + 5000, memories))
+            )
+            s.commit()
+
+    timings = []
+    with session_make() as s:
+        for _ in range(queries):
+            query = " ".join(rng.choices(_WORDS, k=3))
+            start = time.perf_counter()
+            search_memories(s, query, user_id, org_id, k=k)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        Memory.delete_by(Memory.user_id == user_id, s=s)
+        Organization.delete_by(Organization.id == org_id, s=s)
+        User.delete_by(User.id == user_id, s=s)
+
+    timings.sort()
+    click.echo(
+        f"search_memories top-{k} over {memories} memories: "
+        f"p50={statistics.median(timings):.2f}ms "
+        f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms "
+        f"max={timings[-1]:.2f}ms"
+    )
@@ -0,0 +1,260 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+"""Indexed retrieval over `Memory.content`.
+
+Full-text search uses the database index: a GIN index on
+`to_tsvector('simple', content)` for Postgres and the `memories_fts` FTS5
+table for SQLite (both created by the memory search migration).
+
+Semantic search is optional. When `memory_embedding_model` names a
+sentence-transformers model and the package is installed, memory contents
+are embedded on a local CPU model and stored as float32 blobs on
+`Memory.embedding`. Queries are answered by a brute-force NumPy search over
+a per-scope matrix cached in process and invalidated on writes. Full-text
+and semantic rankings are merged with reciprocal rank fusion.
+"""
+
+import re
+import threading
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import column, func, or_, table
+from sqlmodel import Session, col, select
+
+from app.component.environment import env
+from app.model.memory.memory import Memory, MemoryType
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("memory_index")
+
+EMBEDDING_DTYPE = np.float32
+# Constant of reciprocal rank fusion, dampens the weight of top ranks
+RRF_K = 60
+
+_memories_fts = table("memories_fts", column("rowid"), column("memories_fts"))
+
+
+def scope_filters(
+    user_id: int,
+    organization_id: Optional[int] = None,
+    memory_type: Optional[MemoryType] = None,
+) -> list:
+    """Build the visibility filters of a retrieval scope.
+
+    Only the user's own memories are visible. Inside an organization context,
+    those saved in that organization and the personal ones are; without one,
+    only personal memories are, so memories of one organization never leak
+    into another.
+    """
+    filters = [Memory.user_id == user_id, Memory.no_delete()]
+    if organization_id is not None:
+        filters.append(
+            or_(Memory.organization_id == organization_id, col(Memory.organization_id).is_(None))
+        )
+    else:
+        filters.append(col(Memory.organization_id).is_(None))
+    if memory_type is not None:
+        filters.append(Memory.memory_type == memory_type)
+    return filters
+
+
+def _query_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def full_text_search(s: Session, query: str, filters: list, limit: int) -> list[tuple[Memory, float]]:
+    """Rank memories matching any query term using the database text index."""
+    terms = _query_terms(query)
+    if not terms:
+        return []
+    dialect = s.get_bind().dialect.name
+    if dialect == "postgresql":
+        document = func.to_tsvector("simple", Memory.content)
+        ts_query = func.to_tsquery("simple", " | ".join(terms))
+        rank = func.ts_rank_cd(document, ts_query)
+        stmt = (
+            select(Memory, rank)
+            .where(document.op("@@")(ts_query), *filters)
+            .order_by(rank.desc())
+            .limit(limit)
+        )
+    elif dialect == "sqlite":
+        fts_query = " OR ".join(f'"{term}"' for term in terms)
+        # bm25() is lower for better matches
+        rank = -func.bm25(_memories_fts.c.memories_fts)
+        stmt = (
+            select(Memory, rank)
+            .join(_memories_fts, _memories_fts.c.rowid == Memory.id)
+            .where(_memories_fts.c.memories_fts.op("MATCH")(fts_query), *filters)
+            .order_by(rank.desc())
+            .limit(limit)
+        )
+    else:
+        logger.warning("No text index for dialect, falling back to LIKE", extra={"dialect": dialect})
+        stmt = (
+            select(Memory, func.length(Memory.content) * 0)
+            .where(or_(*[col(Memory.content).ilike(f"%{term}%") for term in terms]), *filters)
+            .limit(limit)
+        )
+    return [(memory, float(score)) for memory, score in s.exec(stmt).all()]
+
+
+class MemoryEmbedder:
+    """Lazily loaded local CPU embedding model (sentence-transformers)."""
+
+    def __init__(self, model_name: Optional[str]):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_name) and not self._failed
+
+    def _load(self):
+        if self._model is None and self.enabled:
+            with self._lock:
+                if self._model is None:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+
+                        self._model = SentenceTransformer(self.model_name, device="cpu")
+                    except Exception as e:
+                        self._failed = True
+                        logger.warning(
+                            "Memory embeddings disabled, model could not be loaded",
+                            extra={"model": self.model_name, "error": str(e)},
+                        )
+        return self._model
+
+    def encode(self, texts: list[str]) -> Optional[np.ndarray]:
+        """Return L2-normalized float32 embeddings, or None when disabled."""
+        model = self._load()
+        if model is None:
+            return None
+        vectors = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=EMBEDDING_DTYPE)
+
+
+def to_blob(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def from_blob(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+class MemoryVectorIndex:
+    """In-process brute-force vector index, one matrix per (user, organization) scope.
+
+    Matrices are loaded from `Memory.embedding` on first use and dropped when a
+    memory of the user is created or deleted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scopes: dict[tuple[int, Optional[int]], tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            for key in [key for key in self._scopes if key[0] == user_id]:
+                del self._scopes[key]
+
+    def _load(self, s: Session, user_id: int, organization_id: Optional[int]):
+        key = (user_id, organization_id)
+        with self._lock:
+            cached = self._scopes.get(key)
+        if cached is not None:
+            return cached
+        rows = s.exec(
+            select(Memory.id, Memory.memory_type, Memory.embedding).where(
+                *scope_filters(user_id, organization_id), col(Memory.embedding).is_not(None)
+            )
+        ).all()
+        if rows:
+            ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            types = np.array([MemoryType(row[1]).value for row in rows])
+            matrix = np.vstack([from_blob(row[2]) for row in rows])
+        else:
+            ids, types, matrix = np.empty(0, np.int64), np.empty(0, str), np.empty((0, 0), EMBEDDING_DTYPE)
+        with self._lock:
+            self._scopes[key] = (ids, types, matrix)
+        return ids, types, matrix
+
+    def search(
+        self,
+        s: Session,
+        query_vector: np.ndarray,
+        user_id: int,
+        organization_id: Optional[int],
+        memory_type: Optional[MemoryType],
+        limit: int,
+    ) -> list[tuple[int, float]]:
+        ids, types, matrix = self._load(s, user_id, organization_id)
+        if len(ids) == 0 or matrix.shape[1] != query_vector.shape[0]:
+            return []
+        scores = matrix @ query_vector
+        if memory_type is not None:
+            scores = np.where(types == memory_type.value, scores, -np.inf)
+        limit = min(limit, len(ids))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+
+embedder = MemoryEmbedder(env("memory_embedding_model"))
+vector_index = MemoryVectorIndex()
+
+
+def embed_memory(memory: Memory):
+    """Attach an embedding to a memory before it is saved (no-op when disabled)."""
+    vectors = embedder.encode([memory.content])
+    if vectors is not None:
+        memory.embedding = to_blob(vectors[0])
+
+
+def search_memories(
+    s: Session,
+    query: str,
+    user_id: int,
+    organization_id: Optional[int] = None,
+    memory_type: Optional[MemoryType] = None,
+    k: int = 5,
+) -> list[tuple[Memory, float]]:
+    """Return the top-k memories for a query, best first, with their fused scores."""
+    candidates = max(k * 4, 20)
+    ranked: dict[int, float] = {}
+    memories: dict[int, Memory] = {}
+
+    text_hits = full_text_search(s, query, scope_filters(user_id, organization_id, memory_type), candidates)
+    for rank, (memory, _) in enumerate(text_hits):
+        memories[memory.id] = memory
+        ranked[memory.id] = ranked.get(memory.id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+    if embedder.enabled:
+        query_vectors = embedder.encode([query])
+        if query_vectors is not None:
+            vector_hits = vector_index.search(s, query_vectors[0], user_id, organization_id, memory_type, candidates)
+            for rank, (memory_id, _) in enumerate(vector_hits):
+                ranked[memory_id] = ranked.get(memory_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            missing = [memory_id for memory_id, _ in vector_hits if memory_id not in memories]
+            if missing:
+                for memory in s.exec(select(Memory).where(col(Memory.id).in_(missing))).all():
+                    memories[memory.id] = memory
+
+    top = sorted(ranked.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [(memories[memory_id], score) for memory_id, score in top if memory_id in memories]
@@ -0,0 +1,75 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+from fastapi import Request, Response
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = strong_etag(body)
+
+    def to_response(self, request: Request) -> Response:
+        """Serve the cached body, or 304 when the client already holds this version."""
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or self.etag in [t.strip() for t in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class VersionedResponseCache:
+    """
+    In-process LRU cache of serialized responses.
+
+    Entries belong to a scope (first element of the key). `invalidate(scope)` bumps that
+    scope's version and `invalidate()` bumps the global version; a response computed under
+    an older version is never stored, so a write racing with a slow read cannot resurrect
+    stale data.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._global_version = 0
+        self._scope_versions: dict[Hashable, int] = {}
+
+    def version(self, scope: Hashable) -> tuple[int, int]:
+        with self._lock:
+            return self._global_version, self._scope_versions.get(scope, 0)
+
+    def get(self, key: tuple) -> CachedResponse | None:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+            return cached
+
+    def put(self, key: tuple, body: bytes, version: tuple[int, int]) -> CachedResponse:
+        cached = CachedResponse(body)
+        with self._lock:
+            if version == (self._global_version, self._scope_versions.get(key[0], 0)):
+                self._entries[key] = cached
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self, scope: Hashable | None = None):
+        with self._lock:
+            if scope is None:
+                self._global_version += 1
+                self._entries.clear()
+            else:
+                self._scope_versions[scope] = self._scope_versions.get(scope, 0) + 1
+                for key in [key for key in self._entries if key[0] == scope]:
+                    del self._entries[key]
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Protocol
+
+import httpx
+
+from app.component.environment import env
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("search_cache")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+def cache_key(namespace: str, query: str, params: dict) -> str:
+    payload = json.dumps({"q": normalize_query(query), **params}, sort_keys=True, default=str)
+    return f"search:{namespace}:" + hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SharedCacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+
+class RedisCacheBackend:
+    """Shared cache so every worker process benefits from a result fetched by any of them."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(key, value, ex=max(1, int(ttl)))
+
+
+class SearchMetrics:
+    def __init__(self, window: int = 1024):
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+        self._latencies: deque[float] = deque(maxlen=window)
+
+    def observe_upstream(self, seconds: float):
+        self.upstream_calls += 1
+        self.upstream_seconds += seconds
+        self._latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.shared_hits + self.misses + self.coalesced
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": round((self.hits + self.shared_hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "upstream_calls": self.upstream_calls,
+            "upstream_avg_ms": round(self.upstream_seconds / self.upstream_calls * 1000, 2)
+            if self.upstream_calls
+            else None,
+            "upstream_p50_ms": percentile(0.5),
+            "upstream_p95_ms": percentile(0.95),
+        }
+
+
+class SearchCache:
+    """
+    TTL + LRU cache for upstream search results with request coalescing.
+
+    Concurrent lookups for the same key share one upstream call. Failures are never
+    cached. When a shared backend is configured it is consulted after the local LRU
+    and populated on every successful fetch; backend errors only degrade to a miss.
+    """
+
+    def __init__(self, ttl: float = 600, max_entries: int = 2048, backend: SharedCacheBackend | None = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.backend = backend
+        self.metrics: dict[str, SearchMetrics] = {}
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def _metrics(self, namespace: str) -> SearchMetrics:
+        return self.metrics.setdefault(namespace, SearchMetrics())
+
+    def _get_local(self, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _put_local(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(
+        self, namespace: str, query: str, params: dict, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached result for (query, params) or call `fetch` once for all concurrent callers."""
+        metrics = self._metrics(namespace)
+        key = cache_key(namespace, query, params)
+        found, value = self._get_local(key)
+        if found:
+            metrics.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.coalesced += 1
+        else:
+            # The fetch runs as its own task so a disconnecting caller does not cancel it for the others
+            task = asyncio.ensure_future(self._fetch_through(namespace, key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Retrieve the exception so it is not reported as unhandled when every caller went away
+            task.exception()
+
+    async def _fetch_through(self, namespace: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        metrics = self._metrics(namespace)
+        if self.backend is not None:
+            try:
+                raw = await self.backend.get(key)
+            except Exception as e:
+                logger.warning("Shared search cache read failed", extra={"error": str(e)})
+                raw = None
+            if raw is not None:
+                metrics.shared_hits += 1
+                value = json.loads(raw)
+                self._put_local(key, value)
+                return value
+
+        metrics.misses += 1
+        started = time.perf_counter()
+        try:
+            value = await fetch()
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.observe_upstream(time.perf_counter() - started)
+
+        self._put_local(key, value)
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, json.dumps(value, default=str).encode(), self.ttl)
+            except Exception as e:
+                logger.warning("Shared search cache write failed", extra={"error": str(e)})
+        return value
+
+    def snapshot(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "ttl_seconds": self.ttl,
+            **{namespace: metrics.snapshot() for namespace, metrics in self.metrics.items()},
+        }
+
+
+def _shared_backend() -> SharedCacheBackend | None:
+    url = env("search_cache_redis_url")
+    if not url:
+        return None
+    try:
+        return RedisCacheBackend(url)
+    except ImportError:
+        logger.warning("search_cache_redis_url is set but redis is not installed, using in-process cache only")
+        return None
+
+
+search_cache = SearchCache(
+    ttl=float(env("search_cache_ttl", "600")),
+    max_entries=int(env("search_cache_size", "2048")),
+    backend=_shared_backend(),
+)
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def http_client() -> httpx.AsyncClient:
+    """Process-wide pooled client for proxied upstream calls (keep-alive, bounded connections)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(float(env("proxy_http_timeout", "30")), connect=10.0),
+            limits=httpx.Limits(
+                max_connections=int(env("proxy_http_max_connections", "100")),
+                max_keepalive_connections=int(env("proxy_http_max_keepalive", "20")),
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
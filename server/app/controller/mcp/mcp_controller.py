@@ -1,14 +1,14 @@
 import os
 from typing import Dict
-from fastapi import Depends, HTTPException, APIRouter
+from fastapi import Depends, HTTPException, APIRouter, Request
 from fastapi_babel import _
-from fastapi_pagination import Page
+from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlmodel import paginate
-from sqlmodel import Session, col, select
+from sqlmodel import Session, col, func, select
 from sqlalchemy.orm import selectinload, with_loader_criteria
 from app.component.auth import Auth, auth_must
 from app.component.database import session
-from app.model.mcp.mcp import Mcp, McpOut, McpType
+from app.model.mcp.mcp import Mcp, McpOut, McpType, mcp_catalog_cache
 from app.model.mcp.mcp_env import McpEnv, Status as McpEnvStatus
 from app.model.mcp.mcp_user import McpImportType, McpUser, Status
 from camel.toolkits.mcp_toolkit import MCPToolkit
@@ -66,17 +66,32 @@ async def pre_instantiate_mcp_toolkit(config_dict: dict) -> bool:
         return False
 
 
-@router.get("/mcps", name="mcp list")
+@router.get("/mcps", name="mcp list", response_model=Page[McpOut])
 @traceroot.trace()
 async def gets(
+    request: Request,
     keyword: str | None = None,
     category_id: int | None = None,
     mine: int | None = None,
+    params: Params = Depends(),
     session: Session = Depends(session),
     auth: Auth = Depends(auth_must),
-) -> Page[McpOut]:
-    """List MCP servers with optional filtering."""
+):
+    """List MCP servers with optional filtering.
+
+    Serialized pages are cached per (keyword, category, page) and served with a strong
+    ETag; a matching If-None-Match yields 304. Catalog writes invalidate the cache.
+    """
     user_id = auth.user.id
+    keyword = keyword.strip().lower() if keyword else None
+    scope = ("user", user_id) if mine else "catalog"
+    cache_key = (scope, keyword, category_id, params.page, params.size)
+    cached = mcp_catalog_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("MCP list served from cache", extra={"user_id": user_id, "keyword": keyword, "category_id": category_id, "mine": mine})
+        return cached.to_response(request)
+
+    version = mcp_catalog_cache.version(scope)
     stmt = (
         select(Mcp)
         .where(Mcp.no_delete())
@@ -87,7 +102,9 @@ async def gets(
         )
     )
     if keyword:
-        stmt = stmt.where(col(Mcp.key).like(f"%{keyword.lower()}%"))
+        # Matches the trigram index on lower(key)
+        escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        stmt = stmt.where(func.lower(Mcp.key).like(f"%{escaped}%", escape="\\"))
     if category_id:
         stmt = stmt.where(Mcp.category_id == category_id)
     if mine and auth:
@@ -100,10 +117,11 @@ async def gets(
             )
         )
     
-    result = paginate(session, stmt)
+    result = paginate(session, stmt, params)
     total = result.total if hasattr(result, 'total') else 0
     logger.debug("MCP list retrieved", extra={"user_id": user_id, "keyword": keyword, "category_id": category_id, "mine": mine, "total": total})
-    return result
+    body = Page[McpOut].model_validate(result, from_attributes=True).model_dump_json().encode()
+    return mcp_catalog_cache.put(cache_key, body, version).to_response(request)
 
 
 @router.get("/mcp", name="mcp detail", response_model=McpOut)
@@ -1,10 +1,11 @@
+import dataclasses
+import httpx
 from fastapi import APIRouter, Depends, HTTPException
-from exa_py import Exa
+from exa_py import AsyncExa
 from app.component.auth import key_must
-from app.component.environment import env_not_empty
+from app.component.environment import env, env_not_empty
+from app.component.search_cache import close_http_client, http_client, search_cache
 from app.model.mcp.proxy import ExaSearch
-from typing import Any, cast
-import requests
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("server_proxy_controller")
@@ -12,14 +13,37 @@ logger = traceroot.get_logger("server_proxy_controller")
 from app.model.user.key import Key
 
 
-router = APIRouter(prefix="/proxy", tags=["Mcp Servers"])
+router = APIRouter(prefix="/proxy", tags=["Mcp Servers"], on_shutdown=[close_http_client])
+
+class PooledAsyncExa(AsyncExa):
+    """AsyncExa whose requests go through the pooled proxy HTTP client.
+
+    AsyncExa sends every request with an absolute URL and its own headers, so the shared
+    client needs neither a base URL nor the API key.
+    """
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return http_client()
+
+
+_exa: PooledAsyncExa | None = None
+
+
+def exa_client() -> PooledAsyncExa:
+    """Shared Exa client, recreated when the configured API key or base URL changes."""
+    global _exa
+    api_key = env_not_empty("EXA_API_KEY")
+    api_base = env("EXA_API_BASE", "https://api.exa.ai")
+    if _exa is None or _exa.headers.get("x-api-key") != api_key or _exa.base_url != api_base:
+        _exa = PooledAsyncExa(api_key, api_base=api_base)
+    return _exa
 
 
 @router.post("/exa")
 @traceroot.trace()
-def exa_search(search: ExaSearch, key: Key = Depends(key_must)):
+async def exa_search(search: ExaSearch, key: Key = Depends(key_must)):
     """Search using Exa API."""
-    EXA_API_KEY = env_not_empty("EXA_API_KEY")
     try:
         # Validate input parameters
         if search.num_results is not None and not 0 < search.num_results <= 100:
@@ -42,38 +66,23 @@ def exa_search(search: ExaSearch, key: Key = Depends(key_must)):
                 logger.warning("Invalid exa search parameter", extra={"param": "exclude_text", "reason": "exceeds 5 words"})
                 raise ValueError("exclude_text string cannot be longer than 5 words")
 
-        exa = Exa(EXA_API_KEY)
-
-        # Call Exa API with direct parameters
-        if search.text:
-            results = cast(
-                dict[str, Any],
-                exa.search_and_contents(
-                    query=search.query,
-                    type=search.search_type,
-                    category=search.category,
-                    num_results=search.num_results,
-                    include_text=search.include_text,
-                    exclude_text=search.exclude_text,
-                    use_autoprompt=search.use_autoprompt,
-                    text=True,
-                ),
-            )
-        else:
-            results = cast(
-                dict[str, Any],
-                exa.search(
-                    query=search.query,
-                    type=search.search_type,
-                    category=search.category,
-                    num_results=search.num_results,
-                    include_text=search.include_text,
-                    exclude_text=search.exclude_text,
-                    use_autoprompt=search.use_autoprompt,
-                ),
-            )
-
-        result_count = len(results.get("results", [])) if "results" in results else 0
+        exa = exa_client()
+        params = {
+            "type": search.search_type,
+            "category": search.category,
+            "num_results": search.num_results,
+            "include_text": search.include_text,
+            "exclude_text": search.exclude_text,
+            # Contents are only fetched when asked for, as before
+            "contents": {"text": True} if search.text else False,
+        }
+
+        async def fetch():
+            return dataclasses.asdict(await exa.search(search.query, **params))
+
+        results = await search_cache.get_or_fetch("exa", search.query, params, fetch)
+
+        result_count = len(results.get("results") or [])
         logger.info("Exa search completed", extra={"query": search.query, "search_type": search.search_type, "result_count": result_count})
         return results
 
@@ -87,7 +96,7 @@ def exa_search(search: ExaSearch, key: Key = Depends(key_must)):
 
 @router.get("/google")
 @traceroot.trace()
-def google_search(query: str, search_type: str = "web", key: Key = Depends(key_must)):
+async def google_search(query: str, search_type: str = "web", key: Key = Depends(key_must)):
     """Search using Google Custom Search API."""
     # https://developers.google.com/custom-search/v1/overview
     GOOGLE_API_KEY = env_not_empty("GOOGLE_API_KEY")
@@ -100,97 +109,98 @@ def google_search(query: str, search_type: str = "web", key: Key = Depends(key_m
     search_language = "en"
     # How many pages to return
     num_result_pages = 10
-    
-    # Constructing the URL
-    # Doc: https://developers.google.com/custom-search/v1/using_rest
-    base_url = (
-        f"https://www.googleapis.com/customsearch/v1?"
-        f"key={GOOGLE_API_KEY}&cx={SEARCH_ENGINE_ID}&q={query}&start="
-        f"{start_page_idx}&lr={search_language}&num={num_result_pages}"
-    )
 
+    # Doc: https://developers.google.com/custom-search/v1/using_rest
+    params = {"start": start_page_idx, "lr": search_language, "num": num_result_pages}
     if search_type == "image":
-        url = base_url + "&searchType=image"
-    else:
-        url = base_url
+        params["searchType"] = "image"
 
-    responses = []
-    
-    try:
-        # Make the GET request
-        result = requests.get(url)
+    async def fetch():
+        result = await http_client().get(
+            env("GOOGLE_SEARCH_API_URL", "https://www.googleapis.com/customsearch/v1"),
+            params={"key": GOOGLE_API_KEY, "cx": SEARCH_ENGINE_ID, "q": query, **params},
+        )
         data = result.json()
-
-        # Get the result items
-        if "items" in data:
-            search_items = data.get("items")
-
-            # Iterate over results found
-            for i, search_item in enumerate(search_items, start=1):
-                if search_type == "image":
-                    # Process image search results
-                    title = search_item.get("title")
-                    image_url = search_item.get("link")
-                    display_link = search_item.get("displayLink")
-
-                    # Get context URL (page containing the image)
-                    image_info = search_item.get("image", {})
-                    context_url = image_info.get("contextLink", "")
-
-                    # Get image dimensions if available
-                    width = image_info.get("width")
-                    height = image_info.get("height")
-
-                    response = {
-                        "result_id": i,
-                        "title": title,
-                        "image_url": image_url,
-                        "display_link": display_link,
-                        "context_url": context_url,
-                    }
-
-                    # Add dimensions if available
-                    if width:
-                        response["width"] = int(width)
-                    if height:
-                        response["height"] = int(height)
-
-                    responses.append(response)
-                else:
-                    # Process web search results
-                    # Check metatags are present
-                    if "pagemap" not in search_item:
-                        continue
-                    if "metatags" not in search_item["pagemap"]:
-                        continue
-                    if "og:description" in search_item["pagemap"]["metatags"][0]:
-                        long_description = search_item["pagemap"]["metatags"][0]["og:description"]
-                    else:
-                        long_description = "N/A"
-                    # Get the page title
-                    title = search_item.get("title")
-                    # Page snippet
-                    snippet = search_item.get("snippet")
-
-                    # Extract the page url
-                    link = search_item.get("link")
-                    response = {
-                        "result_id": i,
-                        "title": title,
-                        "description": snippet,
-                        "long_description": long_description,
-                        "url": link,
-                    }
-                    responses.append(response)
-            
-            logger.info("Google search completed", extra={"query": query, "search_type": search_type, "result_count": len(responses)})
-        else:
+        if "items" not in data:
             error_info = data.get("error", {})
             logger.error("Google search API error", extra={"query": query, "api_error": error_info})
             raise HTTPException(status_code=500, detail="Internal server error")
+        return parse_google_items(data["items"], search_type)
 
+    try:
+        responses = await search_cache.get_or_fetch("google", query, {"cx": SEARCH_ENGINE_ID, **params}, fetch)
+        logger.info("Google search completed", extra={"query": query, "search_type": search_type, "result_count": len(responses)})
     except Exception as e:
         logger.error("Google search failed", extra={"query": query, "search_type": search_type, "error": str(e)}, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
-    
-    return responses
\ No newline at end of file
+
+    return responses
+
+
+def parse_google_items(search_items: list[dict], search_type: str) -> list[dict]:
+    responses = []
+    # Iterate over results found
+    for i, search_item in enumerate(search_items, start=1):
+        if search_type == "image":
+            # Process image search results
+            title = search_item.get("title")
+            image_url = search_item.get("link")
+            display_link = search_item.get("displayLink")
+
+            # Get context URL (page containing the image)
+            image_info = search_item.get("image", {})
+            context_url = image_info.get("contextLink", "")
+
+            # Get image dimensions if available
+            width = image_info.get("width")
+            height = image_info.get("height")
+
+            response = {
+                "result_id": i,
+                "title": title,
+                "image_url": image_url,
+                "display_link": display_link,
+                "context_url": context_url,
+            }
+
+            # Add dimensions if available
+            if width:
+                response["width"] = int(width)
+            if height:
+                response["height"] = int(height)
+
+            responses.append(response)
+        else:
+            # Process web search results
+            # Check metatags are present
+            if "pagemap" not in search_item:
+                continue
+            if "metatags" not in search_item["pagemap"]:
+                continue
+            if "og:description" in search_item["pagemap"]["metatags"][0]:
+                long_description = search_item["pagemap"]["metatags"][0]["og:description"]
+            else:
+                long_description = "N/A"
+            # Get the page title
+            title = search_item.get("title")
+            # Page snippet
+            snippet = search_item.get("snippet")
+
+            # Extract the page url
+            link = search_item.get("link")
+            response = {
+                "result_id": i,
+                "title": title,
+                "description": snippet,
+                "long_description": long_description,
+                "url": link,
+            }
+            responses.append(response)
+    return responses
+
+
+@router.get("/metrics")
+@traceroot.trace()
+def search_metrics(key: Key = Depends(key_must)):
+    """Cache hit rate and upstream latency of the proxied search endpoints."""
+    return search_cache.snapshot()
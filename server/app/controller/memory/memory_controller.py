@@ -12,15 +12,18 @@
 # limitations under the License.
 # ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
 
+import asyncio
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from pydantic import BaseModel
 from sqlmodel import Session, select
 
-from app.component.auth import Auth, auth_must
+from app.component.auth import Auth, auth, auth_must
 from app.component.database import session
+from app.component.memory_index import embed_memory, search_memories, vector_index
 from app.model.memory.memory import Memory, MemoryType, UserPreference
+from app.model.user.key import Key, KeyStatus
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("server_memory_controller")
@@ -50,6 +53,12 @@ class MemoryOut(BaseModel):
         from_attributes = True
 
 
+class MemorySearchOut(MemoryOut):
+    """Output model for retrieved memories, best match first."""
+
+    score: float
+
+
 class UserPreferenceUpdate(BaseModel):
     """Input model for updating user preferences."""
 
@@ -93,7 +102,9 @@ async def create_memory(
             content=data.content,
             extra_data=data.extra_data,
         )
+        await asyncio.to_thread(embed_memory, memory)
         memory.save(s)
+        vector_index.invalidate(user_id)
         logger.info(
             "Memory created",
             extra={
@@ -148,6 +159,49 @@ async def list_memories(
     return memories
 
 
+async def memory_user_id(
+    auth: Auth | None = Depends(auth),
+    api_key: Optional[str] = Header(None),
+    s: Session = Depends(session),
+) -> int:
+    """Resolve the caller from a login token or, for the backend, an `api-key` header."""
+    if auth is not None and auth._user is not None:
+        return auth.user.id
+    if api_key:
+        key = s.exec(
+            select(Key).where(Key.value == api_key, Key.status == KeyStatus.active, Key.no_delete())
+        ).first()
+        if key is not None:
+            return key.user_id
+    raise HTTPException(status_code=401, detail="Could not validate credentials")
+
+
+@router.get("/search", response_model=List[MemorySearchOut])
+@traceroot.trace()
+async def search(
+    query: str = Query(..., min_length=1, description="Text to retrieve relevant memories for"),
+    organization_id: Optional[int] = Query(None, description="Organization context"),
+    memory_type: Optional[MemoryType] = Query(None, description="Filter by memory type"),
+    k: int = Query(5, ge=1, le=50, description="Number of memories to return"),
+    user_id: int = Depends(memory_user_id),
+    s: Session = Depends(session),
+):
+    """Retrieve the top-k memories relevant to a query.
+
+    Only the user's own memories are searched: the personal ones plus, when
+    organization_id is provided, those the user saved in that organization.
+    """
+    results = await asyncio.to_thread(search_memories, s, query, user_id, organization_id, memory_type, k)
+    logger.debug(
+        "Memories searched",
+        extra={"user_id": user_id, "org_id": organization_id, "k": k, "count": len(results)},
+    )
+    return [
+        MemorySearchOut(**MemoryOut.model_validate(memory).model_dump(), score=score)
+        for memory, score in results
+    ]
+
+
 @router.delete("/{memory_id}")
 @traceroot.trace()
 async def delete_memory(
@@ -173,6 +227,7 @@ async def delete_memory(
 
     try:
         memory.delete(s)
+        vector_index.invalidate(user_id)
         logger.info(
             "Memory deleted", extra={"user_id": user_id, "memory_id": memory_id}
         )
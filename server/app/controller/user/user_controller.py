@@ -5,7 +5,7 @@ from app.component.auth import Auth, auth_must
 from app.component.database import session
 from app.model.user.privacy import UserPrivacy, UserPrivacySettings
 from app.model.user.user import User, UserIn, UserOut, UserProfile
-from app.model.user.user_stat import UserStat, UserStatActionIn, UserStatOut
+from app.model.user.user_stat import UserStat, UserStatActionIn, UserStatOut, user_stat_accumulator
 from app.model.chat.chat_history import ChatHistory
 from app.model.mcp.mcp_user import McpUser
 from app.model.config.config import Config
@@ -111,6 +111,8 @@ def get_user_credits(auth: Auth = Depends(auth_must), session: Session = Depends
 def get_user_stat(auth: Auth = Depends(auth_must), session: Session = Depends(session)):
     """Get current user's operation statistics."""
     user_id = auth.user.id
+    # Make buffered events of this user visible before reading
+    user_stat_accumulator.flush(user_id)
     stat = session.exec(select(UserStat).where(UserStat.user_id == user_id)).first()
     data = UserStatOut()
     
@@ -141,11 +143,28 @@ def get_user_stat(auth: Auth = Depends(auth_must), session: Session = Depends(se
 @traceroot.trace()
 def record_user_stat(
     data: UserStatActionIn,
+    sync: bool = False,
     auth: Auth = Depends(auth_must),
     session: Session = Depends(session),
 ):
-    """Record or update current user's operation statistics."""
+    """Record current user's operation statistics and return the updated record.
+
+    Events are buffered and written as aggregated deltas; the returned record already
+    includes the buffered ones. Pass `sync=true` to apply the increment immediately.
+    """
     data.user_id = auth.user.id
-    stat = UserStat.record_action(session, data)
-    logger.info("User stat recorded", extra={"user_id": data.user_id, "action": data.action if hasattr(data, 'action') else "unknown"})
+    if sync:
+        stat = UserStat.record_action(session, data)
+        logger.info("User stat recorded", extra={"user_id": data.user_id, "action": data.action})
+        return stat
+    user_stat_accumulator.add(data)
+    logger.debug("User stat buffered", extra={"user_id": data.user_id, "action": data.action})
+    stored = session.exec(select(UserStat).where(UserStat.user_id == data.user_id)).first()
+    # Detached copy: the buffered deltas must not be flushed through this session
+    stat = UserStat(**stored.model_dump()) if stored else UserStat(user_id=data.user_id)
+    deltas, model_type = user_stat_accumulator.pending(data.user_id)
+    for name, value in deltas.items():
+        setattr(stat, name, getattr(stat, name) + value)
+    if model_type is not None:
+        stat.model_type = model_type
     return stat
\ No newline at end of file
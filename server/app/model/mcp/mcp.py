@@ -1,10 +1,11 @@
 from enum import IntEnum
-from typing import List
+from typing import Hashable, List
 from pydantic import BaseModel
-from sqlalchemy import Column, SmallInteger, String
-from sqlalchemy.orm import Mapped
+from sqlalchemy import Column, SmallInteger, String, event
+from sqlalchemy.orm import Mapped, Session as OrmSession, object_session
 from sqlmodel import Field, Relationship, JSON
 from sqlalchemy_utils import ChoiceType
+from app.component.response_cache import VersionedResponseCache
 from app.model.abstract.model import AbstractModel, DefaultTimes
 from app.model.mcp.mcp_env import McpEnv, McpEnvOut
 from app.type.pydantic import HttpUrlStr
@@ -73,3 +74,40 @@ class McpInfo(BaseModel):
     id: int
     name: str
     key: str
+
+
+# Serialized `GET /mcps` pages. The catalog scope is shared by all users, ("user", id)
+# scopes hold the `mine` listings of one user.
+mcp_catalog_cache = VersionedResponseCache()
+
+
+_PENDING_SCOPES = "mcp_catalog_pending_scopes"
+
+
+def mark_catalog_dirty(target, scope: Hashable | None = None):
+    """Remember that `scope` (the whole catalog when None) changed in `target`'s session.
+
+    The cache is only invalidated once that session commits: a read between the flush and
+    the commit would still see the old rows and must not cache them under a new version.
+    """
+    object_session(target).info.setdefault(_PENDING_SCOPES, set()).add(scope)
+
+
+def _mark_catalog_dirty(mapper, connection, target):
+    mark_catalog_dirty(target)
+
+
+for _model in (Mcp, McpEnv, Category):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _mark_catalog_dirty)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_committed_scopes(session):
+    for scope in session.info.pop(_PENDING_SCOPES, ()):
+        mcp_catalog_cache.invalidate(scope)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending_scopes(session):
+    session.info.pop(_PENDING_SCOPES, None)
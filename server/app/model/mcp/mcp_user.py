@@ -1,12 +1,12 @@
 from enum import Enum, IntEnum
 from pydantic import BaseModel
-from sqlalchemy import String
+from sqlalchemy import String, event
 from sqlmodel import Field, Column, JSON, SQLModel, UniqueConstraint, Relationship, SmallInteger
 from app.model.abstract.model import DefaultTimes, AbstractModel
 from sqlalchemy.orm import Mapped
 from typing import Optional
 from sqlalchemy_utils import ChoiceType
-from app.model.mcp.mcp import McpInfo, Mcp
+from app.model.mcp.mcp import McpInfo, Mcp, mark_catalog_dirty
 
 
 class Status(IntEnum):
@@ -41,6 +41,14 @@ class McpUser(AbstractModel, DefaultTimes, table=True):
     mcp: Mcp = Relationship(back_populates="mcp_user")
 
 
+def _mark_user_catalog_dirty(mapper, connection, target: McpUser):
+    mark_catalog_dirty(target, ("user", target.user_id))
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(McpUser, _event, _mark_user_catalog_dirty)
+
+
 class McpUserIn(SQLModel):
     mcp_id: int
     env: Optional[dict] = None
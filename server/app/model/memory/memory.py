@@ -15,7 +15,7 @@
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import JSON
+from sqlalchemy import JSON, LargeBinary
 from sqlmodel import Field
 
 from app.model.abstract.model import AbstractModel, DefaultTimes
@@ -51,6 +51,8 @@ class Memory(AbstractModel, DefaultTimes, table=True):
         memory_type: Category of this memory (preference, knowledge, etc).
         content: The actual memory content as text.
         extra_data: Additional structured data as JSON.
+        embedding: Optional float32 embedding of content used for semantic
+            retrieval (see app.component.memory_index).
     """
 
     __tablename__ = "memories"
@@ -63,6 +65,7 @@ class Memory(AbstractModel, DefaultTimes, table=True):
     memory_type: MemoryType = Field(index=True)
     content: str
     extra_data: Optional[dict] = Field(default=None, sa_type=JSON)
+    embedding: Optional[bytes] = Field(default=None, sa_type=LargeBinary)
 
 
 class UserPreference(AbstractModel, DefaultTimes, table=True):
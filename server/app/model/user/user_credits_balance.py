@@ -0,0 +1,57 @@
+from datetime import datetime
+from sqlalchemy import Integer, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Field, Column, Session, select
+from app.model.abstract.model import AbstractModel, DefaultTimes
+
+
+class UserCreditsBalance(AbstractModel, DefaultTimes, table=True):
+    """
+    Running credit totals of a user, derived from the `user_credits_record` ledger.
+
+    The row is updated in the same transaction as the ledger records it summarizes and is
+    locked with `SELECT ... FOR UPDATE` while credits are consumed, so balance reads and
+    consumption never have to aggregate the ledger. `UserCreditsRecord.rebuild_balance`
+    recomputes it from the ledger (reconciliation) and is also used whenever a grant
+    included in the totals may have expired (`next_expire_at` has passed). Inserting a grant
+    by any other path than `UserCreditsRecord.grant_credits` (which rebuilds the row at once)
+    leaves `next_expire_at` at the time of the insert, so the next read rebuilds it.
+    """
+
+    id: int = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", unique=True, index=True)
+    permanent_credits: int = Field(
+        default=0,
+        description="Remaining register/invite/monthly/paid/addon credits",
+        sa_column=Column(Integer, server_default=text("0"), nullable=False),
+    )
+    daily_credits: int = Field(
+        default=0,
+        description="Remaining credits of the active daily grant",
+        sa_column=Column(Integer, server_default=text("0"), nullable=False),
+    )
+    daily_expire_at: datetime | None = Field(default=None, nullable=True, description="Expiration of the daily grant")
+    next_expire_at: datetime | None = Field(
+        default=None, nullable=True, description="Earliest expiration among grants counted in this snapshot"
+    )
+
+    def is_stale(self, now: datetime | None = None) -> bool:
+        now = now or datetime.now()
+        return self.next_expire_at is not None and self.next_expire_at <= now
+
+    @classmethod
+    def lock(cls, user_id: int, session: Session) -> "UserCreditsBalance":
+        """
+        Fetch the snapshot row with a row-level lock held until the transaction ends.
+
+        A missing row is created first with `INSERT ... ON CONFLICT DO NOTHING`, so concurrent
+        first reads of a user lock the same row instead of racing on the unique `user_id`.
+        The new row is stale (`next_expire_at` is now) and gets rebuilt from the ledger.
+        """
+        insert = sqlite.insert if session.get_bind().dialect.name == "sqlite" else postgresql.insert
+        session.execute(
+            insert(cls.__table__)
+            .values(user_id=user_id, next_expire_at=datetime.now())
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        return session.exec(select(cls).where(cls.user_id == user_id).with_for_update()).one()
@@ -3,8 +3,9 @@ from typing import Optional
 from pydantic import BaseModel
 from sqlmodel import Relationship, SQLModel, Field, Column, col, select, Session
 from sqlalchemy_utils import ChoiceType
-from sqlalchemy import Boolean, SmallInteger, text
+from sqlalchemy import Boolean, Index, SmallInteger, event, func, text, update
 from app.model.abstract.model import AbstractModel, DefaultTimes
+from app.model.user.user_credits_balance import UserCreditsBalance
 from datetime import date, datetime, timedelta
 from app.model.user.key import ModelType
 from app.component.database import session_make
@@ -36,7 +37,23 @@ class CreditsPoint(IntEnum):
     special_register = 1500  # 1000 register + 500 invite credit
 
 
+PERMANENT_CHANNELS = [
+    CreditsChannel.monthly,
+    CreditsChannel.paid,
+    CreditsChannel.addon,
+    CreditsChannel.register,
+    CreditsChannel.invite,
+]
+
+
 class UserCreditsRecord(AbstractModel, DefaultTimes, table=True):
+    __table_args__ = (
+        # 消耗时只扫描未用完的发放记录
+        Index("ix_user_credits_record_user_open", "user_id", "used", "channel"),
+        # 按任务查找已有消耗记录
+        Index("ix_user_credits_record_user_source", "user_id", "channel", "source_id"),
+    )
+
     id: int = Field(default=None, primary_key=True)
     user_id: int = Field(index=True, foreign_key="user.id")
     invite_by: int = Field(default=None, nullable=True, description="invite by user id")
@@ -56,35 +73,72 @@ class UserCreditsRecord(AbstractModel, DefaultTimes, table=True):
     )
     used_at: datetime = Field(default=None, nullable=True, description="Time when this record was used/expired")
 
+    @classmethod
+    def _open_grant_filters(cls, user_id: int, channels: list[CreditsChannel], now: datetime) -> list:
+        """未用完且未过期的积分发放记录的查询条件"""
+        return [
+            UserCreditsRecord.user_id == user_id,
+            UserCreditsRecord.channel.in_(channels),
+            UserCreditsRecord.used == False,
+            (UserCreditsRecord.expire_at.is_(None)) | (col(UserCreditsRecord.expire_at) > now),
+        ]
+
+    @classmethod
+    def _open_grants(cls, user_id: int, channels: list[CreditsChannel], now: datetime):
+        """未用完且未过期的积分发放记录"""
+        return select(UserCreditsRecord).where(*cls._open_grant_filters(user_id, channels, now))
+
+    @classmethod
+    def rebuild_balance(cls, user_id: int, session: Session, now: datetime | None = None) -> UserCreditsBalance:
+        """
+        根据积分流水重建用户的余额快照（对账），调用方负责提交事务
+        """
+        now = now or datetime.now()
+        permanent_stmt = select(
+            func.coalesce(func.sum(UserCreditsRecord.amount - UserCreditsRecord.balance), 0),
+            func.min(UserCreditsRecord.expire_at),
+        ).where(*cls._open_grant_filters(user_id, PERMANENT_CHANNELS, now))
+        permanent, permanent_expire_at = session.exec(permanent_stmt).one()
+        daily: UserCreditsRecord | None = session.exec(
+            cls._open_grants(user_id, [CreditsChannel.daily], now)
+            .where(UserCreditsRecord.expire_at.is_not(None))
+            .order_by(UserCreditsRecord.expire_at)
+        ).first()
+
+        snapshot = UserCreditsBalance.lock(user_id, session)
+        snapshot.permanent_credits = permanent
+        snapshot.daily_credits = max(daily.amount - daily.balance, 0) if daily else 0
+        snapshot.daily_expire_at = daily.expire_at if daily else None
+        expirations = [t for t in (permanent_expire_at, snapshot.daily_expire_at) if t is not None]
+        snapshot.next_expire_at = min(expirations) if expirations else None
+        session.add(snapshot)
+        session.flush()
+        return snapshot
+
+    @classmethod
+    def _get_balance(cls, user_id: int, session: Session, for_update: bool = False) -> UserCreditsBalance:
+        """
+        读取余额快照；快照不存在或其中的积分可能已过期时从流水重建
+        """
+        if for_update:
+            snapshot = UserCreditsBalance.lock(user_id, session)
+        else:
+            snapshot = session.exec(select(UserCreditsBalance).where(UserCreditsBalance.user_id == user_id)).first()
+        if snapshot is None or snapshot.is_stale():
+            snapshot = cls.rebuild_balance(user_id, session)
+            if not for_update:
+                session.commit()
+        return snapshot
+
     @classmethod
     def get_permanent_credits(cls, user_id: int) -> int:
         """
-        获取可用的token总量，直接用SQL聚合sum
+        获取可用的永久积分总量（register/invite/monthly/paid/addon），直接读取余额快照
         Returns:
-            int: 可用的token总量
+            int: 可用的积分总量
         """
-        session = session_make()
-        from sqlalchemy import func
-
-        statement = (
-            select(func.sum(UserCreditsRecord.amount))
-            .where(UserCreditsRecord.user_id == user_id)
-            .where(
-                UserCreditsRecord.channel.in_(
-                    [
-                        CreditsChannel.register,
-                        CreditsChannel.invite,
-                        CreditsChannel.paid,
-                        CreditsChannel.addon,
-                        CreditsChannel.monthly,
-                    ]
-                )
-            )
-            .where(UserCreditsRecord.used == False)
-            .where((UserCreditsRecord.expire_at.is_(None)) | (col(UserCreditsRecord.expire_at) > datetime.now()))
-        )
-        result = session.exec(statement).first()
-        return result or 0
+        with session_make() as session:
+            return cls._get_balance(user_id, session).permanent_credits
 
     @classmethod
     def get_temp_credits(cls, user_id: int) -> tuple[int, date]:
@@ -95,19 +149,35 @@ class UserCreditsRecord(AbstractModel, DefaultTimes, table=True):
         Returns:
             int: 可用的临时token总量
         """
-        session = session_make()
-        statement = (
-            select(UserCreditsRecord)
-            .where(UserCreditsRecord.user_id == user_id)
-            .where(UserCreditsRecord.channel == CreditsChannel.daily)
-            .where(UserCreditsRecord.used == False)
-            .where(UserCreditsRecord.expire_at.is_not(None))
-            .where(col(UserCreditsRecord.expire_at) > datetime.now())
+        with session_make() as session:
+            snapshot = cls._get_balance(user_id, session)
+            if snapshot.daily_expire_at is None:
+                return 0, None
+            return snapshot.daily_credits, snapshot.daily_expire_at
+
+    @classmethod
+    def grant_credits(
+        cls,
+        user_id: int,
+        amount: int,
+        channel: CreditsChannel,
+        session: Session,
+        expire_at: datetime | None = None,
+        source_id: int = 0,
+        remark: str = "",
+    ) -> "UserCreditsRecord":
+        """
+        发放积分：写入流水并在同一事务中重建余额快照
+        """
+        cls._get_balance(user_id, session, for_update=True)
+        record = UserCreditsRecord(
+            user_id=user_id, amount=amount, channel=channel, expire_at=expire_at, source_id=source_id, remark=remark
         )
-        record: UserCreditsRecord = session.exec(statement).first()
-        if record is None:
-            return 0, None
-        return record.amount - record.balance, record.expire_at
+        session.add(record)
+        session.flush()
+        cls.rebuild_balance(user_id, session)
+        session.commit()
+        return record
 
     @classmethod
     def consume_credits(cls, user_id: int, amount: int, session: Session, source_id: int = 0, remark: str = ""):
@@ -116,6 +186,9 @@ class UserCreditsRecord(AbstractModel, DefaultTimes, table=True):
         消耗时更新UserCreditsRecord的balance字段，记录已消耗积分数。
         同时生成积分消耗记录，更新用户积分credits字段（不包括每日积分）。
         避免重复生成积分消耗记录和重复扣减积分。
+        整个过程持有余额快照的行锁（SELECT ... FOR UPDATE），并发消耗按用户串行执行。
+        每次调用同步结算；同一任务（source_id）的多次消耗合并到同一条消耗记录，
+        不在进程内缓存批量提交（余额不足必须在调用时抛出）。
         """
 
         # 检查是否已有积分消耗记录
@@ -147,83 +220,64 @@ class UserCreditsRecord(AbstractModel, DefaultTimes, table=True):
         cls._consume_credits_internal(user_id, amount, session, source_id, remark)
 
     @classmethod
-    def _consume_credits_internal(
-        cls, user_id: int, amount: int, session: Session, source_id: int = 0, remark: str = ""
-    ):
+    def _consume_from_grants(cls, user_id: int, amount: int, session: Session) -> tuple[int, int, int]:
         """
-        内部积分消耗逻辑，处理实际的积分扣减
+        按优先级从积分发放记录中扣减，并同步更新余额快照和用户credits字段。
+        余额快照行在整个事务中保持锁定；快照显示余额为0的部分不再查询流水。
+        用完的发放记录标记为used，后续消耗不会再遍历它们。
+
+        Returns:
+            tuple[int, int, int]: (每日积分消耗, 其他积分消耗, 未能扣减的剩余)
         """
         from app.model.user.user import User
 
+        snapshot = cls._get_balance(user_id, session, for_update=True)
         remain = amount
         now = datetime.now()
         consumed_from_daily = 0
         consumed_from_other = 0
 
+        def consume(record: UserCreditsRecord) -> int:
+            use = min(remain, record.amount - record.balance)
+            if use <= 0:
+                return 0
+            record.balance += use
+            if record.balance >= record.amount:
+                record.used = True
+                record.used_at = now
+            session.add(record)
+            return use
+
         # 优先消耗daily
-        statement = (
-            select(UserCreditsRecord)
-            .where(UserCreditsRecord.user_id == user_id)
-            .where(UserCreditsRecord.channel == CreditsChannel.daily)
-            .where(UserCreditsRecord.used == False)
-            .where(UserCreditsRecord.expire_at.is_not(None))
-            .where(col(UserCreditsRecord.expire_at) > now)
-            .order_by(UserCreditsRecord.expire_at)
-        )
-        daily_records = session.exec(statement).first()
-        if daily_records:
-            can_consume = daily_records.amount - daily_records.balance
-            use = min(remain, can_consume)
-            daily_records.balance += use
-            session.add(daily_records)
-            remain -= use
-            consumed_from_daily = use
-            if remain == 0:
-                # 生成积分消耗记录
-                consume_record = UserCreditsRecord(
-                    user_id=user_id,
-                    amount=-amount,
-                    channel=CreditsChannel.consume,
-                    source_id=source_id,
-                    remark=remark or f"Consumed {amount} credits (daily: {consumed_from_daily})",
-                )
-                session.add(consume_record)
-                session.commit()
-                return
+        if snapshot.daily_credits > 0:
+            daily_record = session.exec(
+                cls._open_grants(user_id, [CreditsChannel.daily], now)
+                .where(UserCreditsRecord.expire_at.is_not(None))
+                .order_by(UserCreditsRecord.expire_at)
+                .with_for_update()
+            ).first()
+            if daily_record:
+                consumed_from_daily = consume(daily_record)
+                remain -= consumed_from_daily
 
         # 若daily不够，继续消耗monthly/paid/addon
-        if remain > 0:
-            statement = (
-                select(UserCreditsRecord)
-                .where(UserCreditsRecord.user_id == user_id)
-                .where(
-                    UserCreditsRecord.channel.in_(
-                        [
-                            CreditsChannel.monthly,
-                            CreditsChannel.paid,
-                            CreditsChannel.addon,
-                            CreditsChannel.register,
-                            CreditsChannel.invite,
-                        ]
-                    )
-                )
-                .where(UserCreditsRecord.used == False)
-                .where((UserCreditsRecord.expire_at.is_(None)) | (col(UserCreditsRecord.expire_at) > now))
+        if remain > 0 and snapshot.permanent_credits > 0:
+            other_records = session.exec(
+                cls._open_grants(user_id, PERMANENT_CHANNELS, now)
                 .order_by(UserCreditsRecord.expire_at)
-            )
-            other_records = session.exec(statement).all()
+                .with_for_update()
+            ).all()
             for record in other_records:
-                can_consume = record.amount - record.balance
-                if can_consume <= 0:
-                    continue
-                use = min(remain, can_consume)
-                record.balance += use
-                session.add(record)
+                use = consume(record)
                 remain -= use
                 consumed_from_other += use
                 if remain == 0:
                     break
 
+        snapshot.daily_credits -= consumed_from_daily
+        snapshot.permanent_credits -= consumed_from_other
+        session.add(snapshot)
+
         # 更新用户积分字段（只扣除非每日积分消耗的部分）
         if consumed_from_other > 0:
             user = session.exec(select(User).where(User.id == user_id)).first()
@@ -231,13 +285,30 @@ class UserCreditsRecord(AbstractModel, DefaultTimes, table=True):
                 user.credits -= consumed_from_other
                 session.add(user)
 
+        return consumed_from_daily, consumed_from_other, remain
+
+    @classmethod
+    def _consume_credits_internal(
+        cls, user_id: int, amount: int, session: Session, source_id: int = 0, remark: str = ""
+    ):
+        """
+        内部积分消耗逻辑，处理实际的积分扣减
+        """
+        consumed_from_daily, consumed_from_other, remain = cls._consume_from_grants(user_id, amount, session)
+
         # 生成积分消耗记录
+        if consumed_from_other == 0 and remain == 0:
+            default_remark = f"Consumed {amount} credits (daily: {consumed_from_daily})"
+        else:
+            default_remark = (
+                f"Consumed {amount} credits (daily: {consumed_from_daily}, other: {consumed_from_other})"
+            )
         consume_record = UserCreditsRecord(
             user_id=user_id,
             amount=-amount,
             channel=CreditsChannel.consume,
             source_id=source_id,
-            remark=remark or f"Consumed {amount} credits (daily: {consumed_from_daily}, other: {consumed_from_other})",
+            remark=remark or default_remark,
         )
         session.add(consume_record)
         session.commit()
@@ -253,74 +324,8 @@ class UserCreditsRecord(AbstractModel, DefaultTimes, table=True):
         内部积分消耗逻辑（更新模式），处理实际的积分扣减但不生成新的消耗记录
         用于更新现有消耗记录时的额外积分消耗
         """
-        from app.model.user.user import User
-
-        remain = amount
-        now = datetime.now()
-        consumed_from_daily = 0
-        consumed_from_other = 0
-
-        # 优先消耗daily
-        statement = (
-            select(UserCreditsRecord)
-            .where(UserCreditsRecord.user_id == user_id)
-            .where(UserCreditsRecord.channel == CreditsChannel.daily)
-            .where(UserCreditsRecord.used == False)
-            .where(UserCreditsRecord.expire_at.is_not(None))
-            .where(col(UserCreditsRecord.expire_at) > now)
-            .order_by(UserCreditsRecord.expire_at)
-        )
-        daily_records = session.exec(statement).first()
-        if daily_records:
-            can_consume = daily_records.amount - daily_records.balance
-            use = min(remain, can_consume)
-            daily_records.balance += use
-            session.add(daily_records)
-            remain -= use
-            consumed_from_daily = use
-            if remain == 0:
-                # 不生成新的消耗记录，只更新现有记录
-                return
-
-        # 若daily不够，继续消耗monthly/paid/addon
-        if remain > 0:
-            statement = (
-                select(UserCreditsRecord)
-                .where(UserCreditsRecord.user_id == user_id)
-                .where(
-                    UserCreditsRecord.channel.in_(
-                        [
-                            CreditsChannel.monthly,
-                            CreditsChannel.paid,
-                            CreditsChannel.addon,
-                            CreditsChannel.register,
-                            CreditsChannel.invite,
-                        ]
-                    )
-                )
-                .where(UserCreditsRecord.used == False)
-                .where((UserCreditsRecord.expire_at.is_(None)) | (col(UserCreditsRecord.expire_at) > now))
-                .order_by(UserCreditsRecord.expire_at)
-            )
-            other_records = session.exec(statement).all()
-            for record in other_records:
-                can_consume = record.amount - record.balance
-                if can_consume <= 0:
-                    continue
-                use = min(remain, can_consume)
-                record.balance += use
-                session.add(record)
-                remain -= use
-                consumed_from_other += use
-                if remain == 0:
-                    break
+        consumed_from_daily, consumed_from_other, remain = cls._consume_from_grants(user_id, amount, session)
         logger.info(f"consumed_from_other: {consumed_from_other}")
-        # 更新用户积分字段（只扣除非每日积分消耗的部分）
-        if consumed_from_other > 0:
-            user = session.exec(select(User).where(User.id == user_id)).first()
-            if user:
-                user.credits -= consumed_from_other
-                session.add(user)
 
         # 不生成新的消耗记录，因为现有记录已经在主函数中更新了
 
@@ -381,3 +386,17 @@ class UserCreditsRecordOut(BaseModel):
     expire_at: datetime | None
     created_at: datetime
     updated_at: datetime | None
+
+
+@event.listens_for(UserCreditsRecord, "after_insert")
+def _invalidate_balance_on_grant(mapper, connection, target: UserCreditsRecord):
+    """
+    积分发放记录无论从哪里写入，都将余额快照标记为过期，下次读取时从流水重建。
+    消耗记录不计入快照，无需处理。
+    """
+    if target.channel != CreditsChannel.consume:
+        connection.execute(
+            update(UserCreditsBalance)
+            .where(UserCreditsBalance.user_id == target.user_id)
+            .values(next_expire_at=datetime.now())
+        )
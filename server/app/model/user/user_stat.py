@@ -1,10 +1,19 @@
+import atexit
+import threading
 from datetime import datetime
 from typing import Optional
-from sqlmodel import SQLModel, Field, Column, select
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import SQLModel, Field, Column, Session, select
 from pydantic import BaseModel
 from enum import Enum
 
+from app.component.database import session_make
+from app.component.environment import env
 from app.model.abstract.model import AbstractModel, DefaultTimes
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("user_stat")
 
 
 class UserStatActionEnum(str, Enum):
@@ -17,6 +26,9 @@ class UserStatActionEnum(str, Enum):
     paid_amount_on_avg_task = "paid_amount_on_avg_task"
 
 
+COUNTER_ACTIONS = frozenset(UserStatActionEnum)
+
+
 class UserStatActionIn(BaseModel):
     user_id: int | None = None
     action: UserStatActionEnum
@@ -26,7 +38,7 @@ class UserStatActionIn(BaseModel):
 
 class UserStat(AbstractModel, DefaultTimes, table=True):
     id: int = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id", index=True, description="User ID")
+    user_id: int = Field(foreign_key="user.id", index=True, unique=True, description="User ID")
     # Model usage type: 'cloud' or 'local'
     model_type: str = Field(default="unused", description="Model usage type: 'cloud' or 'local'")
     # Product page statistics
@@ -40,36 +52,112 @@ class UserStat(AbstractModel, DefaultTimes, table=True):
     paid_amount_on_avg_task: int = Field(default=0, description="Total paid amount on average task completion")
 
     @classmethod
-    def record_action(cls, session, action_in: UserStatActionIn):
+    def record_action(cls, session: Session, action_in: UserStatActionIn):
         """
         Record or update user operation statistics using a Pydantic model.
-        If no record exists for the user, create one. Otherwise, update the corresponding field.
+        The counter is incremented in the database (`col = col + :value`), so concurrent
+        events for the same user are never lost. If no record exists for the user, create one.
         Supported actions: download_count, register_count, task_complete_count, task_failed_count, file_download_count, file_generate_count, paid_amount_on_avg_task.
         If model_type is provided, update it as well.
         """
-        stat = session.exec(select(cls).where(cls.user_id == action_in.user_id)).first()
-        if not stat:
-            stat = cls(user_id=action_in.user_id)
-            session.add(stat)
-        if action_in.action in [
-            UserStatActionEnum.download_count,
-            UserStatActionEnum.register_count,
-            UserStatActionEnum.task_complete_count,
-            UserStatActionEnum.task_failed_count,
-            UserStatActionEnum.file_download_count,
-            UserStatActionEnum.file_generate_count,
-        ]:
-            setattr(stat, action_in.action.value, getattr(stat, action_in.action.value, 0) + action_in.value)
-        elif action_in.action == UserStatActionEnum.paid_amount_on_avg_task:
-            stat.paid_amount_on_avg_task += action_in.value
-        else:
+        if action_in.action not in COUNTER_ACTIONS:
             raise ValueError(f"Unsupported action: {action_in.action}")
-        if action_in.model_type is not None:
-            stat.model_type = action_in.model_type
-        session.add(stat)
+        cls.apply_deltas(session, action_in.user_id, {action_in.action.value: action_in.value}, action_in.model_type)
+        return session.exec(select(cls).where(cls.user_id == action_in.user_id)).first()
+
+    @classmethod
+    def apply_deltas(cls, session: Session, user_id: int, deltas: dict[str, int], model_type: str | None = None):
+        """
+        Atomically add aggregated counter deltas to a user's stat row with one
+        INSERT ... ON CONFLICT (user_id) DO UPDATE, creating the row on the user's first event.
+        """
+        row = dict(deltas)
+        if model_type is not None:
+            row["model_type"] = model_type
+        if not row:
+            return
+        table = cls.__table__
+        insert = sqlite.insert if session.get_bind().dialect.name == "sqlite" else postgresql.insert
+        stmt = insert(table).values(user_id=user_id, **row)
+        values = {name: table.c[name] + stmt.excluded[name] for name in deltas}
+        if model_type is not None:
+            values["model_type"] = stmt.excluded.model_type
+        # Column onupdate defaults do not apply to ON CONFLICT DO UPDATE
+        values["updated_at"] = func.now()
+        session.exec(stmt.on_conflict_do_update(index_elements=[table.c.user_id], set_=values))
         session.commit()
-        session.refresh(stat)
-        return stat
+
+
+class UserStatAccumulator:
+    """
+    In-process buffer that aggregates stat events per user and writes them with one
+    UPDATE per user, either every `flush_interval` seconds or once `max_pending` events
+    are buffered. A burst of e.g. `file_generate_count` events becomes a single write.
+    """
+
+    def __init__(self, flush_interval: float = 5.0, max_pending: int = 100):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._deltas: dict[int, dict[str, int]] = {}
+        self._model_types: dict[int, str] = {}
+        self._events: dict[int, int] = {}
+        self._pending = 0
+        self._timer: threading.Timer | None = None
+
+    def add(self, action_in: UserStatActionIn):
+        if action_in.action not in COUNTER_ACTIONS:
+            raise ValueError(f"Unsupported action: {action_in.action}")
+        with self._lock:
+            user_deltas = self._deltas.setdefault(action_in.user_id, {})
+            user_deltas[action_in.action.value] = user_deltas.get(action_in.action.value, 0) + action_in.value
+            if action_in.model_type is not None:
+                self._model_types[action_in.user_id] = action_in.model_type
+            self._events[action_in.user_id] = self._events.get(action_in.user_id, 0) + 1
+            self._pending += 1
+            should_flush = self._pending >= self.max_pending
+            if not should_flush and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if should_flush:
+            self.flush()
+
+    def pending(self, user_id: int) -> tuple[dict[str, int], str | None]:
+        """Counter deltas and model_type buffered for `user_id` but not written yet."""
+        with self._lock:
+            return dict(self._deltas.get(user_id, {})), self._model_types.get(user_id)
+
+    def flush(self, user_id: int | None = None):
+        """Write buffered deltas, for every user or only for `user_id`."""
+        with self._lock:
+            if user_id is None:
+                batch = self._deltas
+                model_types = self._model_types
+                self._deltas, self._model_types, self._events, self._pending = {}, {}, {}, 0
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            else:
+                if user_id not in self._deltas:
+                    return
+                batch = {user_id: self._deltas.pop(user_id)}
+                model_types = {user_id: self._model_types.pop(user_id)} if user_id in self._model_types else {}
+                self._pending -= self._events.pop(user_id, 0)
+        if not batch:
+            return
+        with session_make() as s:
+            for uid, deltas in batch.items():
+                try:
+                    UserStat.apply_deltas(s, uid, deltas, model_types.get(uid))
+                except Exception as e:
+                    s.rollback()
+                    logger.error(
+                        "Failed to flush user stat deltas",
+                        extra={"user_id": uid, "deltas": deltas, "error": str(e)},
+                        exc_info=True,
+                    )
+        logger.debug("User stat deltas flushed", extra={"users": len(batch)})
 
 
 class UserStatOut(BaseModel):
@@ -85,3 +173,10 @@ class UserStatOut(BaseModel):
     task_queries: int = 0
     mcp_install_count: int = 0
     storage_used: float = 0
+
+
+user_stat_accumulator = UserStatAccumulator(
+    flush_interval=float(env("user_stat_flush_interval", "5")),
+    max_pending=int(env("user_stat_flush_size", "100")),
+)
+atexit.register(user_stat_accumulator.flush)
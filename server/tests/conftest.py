@@ -0,0 +1,22 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+import os
+
+# Importing controllers creates the database engine and reads the token secret; tests that
+# touch neither only need values they accept
+os.environ.setdefault("database_url", "sqlite://")
+os.environ.setdefault("secret_key", "test-secret")
+
+pytest_plugins = ["pytest_asyncio"]
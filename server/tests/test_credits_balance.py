@@ -0,0 +1,58 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.model.user.user import User
+from app.model.user.user_credits_balance import UserCreditsBalance
+from app.model.user.user_credits_record import CreditsChannel, UserCreditsRecord
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(
+        engine, tables=[User.__table__, UserCreditsRecord.__table__, UserCreditsBalance.__table__]
+    )
+    return engine
+
+
+def test_first_lock_creates_one_stale_snapshot(engine):
+    with Session(engine) as s:
+        first = UserCreditsBalance.lock(1, s)
+        assert first.is_stale()
+        assert UserCreditsBalance.lock(1, s) is first
+        first_id = first.id
+        s.commit()
+    with Session(engine) as s:
+        assert UserCreditsBalance.lock(1, s).id == first_id
+        assert len(s.exec(select(UserCreditsBalance)).all()) == 1
+
+
+def test_consume_without_snapshot_rebuilds_it_from_the_ledger(engine):
+    with Session(engine) as s:
+        s.add(User(id=1, email="user@example.com", credits=100))
+        s.add(UserCreditsRecord(
+            user_id=1, amount=100, channel=CreditsChannel.paid, expire_at=datetime.now() + timedelta(days=1)
+        ))
+        s.commit()
+
+        UserCreditsRecord.consume_credits(1, 30, s, source_id=7)
+
+        snapshot = s.exec(select(UserCreditsBalance).where(UserCreditsBalance.user_id == 1)).one()
+        assert snapshot.permanent_credits == 70
+        assert s.get(User, 1).credits == 70
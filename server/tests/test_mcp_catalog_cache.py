@@ -0,0 +1,47 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.model.mcp.category import Category
+from app.model.mcp.mcp import mcp_catalog_cache
+from app.model.mcp.mcp_user import McpUser  # noqa: F401  (Mcp.mcp_user needs it mapped)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[Category.__table__])
+    with Session(engine) as session:
+        yield session
+
+
+def test_catalog_is_invalidated_on_commit_not_on_flush(db):
+    before = mcp_catalog_cache.version("catalog")
+    db.add(Category(name="search"))
+    db.flush()
+    assert mcp_catalog_cache.version("catalog") == before
+
+    db.commit()
+    assert mcp_catalog_cache.version("catalog") > before
+
+
+def test_rolled_back_write_keeps_the_cache(db):
+    before = mcp_catalog_cache.version("catalog")
+    db.add(Category(name="search"))
+    db.flush()
+    db.rollback()
+    db.commit()
+    assert mcp_catalog_cache.version("catalog") == before
@@ -0,0 +1,114 @@
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2025 @ EIGENT.AI. All Rights Reserved. =========
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.component.search_cache import SearchCache, close_http_client, http_client
+from app.controller.mcp import proxy_controller
+from app.model.mcp.proxy import ExaSearch
+
+
+class StubExaHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the Exa API: answers POST /search and fails queries containing "fail"."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append({"path": self.path, "api_key": self.headers.get("x-api-key"), **body})
+        if "fail" in body["query"]:
+            status, payload = 500, {"error": "upstream unavailable"}
+        else:
+            status = 200
+            payload = {
+                "requestId": "stub",
+                "resolvedSearchType": "neural",
+                "results": [{"id": "1", "url": "https://example.com/result", "title": body["query"]}],
+            }
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_exa(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubExaHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("EXA_API_KEY", "test-key")
+    monkeypatch.setenv("EXA_API_BASE", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(proxy_controller, "search_cache", SearchCache(ttl=60))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_pooled_client():
+    # The pooled client belongs to the event loop of the test that created it
+    yield
+    await close_http_client()
+
+
+def exa_metrics() -> dict:
+    return proxy_controller.search_cache.snapshot()["exa"]
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache(stub_exa):
+    first = await proxy_controller.exa_search(ExaSearch(query="eigent agents"), key=None)
+    second = await proxy_controller.exa_search(ExaSearch(query="  Eigent   AGENTS "), key=None)
+
+    assert first["results"][0]["title"] == "eigent agents"
+    assert second == first
+    assert len(stub_exa.requests) == 1
+    assert stub_exa.requests[0]["path"] == "/search"
+    assert stub_exa.requests[0]["api_key"] == "test-key"
+    assert (exa_metrics()["misses"], exa_metrics()["hits"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_new_query_or_parameters_go_upstream(stub_exa):
+    await proxy_controller.exa_search(ExaSearch(query="first"), key=None)
+    await proxy_controller.exa_search(ExaSearch(query="second"), key=None)
+    await proxy_controller.exa_search(ExaSearch(query="first", text=True), key=None)
+
+    assert [request["query"] for request in stub_exa.requests] == ["first", "second", "first"]
+    assert "contents" not in stub_exa.requests[0]
+    assert stub_exa.requests[2]["contents"] == {"text": True}
+    assert (exa_metrics()["misses"], exa_metrics()["hits"]) == (3, 0)
+    # Requests went through the pooled client, not one owned by the Exa SDK
+    assert proxy_controller.exa_client().client is http_client()
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_is_not_cached(stub_exa):
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            await proxy_controller.exa_search(ExaSearch(query="please fail"), key=None)
+        assert error.value.status_code == 500
+
+    assert len(stub_exa.requests) == 2
+    assert exa_metrics()["errors"] == 2
+    assert exa_metrics()["hits"] == 0
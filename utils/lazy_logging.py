@@ -0,0 +1,116 @@
+"""
+Logging facade over `traceroot_wrapper.get_logger` for hot paths (per step, per tool call, per
+queued event).
+
+- Level guard: below the enabled level nothing is formatted, no `extra` dict is built and
+  TraceRoot's per-call bookkeeping is skipped. TraceRoot loggers always sit at DEBUG, so the
+  facade applies LOG_LEVEL (default INFO) on top of the wrapped logger's own level.
+- Lazy arguments: pass %-style args; `payload(obj)` and `lazy(fn)` defer JSON/repr work until a
+  record is actually formatted, and `extra` may be a zero-argument callable.
+- Sampling: `every=N` emits one record per N calls of a call site (keyed by message template).
+- Truncation: `payload()` caps the rendered text at LOG_PAYLOAD_MAX_CHARS.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Callable
+
+from utils import traceroot_wrapper
+
+
+def _level_from_env() -> int:
+    level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+class _Lazy:
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+
+    def __str__(self) -> str:
+        return str(self.fn())
+
+
+class _Payload:
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int | None):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        value = self.value
+        if not isinstance(value, str):
+            try:
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            except (TypeError, ValueError):
+                value = repr(value)
+        limit = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "500")) if self.limit is None else self.limit
+        if len(value) > limit:
+            return f"{value[:limit]}... ({len(value)} chars)"
+        return value
+
+
+def lazy(fn: Callable[[], Any]) -> _Lazy:
+    """Defer an expensive log argument; `fn` only runs if the record is formatted."""
+    return _Lazy(fn)
+
+
+def payload(value: Any, limit: int | None = None) -> _Payload:
+    """Render a message, tool args or result as (JSON) text, truncated to `limit` characters."""
+    return _Payload(value, limit)
+
+
+class LazyLogger:
+    """Drop-in for the loggers returned by `traceroot_wrapper.get_logger`, adding `every=` sampling."""
+
+    def __init__(self, logger: Any, level: int | None = None):
+        self._logger = logger
+        # TraceRootLogger wraps a stdlib logger; plain loggers are used as they are
+        self._std: logging.Logger = getattr(logger, "logger", logger)
+        self.level = _level_from_env() if level is None else level
+        self._calls: dict[tuple[int, str], int] = {}
+
+    def isEnabledFor(self, level: int) -> bool:
+        return level >= self.level and self._std.isEnabledFor(level)
+
+    def _log(self, level: int, method: str, msg: str, args: tuple, every: int, extra: Any, kwargs: dict):
+        if not self.isEnabledFor(level):
+            return
+        if every > 1:
+            key = (level, msg)
+            count = self._calls.get(key, 0)
+            self._calls[key] = count + 1
+            if count % every:
+                return
+            msg = f"{msg} [sampled 1/{every}]"
+        if extra is not None:
+            kwargs["extra"] = extra() if callable(extra) else extra
+        # Attribute the record to the caller, skipping this facade (and TraceRootLogger's own frame)
+        kwargs.setdefault("stacklevel", 3 if self._std is self._logger else 4)
+        getattr(self._logger, method)(msg, *args, **kwargs)
+
+    def debug(self, msg: str, *args: Any, every: int = 1, extra: Any = None, **kwargs: Any):
+        self._log(logging.DEBUG, "debug", msg, args, every, extra, kwargs)
+
+    def info(self, msg: str, *args: Any, every: int = 1, extra: Any = None, **kwargs: Any):
+        self._log(logging.INFO, "info", msg, args, every, extra, kwargs)
+
+    def warning(self, msg: str, *args: Any, every: int = 1, extra: Any = None, **kwargs: Any):
+        self._log(logging.WARNING, "warning", msg, args, every, extra, kwargs)
+
+    def error(self, msg: str, *args: Any, every: int = 1, extra: Any = None, **kwargs: Any):
+        self._log(logging.ERROR, "error", msg, args, every, extra, kwargs)
+
+    def critical(self, msg: str, *args: Any, every: int = 1, extra: Any = None, **kwargs: Any):
+        self._log(logging.CRITICAL, "critical", msg, args, every, extra, kwargs)
+
+
+def get_lazy_logger(name: str, level: int | None = None) -> LazyLogger:
+    return LazyLogger(traceroot_wrapper.get_logger(name), level)
+
+
+__all__ = ["LazyLogger", "get_lazy_logger", "lazy", "payload"]